@@ -0,0 +1,113 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Compute the ac powerflows of many independent injection scenarios (same topology) with GridModel.ac_pf_batch (for
+different batch sizes, a batch size of 1 being one newton raphson per scenario, without python in the loop) and
+with one call to GridModel.ac_pf per scenario (the injections are modified from python before each call).
+
+With "--threads N", the scenarios are split in N parts computed at the same time on copies of the GridModel.
+"""
+
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from lightsim2grid.initGridModel import init
+from utils_benchmark import CASES, make_v0
+import pdb
+
+NB_SCENARIO = 1000
+BATCH_SIZES = [1, 4, 16, 64]
+MAX_IT = 10
+TOL = 1e-8
+
+
+def make_scenarios(net, nb_scenario, seed=0):
+    """injections of each scenario (one row per scenario), the last generator is the slack bus"""
+    prng = np.random.RandomState(seed)
+    load_shape = (nb_scenario, net.load.shape[0])
+    gen_p = np.concatenate((net.gen["p_mw"].values, np.zeros(net.ext_grid.shape[0])))
+    gen_v = np.concatenate((net.gen["vm_pu"].values, net.ext_grid["vm_pu"].values))
+    loads_p = net.load["p_mw"].values * (1.0 + 0.05 * prng.normal(size=load_shape))
+    loads_q = net.load["q_mvar"].values * (1.0 + 0.05 * prng.normal(size=load_shape))
+    gens_p = gen_p * (1.0 + 0.02 * prng.normal(size=(nb_scenario, 1)))
+    gens_v = np.tile(gen_v, (nb_scenario, 1))
+    return loads_p, loads_q, gens_p, gens_v
+
+
+def time_loop(model, net, loads_p, loads_q, gens_p, gens_v):
+    V0 = make_v0(net)
+    res = np.full((loads_p.shape[0], net.line.shape[0]), fill_value=np.NaN)
+    beg_ = time.perf_counter()
+    for scenario_id in range(loads_p.shape[0]):
+        for load_id in range(loads_p.shape[1]):
+            model.change_p_load(load_id, loads_p[scenario_id, load_id])
+            model.change_q_load(load_id, loads_q[scenario_id, load_id])
+        for gen_id in range(gens_p.shape[1]):
+            model.change_p_gen(gen_id, gens_p[scenario_id, gen_id])
+            model.change_v_gen(gen_id, gens_v[scenario_id, gen_id])
+        V = model.ac_pf(V0, MAX_IT, TOL)
+        if V.shape[0] > 0:
+            res[scenario_id] = model.get_lineor_res()[0]
+    return time.perf_counter() - beg_, res
+
+
+def time_batch(model, net, scenarios, batch_size, nb_thread):
+    V0 = make_v0(net)
+    beg_ = time.perf_counter()
+    if nb_thread <= 1:
+        res = model.ac_pf_batch(*scenarios, V0, MAX_IT, TOL, batch_size)
+        p_or = res[2]
+    else:
+        # ac_pf_batch releases the GIL: each thread uses its own copy of the grid
+        parts = np.array_split(np.arange(scenarios[0].shape[0]), nb_thread)
+        models = [model.copy() for _ in parts]
+        with ThreadPoolExecutor(max_workers=nb_thread) as executor:
+            futures = [executor.submit(model_.ac_pf_batch, *[np.ascontiguousarray(el[part]) for el in scenarios],
+                                       V0, MAX_IT, TOL, batch_size)
+                       for model_, part in zip(models, parts)]
+            p_or = np.concatenate([el.result()[2] for el in futures])
+    return time.perf_counter() - beg_, p_or[:, :net.line.shape[0]]
+
+
+def main(case_names, nb_scenario, batch_sizes, nb_thread):
+    print("{:>10s} | {:>12s} | {}".format("case", "ac_pf loop",
+                                          " | ".join(["{:>14s}".format("batch ({})".format(el))
+                                                      for el in batch_sizes])))
+    for case_name in case_names:
+        net = CASES[case_name]()
+        scenarios = make_scenarios(net, nb_scenario)
+        timer_loop, res_ref = time_loop(init(net), net, *scenarios)
+        timers = []
+        max_diff = 0.
+        for batch_size in batch_sizes:
+            model = init(net)
+            timer, res = time_batch(model, net, scenarios, batch_size, nb_thread)
+            timers.append(timer)
+            max_diff = max(max_diff, np.nanmax(np.abs(res - res_ref)))
+        print("{:>10s} | {:>10.1f}us | {}".format(case_name, 1e6 * timer_loop / nb_scenario,
+                                                  " | ".join(["{:>6.1f}us {:>5.1f}x".format(1e6 * el / nb_scenario,
+                                                                                           timer_loop / el)
+                                                              for el in timers])))
+        print("{:>10s} | max difference of the flows: {:.2e}MW".format("", max_diff))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the ac powerflow of many injection scenarios')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--number', type=int, default=NB_SCENARIO,
+                        help='Number of scenarios for each case.')
+    parser.add_argument('--batch_size', default=BATCH_SIZES, type=int, nargs="+",
+                        help='Number of scenarios solved together by ac_pf_batch.')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='Number of threads (each one computing a part of the scenarios).')
+    args = parser.parse_args()
+    main(args.case, args.number, args.batch_size, args.threads)
@@ -0,0 +1,78 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Compute the ac flows after all the single branch outages with GridModel.ac_n1_screening (compensation method, for
+different numbers of newton raphson steps), then compute again with GridModel.run_n1 only the outages whose error
+indicator is above "--error_tol", and compare with one full ac powerflow per outage (GridModel.run_n1, 1 thread).
+"""
+
+import time
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from n1 import make_contingencies
+from utils_benchmark import CASES, make_v0
+import pdb
+
+MAX_IT = 10
+TOL = 1e-8
+NB_STEPS = [1, 2, 3]
+ERROR_TOL = 1e-1
+
+
+def time_screening(model, net, contingency_list, nb_step, error_tol):
+    """screening of all the outages, then a full powerflow for the ones that are flagged"""
+    V0 = make_v0(net)
+    branch_ids = np.arange(len(contingency_list))
+    beg_ = time.perf_counter()
+    error, p_or, a_or = model.ac_n1_screening(V0, branch_ids, MAX_IT, TOL, nb_step)
+    timer_screening = time.perf_counter() - beg_
+    flagged = np.where(~(error <= error_tol))[0]
+    converged, p_or_flagged, a_or_flagged = model.run_n1([contingency_list[el] for el in flagged],
+                                                         V0, MAX_IT, TOL, 1)
+    p_or[flagged] = p_or_flagged
+    return timer_screening, time.perf_counter() - beg_, flagged.shape[0], p_or
+
+
+def main(case_names, nb_steps, error_tol):
+    print("{:>10s} | {:>8s} | {:>12s} | {}".format("case", "nb cont", "run_n1",
+                                                    " | ".join(["{:>14s} | {:>29s}".format("{} step(s)".format(el),
+                                                                                           "+ flagged outages")
+                                                                for el in nb_steps])))
+    for case_name in case_names:
+        net = CASES[case_name]()
+        contingency_list = make_contingencies(net)
+        nb_cont = len(contingency_list)
+        model = init(net)
+        beg_ = time.perf_counter()
+        converged, res_ref, _ = model.run_n1(contingency_list, make_v0(net), MAX_IT, TOL, 1)
+        timer_ref = time.perf_counter() - beg_
+        res = []
+        for nb_step in nb_steps:
+            timer_screening, timer_total, nb_flagged, p_or = time_screening(init(net), net, contingency_list,
+                                                                            nb_step, error_tol)
+            max_diff = np.max(np.abs(p_or - res_ref)[converged])
+            res.append("{:>6.1f}us {:>5.1f}x | {:>4d} {:>6.1f}us {:>4.1f}x {:.0e}MW".format(
+                1e6 * timer_screening / nb_cont, timer_ref / timer_screening,
+                nb_flagged, 1e6 * timer_total / nb_cont, timer_ref / timer_total, max_diff))
+        print("{:>10s} | {:>8d} | {:>10.1f}us | {}".format(case_name, nb_cont, 1e6 * timer_ref / nb_cont,
+                                                           " | ".join(res)))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the ac screening of the single branch outages')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--nb_step', default=NB_STEPS, type=int, nargs="+",
+                        help='Number of newton raphson steps of the screening.')
+    parser.add_argument('--error_tol', type=float, default=ERROR_TOL,
+                        help='Outages with a higher error indicator (pu) are computed again with a full powerflow.')
+    args = parser.parse_args()
+    main(args.case, args.nb_step, args.error_tol)
@@ -0,0 +1,63 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Compare the standard and the "chord" newton raphson (the factorization of the jacobian is reused across
+iterations and powerflows) of GridModel.ac_pf on a sequence of powerflows where only the loads change
+(each powerflow starts from the result of the previous one).
+"""
+
+import time
+import numpy as np
+import pandapower.networks as pn
+
+from lightsim2grid.initGridModel import init
+from utils_benchmark import str2bool, CASES, run_pfs
+import pdb
+
+NB_PF = 1000
+MAX_IT = 20  # the chord newton can require more (but cheaper) iterations
+
+
+def main(case_names, nb_pf, max_ratio, max_reuse, check=True):
+    for case_name in case_names:
+        net = CASES[case_name]()
+        print("{}: {} powerflows".format(case_name, nb_pf))
+        por_ref = None
+        for chord in [False, True]:
+            model = init(net)
+            model.set_chord_newton(chord)
+            model.set_chord_policy(max_ratio, max_reuse)
+            nb_conv, nb_iter, timer_pf = run_pfs(model, net, nb_pf, MAX_IT)
+            print("\t{}: {:.2f}ms / pf, {:.1f} iterations / pf ({} converged), nb analyze / factor / refactor {}, "
+                  "nb refactor saved {}"
+                  "".format("chord" if chord else "standard", 1000. * timer_pf / nb_pf, nb_iter / max(nb_conv, 1),
+                            nb_conv, model.get_nb_factorizations(), model.get_nb_refactor_saved()))
+            if check:
+                por, *_ = model.get_lineor_res()
+                if por_ref is None:
+                    por_ref = por
+                else:
+                    print("\t\tmax difference p_or: {:.2e}MW".format(np.max(np.abs(por - por_ref))))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the "chord" newton raphson against the standard one')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--number', type=int, default=NB_PF,
+                        help='Number of powerflows computed for each case.')
+    parser.add_argument('--max_ratio', type=float, default=0.1,
+                        help='The factorization is kept if the mismatch is divided by at least 1. / max_ratio')
+    parser.add_argument('--max_reuse', type=int, default=20,
+                        help='Maximum number of consecutive iterations with the same factorization')
+    parser.add_argument('--check', type=str2bool, nargs='?', const=True, default=True,
+                        help='Check that both methods give the same results (default True)')
+    args = parser.parse_args()
+    main(args.case, args.number, args.max_ratio, args.max_reuse, args.check)
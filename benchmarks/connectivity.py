@@ -0,0 +1,80 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Time lost on the topologies that cannot be solved (eg an action that isolates a load): the powerlines whose
+disconnection splits the grid (see GridModel.get_bridges) are disconnected one by one, then reconnected.
+ac_pf and dc_pf now fail before computing the admittance matrix (union find of the buses, see
+GridModel.check_connectivity), it is compared with the time of the dc (initialization) and ac powerflows that
+used to be computed before detecting the divergence (timed on the disconnection of the powerlines that do not
+split the grid).
+"""
+
+import time
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from utils_benchmark import CASES, make_v0
+import pdb
+
+MAX_IT = 10
+TOL = 1e-8
+
+
+def time_outages(model, line_ids, V0):
+    """average time of the check alone and of the dc and ac powerflows after the disconnection of each powerline
+    (the powerline is reconnected afterwards, and the check is timed again: only the union find is updated)"""
+    timer_check = 0.
+    timer_pf = 0.
+    nb_failed = 0
+    for line_id in line_ids:
+        model.deactivate_powerline(int(line_id))
+        beg_ = time.perf_counter()
+        model.check_connectivity()
+        timer_check += time.perf_counter() - beg_
+        beg_ = time.perf_counter()
+        V = model.dc_pf(V0, MAX_IT, TOL)
+        if V.shape[0]:
+            V = model.ac_pf(V, MAX_IT, TOL)
+        timer_pf += time.perf_counter() - beg_
+        nb_failed += V.shape[0] == 0
+        model.reactivate_powerline(int(line_id))
+        beg_ = time.perf_counter()
+        model.check_connectivity()
+        timer_check += time.perf_counter() - beg_
+    nb_line = max(len(line_ids), 1)
+    return timer_check / (2 * nb_line), timer_pf / nb_line, nb_failed
+
+
+def main(case_names):
+    print("{:>10s} | {:>10s} | {:>12s} | {:>22s} | {:>22s}".format(
+        "case", "islanding", "check", "failed dc + ac pf", "valid dc + ac pf"))
+    for case_name in case_names:
+        net = CASES[case_name]()
+        V0 = make_v0(net)
+        model = init(net)
+        nb_line = net.line.shape[0]
+        bridges = model.get_bridges()[:nb_line]
+        islanding = np.where(bridges)[0]
+        others = np.where(~bridges)[0][:islanding.shape[0]]
+        timer_check, timer_failed, nb_failed = time_outages(model, islanding, V0)
+        _, timer_valid, nb_failed_valid = time_outages(init(net), others, V0)
+        print("{:>10s} | {:>10d} | {:>10.1f}us | {:>9.1f}us ({:>4d} fail) | {:>9.1f}us ({:>4d} fail)".format(
+            case_name, islanding.shape[0], 1e6 * timer_check, 1e6 * timer_failed, nb_failed,
+            1e6 * timer_valid, nb_failed_valid))
+        nb_build, nb_update = model.get_connectivity_stats()
+        print("{:>10s} | union find built {} times, updated incrementally {} times".format("", nb_build, nb_update))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the detection of the topologies that cannot be solved')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    args = parser.parse_args()
+    main(args.case)
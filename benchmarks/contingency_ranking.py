@@ -0,0 +1,90 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Two stages N-1 security analysis (lightsim2grid.rankContingencies.rank_contingencies): all the single branch outages
+are ranked by a dc or a one step ac estimation of the highest flow relatively to the thermal limits, and only the
+ones above "--rho_threshold" are computed with a full ac powerflow. It is compared with one full ac powerflow per
+outage (GridModel.run_n1), that also gives the recall of the filter (fraction of the outages leading to an overload
+or a divergence that are selected). The outages that split the grid (a third of them for case1888) are always
+selected.
+
+The pandapower cases have no thermal limits: they are the flows of the base case times a random margin.
+"""
+
+import time
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid.rankContingencies import rank_contingencies
+from n1 import make_contingencies
+from utils_benchmark import CASES, make_v0
+import pdb
+
+MAX_IT = 10
+TOL = 1e-8
+INDEX_TYPES = ["dc", "ac"]
+RHO_THRESHOLDS = [1.0, 0.9]
+
+
+def make_thermal_limits(net, seed=0):
+    """flows of the base case (at least the median flow) times a margin between 1.5 and 2.5"""
+    model = init(net)
+    model.ac_pf(make_v0(net), MAX_IT, TOL)
+    a_or = 1000. * np.concatenate((model.get_lineor_res()[3], model.get_trafohv_res()[3]))
+    margin = 1.5 + np.random.RandomState(seed).uniform(size=a_or.shape[0])
+    return np.maximum(a_or, np.median(a_or)) * margin
+
+
+def main(case_names, index_types, rho_thresholds, nb_thread):
+    print("{:>10s} | {:>8s} | {:>12s} | {}".format(
+        "case", "nb cont", "run_n1",
+        " | ".join(["{:>32s}".format("{} >= {}".format(index_type, rho_threshold))
+                    for index_type in index_types for rho_threshold in rho_thresholds])))
+    for case_name in case_names:
+        net = CASES[case_name]()
+        V0 = make_v0(net)
+        thermal_limit_a = make_thermal_limits(net)
+        contingency_list = make_contingencies(net)
+        nb_cont = len(contingency_list)
+        beg_ = time.perf_counter()
+        converged, _, a_or = init(net).run_n1(contingency_list, V0, MAX_IT, TOL, nb_thread)
+        timer_ref = time.perf_counter() - beg_
+        max_rho = np.full(nb_cont, fill_value=np.inf)
+        max_rho[converged] = np.max(1000. * a_or[converged] / thermal_limit_a, axis=1)
+        critical = ~(max_rho < 1.)
+        res = []
+        for index_type in index_types:
+            for rho_threshold in rho_thresholds:
+                beg_ = time.perf_counter()
+                report = rank_contingencies(init(net), V0, thermal_limit_a, index_type=index_type,
+                                            rho_threshold=rho_threshold, max_iter=MAX_IT, tol=TOL,
+                                            n_threads=nb_thread)
+                timer = time.perf_counter() - beg_
+                selected = report["branch_ids"][report["selected"]]
+                recall = np.sum(critical[selected]) / np.sum(critical) if np.any(critical) else 1.
+                res.append("{:>5d} {:>6.1f}us {:>5.1f}x {:>5.1f}%".format(
+                    selected.shape[0], 1e6 * timer / nb_cont, timer_ref / timer, 100. * recall))
+        print("{:>10s} | {:>8d} | {:>10.1f}us | {}".format(case_name, nb_cont, 1e6 * timer_ref / nb_cont,
+                                                           " | ".join(res)))
+        print("{:>10s} | {:>8d} critical outages".format("", np.sum(critical)))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the two stages N-1 security analysis')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--index', default=INDEX_TYPES, type=str, nargs="+",
+                        help='Performance index(es) used to rank the outages, among {}'.format(INDEX_TYPES))
+    parser.add_argument('--rho_threshold', default=RHO_THRESHOLDS, type=float, nargs="+",
+                        help='The outages with a higher performance index are computed with a full ac powerflow.')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='Number of threads of the full ac powerflows.')
+    args = parser.parse_args()
+    main(args.case, args.index, args.rho_threshold, args.threads)
@@ -0,0 +1,86 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Compute the dc flows of many injection scenarios (same topology) with GridModel.dc_pf_batch (for different chunk
+sizes) and with one call to GridModel.dc_pf per scenario (the loads are modified from python before each call).
+"""
+
+import time
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from utils_benchmark import CASES, make_v0
+import pdb
+
+NB_SCENARIO = 10000
+CHUNK_SIZES = [1, 16, 64, 256, 4096]
+
+
+def make_scenarios(model, net, nb_scenario, seed=0):
+    """loads of each scenario, and the corresponding injections at each bus"""
+    prng = np.random.RandomState(seed)
+    loads_p = net.load["p_mw"].values * (1.0 + 0.05 * prng.normal(size=(nb_scenario, net.load.shape[0])))
+    gen_p = np.concatenate((net.gen["p_mw"].values, np.zeros(net.ext_grid.shape[0])))
+    Pbus = np.zeros((net.bus.shape[0], nb_scenario))
+    for load_id in range(loads_p.shape[1]):
+        Pbus[model.get_bus_load(load_id)] -= loads_p[:, load_id]
+    for gen_id in range(gen_p.shape[0]):
+        Pbus[model.get_bus_gen(gen_id)] += gen_p[gen_id]
+    for shunt_id in range(net.shunt.shape[0]):
+        Pbus[model.get_bus_shunt(shunt_id)] -= net.shunt["p_mw"].values[shunt_id]
+    return loads_p, Pbus
+
+
+def time_loop(model, net, loads_p):
+    V0 = make_v0(net)
+    res = np.zeros((loads_p.shape[0], net.line.shape[0] + net.trafo.shape[0]))
+    beg_ = time.perf_counter()
+    for scenario_id in range(loads_p.shape[0]):
+        for load_id in range(loads_p.shape[1]):
+            model.change_p_load(load_id, loads_p[scenario_id, load_id])
+        V = model.dc_pf(V0, 10, 1e-8)
+        assert V.shape[0] > 0, "the dc powerflow failed"
+        res[scenario_id] = np.concatenate((model.get_lineor_res()[0], model.get_trafohv_res()[0]))
+    return time.perf_counter() - beg_, res
+
+
+def main(case_names, nb_scenario, chunk_sizes):
+    print("{:>10s} | {:>12s} | {}".format("case", "dc_pf loop", " | ".join(["{:>14s}".format("batch ({})".format(el))
+                                                                              for el in chunk_sizes])))
+    for case_name in case_names:
+        net = CASES[case_name]()
+        model = init(net)
+        loads_p, Pbus = make_scenarios(model, net, nb_scenario)
+        timer_loop, res_ref = time_loop(init(net), net, loads_p)
+        timers = []
+        max_diff = 0.
+        for chunk_size in chunk_sizes:
+            model = init(net)
+            beg_ = time.perf_counter()
+            res = model.dc_pf_batch(Pbus, chunk_size)
+            timers.append(time.perf_counter() - beg_)
+            max_diff = max(max_diff, np.max(np.abs(res - res_ref)))
+        print("{:>10s} | {:>10.1f}us | {}".format(case_name, 1e6 * timer_loop / nb_scenario,
+                                                  " | ".join(["{:>6.1f}us {:>5.0f}x".format(1e6 * el / nb_scenario,
+                                                                                           timer_loop / el)
+                                                              for el in timers])))
+        print("{:>10s} | max difference of the flows: {:.2e}MW".format("", max_diff))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the dc powerflow of many injection scenarios')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--number', type=int, default=NB_SCENARIO,
+                        help='Number of scenarios for each case.')
+    parser.add_argument('--chunk_size', default=CHUNK_SIZES, type=int, nargs="+",
+                        help='Number of scenarios solved at once by dc_pf_batch.')
+    args = parser.parse_args()
+    main(args.case, args.number, args.chunk_size)
@@ -0,0 +1,70 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Compare the number of steps per second of a "do nothing" agent when the powerflows are computed in dc
+(parameter "ENV_DC" of grid2op, see LightSimBackend.runpf(is_dc=True)) and in ac, with the LightSimBackend.
+"""
+
+import numpy as np
+
+from grid2op import make
+from grid2op.Agent import DoNothingAgent
+from grid2op.Chronics import GridStateFromFile
+from grid2op.Parameters import Parameters
+from lightsim2grid.LightSimBackend import LightSimBackend
+from utils_benchmark import run_env, str2bool
+import pdb
+
+MAX_TS = 1000
+ENV_NAMES = ["rte_case5_example", "rte_case14_realistic", "rte_case118_example"]
+
+
+def run_one(name, max_ts, test, env_dc):
+    param = Parameters()
+    param.init_from_dict({"NO_OVERFLOW_DISCONNECTION": True, "ENV_DC": env_dc})
+    env = make(name, backend=LightSimBackend(), param=param, test=test,
+               data_feeding_kwargs={"gridvalueClass": GridStateFromFile})
+    agent = DoNothingAgent(action_space=env.action_space)
+    nb_ts, time_, aor, gen_p, gen_q = run_env(env, max_ts, agent, chron_id=0)
+    time_pf = env._time_powerflow
+    env.close()
+    return nb_ts, time_, time_pf, aor
+
+
+def main(max_ts, names, test=True):
+    res = []
+    for name in names:
+        nb_ts_ac, time_ac, time_pf_ac, aor_ac = run_one(name, max_ts, test, env_dc=False)
+        nb_ts_dc, time_dc, time_pf_dc, aor_dc = run_one(name, max_ts, test, env_dc=True)
+        nb_ts = min(nb_ts_ac, nb_ts_dc)
+        res.append((name,
+                    nb_ts_ac / time_ac, 1000. * time_pf_ac / nb_ts_ac,
+                    nb_ts_dc / time_dc, 1000. * time_pf_dc / nb_ts_dc,
+                    np.max(np.abs(aor_ac[:nb_ts] - aor_dc[:nb_ts]))))
+
+    print("{:>22s} | {:>10s} {:>10s} | {:>10s} {:>10s} | {:>7s} | {:>12s}"
+          "".format("env", "ac (it/s)", "ac pf", "dc (it/s)", "dc pf", "speedup", "max |da_or|"))
+    for name, it_ac, pf_ac, it_dc, pf_dc, diff_aor in res:
+        print("{:>22s} | {:>10.1f} {:>8.3f}ms | {:>10.1f} {:>8.3f}ms | {:>6.2f}x | {:>10.2f}A"
+              "".format(name, it_ac, pf_ac, it_dc, pf_dc, it_dc / it_ac, diff_aor))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the dc and the ac powerflows of the LightSimBackend')
+    parser.add_argument('--name', default=ENV_NAMES, type=str, nargs="+",
+                        help='Environment name(s) to be used for the benchmark.')
+    parser.add_argument('--number', type=int, default=MAX_TS,
+                        help='Maximum number of time steps for which the benchamark will be run.')
+    parser.add_argument('--no_test', type=str2bool, nargs='?',
+                        const=True, default=False,
+                        help='Do not use test environment for the benchmark (default False: use test environment)')
+
+    args = parser.parse_args()
+    main(int(args.number), args.name, not args.no_test)
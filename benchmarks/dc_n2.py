@@ -0,0 +1,96 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Find the critical pairs of branch outages (dc approximation) with GridModel.dc_n2_screening (LODF, bounding and
+pruning of the pairs, for different numbers of threads), and compare with a dc screening of all the single outages
+after each single outage (GridModel.dc_n1_screening on a copy of the grid for each outage, timed on
+"--sample" outages only).
+
+The pandapower cases have no thermal limits: they are the dc flows of the base case (at least the median flow)
+times a random margin.
+"""
+
+import time
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from utils_benchmark import CASES, make_v0
+import pdb
+
+NB_THREADS = [1, 2, 4]
+NB_SAMPLE = 20
+MARGIN = 1.5
+
+
+def make_flow_limits(net, margin, seed=0):
+    model = init(net)
+    model.dc_pf(make_v0(net), 1, 0.)
+    flows = np.abs(np.concatenate((model.get_lineor_res()[0], model.get_trafohv_res()[0])))
+    return np.maximum(flows, np.median(flows)) * (margin + np.random.RandomState(seed).uniform(size=flows.shape[0]))
+
+
+def time_n1_of_n1(model, net, flow_limits, nb_sample):
+    """time of the dc screening of all the outages after one outage (on average over some outages)"""
+    V0 = make_v0(net)
+    nb_line = net.line.shape[0]
+    branch_ids = np.arange(flow_limits.shape[0])
+    beg_ = time.perf_counter()
+    for branch_id in np.linspace(0, branch_ids.shape[0] - 1, nb_sample).astype(int):
+        model_cont = model.copy()
+        if branch_id < nb_line:
+            model_cont.deactivate_powerline(int(branch_id))
+        else:
+            model_cont.deactivate_trafo(int(branch_id) - nb_line)
+        try:
+            split_grid, p_or = model_cont.dc_n1_screening(V0, branch_ids)
+        except RuntimeError:
+            # this outage splits the grid
+            continue
+        critical = split_grid | ~(np.max(np.abs(p_or) / flow_limits, axis=1) < 1.)
+    return (time.perf_counter() - beg_) / nb_sample
+
+
+def main(case_names, nb_threads, nb_sample, margin):
+    print("{:>10s} | {:>8s} | {:>8s} | {:>14s} | {}".format(
+        "case", "nb pairs", "pruned", "N-1 of N-1", " | ".join(["{:>14s}".format("n2 ({})".format(el))
+                                                                  for el in nb_threads])))
+    for case_name in case_names:
+        net = CASES[case_name]()
+        flow_limits = make_flow_limits(net, margin)
+        nb_branch = flow_limits.shape[0]
+        timer_ref = nb_branch * time_n1_of_n1(init(net), net, flow_limits, nb_sample)
+        timers = []
+        for nb_thread in nb_threads:
+            model = init(net)
+            beg_ = time.perf_counter()
+            pairs, rho, n1_critical = model.dc_n2_screening(make_v0(net), np.arange(nb_branch), flow_limits,
+                                                            1.0, nb_thread)
+            timers.append(time.perf_counter() - beg_)
+        nb_pair, nb_pruned, nb_critical = model.get_n2_stats()
+        print("{:>10s} | {:>8d} | {:>7.1f}% | {:>12.2f}s | {}".format(
+            case_name, nb_pair, 100. * nb_pruned / max(nb_pair, 1), timer_ref,
+            " | ".join(["{:>6.3f}s {:>5.0f}x".format(el, timer_ref / el) for el in timers])))
+        print("{:>10s} | {} critical single outages, {} critical pairs ({} splitting the grid)"
+              "".format("", n1_critical.shape[0], nb_critical, np.sum(pairs[:, 2] == -1)))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the dc screening of the pairs of branch outages')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--threads', default=NB_THREADS, type=int, nargs="+",
+                        help='Number(s) of threads of dc_n2_screening.')
+    parser.add_argument('--sample', type=int, default=NB_SAMPLE,
+                        help='Number of outages used to time the "N-1 of N-1" approach.')
+    parser.add_argument('--margin', type=float, default=MARGIN,
+                        help='The limits are the flows of the base case times a margin between this value and '
+                             'this value + 1.')
+    args = parser.parse_args()
+    main(args.case, args.threads, args.sample, args.margin)
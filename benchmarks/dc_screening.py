@@ -0,0 +1,79 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Compute the dc flows after the outage of each branch with GridModel.dc_n1_screening (one factorization of B, a rank
+one correction per outage) and with one call to GridModel.dc_pf per outage (B is factorized again each time).
+"""
+
+import time
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import LinearSolverType
+from utils_benchmark import CASES, make_v0
+import pdb
+
+SOLVERS = {"SparseLU": LinearSolverType.SparseLU,
+           "KLU": LinearSolverType.KLU}
+
+
+def time_loop(model, net, linear_solver):
+    V0 = make_v0(net)
+    nb_line = net.line.shape[0]
+    nb_branch = nb_line + net.trafo.shape[0]
+    res = np.full((nb_branch, nb_branch), fill_value=np.NaN)
+    model.set_dc_linear_solver(linear_solver)
+    beg_ = time.perf_counter()
+    for branch_id in range(nb_branch):
+        if branch_id < nb_line:
+            model.deactivate_powerline(branch_id)
+        else:
+            model.deactivate_trafo(branch_id - nb_line)
+        V = model.dc_pf(V0, 10, 1e-8)
+        if V.shape[0] > 0:
+            res[branch_id] = np.concatenate((model.get_lineor_res()[0], model.get_trafohv_res()[0]))
+        if branch_id < nb_line:
+            model.reactivate_powerline(branch_id)
+        else:
+            model.reactivate_trafo(branch_id - nb_line)
+    return time.perf_counter() - beg_, res
+
+
+def main(case_names, solver_names, chunk_size):
+    print("{:>10s} | {:>8s} | {:>8s} | {:>12s} | {:>12s} | {:>8s}".format("case", "solver", "nb cont", "dc_pf loop",
+                                                                          "screening", "speed up"))
+    for case_name in case_names:
+        net = CASES[case_name]()
+        nb_branch = net.line.shape[0] + net.trafo.shape[0]
+        for solver_name in solver_names:
+            timer_loop, res_ref = time_loop(init(net), net, SOLVERS[solver_name])
+            model = init(net)
+            model.set_dc_linear_solver(SOLVERS[solver_name])
+            beg_ = time.perf_counter()
+            split_grid, res = model.dc_n1_screening(make_v0(net), np.arange(nb_branch), chunk_size)
+            timer = time.perf_counter() - beg_
+            print("{:>10s} | {:>8s} | {:>8d} | {:>10.2f}ms | {:>10.2f}ms | {:>7.1f}x".format(
+                case_name, solver_name, nb_branch, 1e3 * timer_loop, 1e3 * timer, timer_loop / timer))
+            # some dc powerflows of a split grid "converge" (the linear solver does not detect the singular matrix)
+            ok = ~split_grid & np.isfinite(res_ref[:, 0])
+            print("{:>10s} | {} outages split the grid, max difference of the flows: {:.2e}MW"
+                  "".format("", np.sum(split_grid), np.max(np.abs(res[ok] - res_ref[ok]))))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the dc screening of the single branch outages')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--solver', default=list(SOLVERS.keys()), type=str, nargs="+",
+                        help='Linear solver(s) used for B, among {}'.format(sorted(SOLVERS.keys())))
+    parser.add_argument('--chunk_size', type=int, default=64,
+                        help='Number of outages solved at once by dc_n1_screening.')
+    args = parser.parse_args()
+    main(args.case, args.solver, args.chunk_size)
@@ -0,0 +1,91 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Time GridModel.dc_pf when only the loads change (the factorization of the dc admittance matrix is reused) and
+when the topology changes at each call (a powerline is disconnected / reconnected, so the matrix is computed and
+factorized again, as it was before DCSolver). The ac powerflow (newton raphson) is given for reference.
+"""
+
+import time
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from utils_benchmark import CASES, run_pfs, make_v0
+import pdb
+
+NB_PF = 1000
+MAX_IT = 10
+
+
+def find_line(model, net):
+    """a powerline that can be disconnected without splitting the grid"""
+    V0 = make_v0(net)
+    for line_id in range(net.line.shape[0]):
+        tmp = model.copy()
+        tmp.deactivate_powerline(line_id)
+        if tmp.dc_pf(V0, MAX_IT, 1e-8).shape[0]:
+            return line_id
+    raise RuntimeError("every powerline is a bridge of the grid")
+
+
+def time_dc(model, net, nb_pf, line_id=None, seed=0):
+    """nb_pf dc powerflows with slightly different loads, the powerline "line_id" changes of status each time"""
+    prng = np.random.RandomState(seed)
+    load_p_init = net.load["p_mw"].values
+    n_load = load_p_init.shape[0]
+    V0 = make_v0(net)
+    timer_pf = 0.
+    for pf_id in range(nb_pf):
+        ratio = 1.0 + 0.01 * prng.normal(size=n_load)
+        for load_id in range(n_load):
+            model.change_p_load(load_id, load_p_init[load_id] * ratio[load_id])
+        if line_id is not None:
+            if pf_id % 2:
+                model.reactivate_powerline(line_id)
+            else:
+                model.deactivate_powerline(line_id)
+        beg_ = time.perf_counter()
+        V = model.dc_pf(V0, MAX_IT, 1e-8)
+        timer_pf += time.perf_counter() - beg_
+        assert V.shape[0] > 0, "the dc powerflow failed"
+    return timer_pf
+
+
+def main(case_names, nb_pf):
+    print("{:>10s} | {:>12s} {:>12s} {:>7s} | {:>12s} {:>9s}"
+          "".format("case", "dc new topo", "dc same topo", "speedup", "ac (NR)", "ac / dc"))
+    for case_name in case_names:
+        net = CASES[case_name]()
+        model = init(net)
+        line_id = find_line(model, net)
+        timer_topo = time_dc(model, net, nb_pf, line_id=line_id)
+        nb_fact_topo = model.get_dc_nb_factorizations()
+
+        model = init(net)
+        timer_inj = time_dc(model, net, nb_pf)
+        nb_fact_inj = model.get_dc_nb_factorizations()
+
+        model = init(net)
+        nb_conv, nb_iter, timer_ac = run_pfs(model, net, nb_pf, MAX_IT)
+        print("{:>10s} | {:>10.1f}us {:>10.1f}us {:>6.2f}x | {:>10.1f}us {:>8.1f}x"
+              "".format(case_name, 1e6 * timer_topo / nb_pf, 1e6 * timer_inj / nb_pf, timer_topo / timer_inj,
+                        1e6 * timer_ac / nb_pf, timer_ac / timer_inj))
+        print("{:>10s} | nb analyze / factor / solve: new topo {}, same topo {}"
+              "".format("", nb_fact_topo, nb_fact_inj))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the dc powerflow')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--number', type=int, default=NB_PF,
+                        help='Number of powerflows computed for each case.')
+    args = parser.parse_args()
+    main(args.case, args.number)
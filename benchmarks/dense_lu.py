@@ -0,0 +1,82 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Crossover between the dense LU decomposition (LinearSolverType.DenseLU) and the sparse solver (KLU) for small
+grids: ac powerflows (where only the loads change) and dc powerflows. The dense LU is disabled by default,
+this table gives the values to pass to GridModel.set_dense_threshold and GridModel.set_dc_dense_threshold
+(buses) to opt in on a given machine.
+"""
+
+import time
+import numpy as np
+import pandapower.networks as pn
+
+from lightsim2grid.initGridModel import init
+from utils_benchmark import run_pfs, make_v0
+import pdb
+
+NB_PF = 1000
+MAX_IT = 10
+SMALL_CASES = {"case14": pn.case14,
+               "case30": pn.case30,
+               "case39": pn.case39,
+               "case57": pn.case57,
+               "case89pegase": pn.case89pegase,
+               "case118": pn.case118,
+               }
+
+
+def time_dc(model, net, nb_pf):
+    V0 = make_v0(net)
+    beg_ = time.perf_counter()
+    for _ in range(nb_pf):
+        model.dc_pf(V0, MAX_IT, 1e-8)
+    return time.perf_counter() - beg_
+
+
+def main(case_names, nb_pf):
+    ac_threshold = -1
+    dc_threshold = -1
+    print("{:>14s} {:>6s} | {:>10s} {:>10s} {:>7s} | {:>10s} {:>10s} {:>7s}"
+          "".format("case", "nb bus", "ac sparse", "ac dense", "speedup", "dc sparse", "dc dense", "speedup"))
+    for case_name in case_names:
+        net = SMALL_CASES[case_name]()
+        res = []
+        for dense_threshold in [-1, 100000]:
+            model = init(net)
+            model.set_dense_threshold(dense_threshold)
+            nb_conv, nb_iter, timer_ac = run_pfs(model, net, nb_pf, MAX_IT)
+            assert nb_conv == nb_pf, "some powerflows diverged"
+            model = init(net)
+            model.set_dc_dense_threshold(dense_threshold)
+            model.set_dc_linear_solver(model.get_linear_solver())  # KLU for both
+            timer_dc = time_dc(model, net, nb_pf)
+            res.append((timer_ac, timer_dc))
+        (ac_sparse, dc_sparse), (ac_dense, dc_dense) = res
+        print("{:>14s} {:>6d} | {:>8.1f}us {:>8.1f}us {:>6.2f}x | {:>8.1f}us {:>8.1f}us {:>6.2f}x"
+              "".format(case_name, net.bus.shape[0],
+                        1e6 * ac_sparse / nb_pf, 1e6 * ac_dense / nb_pf, ac_sparse / ac_dense,
+                        1e6 * dc_sparse / nb_pf, 1e6 * dc_dense / nb_pf, dc_sparse / dc_dense))
+        # largest grid for which the dense LU is faster
+        if ac_dense < ac_sparse:
+            ac_threshold = max(ac_threshold, net.bus.shape[0])
+        if dc_dense < dc_sparse:
+            dc_threshold = max(dc_threshold, net.bus.shape[0])
+    print("dense LU faster up to (buses): ac {}, dc {}".format(ac_threshold, dc_threshold))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Crossover between the dense and the sparse LU for small grids')
+    parser.add_argument('--case', default=list(SMALL_CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(SMALL_CASES.keys())))
+    parser.add_argument('--number', type=int, default=NB_PF,
+                        help='Number of powerflows computed for each case.')
+    args = parser.parse_args()
+    main(args.case, args.number)
@@ -21,7 +21,32 @@ MAX_TS = 1000
 ENV_NAME = "rte_case14_realistic"
 
 
-def main(max_ts, ENV_NAME, test=True):
+def print_pf_stats(env, nb_ts, time_, nm):
+    stats = env.backend.get_pf_stats()
+    print("PyKLU Backend ({}) {} time steps in {}s ({:.2f} it/s)".format(nm, nb_ts, time_, nb_ts / time_))
+    print("\tTime powerflow: {:.2f}ms".format(1000. * env._time_powerflow / nb_ts))
+    print("\t{} ac powerflows, {} iterations ({:.2f} per powerflow), {} dc initializations"
+          "".format(stats["nb_ac_pf"], stats["nb_ac_iter"], stats["nb_ac_iter"] / max(stats["nb_ac_pf"], 1),
+                    stats["nb_dc_init"]))
+    nb_factor = env.backend._grid.get_nb_factorizations()
+    print("\tklu_analyze: {}, klu_factor: {}, klu_refactor: {}".format(*nb_factor))
+
+
+def compare_v_extrapolation(env_klu, nb_ts_klu, time_klu, aor_klu, max_ts, ENV_NAME, test, param, order):
+    """run the same scenario when the initial point of the ac powerflows is extrapolated from the previous
+    results (see LightSimBackend(v_extrapolation_order=...)), and compare it with the default one"""
+    env_ex = make(ENV_NAME, backend=LightSimBackend(v_extrapolation_order=order), param=param, test=test,
+                  data_feeding_kwargs={"gridvalueClass": GridStateFromFile})
+    agent = DoNothingAgent(action_space=env_ex.action_space)
+    env_ex.backend.reset_pf_stats()
+    nb_ts_ex, time_ex, aor_ex, gen_p_ex, gen_q_ex = run_env(env_ex, max_ts, agent, chron_id=0)
+    print("Speed-up of the extrapolation of the voltages (order {}) {:.2f}".format(order, time_klu / time_ex))
+    print_pf_stats(env_klu, nb_ts_klu, time_klu, "default")
+    print_pf_stats(env_ex, nb_ts_ex, time_ex, "extrapolation")
+    print("Absolute value of the difference (max) for aor: {}".format(np.max(np.abs(aor_klu - aor_ex))))
+
+
+def main(max_ts, ENV_NAME, test=True, v_extrapolation_order=0):
     backend = LightSimBackend()
     param = Parameters()
     param.init_from_dict({"NO_OVERFLOW_DISCONNECTION": True})
@@ -29,6 +54,7 @@ def main(max_ts, ENV_NAME, test=True):
     env_klu = make(ENV_NAME, backend=backend, param=param, test=test,
                    data_feeding_kwargs={"gridvalueClass": GridStateFromFile})
     agent = DoNothingAgent(action_space=env_klu.action_space)
+    env_klu.backend.reset_pf_stats()
     nb_ts_klu, time_klu, aor_klu, gen_p_klu, gen_q_klu = run_env(env_klu, max_ts, agent, chron_id=0)
 
     env_pp = make(ENV_NAME, param=param, test=test,
@@ -43,6 +69,9 @@ def main(max_ts, ENV_NAME, test=True):
               gen_p_klu, gen_p_pp,
               gen_q_klu, gen_q_pp
               )
+    if v_extrapolation_order > 0:
+        compare_v_extrapolation(env_klu, nb_ts_klu, time_klu, aor_klu, max_ts, ENV_NAME, test, param,
+                                v_extrapolation_order)
 
 
 if __name__ == "__main__":
@@ -55,10 +84,14 @@ if __name__ == "__main__":
     parser.add_argument('--no_test', type=str2bool, nargs='?',
                         const=True, default=False,
                         help='Do not use test environment for the benchmark (default False: use test environment)')
+    parser.add_argument('--v_extrapolation', type=int, default=0,
+                        help='Also benchmark the LightSimBackend when the initial point of the powerflows is '
+                             'extrapolated from the previous ones, with this order (1 or 2, default 0: not '
+                             'benchmarked)')
 
     args = parser.parse_args()
 
     max_ts = int(args.number)
     name = str(args.name)
     test_env = not args.no_test
-    main(max_ts, name, test_env)
+    main(max_ts, name, test_env, args.v_extrapolation)
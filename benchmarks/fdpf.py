@@ -0,0 +1,61 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Compare the newton raphson and the fast decoupled (XB and BX) powerflows of GridModel.ac_pf on a sequence of
+powerflows where only the loads change (each powerflow starts from the result of the previous one).
+"""
+
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import PFAlgorithm
+from utils_benchmark import str2bool, CASES, run_pfs
+import pdb
+
+NB_PF = 1000
+ALGOS = {"NR": (PFAlgorithm.NR, 10),
+         "FDPF_XB": (PFAlgorithm.FDPF_XB, 50),
+         "FDPF_BX": (PFAlgorithm.FDPF_BX, 50)}
+
+
+def main(case_names, algo_names, nb_pf, check=True):
+    for case_name in case_names:
+        net = CASES[case_name]()
+        print("{}: {} powerflows".format(case_name, nb_pf))
+        por_ref = None
+        for algo_name in algo_names:
+            pf_algorithm, max_it = ALGOS[algo_name]
+            model = init(net)
+            model.set_pf_algorithm(pf_algorithm)
+            nb_conv, nb_iter, timer_pf = run_pfs(model, net, nb_pf, max_it)
+            print("\t{}: {:.2f}ms / pf, {:.1f} iterations / pf ({} converged), nb analyze / factor / refactor {}"
+                  "".format(algo_name, 1000. * timer_pf / nb_pf, nb_iter / max(nb_conv, 1), nb_conv,
+                            model.get_nb_factorizations()))
+            if check:
+                por, *_ = model.get_lineor_res()
+                if por_ref is None:
+                    por_ref = por
+                else:
+                    print("\t\tmax difference p_or with {}: {:.2e}MW".format(algo_names[0],
+                                                                            np.max(np.abs(por - por_ref))))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the fast decoupled powerflow against the newton raphson')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--algo', default=list(ALGOS.keys()), type=str, nargs="+",
+                        help='Algorithm(s) to use, among {}'.format(sorted(ALGOS.keys())))
+    parser.add_argument('--number', type=int, default=NB_PF,
+                        help='Number of powerflows computed for each case.')
+    parser.add_argument('--check', type=str2bool, nargs='?', const=True, default=True,
+                        help='Check that all algorithms give the same results (default True)')
+    args = parser.parse_args()
+    main(args.case, args.algo, args.number, args.check)
@@ -0,0 +1,72 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Find the branches whose outage splits the grid: with the graph analytics of GridModel (GridModel.get_bridges, computed
+again after each change of topology), with the dc screening of all the single outages (GridModel.dc_n1_screening) and
+with one ac powerflow per outage (GridModel.run_n1, on the islanding outages only: the time lost before the
+powerflows fail).
+"""
+
+import time
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from n1 import make_contingencies
+from utils_benchmark import CASES, make_v0
+import pdb
+
+NB_TOPO = 100
+MAX_IT = 10
+TOL = 1e-8
+
+
+def time_bridges(model, nb_line, nb_topo):
+    """the topology changes before each call: one powerline is disconnected, then reconnected"""
+    beg_ = time.perf_counter()
+    for topo_id in range(nb_topo):
+        line_id = topo_id % nb_line
+        model.deactivate_powerline(line_id)
+        model.get_bridges()
+        model.reactivate_powerline(line_id)
+        bridges = model.get_bridges()
+    return (time.perf_counter() - beg_) / (2 * nb_topo), bridges
+
+
+def main(case_names, nb_topo):
+    print("{:>10s} | {:>8s} | {:>10s} | {:>12s} | {:>16s} | {:>16s}".format(
+        "case", "branches", "islanding", "get_bridges", "dc_n1_screening", "run_n1 (failed)"))
+    for case_name in case_names:
+        net = CASES[case_name]()
+        V0 = make_v0(net)
+        contingency_list = make_contingencies(net)
+        nb_branch = len(contingency_list)
+        timer_graph, bridges = time_bridges(init(net), net.line.shape[0], nb_topo)
+        beg_ = time.perf_counter()
+        split_grid, _ = init(net).dc_n1_screening(V0, np.arange(nb_branch))
+        timer_dc = time.perf_counter() - beg_
+        assert np.all(split_grid == bridges)
+        islanding = np.where(bridges)[0]
+        beg_ = time.perf_counter()
+        converged, _, _ = init(net).run_n1([contingency_list[el] for el in islanding], V0, MAX_IT, TOL, 1)
+        timer_ac = time.perf_counter() - beg_
+        print("{:>10s} | {:>8d} | {:>10d} | {:>10.1f}us | {:>14.1f}us | {:>14.1f}us".format(
+            case_name, nb_branch, islanding.shape[0], 1e6 * timer_graph, 1e6 * timer_dc, 1e6 * timer_ac))
+        print("{:>10s} | {} islanding outage(s) for which the ac powerflow still converged"
+              "".format("", np.sum(converged)))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the detection of the outages that split the grid')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--number', type=int, default=NB_TOPO,
+                        help='Number of topologies for which the bridges are computed.')
+    args = parser.parse_args()
+    main(args.case, args.number)
@@ -0,0 +1,59 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Measure the gain of not rebuilding Ybus / pv / pq / the KLU factorization in GridModel.ac_pf when only
+the injections (load p / q, generator p / v) are modified between two consecutive powerflows.
+
+It compares the same powerflows computed with a "full rebuild" before each of them (a bus is disconnected and
+reconnected, see run_pfs: Ybus, pv / pq, the symbolic and numeric factorizations are computed from scratch) and
+with the "injection only" path (only Sbus is computed again and the jacobian is refactorized). The number of
+symbolic factorizations (klu_analyze) of each case is printed.
+"""
+
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from utils_benchmark import str2bool, CASES, run_pfs
+import pdb
+
+NB_PF = 1000
+MAX_IT = 10
+DEFAULT_CASES = ["case118", "case1888"]
+
+
+def main(case_names, nb_pf, check=True):
+    for case_name in case_names:
+        net = CASES[case_name]()
+        model_reset = init(net)
+        model_fast = init(net)
+        nb_conv_reset, _, time_reset = run_pfs(model_reset, net, nb_pf, MAX_IT, force_reset=True)
+        nb_conv_fast, _, time_fast = run_pfs(model_fast, net, nb_pf, MAX_IT)
+        print("{}: {} powerflows".format(case_name, nb_pf))
+        print("\tfull rebuild: {:.2f}ms / pf ({} converged, {} klu_analyze)".format(
+            1000. * time_reset / nb_pf, nb_conv_reset, model_reset.get_nb_factorizations()[0]))
+        print("\tinjection only: {:.2f}ms / pf ({} converged, {} klu_analyze)".format(
+            1000. * time_fast / nb_pf, nb_conv_fast, model_fast.get_nb_factorizations()[0]))
+        print("\tspeed up: {:.2f}".format(time_reset / time_fast))
+        if check:
+            por_reset, *_ = model_reset.get_lineor_res()
+            por_fast, *_ = model_fast.get_lineor_res()
+            print("\tmax difference p_or: {:.2e}MW".format(np.max(np.abs(por_reset - por_fast))))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the "injection only" optimization of GridModel.ac_pf')
+    parser.add_argument('--case', default=DEFAULT_CASES, type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--number', type=int, default=NB_PF,
+                        help='Number of powerflows computed for each case.')
+    parser.add_argument('--check', type=str2bool, nargs='?', const=True, default=True,
+                        help='Check that both methods give the same results (default True)')
+    args = parser.parse_args()
+    main(args.case, args.number, args.check)
@@ -0,0 +1,58 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Report the time spent, per newton raphson iteration, to compute dS/dV ("timer_dSbus_") and to fill the
+jacobian matrix ("timer_fillJ_") in the KLUSolver.
+"""
+
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from utils_benchmark import CASES, make_v0
+import pdb
+
+NB_PF = 100
+DEFAULT_CASES = ["case300", "case1888"]
+# order of the timers returned by "get_timers"
+TIMERS = ["timer_Fx_", "timer_solve_", "timer_initialize_", "timer_check_", "timer_dSbus_", "timer_fillJ_",
+          "timer_total_nr_"]
+
+
+def main(case_names, nb_pf):
+    for case_name in case_names:
+        net = CASES[case_name]()
+        model = init(net)
+        V0 = make_v0(net)
+        timers = np.zeros(len(TIMERS))
+        nb_iter = 0
+        prng = np.random.RandomState(0)
+        load_p_init = net.load["p_mw"].values
+        for _ in range(nb_pf):
+            ratio = 1.0 + 0.01 * prng.normal(size=load_p_init.shape[0])
+            for load_id in range(load_p_init.shape[0]):
+                model.change_p_load(load_id, load_p_init[load_id] * ratio[load_id])
+            V = model.ac_pf(V0, 10, 1e-8)
+            if V.shape[0] == 0:
+                print("\tWARNING: a powerflow diverged")
+            timers += model.get_timers()
+            nb_iter += model.get_nb_iter()
+        print("{}: {} powerflows, {} newton raphson iterations".format(case_name, nb_pf, nb_iter))
+        for nm, val in zip(TIMERS, timers):
+            print("\t{}: {:.1f}us / iteration".format(nm, 1e6 * val / nb_iter))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the assembly of the jacobian matrix in the KLUSolver')
+    parser.add_argument('--case', default=DEFAULT_CASES, type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--number', type=int, default=NB_PF,
+                        help='Number of powerflows computed for each case.')
+    args = parser.parse_args()
+    main(args.case, args.number)
@@ -0,0 +1,64 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Compare the sparse linear solvers (KLU, Eigen SparseLU and, for the dc powerflow only, Eigen SimplicialLDLT)
+on a sequence of ac powerflows where only the loads change, and on dc powerflows. The choice made by
+GridModel.tune_linear_solver is printed as well.
+"""
+
+import time
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import LinearSolverType
+from utils_benchmark import CASES, run_pfs, make_v0
+import pdb
+
+NB_PF = 100
+MAX_IT = 10
+AC_SOLVERS = [LinearSolverType.KLU, LinearSolverType.SparseLU]
+DC_SOLVERS = [LinearSolverType.KLU, LinearSolverType.SparseLU, LinearSolverType.LDLT]
+
+
+def main(case_names, nb_pf):
+    for case_name in case_names:
+        net = CASES[case_name]()
+        print("{}: {} powerflows".format(case_name, nb_pf))
+        for linear_solver in AC_SOLVERS:
+            model = init(net)
+            model.set_linear_solver(linear_solver)
+            nb_conv, nb_iter, timer_pf = run_pfs(model, net, nb_pf, MAX_IT)
+            print("\tac {}: {:.2f}ms / pf, {:.1f} iterations / pf ({} converged)"
+                  "".format(linear_solver.name, 1000. * timer_pf / nb_pf, nb_iter / max(nb_conv, 1), nb_conv))
+
+        V0 = make_v0(net)
+        for linear_solver in DC_SOLVERS:
+            model = init(net)
+            model.set_dc_linear_solver(linear_solver)
+            beg_ = time.perf_counter()
+            for _ in range(nb_pf):
+                model.dc_pf(V0, MAX_IT, 1e-8)
+            timer_pf = time.perf_counter() - beg_
+            print("\tdc {}: {:.2f}ms / pf".format(linear_solver.name, 1000. * timer_pf / nb_pf))
+
+        model = init(net)
+        model.tune_linear_solver(model.dc_pf(V0, MAX_IT, 1e-8), MAX_IT, 1e-8, 5)
+        print("\tchosen by tune_linear_solver: ac {}, dc {}".format(model.get_linear_solver().name,
+                                                                    model.get_dc_linear_solver().name))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the sparse linear solvers')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--number', type=int, default=NB_PF,
+                        help='Number of powerflows computed for each case and each solver.')
+    args = parser.parse_args()
+    main(args.case, args.number)
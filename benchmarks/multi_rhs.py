@@ -0,0 +1,69 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Solve the (reduced) dc admittance matrix for many right hand sides: with one call to KLUSolver.solve_multi per
+right hand side, or with one call for all of them (klu_solve with nrhs > 1, without any copy).
+"""
+
+import time
+import numpy as np
+import scipy.sparse
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import KLUSolver
+from utils_benchmark import CASES, make_v0
+import pdb
+
+NB_RHS = 1000
+
+
+def get_reduced_ybus(net):
+    model = init(net)
+    model.ac_pf(make_v0(net), 10, 1e-8)
+    Ybus = model.get_Ybus()
+    pvpq = np.concatenate((model.get_pv(), model.get_pq()))
+    return Ybus[pvpq, :][:, pvpq].imag.tocoo().tocsc()
+
+
+def main(case_names, nb_rhs):
+    prng = np.random.RandomState(0)
+    for case_name in case_names:
+        net = CASES[case_name]()
+        B = get_reduced_ybus(net)
+        solver = KLUSolver()
+        solver.factorize(B)
+        rhs_init = np.asfortranarray(prng.normal(size=(B.shape[0], nb_rhs)))
+        print("{}: {} right hand sides ({} rows)".format(case_name, nb_rhs, B.shape[0]))
+
+        rhs_one = 1. * rhs_init
+        beg_ = time.perf_counter()
+        for col_id in range(nb_rhs):
+            solver.solve_multi(rhs_one[:, col_id])
+        time_one = time.perf_counter() - beg_
+
+        rhs_all = 1. * rhs_init
+        beg_ = time.perf_counter()
+        solver.solve_multi(rhs_all)
+        time_all = time.perf_counter() - beg_
+
+        print("\tone call per right hand side: {:.2f}ms".format(1000. * time_one))
+        print("\tone call for all right hand sides: {:.2f}ms (speed up x{:.1f})".format(1000. * time_all,
+                                                                                      time_one / time_all))
+        print("\t\tmax difference: {:.2e}".format(np.max(np.abs(rhs_one - rhs_all))))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the multiple right hand sides solve of KLUSolver')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--number', type=int, default=NB_RHS,
+                        help='Number of right hand sides.')
+    args = parser.parse_args()
+    main(args.case, args.number)
@@ -0,0 +1,85 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Compute the ac powerflows of all the single branch outages (N-1 security analysis) with GridModel.run_n1 (for
+different numbers of threads) and from python, with a copy of the GridModel for each contingency (as it is done
+when a LightSimBackend is copied before calling runpf).
+"""
+
+import time
+import numpy as np
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import ElementType
+from utils_benchmark import CASES, make_v0
+import pdb
+
+MAX_IT = 10
+TOL = 1e-8
+NB_THREADS = [1, 2, 4]
+
+
+def make_contingencies(net):
+    """one contingency per powerline and per trafo"""
+    return [[(ElementType.LINE, line_id)] for line_id in range(net.line.shape[0])] + \
+           [[(ElementType.TRAFO, trafo_id)] for trafo_id in range(net.trafo.shape[0])]
+
+
+def time_python(model, net, contingency_list):
+    V0 = make_v0(net)
+    p_or = np.full((len(contingency_list), net.line.shape[0] + net.trafo.shape[0]), fill_value=np.NaN)
+    beg_ = time.perf_counter()
+    V_base = model.ac_pf(V0, MAX_IT, TOL)
+    for cont_id, contingency in enumerate(contingency_list):
+        model_cont = model.copy()
+        for el_type, el_id in contingency:
+            if el_type == ElementType.LINE:
+                model_cont.deactivate_powerline(el_id)
+            else:
+                model_cont.deactivate_trafo(el_id)
+        V = model_cont.ac_pf(V_base, MAX_IT, TOL)
+        if V.shape[0] > 0:
+            p_or[cont_id] = np.concatenate((model_cont.get_lineor_res()[0], model_cont.get_trafohv_res()[0]))
+    return time.perf_counter() - beg_, p_or
+
+
+def main(case_names, nb_threads):
+    print("{:>10s} | {:>8s} | {:>12s} | {}".format("case", "nb cont", "python copy",
+                                                    " | ".join(["{:>14s}".format("run_n1 ({})".format(el))
+                                                                for el in nb_threads])))
+    for case_name in case_names:
+        net = CASES[case_name]()
+        contingency_list = make_contingencies(net)
+        nb_cont = len(contingency_list)
+        timer_python, res_ref = time_python(init(net), net, contingency_list)
+        timers = []
+        max_diff = 0.
+        for n_threads in nb_threads:
+            model = init(net)
+            beg_ = time.perf_counter()
+            converged, p_or, a_or = model.run_n1(contingency_list, make_v0(net), MAX_IT, TOL, n_threads)
+            timers.append(time.perf_counter() - beg_)
+            assert np.all(converged == np.isfinite(res_ref[:, 0]))
+            max_diff = max(max_diff, np.nanmax(np.abs(p_or - res_ref)))
+        print("{:>10s} | {:>8d} | {:>10.1f}us | {}".format(case_name, nb_cont, 1e6 * timer_python / nb_cont,
+                                                           " | ".join(["{:>6.1f}us {:>5.1f}x".format(1e6 * el / nb_cont,
+                                                                                                    timer_python / el)
+                                                                       for el in timers])))
+        print("{:>10s} | max difference of the flows: {:.2e}MW".format("", max_diff))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the N-1 security analysis')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--threads', default=NB_THREADS, type=int, nargs="+",
+                        help='Number of threads used by run_n1.')
+    args = parser.parse_args()
+    main(args.case, args.threads)
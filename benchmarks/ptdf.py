@@ -0,0 +1,85 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Compute the PTDF and the LODF matrices with GridModel.get_ptdf / GridModel.get_lodf (all the branches, and only
+some "monitored" branches) and with the pandapower (pypower) functions makePTDF / makeLODF, which need a dc
+powerflow first (to build the internal "ppc" of pandapower) and use its bus ordering.
+
+NB: the dc powerflows of pandapower and of lightsim2grid already differ on case300 and case1888 (some trafos are
+not modeled the same way), and so do the matrices.
+"""
+
+import time
+import warnings
+import numpy as np
+import pandapower as pp
+from pandapower.pypower.makePTDF import makePTDF
+from pandapower.pypower.makeLODF import makeLODF
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import LinearSolverType
+from utils_benchmark import CASES
+import pdb
+
+NB_MONITORED = 50
+
+
+def time_pandapower(net):
+    beg_ = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore")
+        pp.rundcpp(net)
+    ppc = net._ppc
+    ptdf = makePTDF(ppc["baseMVA"], ppc["bus"], ppc["branch"])
+    timer_ptdf = time.perf_counter() - beg_
+    lodf = makeLODF(ppc["branch"], ptdf)
+    timer_lodf = time.perf_counter() - beg_
+    # back to the order of the buses of the grid (the bus ids are 0, 1, ..., nb_bus - 1 in these grids)
+    ptdf = ptdf[:, net._pd2ppc_lookups["bus"][np.arange(net.bus.shape[0])]]
+    return timer_ptdf, timer_lodf, ptdf, lodf
+
+
+def main(case_names, nb_monitored):
+    print("{:>10s} | {:>12s} | {:>12s} | {:>12s} | {:>12s} | {:>12s} | {:>12s}".format(
+        "case", "pp ptdf", "ptdf", "ptdf (mon.)", "pp +lodf", "lodf", "lodf (mon.)"))
+    for case_name in case_names:
+        net = CASES[case_name]()
+        monitored = np.arange(min(nb_monitored, net.line.shape[0] + net.trafo.shape[0]))
+        timers = []
+        res = []
+        for fun_name, args in [("get_ptdf", ()), ("get_ptdf", (monitored, )),
+                               ("get_lodf", ()), ("get_lodf", (monitored, ))]:
+            model = init(net)
+            model.set_dc_linear_solver(LinearSolverType.KLU)
+            beg_ = time.perf_counter()
+            res.append(getattr(model, fun_name)(*args))
+            timers.append(time.perf_counter() - beg_)
+        # the powerflow of pandapower modifies the grid
+        timer_pp_ptdf, timer_pp_lodf, ptdf_ref, lodf_ref = time_pandapower(net)
+        ptdf, ptdf_mon, lodf, lodf_mon = res
+        print("{:>10s} | {:>10.2f}ms | {:>10.2f}ms | {:>10.2f}ms | {:>10.2f}ms | {:>10.2f}ms | {:>10.2f}ms".format(
+            case_name, 1e3 * timer_pp_ptdf, 1e3 * timers[0], 1e3 * timers[1],
+            1e3 * timer_pp_lodf, 1e3 * timers[2], 1e3 * timers[3]))
+        ok = np.isfinite(lodf) & np.isfinite(lodf_ref)
+        print("{:>10s} | max difference ptdf: {:.2e}, lodf: {:.2e} ({} outages split the grid)".format(
+            "", np.max(np.abs(ptdf - ptdf_ref)), np.max(np.abs(lodf[ok] - lodf_ref[ok])),
+            np.sum(np.isnan(lodf[0]))))
+        assert np.max(np.abs(ptdf_mon - ptdf[monitored])) == 0.
+        assert np.array_equal(lodf_mon, lodf[monitored], equal_nan=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the computation of the PTDF and LODF matrices')
+    parser.add_argument('--case', default=list(CASES.keys()), type=str, nargs="+",
+                        help='Name of the pandapower case(s) to use, among {}'.format(sorted(CASES.keys())))
+    parser.add_argument('--monitored', type=int, default=NB_MONITORED,
+                        help='Number of monitored branches.')
+    args = parser.parse_args()
+    main(args.case, args.monitored)
@@ -0,0 +1,80 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid a implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Compare a "do nothing" agent in a grid2op environment (with the LightSimBackend) and GridModel.compute_time_series
+(all the powerflows are computed in c++, without python nor grid2op in the loop) on the same injections.
+"""
+
+import time
+import numpy as np
+
+from grid2op import make
+from grid2op.Agent import DoNothingAgent
+from grid2op.Parameters import Parameters
+from lightsim2grid.LightSimBackend import LightSimBackend
+from utils_benchmark import run_env, str2bool
+import pdb
+
+MAX_TS = 1000
+ENV_NAME = "rte_case14_realistic"
+
+
+def get_injections(env, max_ts):
+    """injections of the "max_ts" first steps of the current chronics, in the units of GridModel"""
+    data = env.chronics_handler.real_data.data
+    # the first step of the environment uses the second row of the chronics
+    rows = slice(data.current_index + 1, data.current_index + 1 + max_ts)
+    load_p = np.ascontiguousarray(data.load_p[rows], dtype=np.float64)
+    load_q = np.ascontiguousarray(data.load_q[rows], dtype=np.float64)
+    gen_p = np.ascontiguousarray(data.prod_p[rows], dtype=np.float64)
+    gen_v = np.ascontiguousarray(data.prod_v[rows] / env.backend.prod_pu_to_kv, dtype=np.float64)
+    return load_p, load_q, gen_p, gen_v
+
+
+def main(max_ts, name, test=True):
+    param = Parameters()
+    param.init_from_dict({"NO_OVERFLOW_DISCONNECTION": True})
+    env = make(name, backend=LightSimBackend(), param=param, test=test)
+    backend = env.backend
+    model = backend._grid.copy()
+    V0 = 1. * backend.V
+    load_p, load_q, gen_p, gen_v = get_injections(env, max_ts)
+
+    agent = DoNothingAgent(action_space=env.action_space)
+    nb_ts, time_env, aor_env, gen_p_env, gen_q_env = run_env(env, max_ts, agent)
+
+    beg_ = time.perf_counter()
+    converged, V, p_or, q_or, a_or, p_ex, q_ex, a_ex = model.compute_time_series(load_p[:nb_ts], load_q[:nb_ts],
+                                                                                 gen_p[:nb_ts], gen_v[:nb_ts],
+                                                                                 V0, backend.max_it, backend.tol)
+    time_ts = time.perf_counter() - beg_
+
+    print("grid2op environment: {} time steps in {:.3f}s ({:.1f} it/s), of which powerflow {:.3f}s"
+          "".format(nb_ts, time_env, nb_ts / time_env, env._time_powerflow))
+    print("compute_time_series: {} time steps in {:.3f}s ({:.1f} it/s), {} converged"
+          "".format(nb_ts, time_ts, nb_ts / time_ts, np.sum(converged)))
+    print("Speed-up {:.1f}".format(time_env / time_ts))
+    print("Absolute value of the difference (max) for aor: {}"
+          "".format(np.max(np.abs(1000. * a_or - aor_env))))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark GridModel.compute_time_series against a grid2op '
+                                                 'environment with a "do nothing" agent')
+    parser.add_argument('--name', default=ENV_NAME, type=str,
+                        help='Environment name to be used for the benchmark.')
+    parser.add_argument('--number', type=int, default=MAX_TS,
+                        help='Maximum number of time steps for which the benchamark will be run.')
+    parser.add_argument('--no_test', type=str2bool, nargs='?',
+                        const=True, default=False,
+                        help='Do not use test environment for the benchmark (default False: use test environment)')
+
+    args = parser.parse_args()
+    main(int(args.number), str(args.name), not args.no_test)
@@ -173,7 +173,52 @@ class TestAgent(AgentWithConverter):
         return res
 
 
-def main(max_ts, name, test=True):
+def compare_fixed_pattern(env_klu, nb_ts_klu, time_klu, aor_klu, max_ts, name, test, param):
+    """run the same scenario with the "fixed pattern" mode of the LightSimBackend, and compare it with the default one"""
+    env_fp = make(name, backend=LightSimBackend(fixed_pattern=True), test=test,
+                  param=param, gamerules_class=AlwaysLegal,
+                  data_feeding_kwargs={"chunk_size": 128, "max_iter": max_ts, "gridvalueClass": GridStateFromFile})
+    agent = TestAgent(action_space=env_fp.action_space, env_name=name)
+    nb_ts_fp, time_fp, aor_fp, gen_p_fp, gen_q_fp = run_env(env_fp, max_ts, agent,
+                                                            chron_id=0, keep_forecast=False)
+    print("Speed-up of the \"fixed pattern\" mode {:.2f}".format(time_klu / time_fp))
+    for env, nb_ts, time_, nm in [(env_klu, nb_ts_klu, time_klu, "default"), (env_fp, nb_ts_fp, time_fp, "fixed pattern")]:
+        nb_analyze, nb_factor, nb_refactor = env.backend._grid.get_nb_factorizations()
+        print("PyKLU Backend ({}) {} time steps in {}s ({:.2f} it/s)".format(nm, nb_ts, time_, nb_ts / time_))
+        print("\tTime powerflow: {:.2f}ms".format(1000. * env._time_powerflow / nb_ts))
+        print("\tklu_analyze: {}, klu_factor: {}, klu_refactor: {} (since the last reset)".format(nb_analyze,
+                                                                                          nb_factor,
+                                                                                          nb_refactor))
+    print("Absolute value of the difference (max) for aor: {}".format(np.max(np.abs(aor_klu - aor_fp))))
+
+
+def compare_v_cache(env_klu, nb_ts_klu, time_klu, aor_klu, max_ts, name, test, param, v_cache_capacity):
+    """run the same scenario when the last converged voltages of each topology are used as the initial point of the
+    ac powerflow (see LightSimBackend(v_cache_capacity=...)), and compare it with the default one"""
+    env_vc = make(name, backend=LightSimBackend(v_cache_capacity=v_cache_capacity), test=test,
+                  param=param, gamerules_class=AlwaysLegal,
+                  data_feeding_kwargs={"chunk_size": 128, "max_iter": max_ts, "gridvalueClass": GridStateFromFile})
+    agent = TestAgent(action_space=env_vc.action_space, env_name=name)
+    env_vc.backend.reset_pf_stats()
+    nb_ts_vc, time_vc, aor_vc, gen_p_vc, gen_q_vc = run_env(env_vc, max_ts, agent,
+                                                            chron_id=0, keep_forecast=False)
+    print("Speed-up of the voltage cache {:.2f}".format(time_klu / time_vc))
+    for env, nb_ts, time_, nm in [(env_klu, nb_ts_klu, time_klu, "default"), (env_vc, nb_ts_vc, time_vc, "v cache")]:
+        stats = env.backend.get_pf_stats()
+        print("PyKLU Backend ({}) {} time steps in {}s ({:.2f} it/s)".format(nm, nb_ts, time_, nb_ts / time_))
+        print("\tTime powerflow: {:.2f}ms".format(1000. * env._time_powerflow / nb_ts))
+        print("\t{} ac powerflows, {} iterations ({:.2f} per powerflow), {} dc initializations"
+              "".format(stats["nb_ac_pf"], stats["nb_ac_iter"], stats["nb_ac_iter"] / stats["nb_ac_pf"],
+                        stats["nb_dc_init"]))
+    stats = env_vc.backend.get_pf_stats()
+    nb_miss = stats["nb_ac_pf"] - stats["v_cache_hit"]
+    print("\tcache hits: {} ({:.2f} iterations per powerflow), misses: {} ({:.2f} iterations per powerflow)"
+          "".format(stats["v_cache_hit"], stats["nb_iter_v_cache_hit"] / max(stats["v_cache_hit"], 1),
+                    nb_miss, (stats["nb_ac_iter"] - stats["nb_iter_v_cache_hit"]) / max(nb_miss, 1)))
+    print("Absolute value of the difference (max) for aor: {}".format(np.max(np.abs(aor_klu - aor_vc))))
+
+
+def main(max_ts, name, test=True, fixed_pattern=False, v_cache_capacity=0):
     backend = LightSimBackend()
     param = Parameters()
     param.init_from_dict({"NO_OVERFLOW_DISCONNECTION": True})
@@ -182,6 +227,7 @@ def main(max_ts, name, test=True):
                    param=param, gamerules_class=AlwaysLegal,
                    data_feeding_kwargs={"chunk_size": 128, "max_iter": max_ts, "gridvalueClass": GridStateFromFile})
     agent = TestAgent(action_space=env_klu.action_space, env_name=name)
+    env_klu.backend.reset_pf_stats()
     nb_ts_klu, time_klu, aor_klu, gen_p_klu, gen_q_klu = run_env(env_klu, max_ts, agent,
                                                                  chron_id=0, keep_forecast=False)
 
@@ -198,6 +244,10 @@ def main(max_ts, name, test=True):
               gen_p_klu, gen_p_pp,
               gen_q_klu, gen_q_pp
               )
+    if fixed_pattern:
+        compare_fixed_pattern(env_klu, nb_ts_klu, time_klu, aor_klu, max_ts, name, test, param)
+    if v_cache_capacity > 0:
+        compare_v_cache(env_klu, nb_ts_klu, time_klu, aor_klu, max_ts, name, test, param, v_cache_capacity)
 
 
 if __name__ == "__main__":
@@ -211,10 +261,16 @@ if __name__ == "__main__":
     parser.add_argument('--no_test', type=str2bool, nargs='?',
                         const=True, default=False,
                         help='Do not use test environment for the benchmark (default False: use test environment)')
+    parser.add_argument('--fixed_pattern', type=str2bool, nargs='?',
+                        const=True, default=False,
+                        help='Also benchmark the "fixed pattern" mode of the LightSimBackend (default False)')
+    parser.add_argument('--v_cache', type=int, default=0,
+                        help='Also benchmark the LightSimBackend when the voltages of this number of topologies '
+                             'are kept to initialize the ac powerflow (default 0: not benchmarked)')
 
     args = parser.parse_args()
 
     max_ts = int(args.number)
     name = str(args.name)
     test_env = not args.no_test
-    main(max_ts, name, test_env)
+    main(max_ts, name, test_env, args.fixed_pattern, args.v_cache)
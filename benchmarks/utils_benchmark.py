@@ -8,10 +8,54 @@
 
 import time
 import numpy as np
+import pandapower.networks as pn
 from tqdm import tqdm
 import argparse
 import pdb
 
+# pandapower cases used by the benchmarks of GridModel
+CASES = {"case118": pn.case118,
+         "case300": pn.case300,
+         "case1888": pn.case1888rte}
+
+
+def make_v0(net):
+    """flat start, with the voltage setpoint of the ext_grid"""
+    V0 = np.full(net.bus.shape[0], fill_value=1.0, dtype=np.complex_)
+    V0[net.ext_grid["bus"].values] = net.ext_grid["vm_pu"].values
+    return V0
+
+
+def run_pfs(model, net, nb_pf, max_it, seed=0, force_reset=False):
+    """run nb_pf powerflows, each time with slightly different loads (each one starts from the result of the
+    previous one). If force_reset is set, a bus is disconnected and reconnected before each powerflow: this does
+    not change the grid, but GridModel computes Ybus, pv / pq and the KLU factorization from scratch (a change of
+    status of a bus sets "need_reset_", whereas a branch disconnected then reconnected leaves Ybus unchanged)."""
+    prng = np.random.RandomState(seed)
+    load_p_init = net.load["p_mw"].values
+    load_q_init = net.load["q_mvar"].values
+    n_load = load_p_init.shape[0]
+    V = model.ac_pf(make_v0(net), max_it, 1e-8)
+    nb_conv = 0
+    nb_iter = 0
+    timer_pf = 0.
+    for _ in range(nb_pf):
+        ratio = 1.0 + 0.01 * prng.normal(size=n_load)
+        for load_id in range(n_load):
+            model.change_p_load(load_id, load_p_init[load_id] * ratio[load_id])
+            model.change_q_load(load_id, load_q_init[load_id] * ratio[load_id])
+        if force_reset:
+            model.deactivate_bus(0)
+            model.reactivate_bus(0)
+        beg_ = time.perf_counter()
+        V_tmp = model.ac_pf(V, max_it, 1e-8)
+        timer_pf += time.perf_counter() - beg_
+        if V_tmp.shape[0]:
+            nb_conv += 1
+            nb_iter += model.get_nb_iter()
+            V = V_tmp
+    return nb_conv, nb_iter, timer_pf
+
 
 def print_res(env_klu, env_pp,
               nb_ts_klu, nb_ts_pp,
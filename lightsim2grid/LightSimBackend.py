@@ -8,6 +8,7 @@
 
 import copy
 import numpy as np
+from collections import OrderedDict
 
 from grid2op.Action import CompleteAction
 from grid2op.Backend import Backend
@@ -16,10 +17,18 @@ from grid2op.Action._BackendAction import _BackendAction
 from grid2op.dtypes import dt_float, dt_int
 
 from lightsim2grid.initGridModel import init
+from lightsim2grid.rankContingencies import rank_contingencies, INDEX_TYPES
+from lightsim2grid_cpp import PFAlgorithm, LinearSolverType, ElementType, ConnectivityStatus
 
 
 class LightSimBackend(Backend):
-    def __init__(self, detailed_infos_for_cascading_failures=False):
+    # coefficients of the extrapolation of the voltages of order 0, 1 or 2 (from the oldest to the last state)
+    _v_extrapolation_coeffs = {0: (1.,), 1: (-1., 2.), 2: (1., -3., 3.)}
+
+    def __init__(self, detailed_infos_for_cascading_failures=False, fixed_pattern=False, topo_cache_capacity=0,
+                 pf_algorithm="NR", chord_newton=False, linear_solver="KLU", dc_linear_solver="KLU",
+                 auto_tune_linear_solver=False, dense_threshold=None, dc_dense_threshold=None, v_cache_capacity=0,
+                 v_extrapolation_order=0):
         Backend.__init__(self,
                          detailed_infos_for_cascading_failures=detailed_infos_for_cascading_failures)
 
@@ -48,6 +57,50 @@ class LightSimBackend(Backend):
         self.V = None
         self.max_it = 10
         self.tol = 1e-8  # tolerance for the solver
+        # use the same sparsity pattern for the jacobian whatever the topology (see GridModel.set_fixed_pattern)
+        self.fixed_pattern = fixed_pattern
+        # number of topologies for which Ybus, pv, pq and the factorization are kept (see GridModel.set_topo_cache_capacity)
+        self.topo_cache_capacity = topo_cache_capacity
+        # algorithm for the ac powerflow: "NR" (newton raphson), "FDPF_XB" or "FDPF_BX" (fast decoupled),
+        # see GridModel.set_pf_algorithm. It can also be chosen for each call to "runpf"
+        self.pf_algorithm = pf_algorithm
+        self._get_pf_algorithm(self.pf_algorithm)  # check it is valid
+        self.max_it_fdpf = 30  # the fast decoupled method needs more (but cheaper) iterations
+        # reuse the factorization of the jacobian while the mismatch decreases fast enough
+        # (see GridModel.set_chord_newton)
+        self.chord_newton = chord_newton
+        # sparse linear solvers: "KLU" or "SparseLU" for the ac powerflow, "KLU", "SparseLU" or "LDLT" for the dc
+        # powerflow (see GridModel.set_linear_solver and GridModel.set_dc_linear_solver)
+        self.linear_solver = linear_solver
+        self.dc_linear_solver = dc_linear_solver
+        self._get_linear_solver(self.linear_solver)  # check they are valid
+        self._get_linear_solver(self.dc_linear_solver, dc=True)
+        # if True, the fastest linear solvers (for this grid) are chosen at the end of "load_grid"
+        # instead (see GridModel.tune_linear_solver)
+        self.auto_tune_linear_solver = auto_tune_linear_solver
+        self.nb_pf_tune = 5  # number of powerflows timed for each linear solver
+        # opt-in: grids with at most this number of buses are solved with a dense LU (ac and dc powerflows). None
+        # keeps the default of GridModel (-1, the dense LU is never used), see GridModel.set_dense_threshold and
+        # benchmarks/dense_lu.py to choose a value for a given grid
+        self.dense_threshold = dense_threshold
+        self.dc_dense_threshold = dc_dense_threshold
+        # number of topologies (see GridModel.get_topo_fingerprint) for which the last converged voltages are kept,
+        # they are used as the initial point of the ac powerflow (instead of the current voltages or of a dc
+        # powerflow) when the grid comes back to one of these topologies. 0 to disable it.
+        self.v_cache_capacity = v_cache_capacity
+        self._v_cache = OrderedDict()  # fingerprint -> voltages, the most recently used at the end
+        # when the topology did not change since the last powerflows, the initial point of the ac powerflow is
+        # extrapolated (on the unwrapped voltage angles and on the magnitudes) from their results: 0 to disable it,
+        # 1 for a linear extrapolation (from the last 2 converged states) or 2 for a quadratic one (from the last 3
+        # states). The usual initial point is used until 2 states are known.
+        self.v_extrapolation_order = v_extrapolation_order
+        if self.v_extrapolation_order not in self._v_extrapolation_coeffs:
+            raise BackendError("The order of the extrapolation of the voltages should be one of {}"
+                               "".format(sorted(self._v_extrapolation_coeffs)))
+        self._v_history = []  # last converged (Va, Vm) of the topology "_v_history_key", the most recent at the end
+        self._v_history_key = None
+        self._pf_stats = None
+        self.reset_pf_stats()
 
         self.prod_pu_to_kv = None
         self.load_pu_to_kv = None
@@ -159,6 +212,18 @@ class LightSimBackend(Backend):
 
         # set up the "lightsim grid" accordingly
         self._grid.set_n_sub(self.__nb_bus_before)
+        self._grid.set_fixed_pattern(self.fixed_pattern)
+        self._grid.set_topo_cache_capacity(self.topo_cache_capacity)
+        self.clear_v_cache()
+        self._v_history = []
+        self._grid.set_pf_algorithm(self._get_pf_algorithm(self.pf_algorithm))
+        self._grid.set_chord_newton(self.chord_newton)
+        self._grid.set_linear_solver(self._get_linear_solver(self.linear_solver))
+        self._grid.set_dc_linear_solver(self._get_linear_solver(self.dc_linear_solver, dc=True))
+        if self.dense_threshold is not None:
+            self._grid.set_dense_threshold(self.dense_threshold)
+        if self.dc_dense_threshold is not None:
+            self._grid.set_dc_dense_threshold(self.dc_dense_threshold)
         self._grid.set_load_pos_topo_vect(self.load_pos_topo_vect)
         self._grid.set_gen_pos_topo_vect(self.gen_pos_topo_vect)
         self._grid.set_line_or_pos_topo_vect(self.line_or_pos_topo_vect[:self.__nb_powerline])
@@ -219,6 +284,8 @@ class LightSimBackend(Backend):
         self.prod_v = np.full(self.n_gen, dtype=dt_float, fill_value=np.NaN)
 
         self._count_object_per_bus()
+        if self.auto_tune_linear_solver:
+            self._tune_linear_solver()
         self.__me_at_init = self._grid.copy()
         self.__init_topo_vect = np.ones(self.dim_topo, dtype=np.int)
         self.__init_topo_vect[:] = self.topo_vect
@@ -343,66 +410,229 @@ class LightSimBackend(Backend):
         # TODO c++ side: have a check to be sure that the set_***_pos_topo_vect and set_***_to_sub_id
         # TODO have been correctly called before calling the function self._grid.update_topo
 
-    def runpf(self, is_dc=False):
+    @staticmethod
+    def _get_pf_algorithm(pf_algorithm):
+        """convert the name of an algorithm ("NR", "FDPF_XB" or "FDPF_BX") to a PFAlgorithm"""
+        if isinstance(pf_algorithm, str):
+            if pf_algorithm not in PFAlgorithm.__members__:
+                raise BackendError("Unknown powerflow algorithm \"{}\", it should be one of {}"
+                                   "".format(pf_algorithm, sorted(PFAlgorithm.__members__)))
+            pf_algorithm = PFAlgorithm.__members__[pf_algorithm]
+        return pf_algorithm
+
+    @staticmethod
+    def _get_linear_solver(linear_solver, dc=False):
+        """convert the name of a linear solver ("KLU", "SparseLU" or "LDLT" for the dc powerflow only)
+        to a LinearSolverType"""
+        if isinstance(linear_solver, str):
+            if linear_solver not in LinearSolverType.__members__:
+                raise BackendError("Unknown linear solver \"{}\", it should be one of {}"
+                                   "".format(linear_solver, sorted(LinearSolverType.__members__)))
+            linear_solver = LinearSolverType.__members__[linear_solver]
+        if linear_solver == LinearSolverType.LDLT and not dc:
+            raise BackendError("The LDLT linear solver can only be used for the dc powerflow (dc_linear_solver)")
+        return linear_solver
+
+    def _tune_linear_solver(self):
+        """keep the fastest linear solvers for this grid (the powerflows start from the dc approximation)"""
+        V = np.ones(self.nb_bus_total, dtype=np.complex_) * 1.04
+        Vdc = self._grid.dc_pf(V, self.max_it, self.tol)
+        if Vdc.shape[0]:
+            V[:] = Vdc
+        self._grid.tune_linear_solver(V, self.max_it, self.tol, self.nb_pf_tune)
+        self.linear_solver = self._grid.get_linear_solver()
+        self.dc_linear_solver = self._grid.get_dc_linear_solver()
+
+    def runpf(self, is_dc=False, pf_algorithm=None):
+        """
+        is_dc: use the dc approximation (see GridModel.dc_pf): the flows, the loads and the productions are computed
+        without losses, the reactive powers are 0. and the voltage magnitudes are the setpoints of the generators
+        (1. pu elsewhere)
+
+        pf_algorithm: algorithm used for the ac powerflow for this call only (``self.pf_algorithm`` is used if
+        it is ``None``)
+        """
+        if pf_algorithm is None:
+            pf_algorithm = self.pf_algorithm
+        pf_algorithm = self._get_pf_algorithm(pf_algorithm)
+        max_it = self.max_it if pf_algorithm == PFAlgorithm.NR else self.max_it_fdpf
         try:
-            if is_dc:
-                raise NotImplementedError("Not fully implemented at the moment.")
-                if self.V is None:
-                    self.V = np.ones(self.nb_bus_total, dtype=np.complex_)
-                self.V = self._grid.dc_pf(self.V, self.max_it, self.tol)
-            else:
-                if self.V is None:
-                    # init from dc approx in this case
-                    self.V = np.ones(self.nb_bus_total, dtype=np.complex_) * 1.04
-
-                if self.initdc:
-                    V = self._grid.dc_pf(self.V, self.max_it, self.tol)
-                    if V.shape[0] == 0:
-                        # V = self._grid.ac_pf(self.V, self.max_it, self.tol)
-                        raise DivergingPowerFlow("divergence of powerflow (non connected grid)")
-                    self.V[:] = V
-                V = self._grid.ac_pf(self.V, self.max_it, self.tol)
+            if self.V is None:
+                # init from dc approx in this case
+                self.V = np.ones(self.nb_bus_total, dtype=np.complex_) * 1.04
+
+            topo_key = None
+            v_init_from = None  # where the initial point of the ac powerflow comes from
+            if not is_dc and (self.v_cache_capacity > 0 or self.v_extrapolation_order > 0):
+                topo_key = self._grid.get_topo_fingerprint()
+                V_init = self._extrapolate_v(topo_key)
+                if V_init is not None:
+                    v_init_from = "extrapolation"
+                elif self.v_cache_capacity > 0:
+                    V_init = self._get_v_cache(topo_key)
+                    if V_init is not None:
+                        v_init_from = "v_cache"
+                if V_init is not None:
+                    self.V[:] = V_init
+
+            if v_init_from is None and (is_dc or self.initdc):
+                V = self._grid.dc_pf(self.V, self.max_it, self.tol)
+                if V.shape[0] == 0:
+                    # V = self._grid.ac_pf(self.V, self.max_it, self.tol)
+                    self._check_connectivity()
+                    raise DivergingPowerFlow("divergence of powerflow (non connected grid)")
+                if not is_dc:
+                    self._pf_stats["nb_dc_init"] += 1
+                self.V[:] = V
+            if not is_dc:
+                self._grid.set_pf_algorithm(pf_algorithm)
+                V = self._grid.ac_pf(self.V, max_it, self.tol)
+                if V.shape[0] == 0:
+                    self._check_connectivity()
+                self._update_pf_stats(V, v_init_from)
                 if V.shape[0] == 0:
                     # V = self._grid.ac_pf(self.V, self.max_it, self.tol)
+                    # do not start from these voltages again
+                    if v_init_from == "v_cache":
+                        del self._v_cache[topo_key]
+                    self._v_history = []
                     raise DivergingPowerFlow("divergence of powerflow")
                 self.V[:] = V
-                # self.V[self.V == 0.] = 1.
-                lpor, lqor, lvor, laor = self._grid.get_lineor_res()
-                lpex, lqex, lvex, laex = self._grid.get_lineex_res()
-                tpor, tqor, tvor, taor = self._grid.get_trafohv_res()
-                tpex, tqex, tvex, taex = self._grid.get_trafolv_res()
-
-                self.p_or[:] = np.concatenate((lpor, tpor))
-                self.q_or[:] = np.concatenate((lqor, tqor))
-                self.v_or[:] = np.concatenate((lvor, tvor))
-                self.a_or[:] = 1000. * np.concatenate((laor, taor))
-
-                self.a_or[~np.isfinite(self.a_or)] = 0.
-                self.v_or[~np.isfinite(self.v_or)] = 0.
-                self.a_ex[~np.isfinite(self.a_ex)] = 0.
-                self.v_ex[~np.isfinite(self.v_ex)] = 0.
-
-                self.p_ex[:] = np.concatenate((lpex, tpex))
-                self.q_ex[:] = np.concatenate((lqex, tqex))
-                self.v_ex[:] = np.concatenate((lvex, tvex))
-                self.a_ex[:] = 1000. * np.concatenate((laex, taex))
-
-                self.load_p[:], self.load_q[:], self.load_v[:] = self._grid.get_loads_res()
-                self.prod_p[:], self.prod_q[:], self.prod_v[:] = self._grid.get_gen_res()
-                self.next_prod_p[:] = self.prod_p
-
-                if np.any(~np.isfinite(self.load_v)) or np.any(self.load_v <= 0.):
-                    raise DivergingPowerFlow("One load is disconnected")
-                if np.any(~np.isfinite(self.prod_v)) or np.any(self.prod_v <= 0.):
-                    raise DivergingPowerFlow("One generator is disconnected")
-
-                res = True
+                if self.v_cache_capacity > 0:
+                    self._set_v_cache(topo_key, V)
+                if self.v_extrapolation_order > 0:
+                    self._add_v_history(topo_key, V)
+            # self.V[self.V == 0.] = 1.
+            lpor, lqor, lvor, laor = self._grid.get_lineor_res()
+            lpex, lqex, lvex, laex = self._grid.get_lineex_res()
+            tpor, tqor, tvor, taor = self._grid.get_trafohv_res()
+            tpex, tqex, tvex, taex = self._grid.get_trafolv_res()
+
+            self.p_or[:] = np.concatenate((lpor, tpor))
+            self.q_or[:] = np.concatenate((lqor, tqor))
+            self.v_or[:] = np.concatenate((lvor, tvor))
+            self.a_or[:] = 1000. * np.concatenate((laor, taor))
+
+            self.a_or[~np.isfinite(self.a_or)] = 0.
+            self.v_or[~np.isfinite(self.v_or)] = 0.
+            self.a_ex[~np.isfinite(self.a_ex)] = 0.
+            self.v_ex[~np.isfinite(self.v_ex)] = 0.
+
+            self.p_ex[:] = np.concatenate((lpex, tpex))
+            self.q_ex[:] = np.concatenate((lqex, tqex))
+            self.v_ex[:] = np.concatenate((lvex, tvex))
+            self.a_ex[:] = 1000. * np.concatenate((laex, taex))
+
+            self.load_p[:], self.load_q[:], self.load_v[:] = self._grid.get_loads_res()
+            self.prod_p[:], self.prod_q[:], self.prod_v[:] = self._grid.get_gen_res()
+            self.next_prod_p[:] = self.prod_p
+
+            if np.any(~np.isfinite(self.load_v)) or np.any(self.load_v <= 0.):
+                raise DivergingPowerFlow("One load is disconnected")
+            if np.any(~np.isfinite(self.prod_v)) or np.any(self.prod_v <= 0.):
+                raise DivergingPowerFlow("One generator is disconnected")
+
+            res = True
         except Exception as e:
             # of the powerflow has not converged, results are Nan
             self._fill_nans()
 
         return res
 
+    def _check_connectivity(self):
+        """
+        raise if the last powerflow failed because the grid is not connected: it has then been rejected by
+        GridModel.dc_pf / GridModel.ac_pf before any computation (and the status they checked is not computed again)
+        """
+        if self._grid.check_connectivity() != ConnectivityStatus.CONNECTED:
+            self._pf_stats["nb_not_connected"] += 1
+            raise DivergingPowerFlow("divergence of powerflow (non connected grid: {})"
+                                     "".format(self.get_connectivity_report()))
+
+    def _get_v_cache(self, topo_key):
+        """last converged voltages for the topology "topo_key" (None if there are none)"""
+        V = self._v_cache.get(topo_key)
+        if V is None:
+            self._pf_stats["v_cache_miss"] += 1
+            return None
+        self._v_cache.move_to_end(topo_key)
+        self._pf_stats["v_cache_hit"] += 1
+        return V
+
+    def _set_v_cache(self, topo_key, V):
+        self._v_cache[topo_key] = 1. * V
+        self._v_cache.move_to_end(topo_key)
+        while len(self._v_cache) > self.v_cache_capacity:
+            # remove the least recently used topology
+            self._v_cache.popitem(last=False)
+
+    def clear_v_cache(self):
+        """remove all the voltages kept for the warm start of the ac powerflow"""
+        self._v_cache.clear()
+
+    def _extrapolate_v(self, topo_key):
+        """initial point of the ac powerflow extrapolated from the last converged voltages (None if the topology
+        changed since then or if there are less than 2 of them)"""
+        if self.v_extrapolation_order == 0 or topo_key != self._v_history_key or len(self._v_history) < 2:
+            return None
+        # linear extrapolation until there are enough states for the requested order
+        coeffs = self._v_extrapolation_coeffs[min(self.v_extrapolation_order, len(self._v_history) - 1)]
+        Va, Vm = zip(*self._v_history[-len(coeffs):])
+        # the angles are in (-pi, pi]: no jump of 2 pi between two states
+        Va = np.unwrap(np.array(Va), axis=0)
+        Vm = np.array(Vm)
+        coeffs = np.array(coeffs)
+        return coeffs.dot(Vm) * np.exp(1j * coeffs.dot(Va))
+
+    def _add_v_history(self, topo_key, V):
+        if topo_key != self._v_history_key:
+            self._v_history = []
+            self._v_history_key = topo_key
+        self._v_history.append((np.angle(V), np.abs(V)))
+        if len(self._v_history) > self.v_extrapolation_order + 1:
+            del self._v_history[0]
+
+    def _update_pf_stats(self, V, v_init_from):
+        nb_iter = self._grid.get_nb_iter()
+        self._pf_stats["nb_ac_pf"] += 1
+        self._pf_stats["nb_ac_iter"] += nb_iter
+        if V.shape[0] == 0:
+            self._pf_stats["nb_ac_diverged"] += 1
+        if v_init_from == "v_cache":
+            self._pf_stats["nb_iter_v_cache_hit"] += nb_iter
+        elif v_init_from == "extrapolation":
+            self._pf_stats["nb_extrapolated"] += 1
+            self._pf_stats["nb_iter_extrapolated"] += nb_iter
+
+    def get_pf_stats(self):
+        """
+        statistics about the ac powerflows computed by "runpf" since the last call to "reset_pf_stats":
+
+        - nb_ac_pf: number of ac powerflows, nb_ac_diverged: how many of them diverged
+        - nb_ac_iter: total number of iterations of these powerflows
+        - nb_dc_init: number of dc powerflows computed to initialize them
+        - v_cache_hit, v_cache_miss: number of ac powerflows that started (or not) from the voltages kept for their
+          topology (see "v_cache_capacity")
+        - nb_iter_v_cache_hit: number of iterations of the ac powerflows that started from these voltages
+        - nb_extrapolated: number of ac powerflows that started from voltages extrapolated from the previous
+          ones (see "v_extrapolation_order"), nb_iter_extrapolated: number of iterations of these powerflows
+        - nb_not_connected: number of calls to "runpf" that failed without computing any powerflow because the
+          grid is not connected (see "get_connectivity_report")
+        """
+        return copy.copy(self._pf_stats)
+
+    def reset_pf_stats(self):
+        self._pf_stats = {"nb_ac_pf": 0,
+                          "nb_ac_diverged": 0,
+                          "nb_ac_iter": 0,
+                          "nb_dc_init": 0,
+                          "v_cache_hit": 0,
+                          "v_cache_miss": 0,
+                          "nb_iter_v_cache_hit": 0,
+                          "nb_extrapolated": 0,
+                          "nb_iter_extrapolated": 0,
+                          "nb_not_connected": 0}
+
     def _fill_nans(self):
         """fill the results vectors with nans"""
         self.p_or[:] = np.NaN
@@ -491,8 +721,93 @@ class LightSimBackend(Backend):
         else:
             self._grid.deactivate_trafo(id_ - self.__nb_powerline)
 
+    def _get_v_init(self):
+        """voltages of the last powerflow, or the initial point of "runpf" if none was computed (flat start, then a
+        dc powerflow on a copy of the grid if "initdc")"""
+        if self.V is not None:
+            return self.V
+        V = np.ones(self.nb_bus_total, dtype=np.complex_) * 1.04
+        if self.initdc:
+            V_dc = self._grid.copy().dc_pf(V, self.max_it, self.tol)
+            if V_dc.shape[0] > 0:
+                V = V_dc
+        return V
+
+    def run_n1(self, line_ids=None, n_threads=0):
+        """
+        Security analysis of the current state of the grid: one ac powerflow per disconnected powerline (all the
+        powerlines if `line_ids` is ``None``), computed in c++ by `n_threads` threads (all the cores if 0) with
+        `GridModel.run_n1`, starting from the voltages of the current state (or from the initial point of `runpf` if
+        no powerflow has been computed yet). The backend is not modified.
+
+        Returns whether each powerflow converged, and the flows of all the powerlines relatively to their thermal
+        limits ("rho") with one row per contingency (NaN if the powerflow diverged).
+        """
+        if line_ids is None:
+            line_ids = np.arange(self.n_line)
+        contingency_list = [[(ElementType.LINE, int(id_))] if id_ < self.__nb_powerline
+                            else [(ElementType.TRAFO, int(id_) - self.__nb_powerline)]
+                            for id_ in line_ids]
+        try:
+            converged, p_or, a_or = self._grid.run_n1(contingency_list, self._get_v_init(), self.max_it, self.tol,
+                                                      n_threads)
+        except RuntimeError as exc_:
+            raise DivergingPowerFlow("divergence of the powerflow of the base case: {}".format(exc_))
+        rho = 1000. * a_or / self.thermal_limit_a
+        return converged, rho
+
+    def rank_contingencies(self, line_ids=None, index_type="dc", top_k=None, rho_threshold=0.9, n_threads=0,
+                           check_recall=False):
+        """
+        Two stages security analysis of the current state of the grid: the disconnections of the powerlines
+        `line_ids` (all the powerlines if ``None``) are ranked by a cheap estimation of the highest "rho" after each
+        of them ("dc": dc flows, "ac": one newton raphson step from the base case), then one ac powerflow is
+        computed only for the `top_k` first ones and the ones whose estimation is at least `rho_threshold`.
+        The backend is not modified.
+
+        See :func:`lightsim2grid.rankContingencies.rank_contingencies` for the report (the "branch_ids" are the
+        powerline ids) and for `check_recall`.
+        """
+        if index_type not in INDEX_TYPES:
+            raise BackendError("Unknown performance index \"{}\", it should be one of {}".format(index_type,
+                                                                                               INDEX_TYPES))
+        try:
+            return rank_contingencies(self._grid.copy(), self._get_v_init(), self.thermal_limit_a, line_ids,
+                                      index_type, top_k, rho_threshold, self.max_it, self.tol, 1, n_threads,
+                                      check_recall)
+        except RuntimeError as exc_:
+            raise DivergingPowerFlow("divergence of the powerflow of the base case: {}".format(exc_))
+
+    def get_islanding_lines(self):
+        """
+        Whether the disconnection of each powerline splits the grid in the current topology (the powerline is a
+        bridge of the graph of the buses, see `GridModel.get_bridges`). No powerflow is computed: the actions
+        and the contingencies that disconnect one of these powerlines can be rejected beforehand.
+        """
+        return self._grid.get_bridges()
+
+    def get_articulation_substations(self):
+        """
+        Whether the disconnection of all the elements of each substation splits the rest of the grid in the
+        current topology (see `GridModel.get_articulation_substations`).
+        """
+        return self._grid.get_articulation_substations()
+
+    def get_connectivity_report(self):
+        """
+        Whether the current topology can be solved (see `GridModel.get_connectivity_report`): "status" is the name of
+        the `ConnectivityStatus` ("CONNECTED" or the first reason found for which it cannot), "buses", "loads" and
+        "gens" are the ids of the buses, loads and generators that are not connected to the slack bus.
+        It is computed incrementally (with a union find of the buses) and checked by GridModel.dc_pf and
+        GridModel.ac_pf before any powerflow.
+        """
+        status, buses, loads, gens = self._grid.get_connectivity_report()
+        return {"status": status.name, "buses": buses, "loads": loads, "gens": gens[gens < self.n_gen]}
+
     def reset(self, grid_path, grid_filename=None):
         self.V = None
+        # the injections of the new episode are not related to the previous ones
+        self._v_history = []
         self._fill_nans()
         self._grid = self.__me_at_init.copy()
         self.topo_vect[:] = self.__init_topo_vect
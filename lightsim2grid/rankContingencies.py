@@ -0,0 +1,165 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+"""
+Two stages security analysis of the single branch outages: all the outages are ranked with a cheap estimation of
+the flows after each of them (a "performance index"), then a full ac powerflow is computed only for the most severe
+ones.
+"""
+
+import numpy as np
+from lightsim2grid_cpp import ElementType
+
+INDEX_TYPES = ("dc", "ac")
+
+
+def get_contingencies(model, branch_ids):
+    """contingency list of GridModel.run_n1 for branches given in grid2op order (powerlines then trafos)"""
+    nb_line = len(model.get_lines_status())
+    return [[(ElementType.LINE, int(id_))] if id_ < nb_line else [(ElementType.TRAFO, int(id_) - nb_line)]
+            for id_ in branch_ids]
+
+
+def compute_index(model, V, thermal_limit_a, branch_ids, index_type="dc", max_iter=10, tol=1e-8, nb_step=1):
+    """
+    Estimation of the flows of all the branches after the outage of each branch of `branch_ids`, relatively to
+    their thermal limits, and performance index of each outage (the highest of these ratios).
+
+    With `index_type="dc"` the active flows are the ones of the ac powerflow of the base case corrected by the
+    variations given by `GridModel.dc_n1_screening`, the reactive flows and the voltages are the ones of the base
+    case. With `index_type="ac"` the flows are the currents given by `GridModel.ac_n1_screening` after `nb_step`
+    newton raphson step(s).
+
+    Parameters
+    ----------
+    model: :class:`GridModel`
+        The grid (its results are the ones of the ac powerflow of the base case afterwards)
+
+    V: ``numpy.ndarray``, complex
+        The initial voltages of the powerflow of the base case
+
+    thermal_limit_a: ``numpy.ndarray``, float
+        The thermal limits (in A) of all the branches (powerlines then trafos)
+
+    branch_ids: ``numpy.ndarray``, int
+        The branches (powerlines then trafos) to disconnect, one at a time
+
+    Returns
+    -------
+    rho: ``numpy.ndarray``, float
+        The estimated flows relatively to the thermal limits, one row per outage (NaN if it splits the grid)
+
+    index: ``numpy.ndarray``, float
+        The performance index of each outage (+inf if it splits the grid)
+
+    """
+    thermal_limit_a = np.asarray(thermal_limit_a, dtype=float)
+    if index_type == "dc":
+        split_grid, p_or = model.dc_n1_screening(V, branch_ids)
+        p_or_dc = np.concatenate((model.get_lineor_res()[0], model.get_trafohv_res()[0]))
+        if model.ac_pf(V, max_iter, tol).shape[0] == 0:
+            raise RuntimeError("The powerflow of the base case diverged")
+        p_or_ac, q_or_ac, v_or_ac, _ = [np.concatenate((el_line, el_trafo))
+                                        for el_line, el_trafo in zip(model.get_lineor_res(),
+                                                                     model.get_trafohv_res())]
+        # the disconnected branches have no flow
+        v_or_ac[~(v_or_ac > 0.)] = np.inf
+        # the variations of the active flows are given by the dc approximation, the reactive flows and the voltages
+        # are the ones of the base case
+        p_or = p_or_ac + (p_or - p_or_dc)
+        rho = 1000. * np.sqrt(p_or**2 + q_or_ac**2) / (np.sqrt(3.) * v_or_ac * thermal_limit_a)
+        rho[np.arange(branch_ids.shape[0]), branch_ids] = 0.
+        rho[split_grid] = np.NaN
+    elif index_type == "ac":
+        error, p_or, a_or = model.ac_n1_screening(V, branch_ids, max_iter, tol, nb_step)
+        split_grid = ~np.isfinite(error)
+        rho = 1000. * a_or / thermal_limit_a
+    else:
+        raise RuntimeError("Unknown performance index \"{}\", it should be one of {}".format(index_type,
+                                                                                          INDEX_TYPES))
+    index = np.full(branch_ids.shape[0], fill_value=np.inf)
+    index[~split_grid] = np.max(rho[~split_grid], axis=1)
+    return rho, index
+
+
+def rank_contingencies(model, V, thermal_limit_a, branch_ids=None, index_type="dc", top_k=None, rho_threshold=0.9,
+                       max_iter=10, tol=1e-8, nb_step=1, n_threads=0, check_recall=False, rho_critical=1.0):
+    """
+    Two stages N-1 security analysis: the outages of the branches `branch_ids` (all the branches if ``None``) are
+    ranked by their performance index (see :func:`compute_index`), then `GridModel.run_n1` computes a full ac
+    powerflow for the `top_k` first ones (none if ``None``) and for the ones whose index is at least
+    `rho_threshold` (none if ``None``). The outages that split the grid are always selected.
+
+    With `check_recall=True`, the ac powerflows of the other outages are computed too (it is as slow as a
+    complete security analysis) to measure the quality of the filter: the "recall" is the fraction of the
+    "critical" outages (the ones for which the powerflow diverges or a flow is at least `rho_critical`) that were
+    selected.
+
+    Returns
+    -------
+    report: ``dict``
+        The outages, sorted by decreasing performance index:
+
+        - "branch_ids": the branch disconnected by each outage
+        - "index": its performance index
+        - "selected": whether it was selected by the filter
+        - "computed": whether its ac powerflow was computed (selected or `check_recall`)
+        - "converged": whether its ac powerflow converged (``False`` if it was not computed)
+        - "rho": the ac flows of all the branches relatively to their thermal limits, one row per outage (NaN if the
+          powerflow was not computed or diverged)
+        - "max_rho": the highest of these flows (NaN if not computed, +inf if the powerflow diverged)
+
+        and with `check_recall=True`:
+
+        - "critical": whether the outage is critical
+        - "recall": the fraction of the critical outages that were selected (1. if there are none)
+        - "missed": the critical outages that were not selected
+
+    """
+    nb_branch = len(model.get_lines_status()) + len(model.get_trafo_status())
+    if branch_ids is None:
+        branch_ids = np.arange(nb_branch)
+    branch_ids = np.asarray(branch_ids, dtype=int)
+    thermal_limit_a = np.asarray(thermal_limit_a, dtype=float)
+    if thermal_limit_a.shape != (nb_branch, ):
+        raise RuntimeError("There should be one thermal limit per branch ({}) but {} are given"
+                           "".format(nb_branch, thermal_limit_a.shape[0]))
+    nb_cont = branch_ids.shape[0]
+
+    # first stage: the cheap estimation, the outages are ranked with it
+    _, index = compute_index(model, V, thermal_limit_a, branch_ids, index_type, max_iter, tol, nb_step)
+    order = np.argsort(-index, kind="stable")
+    branch_ids = branch_ids[order]
+    index = index[order]
+    selected = np.isinf(index)
+    if top_k is not None:
+        selected[:top_k] = True
+    if rho_threshold is not None:
+        selected |= index >= rho_threshold
+
+    # second stage: full ac powerflows
+    computed = np.full(nb_cont, fill_value=True) if check_recall else selected.copy()
+    converged = np.full(nb_cont, fill_value=False)
+    rho = np.full((nb_cont, nb_branch), fill_value=np.NaN)
+    cont_ids = np.where(computed)[0]
+    converged_, _, a_or = model.run_n1(get_contingencies(model, branch_ids[cont_ids]), V, max_iter, tol, n_threads)
+    converged[cont_ids] = converged_
+    rho[cont_ids] = 1000. * a_or / thermal_limit_a
+    max_rho = np.full(nb_cont, fill_value=np.NaN)
+    max_rho[computed] = np.inf
+    max_rho[converged] = np.max(rho[converged], axis=1)
+
+    report = {"branch_ids": branch_ids, "index": index, "selected": selected, "computed": computed,
+              "converged": converged, "rho": rho, "max_rho": max_rho}
+    if check_recall:
+        critical = ~(max_rho < rho_critical)
+        nb_critical = np.sum(critical)
+        report["critical"] = critical
+        report["recall"] = np.sum(critical & selected) / nb_critical if nb_critical else 1.
+        report["missed"] = branch_ids[critical & ~selected]
+    return report
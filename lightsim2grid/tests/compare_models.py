@@ -0,0 +1,309 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import warnings
+import numpy as np
+import pandapower.networks as pn
+import pdb
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import ElementType
+
+try:
+    from grid2op import make
+    from grid2op.Parameters import Parameters
+    from lightsim2grid.LightSimBackend import LightSimBackend
+    GRID2OP_INSTALLED = True
+except ImportError as exc_:
+    GRID2OP_INSTALLED = False
+
+
+class BaseCompareModels:
+    """
+    Compare a GridModel with a setting under test ("self.model") with a GridModel with the default settings
+    ("self.model_ref"): the same modifications are applied to both of them (see "_both") and "check_same" compares
+    the results of their ac powerflows.
+
+    The test classes inherit from this class and from unittest.TestCase, and define "set_variant" (the setting
+    under test) and, if needed, "make_net", "make_model" and the class attributes below.
+    """
+    max_it = 10  # of the reference
+    max_it_variant = None  # same as max_it if None
+    tol = 1e-8  # tolerance for the solver
+    tol_test = 1e-6
+    variant_name = "the variant"  # in the assert messages
+
+    def make_net(self):
+        return pn.case118()
+
+    def set_variant(self, model):
+        raise NotImplementedError()
+
+    def make_model(self, variant):
+        """reference model (variant False) or model with the setting under test (variant True)"""
+        model = init(self.net)
+        if variant:
+            self.set_variant(model)
+        return model
+
+    def setUp(self):
+        self.net = self.make_net()
+        self.model_ref = self.make_model(False)
+        self.model = self.make_model(True)
+        self.V0 = np.full(self.net.bus.shape[0], fill_value=1.0, dtype=np.complex_)
+        self.V0[self.net.ext_grid["bus"].values] = self.net.ext_grid["vm_pu"].values
+
+    def _both(self, fun_name, *args):
+        getattr(self.model_ref, fun_name)(*args)
+        getattr(self.model, fun_name)(*args)
+
+    def check_same(self):
+        max_it_variant = self.max_it if self.max_it_variant is None else self.max_it_variant
+        V_ref = self.model_ref.ac_pf(self.V0, self.max_it, self.tol)
+        V = self.model.ac_pf(self.V0, max_it_variant, self.tol)
+        assert V_ref.shape[0] > 0, "reference powerflow diverged"
+        assert V.shape[0] > 0, "powerflow diverged with {}".format(self.variant_name)
+        assert np.max(np.abs(V - V_ref)) <= self.tol_test
+        por_ref, qor_ref, *_ = self.model_ref.get_lineor_res()
+        por, qor, *_ = self.model.get_lineor_res()
+        assert np.max(np.abs(por - por_ref)) <= 1e3 * self.tol_test
+        assert np.max(np.abs(qor - qor_ref)) <= 1e3 * self.tol_test
+        prod_p_ref, prod_q_ref, _ = self.model_ref.get_gen_res()
+        prod_p, prod_q, _ = self.model.get_gen_res()
+        assert np.max(np.abs(prod_p - prod_p_ref)) <= 1e3 * self.tol_test
+        assert np.max(np.abs(prod_q - prod_q_ref)) <= 1e3 * self.tol_test
+        return V
+
+
+class BaseCompareSeries:
+    """
+    Compare the ac powerflows computed for many injections in one call (GridModel.compute_time_series,
+    GridModel.ac_pf_batch...) with the same powerflows computed one by one with GridModel.ac_pf (see "compute_ref").
+
+    Row "i" of "self.loads_p", "self.loads_q", "self.gens_p" and "self.gens_v" holds the injections of the i-th
+    powerflow. The test classes inherit from this class and from unittest.TestCase, and set the class attributes below.
+    """
+    nb_scenario = 10
+    max_it = 10
+    tol = 1e-8  # tolerance for the solver
+    tol_test = 1e-6
+    warm_start = False  # if True, each reference powerflow starts from the result of the previous one (and not V0)
+    check_nb_iter = False  # if True, the number of iterations of each powerflow must match the reference
+
+    def setUp(self):
+        self.net = pn.case118()
+        self.V0 = np.full(self.net.bus.shape[0], fill_value=1.0, dtype=np.complex_)
+        self.V0[self.net.ext_grid["bus"].values] = self.net.ext_grid["vm_pu"].values
+
+        prng = np.random.RandomState(0)
+        # generators of the grid, and the slack bus (see initGridModel)
+        gen_p = np.concatenate((self.net.gen["p_mw"].values, [0.]))
+        gen_v = np.concatenate((self.net.gen["vm_pu"].values, self.net.ext_grid["vm_pu"].values))
+        load_shape = (self.nb_scenario, self.net.load.shape[0])
+        self.loads_p = self.net.load["p_mw"].values * (1. + 0.1 * prng.normal(size=load_shape))
+        self.loads_q = self.net.load["q_mvar"].values * (1. + 0.1 * prng.normal(size=load_shape))
+        self.gens_p = gen_p * (1. + 0.05 * prng.normal(size=(self.nb_scenario, 1)))
+        self.gens_v = gen_v + 0.01 * prng.normal(size=(self.nb_scenario, gen_v.shape[0]))
+        # this powerflow needs more iterations than the others
+        self.loads_p[2] *= 1.5
+        self.loads_q[2] *= 1.5
+
+    def compute_ref(self, model):
+        """the same powerflows, one by one (None for the powerflows that diverged)"""
+        res = []
+        V = self.V0
+        for scenario_id in range(self.nb_scenario):
+            for load_id in range(self.loads_p.shape[1]):
+                model.change_p_load(load_id, self.loads_p[scenario_id, load_id])
+                model.change_q_load(load_id, self.loads_q[scenario_id, load_id])
+            for gen_id in range(self.gens_p.shape[1]):
+                model.change_p_gen(gen_id, self.gens_p[scenario_id, gen_id])
+                model.change_v_gen(gen_id, self.gens_v[scenario_id, gen_id])
+            V_scenario = model.ac_pf(V, self.max_it, self.tol)
+            if V_scenario.shape[0] == 0:
+                res.append(None)
+                V = self.V0
+                continue
+            if self.warm_start:
+                V = V_scenario
+            por, qor, vor, aor = model.get_lineor_res()
+            tpor, tqor, tvor, taor = model.get_trafohv_res()
+            pex, qex, vex, aex = model.get_lineex_res()
+            tpex, tqex, tvex, taex = model.get_trafolv_res()
+            res.append((V_scenario, np.concatenate((por, tpor)), np.concatenate((aor, taor)),
+                        np.concatenate((qex, tqex)), model.get_nb_iter()))
+        return res
+
+    def check_same(self, res, res_ref, nb_iter=None):
+        """"res" is the tuple (converged, V, p_or, q_or, a_or, p_ex, q_ex, a_ex) of the batched function"""
+        converged, V, p_or, q_or, a_or, p_ex, q_ex, a_ex = res
+        nb_branch = self.net.line.shape[0] + self.net.trafo.shape[0]
+        assert V.shape == (self.nb_scenario, self.net.bus.shape[0])
+        assert p_or.shape == (self.nb_scenario, nb_branch)
+        if self.check_nb_iter:
+            assert nb_iter is not None
+        for scenario_id, ref in enumerate(res_ref):
+            if ref is None:
+                assert not converged[scenario_id]
+                if self.check_nb_iter:
+                    assert nb_iter[scenario_id] == -1
+                assert np.all(~np.isfinite(V[scenario_id]))
+                assert np.all(~np.isfinite(p_or[scenario_id]))
+                continue
+            assert converged[scenario_id]
+            V_ref, p_or_ref, a_or_ref, q_ex_ref, nb_iter_ref = ref
+            if self.check_nb_iter:
+                assert nb_iter[scenario_id] == nb_iter_ref
+            assert np.max(np.abs(V[scenario_id] - V_ref)) <= self.tol_test
+            assert np.max(np.abs(p_or[scenario_id] - p_or_ref)) <= self.tol_test
+            assert np.max(np.abs(a_or[scenario_id] - a_or_ref)) <= self.tol_test
+            assert np.max(np.abs(q_ex[scenario_id] - q_ex_ref)) <= self.tol_test
+
+
+class BaseCompareEnvs:
+    """
+    Compare a grid2op environment using a LightSimBackend with the settings under test with an environment using a
+    LightSimBackend with the default settings: the same action is performed on both of them and "step_both" compares
+    the resulting observations.
+
+    The test classes inherit from this class and from unittest.TestCase, and create their environments with
+    "make_env".
+    """
+    env_name = "rte_case14_realistic"
+    tol = 1e-4
+
+    def make_env(self, **kwargs):
+        """environment whose backend is LightSimBackend(**kwargs), without the statistics of its creation"""
+        param = Parameters()
+        param.init_from_dict({"NO_OVERFLOW_DISCONNECTION": True})
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore")
+            env = make(self.env_name, param=param, backend=LightSimBackend(**kwargs), test=True)
+        env.backend.reset_pf_stats()
+        return env
+
+    def step_both(self, env_ref, env, act_dict=None):
+        act_dict = {} if act_dict is None else act_dict
+        obs_ref, reward, done, info = env_ref.step(env_ref.action_space(act_dict))
+        assert not done
+        obs, reward, done, info = env.step(env.action_space(act_dict))
+        assert not done
+        assert np.max(np.abs(obs.p_or - obs_ref.p_or)) <= self.tol
+        assert np.max(np.abs(obs.a_or - obs_ref.a_or)) <= self.tol
+        assert np.max(np.abs(obs.prod_q - obs_ref.prod_q)) <= self.tol
+        assert np.max(np.abs(obs.v_or - obs_ref.v_or)) <= self.tol
+        return obs
+
+
+class BaseGridTests:
+    """
+    Fixture of the tests of a feature of GridModel on a pandapower grid ("make_net", or "set_net"), with helpers to modify the
+    branches (lines then trafos, as in the results of GridModel) and to compare the results of a feature with the
+    same outages computed one powerflow at a time ("compute_ref_outages" and "check_same_outages").
+
+    The test classes inherit from this class and from unittest.TestCase.
+    """
+    max_it = 10
+    tol = 1e-8  # tolerance for the solver (not used in dc)
+    tol_test = 1e-6
+
+    def make_net(self):
+        return pn.case118()
+
+    def setUp(self):
+        self.set_net(self.make_net())
+
+    def set_net(self, net):
+        self.net = net
+        self.nb_bus = self.net.bus.shape[0]
+        self.nb_line = self.net.line.shape[0]
+        self.nb_branch = self.nb_line + self.net.trafo.shape[0]
+        self.V0 = np.full(self.nb_bus, fill_value=1.0, dtype=np.complex_)
+        self.V0[self.net.ext_grid["bus"].values] = self.net.ext_grid["vm_pu"].values
+
+    def set_branch(self, model, branch_id, status):
+        branch_id = int(branch_id)
+        if branch_id < self.nb_line:
+            if status:
+                model.reactivate_powerline(branch_id)
+            else:
+                model.deactivate_powerline(branch_id)
+        else:
+            if status:
+                model.reactivate_trafo(branch_id - self.nb_line)
+            else:
+                model.deactivate_trafo(branch_id - self.nb_line)
+
+    def get_flows(self, model):
+        """p_or and a_or of all the branches"""
+        por, qor, vor, aor = model.get_lineor_res()
+        tpor, tqor, tvor, taor = model.get_trafohv_res()
+        return np.concatenate((por, tpor)), np.concatenate((aor, taor))
+
+    def compute_ref_outages(self, outages, dc=False, model=None):
+        """
+        one powerflow for each outage (a branch id, or a list of (ElementType, id)) on a copy of "model" (the base
+        case, a GridModel of self.net by default): (p_or, a_or) of each of them, None if it failed. The ac
+        powerflows start from the voltages of the base case.
+        """
+        model = init(self.net) if model is None else model
+        V_base = model.dc_pf(self.V0, self.max_it, self.tol) if dc else model.ac_pf(self.V0, self.max_it, self.tol)
+        assert V_base.shape[0] > 0
+        res = []
+        for outage in outages:
+            model_cont = model.copy()
+            if np.ndim(outage) == 0:
+                self.set_branch(model_cont, outage, False)
+            else:
+                for el_type, el_id in outage:
+                    if el_type == ElementType.LINE:
+                        model_cont.deactivate_powerline(el_id)
+                    elif el_type == ElementType.TRAFO:
+                        model_cont.deactivate_trafo(el_id)
+                    else:
+                        model_cont.deactivate_gen(el_id)
+            if dc:
+                V = model_cont.dc_pf(V_base, self.max_it, self.tol)
+            else:
+                V = model_cont.ac_pf(V_base, self.max_it, self.tol)
+            res.append(self.get_flows(model_cont) if V.shape[0] > 0 else None)
+        return res
+
+    def check_same_outages(self, res_ref, converged, p_or, a_or=None):
+        """results of the outages (one row per outage) vs the ones of "compute_ref_outages\""""
+        assert converged.shape == (len(res_ref), )
+        assert p_or.shape == (len(res_ref), self.nb_branch)
+        if a_or is not None:
+            assert a_or.shape == p_or.shape
+        for cont_id, ref in enumerate(res_ref):
+            if ref is None:
+                assert not converged[cont_id]
+                assert np.all(~np.isfinite(p_or[cont_id]))
+                if a_or is not None:
+                    assert np.all(~np.isfinite(a_or[cont_id]))
+                continue
+            assert converged[cont_id]
+            p_or_ref, a_or_ref = ref
+            assert np.max(np.abs(p_or[cont_id] - p_or_ref)) <= self.tol_test
+            if a_or is not None:
+                assert np.max(np.abs(a_or[cont_id] - a_or_ref)) <= self.tol_test
+
+    def check_base_case(self, model, dc=False):
+        """the results of "model" are the ones of the base case (powerflow of a GridModel of self.net)"""
+        model_ref = init(self.net)
+        if dc:
+            assert model_ref.dc_pf(self.V0, self.max_it, self.tol).shape[0] > 0
+        else:
+            assert model_ref.ac_pf(self.V0, self.max_it, self.tol).shape[0] > 0
+        assert np.max(np.abs(self.get_flows(model)[0] - self.get_flows(model_ref)[0])) <= self.tol_test
+
+    def check_errors(self, fun, *args_list):
+        """fun(*args) raises a RuntimeError for each args of args_list"""
+        for args in args_list:
+            with self.assertRaises(RuntimeError):
+                fun(*args)
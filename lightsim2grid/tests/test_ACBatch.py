@@ -0,0 +1,120 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import numpy as np
+import pandapower as pp
+import pdb
+
+from lightsim2grid.initGridModel import init
+from compare_models import BaseCompareSeries
+
+
+class TestACBatch(BaseCompareSeries, unittest.TestCase):
+    check_nb_iter = True  # all the scenarios start from V0, so they need as many iterations as one by one
+
+    def test_same_results(self):
+        res_ref = self.compute_ref(init(self.net))
+        for batch_size in [1, 4, self.nb_scenario, 256]:
+            model = init(self.net)
+            res = model.ac_pf_batch(self.loads_p, self.loads_q, self.gens_p, self.gens_v,
+                                    self.V0, self.max_it, self.tol, batch_size)
+            nb_iter = model.get_batch_nb_iter()
+            self.check_same(res, res_ref, nb_iter)
+            # the scenarios left the batch at different iterations
+            assert np.unique(nb_iter).shape[0] >= 2
+            # one symbolic analysis for all the scenarios, one klu_refactor per scenario and per iteration
+            nb_analyze, nb_factor, nb_refactor = model.get_nb_factorizations()
+            assert nb_analyze == 1
+            assert nb_factor == 1
+            assert nb_refactor == np.sum(nb_iter) - 1
+
+            # the grid keeps the injections of the last scenario
+            V = model.ac_pf(self.V0, self.max_it, self.tol)
+            assert np.max(np.abs(V - res[1][-1])) <= self.tol_test
+
+    def test_divergence(self):
+        self.loads_p[4] *= 10.
+        self.loads_q[4] *= 10.
+        res_ref = self.compute_ref(init(self.net))
+        assert res_ref[4] is None
+        model = init(self.net)
+        res = model.ac_pf_batch(self.loads_p, self.loads_q, self.gens_p, self.gens_v,
+                                self.V0, self.max_it, self.tol, 4)
+        self.check_same(res, res_ref, model.get_batch_nb_iter())
+        assert np.sum(~res[0]) == 1
+
+    def test_topology(self):
+        # the current topology is used for all the scenarios
+        model_ref = init(self.net)
+        model_ref.deactivate_powerline(3)
+        res_ref = self.compute_ref(model_ref)
+        model = init(self.net)
+        model.deactivate_powerline(3)
+        res = model.ac_pf_batch(self.loads_p, self.loads_q, self.gens_p, self.gens_v,
+                                self.V0, self.max_it, self.tol)
+        self.check_same(res, res_ref, model.get_batch_nb_iter())
+        assert np.all(res[2][:, 3] == 0.)
+
+    def test_not_connected(self):
+        # all the branches of a bus with a load (and no generator) are disconnected (see test_Connectivity)
+        buses_gen = set(self.net.gen["bus"].values)
+        bus_id = [bus_id for bus_id in self.net.load["bus"].values if bus_id not in buses_gen][0]
+        line_ids = np.where((self.net.line["from_bus"].values == bus_id) | (self.net.line["to_bus"].values == bus_id))[0]
+        assert np.all((self.net.trafo["hv_bus"].values != bus_id) & (self.net.trafo["lv_bus"].values != bus_id))
+        model = init(self.net)
+        for line_id in line_ids:
+            model.deactivate_powerline(int(line_id))
+        res = model.ac_pf_batch(self.loads_p, self.loads_q, self.gens_p, self.gens_v,
+                                self.V0, self.max_it, self.tol)
+        self.check_same(res, [None] * self.nb_scenario, model.get_batch_nb_iter())
+        # nothing has been factorized
+        assert model.get_nb_factorizations() == (0, 0, 0)
+        # and the topology is still rejected by ac_pf afterwards
+        assert model.ac_pf(self.V0, self.max_it, self.tol).shape[0] == 0
+        assert model.get_nb_factorizations() == (0, 0, 0)
+
+    def test_fixed_pattern(self):
+        # second busbar of each substation (see test_FixedPattern)
+        n_sub = self.net.bus.shape[0]
+        for bus_id in range(n_sub):
+            pp.create_bus(self.net, vn_kv=self.net.bus["vn_kv"].values[bus_id])
+        self.V0 = np.full(2 * n_sub, fill_value=1.0, dtype=np.complex_)
+        models = []
+        for fixed_pattern in [False, True]:
+            model = init(self.net)
+            for bus_id in range(n_sub, 2 * n_sub):
+                model.deactivate_bus(bus_id)
+            model.set_n_sub(n_sub)
+            model.set_fixed_pattern(fixed_pattern)
+            models.append(model)
+        model_ref, model = models
+        res_ref = self.compute_ref(model_ref)
+        assert model.ac_pf(self.V0, self.max_it, self.tol).shape[0] > 0
+        res = model.ac_pf_batch(self.loads_p, self.loads_q, self.gens_p, self.gens_v,
+                                self.V0, self.max_it, self.tol)
+        self.check_same(res, res_ref, model.get_batch_nb_iter())
+        # the "fixed pattern" mode can still be used afterwards
+        V = model.ac_pf(self.V0, self.max_it, self.tol)
+        assert np.max(np.abs(V - res[1][-1])) <= self.tol_test
+
+    def test_wrong_shape(self):
+        model = init(self.net)
+        with self.assertRaises(RuntimeError):
+            model.ac_pf_batch(self.loads_p[:, 1:], self.loads_q, self.gens_p, self.gens_v,
+                              self.V0, self.max_it, self.tol)
+        with self.assertRaises(RuntimeError):
+            model.ac_pf_batch(self.loads_p, self.loads_q, self.gens_p[1:], self.gens_v,
+                              self.V0, self.max_it, self.tol)
+        with self.assertRaises(RuntimeError):
+            model.ac_pf_batch(self.loads_p, self.loads_q, self.gens_p, self.gens_v,
+                              self.V0, self.max_it, self.tol, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import numpy as np
+import pdb
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import ElementType, PFAlgorithm
+from compare_models import BaseGridTests
+
+
+class TestACScreening(BaseGridTests, unittest.TestCase):
+    def get_contingencies(self, branch_ids):
+        return [[(ElementType.LINE, el)] if el < self.nb_line else [(ElementType.TRAFO, el - self.nb_line)]
+                for el in branch_ids]
+
+    def test_same_results(self):
+        model = init(self.net)
+        branch_ids = np.arange(self.nb_branch)
+        converged, p_or_ref, a_or_ref = init(self.net).run_n1(self.get_contingencies(branch_ids), self.V0,
+                                                              self.max_it, self.tol, 1)
+        split_grid, _ = init(self.net).dc_n1_screening(self.V0, branch_ids)
+        errors = []
+        for nb_step in [1, 2, 3]:
+            error, p_or, a_or = model.ac_n1_screening(self.V0, branch_ids, self.max_it, self.tol, nb_step)
+            assert error.shape == (self.nb_branch, )
+            assert p_or.shape == (self.nb_branch, self.nb_branch)
+            # the outages that split the grid are detected
+            assert np.all(np.isinf(error) == split_grid)
+            assert np.all(~np.isfinite(p_or[split_grid]))
+            assert np.all(converged[~split_grid])
+            # the error indicator bounds the error on the flows
+            ok = ~split_grid
+            diff_p = np.max(np.abs(p_or[ok] - p_or_ref[ok]), axis=1)
+            diff_a = np.max(np.abs(a_or[ok] - a_or_ref[ok]), axis=1)
+            assert np.all(diff_p <= 10. * error[ok] + self.tol_test)
+            assert np.all(diff_a <= 10. * error[ok] + self.tol_test)
+            assert np.all(p_or[ok, branch_ids[ok]] == 0.)
+            errors.append(np.median(error[ok]))
+        # each newton raphson step reduces the mismatch
+        assert errors[0] > errors[1] > errors[2]
+
+    def test_convergence(self):
+        # with enough steps, the results of a full powerflow are found
+        model = init(self.net)
+        branch_ids = np.array([0, 5, 100, self.nb_line, self.nb_branch - 1])
+        error, p_or, a_or = model.ac_n1_screening(self.V0, branch_ids, self.max_it, self.tol, 20)
+        assert np.all(error <= self.tol)
+        self.check_same_outages(self.compute_ref_outages(branch_ids), np.isfinite(error), p_or, a_or)
+
+    def test_base_case(self):
+        model = init(self.net)
+        model.deactivate_powerline(3)
+        branch_ids = np.array([3, 100])
+        error, p_or, a_or = model.ac_n1_screening(self.V0, branch_ids, self.max_it, self.tol, 2)
+        # the grid keeps the results of the base case
+        model_ref = init(self.net)
+        model_ref.deactivate_powerline(3)
+        V_ref = model_ref.ac_pf(self.V0, self.max_it, self.tol)
+        p_or_ref = self.get_flows(model_ref)[0]
+        assert np.max(np.abs(self.get_flows(model)[0] - p_or_ref)) <= self.tol_test
+        # the outage of a disconnected branch does not change anything
+        assert error[0] <= self.tol
+        assert np.max(np.abs(p_or[0] - p_or_ref)) <= self.tol_test
+        assert p_or[1, 3] == 0.
+        assert p_or[1, 100] == 0.
+        # the solver can still be used afterwards
+        V = model.ac_pf(V_ref, self.max_it, self.tol)
+        assert np.max(np.abs(V - V_ref)) <= self.tol_test
+
+    def test_errors(self):
+        model = init(self.net)
+        self.check_errors(model.ac_n1_screening,
+                          (self.V0, np.array([self.nb_branch]), self.max_it, self.tol),
+                          (self.V0, np.array([0]), self.max_it, self.tol, 0))
+        model.set_pf_algorithm(PFAlgorithm.FDPF_XB)
+        self.check_errors(model.ac_n1_screening, (self.V0, np.array([0]), self.max_it, self.tol))
+        model = init(self.net)
+        model.change_p_load(0, 1e5)
+        self.check_errors(model.ac_n1_screening, (self.V0, np.array([0]), self.max_it, self.tol))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import warnings
+import numpy as np
+import pdb
+
+from compare_models import BaseCompareModels
+
+
+class TestChordNewton(BaseCompareModels, unittest.TestCase):
+    max_it = 20
+    variant_name = "the \"chord\" mode"
+
+    def set_variant(self, model):
+        model.set_chord_newton(True)
+
+    def test_flag_policy(self):
+        assert not self.model_ref.get_chord_newton()
+        assert self.model.get_chord_newton()
+        self.model.set_chord_policy(0.5, 3)
+        assert self.model.get_chord_policy() == (0.5, 3)
+        model_cpy = self.model.copy()
+        assert model_cpy.get_chord_newton()
+        assert model_cpy.get_chord_policy() == (0.5, 3)
+        with self.assertRaises(RuntimeError):
+            self.model.set_chord_policy(1.5, 3)
+        with self.assertRaises(RuntimeError):
+            self.model.set_chord_policy(0.5, -1)
+
+    def test_injections_change(self):
+        self.check_same()
+        load_p = self.net.load["p_mw"].values
+        for coeff in [1.01, 1.02, 1.03, 1.02, 1.01]:
+            for load_id in range(load_p.shape[0]):
+                self._both("change_p_load", load_id, coeff * load_p[load_id])
+            self.check_same()
+        assert self.model.get_nb_refactor_saved() > 0
+        assert self.model_ref.get_nb_refactor_saved() == 0
+        *_, nb_refactor = self.model.get_nb_factorizations()
+        *_, nb_refactor_ref = self.model_ref.get_nb_factorizations()
+        assert nb_refactor < nb_refactor_ref
+
+    def test_topo_changes(self):
+        self.check_same()
+        self._both("deactivate_powerline", 0)
+        self.check_same()
+        self._both("reactivate_powerline", 0)
+        self._both("change_p_load", 0, 1.1 * self.net.load["p_mw"].values[0])
+        self.check_same()
+
+    def test_no_reuse(self):
+        # with max_reuse = 0 it is the standard newton raphson
+        self.model.set_chord_policy(0.1, 0)
+        self.check_same()
+        self._both("change_p_load", 0, 1.1 * self.net.load["p_mw"].values[0])
+        self.check_same()
+        assert self.model.get_nb_refactor_saved() == 0
+
+
+class TestChordNewtonBackend(unittest.TestCase):
+    def setUp(self):
+        from grid2op import make
+        from grid2op.Parameters import Parameters
+        from lightsim2grid.LightSimBackend import LightSimBackend
+        param = Parameters()
+        param.init_from_dict({"NO_OVERFLOW_DISCONNECTION": True})
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore")
+            self.env_ref = make("rte_case14_realistic", param=param, backend=LightSimBackend(), test=True)
+            self.env = make("rte_case14_realistic", param=param, backend=LightSimBackend(chord_newton=True),
+                            test=True)
+        self.tol = 1e-4
+
+    def tearDown(self):
+        self.env_ref.close()
+        self.env.close()
+
+    def test_same_results(self):
+        assert self.env.backend._grid.get_chord_newton()
+        for _ in range(10):
+            obs_ref, *_ = self.env_ref.step(self.env_ref.action_space())
+            obs, *_ = self.env.step(self.env.action_space())
+            assert np.max(np.abs(obs.p_or - obs_ref.p_or)) <= self.tol
+            assert np.max(np.abs(obs.a_or - obs_ref.a_or)) <= self.tol
+            assert np.max(np.abs(obs.prod_q - obs_ref.prod_q)) <= self.tol
+        assert self.env.backend._grid.get_nb_refactor_saved() > 0
+
+
+if __name__ == "__main__":
+    unittest.main()
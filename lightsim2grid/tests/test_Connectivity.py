@@ -0,0 +1,223 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import warnings
+import numpy as np
+import networkx as nx
+import pandapower as pp
+import pandapower.networks as pn
+import pdb
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import ConnectivityStatus
+from compare_models import BaseGridTests
+
+try:
+    import grid2op
+    from lightsim2grid.LightSimBackend import LightSimBackend
+    GRID2OP_INSTALLED = True
+except ImportError as exc_:
+    GRID2OP_INSTALLED = False
+
+
+class TestConnectivity(BaseGridTests, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        # a load on a bus without generator
+        buses_gen = set(self.net.gen["bus"].values)
+        self.load_id = [load_id for load_id, bus_id in enumerate(self.net.load["bus"].values)
+                        if bus_id not in buses_gen][0]
+        self.load_bus_id = int(self.net.load["bus"].values[self.load_id])
+
+    def get_branch_buses(self, model, branch_id):
+        if branch_id < self.nb_line:
+            return model.get_bus_powerline_or(branch_id), model.get_bus_powerline_ex(branch_id)
+        trafo_id = branch_id - self.nb_line
+        return model.get_bus_trafo_hv(trafo_id), model.get_bus_trafo_lv(trafo_id)
+
+    def isolate_bus(self, model, bus_id):
+        """disconnect all the branches connected to a bus, returns their ids"""
+        branch_ids = [branch_id for branch_id in range(self.nb_branch)
+                      if bus_id in self.get_branch_buses(model, branch_id)]
+        for branch_id in branch_ids:
+            self.set_branch(model, branch_id, False)
+        return branch_ids
+
+    def check_report(self, model, status, buses=(), loads=(), gens=()):
+        assert model.check_connectivity() == status
+        status_, buses_, loads_, gens_ = model.get_connectivity_report()
+        assert status_ == status
+        assert list(buses_) == list(buses)
+        assert list(loads_) == list(loads)
+        assert list(gens_) == list(gens)
+
+    def check_diverged(self, model):
+        assert model.ac_pf(self.V0, self.max_it, self.tol).shape[0] == 0
+        assert np.all(~np.isfinite(model.get_lineor_res()[0]))
+        assert model.dc_pf(self.V0, self.max_it, self.tol).shape[0] == 0
+        assert np.all(~np.isfinite(model.get_loads_res()[0]))
+
+    def test_connected(self):
+        model = init(self.net)
+        self.check_report(model, ConnectivityStatus.CONNECTED)
+        assert model.ac_pf(self.V0, self.max_it, self.tol).shape[0] == self.nb_bus
+        assert model.dc_pf(self.V0, self.max_it, self.tol).shape[0] == self.nb_bus
+
+    def test_isolated_load(self):
+        model = init(self.net)
+        Vref = model.ac_pf(self.V0, self.max_it, self.tol)
+        branch_ids = self.isolate_bus(model, self.load_bus_id)
+        self.check_report(model, ConnectivityStatus.LOAD_ISOLATED, buses=[self.load_bus_id], loads=[self.load_id])
+        self.check_diverged(model)
+        # the grid can be solved again when a branch is reconnected
+        self.set_branch(model, branch_ids[0], True)
+        self.check_report(model, ConnectivityStatus.CONNECTED)
+        for branch_id in branch_ids[1:]:
+            self.set_branch(model, branch_id, True)
+        V = model.ac_pf(self.V0, self.max_it, self.tol)
+        assert np.max(np.abs(V - Vref)) <= self.tol_test
+
+    def test_isolated_gen(self):
+        buses_load = set(self.net.load["bus"].values)
+        gen_id = [gen_id for gen_id, bus_id in enumerate(self.net.gen["bus"].values) if bus_id not in buses_load][0]
+        bus_id = int(self.net.gen["bus"].values[gen_id])
+        model = init(self.net)
+        self.isolate_bus(model, bus_id)
+        self.check_report(model, ConnectivityStatus.GEN_ISOLATED, buses=[bus_id], gens=[gen_id])
+        self.check_diverged(model)
+        model.deactivate_gen(gen_id)
+        self.check_report(model, ConnectivityStatus.BUS_ISOLATED, buses=[bus_id])
+        self.check_diverged(model)
+        model.deactivate_bus(bus_id)
+        self.check_report(model, ConnectivityStatus.CONNECTED)
+        assert model.ac_pf(self.V0, self.max_it, self.tol).shape[0] == self.nb_bus
+
+    def test_disconnected_bus(self):
+        # a second busbar in a substation, not connected to anything
+        pp.create_bus(self.net, vn_kv=self.net.bus["vn_kv"].values[0])
+        model = init(self.net)
+        V0 = np.full(self.nb_bus + 1, fill_value=1.0, dtype=np.complex_)
+        self.check_report(model, ConnectivityStatus.BUS_ISOLATED, buses=[self.nb_bus])
+        model.deactivate_bus(self.nb_bus)
+        self.check_report(model, ConnectivityStatus.CONNECTED)
+        assert model.ac_pf(V0, self.max_it, self.tol).shape[0] == self.nb_bus + 1
+        # a load connected to a disconnected bus
+        model.change_bus_load(0, self.nb_bus)
+        self.check_report(model, ConnectivityStatus.LOAD_ISOLATED, loads=[0])
+        assert model.ac_pf(V0, self.max_it, self.tol).shape[0] == 0
+
+    def test_slack(self):
+        model = init(self.net)
+        slack_gen_id = self.net.gen.shape[0]  # the ext_grid is the last generator of the model
+        model.deactivate_gen(slack_gen_id)
+        self.check_report(model, ConnectivityStatus.SLACK_DISCONNECTED)
+        self.check_diverged(model)
+        model.reactivate_gen(slack_gen_id)
+        self.check_report(model, ConnectivityStatus.CONNECTED)
+
+    def test_incremental(self):
+        """random disconnections / reconnections, the isolated buses are the ones of networkx"""
+        model = init(self.net)
+        slack_bus_id = model.get_bus_gen(self.net.gen.shape[0])
+        status = np.ones(self.nb_branch, dtype=bool)
+        prng = np.random.RandomState(0)
+        model.check_connectivity()
+        nb_build, nb_update = model.get_connectivity_stats()
+        assert (nb_build, nb_update) == (1, 0)
+        nb_build_ref, nb_update_ref = 1, 0
+        for step in range(100):
+            branch_ids = prng.choice(self.nb_branch, size=3, replace=False)
+            # disconnections and reconnections alternate
+            new_status = step % 2 == 1
+            for branch_id in branch_ids:
+                self.set_branch(model, branch_id, new_status)
+            nb_build_before = model.get_connectivity_stats()[0]
+            # nothing is scanned again if no branch changed of status
+            if np.any(status[branch_ids] != new_status):
+                if new_status:
+                    nb_update_ref += 1
+                else:
+                    nb_build_ref += 1
+            status[branch_ids] = new_status
+            graph = nx.Graph()
+            graph.add_nodes_from(range(self.nb_bus))
+            graph.add_edges_from([self.get_branch_buses(model, branch_id) for branch_id in np.where(status)[0]])
+            isolated_ref = sorted(set(range(self.nb_bus)) - nx.node_connected_component(graph, slack_bus_id))
+            status_, buses, loads, gens = model.get_connectivity_report()
+            assert list(buses) == isolated_ref
+            assert (status_ == ConnectivityStatus.CONNECTED) == (len(isolated_ref) == 0)
+            if new_status:
+                # only reconnections: the union find is updated
+                assert model.get_connectivity_stats()[0] == nb_build_before
+        assert model.get_connectivity_stats() == (nb_build_ref, nb_update_ref)
+        assert nb_update_ref >= 1
+
+    def test_no_change(self):
+        """the status is kept when the topology did not change"""
+        model = init(self.net)
+        self.check_report(model, ConnectivityStatus.CONNECTED)
+        assert model.get_connectivity_stats() == (1, 0)
+        for _ in range(3):
+            assert model.ac_pf(self.V0, self.max_it, self.tol).shape[0] == self.nb_bus
+            assert model.dc_pf(self.V0, self.max_it, self.tol).shape[0] == self.nb_bus
+            # the injections do not change the connectivity
+            model.change_p_load(self.load_id, 1.1 * self.net.load["p_mw"].values[self.load_id])
+        # neither does an element set to its current status / bus
+        model.reactivate_powerline(0)
+        model.change_bus_load(self.load_id, model.get_bus_load(self.load_id))
+        self.check_report(model, ConnectivityStatus.CONNECTED)
+        assert model.get_connectivity_stats() == (1, 0)
+        model.deactivate_powerline(0)
+        model.check_connectivity()
+        assert model.get_connectivity_stats() == (2, 0)
+
+    def test_copy(self):
+        model = init(self.net)
+        self.isolate_bus(model, self.load_bus_id)
+        model.check_connectivity()
+        model_copy = model.copy()
+        assert model_copy.get_connectivity_stats() == (0, 0)
+        self.check_report(model_copy, ConnectivityStatus.LOAD_ISOLATED, buses=[self.load_bus_id],
+                          loads=[self.load_id])
+
+
+class TestConnectivityBackend(unittest.TestCase):
+    def setUp(self):
+        if not GRID2OP_INSTALLED:
+            self.skipTest("grid2op is not installed")
+
+    def test_backend(self):
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore")
+            env = grid2op.make("rte_case14_realistic", test=True, backend=LightSimBackend())
+        assert env.backend.get_connectivity_report()["status"] == "CONNECTED"
+        islanding = np.where(env.backend.get_islanding_lines())[0]
+        assert islanding.shape[0] >= 1
+        backend = env.backend.copy()
+        backend.reset_pf_stats()
+        backend._disconnect_line(int(islanding[0]))
+        try:
+            converged = backend.runpf(is_dc=False)
+        except Exception as exc_:
+            converged = False
+        assert not converged
+        # no powerflow has been computed
+        stats = backend.get_pf_stats()
+        assert stats["nb_not_connected"] == 1
+        assert stats["nb_ac_pf"] == 0
+        assert stats["nb_dc_init"] == 0
+        report = backend.get_connectivity_report()
+        assert report["status"] in ["LOAD_ISOLATED", "GEN_ISOLATED", "BUS_ISOLATED"]
+        assert report["buses"].shape[0] >= 1
+        assert np.all(~np.isfinite(backend.p_or))
+        env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import warnings
+import numpy as np
+import pandapower.networks as pn
+import pdb
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid.rankContingencies import rank_contingencies, compute_index, get_contingencies
+
+try:
+    import grid2op
+    from grid2op.Exceptions import BackendError
+    from lightsim2grid.LightSimBackend import LightSimBackend
+    GRID2OP_INSTALLED = True
+except ImportError as exc_:
+    GRID2OP_INSTALLED = False
+
+
+class TestContingencyRanking(unittest.TestCase):
+    def setUp(self):
+        self.net = pn.case118()
+        self.nb_branch = self.net.line.shape[0] + self.net.trafo.shape[0]
+        self.V0 = np.full(self.net.bus.shape[0], fill_value=1.0, dtype=np.complex_)
+        self.max_it = 10
+        self.tol = 1e-8
+        self.tol_test = 1e-6
+        # thermal limits: some margin above the flows of the base case
+        model = init(self.net)
+        model.ac_pf(self.V0, self.max_it, self.tol)
+        a_or = 1000. * np.concatenate((model.get_lineor_res()[3], model.get_trafohv_res()[3]))
+        margin = 1.2 + np.random.RandomState(0).uniform(size=self.nb_branch)
+        self.thermal_limit_a = np.maximum(a_or, np.median(a_or)) * margin
+        # all the outages, with one ac powerflow each
+        self.converged, _, a_or = init(self.net).run_n1(get_contingencies(model, np.arange(self.nb_branch)),
+                                                        self.V0, self.max_it, self.tol, 1)
+        self.rho_ref = 1000. * a_or / self.thermal_limit_a
+
+    def test_index(self):
+        split_grid, _ = init(self.net).dc_n1_screening(self.V0, np.arange(self.nb_branch))
+        for index_type in ["dc", "ac"]:
+            branch_ids = np.arange(self.nb_branch)
+            rho, index = compute_index(init(self.net), self.V0, self.thermal_limit_a, branch_ids, index_type)
+            assert rho.shape == (self.nb_branch, self.nb_branch)
+            assert np.all(np.isinf(index) == split_grid)
+            ok = ~split_grid
+            assert np.all(index[ok] == np.max(rho[ok], axis=1))
+            # a rough estimation of the flows
+            max_rho = np.max(self.rho_ref[ok], axis=1)
+            assert np.max(np.abs(index[ok] - max_rho)) <= 0.5
+            assert np.corrcoef(index[ok], max_rho)[0, 1] >= 0.9
+
+    def test_report(self):
+        model = init(self.net)
+        report = rank_contingencies(model, self.V0, self.thermal_limit_a, top_k=10, rho_threshold=1.)
+        branch_ids = report["branch_ids"]
+        assert np.all(np.sort(branch_ids) == np.arange(self.nb_branch))
+        # sorted by decreasing index
+        assert np.all(np.diff(report["index"][np.isfinite(report["index"])]) <= 0.)
+        selected = report["selected"]
+        assert np.all(selected[:10])
+        assert np.all(selected == (np.arange(self.nb_branch) < 10) | (report["index"] >= 1.))
+        assert np.all(report["computed"] == selected)
+        # the ac flows of the selected outages, and nothing for the others
+        assert np.all(report["converged"] == (self.converged[branch_ids] & selected))
+        ok = report["converged"]
+        assert np.max(np.abs(report["rho"][ok] - self.rho_ref[branch_ids[ok]])) <= self.tol_test
+        assert np.all(np.isnan(report["rho"][~selected]))
+        assert np.all(np.isnan(report["max_rho"][~selected]))
+        assert np.all(np.isinf(report["max_rho"][selected & ~ok]))
+        assert np.all(report["max_rho"][ok] == np.max(report["rho"][ok], axis=1))
+        # the grid keeps the ac results of the base case
+        model_ref = init(self.net)
+        model_ref.ac_pf(self.V0, self.max_it, self.tol)
+        assert np.max(np.abs(model.get_lineor_res()[0] - model_ref.get_lineor_res()[0])) <= self.tol_test
+
+    def test_recall(self):
+        max_rho_ref = np.full(self.nb_branch, fill_value=np.inf)
+        max_rho_ref[self.converged] = np.max(self.rho_ref[self.converged], axis=1)
+        critical_ref = max_rho_ref >= 1.
+        assert np.sum(critical_ref) >= 5
+        for index_type in ["dc", "ac"]:
+            recalls = []
+            nb_selected = []
+            for rho_threshold in [1.2, 1.0, 0.9]:
+                report = rank_contingencies(init(self.net), self.V0, self.thermal_limit_a, index_type=index_type,
+                                            rho_threshold=rho_threshold, check_recall=True)
+                branch_ids = report["branch_ids"]
+                assert np.all(report["computed"])
+                assert np.all(report["critical"] == critical_ref[branch_ids])
+                assert np.all(np.sort(report["missed"]) ==
+                              np.sort(branch_ids[report["critical"] & ~report["selected"]]))
+                assert abs(report["recall"] - (1. - report["missed"].shape[0] / np.sum(critical_ref))) <= 1e-12
+                recalls.append(report["recall"])
+                nb_selected.append(np.sum(report["selected"]))
+            # a lower threshold selects more outages, and misses fewer critical ones
+            assert recalls[0] <= recalls[1] <= recalls[2]
+            assert nb_selected[0] <= nb_selected[1] <= nb_selected[2]
+            assert recalls[2] >= 0.95
+            assert nb_selected[2] < self.nb_branch
+
+    def test_subset(self):
+        branch_ids = np.array([0, 5, 100, self.nb_branch - 1])
+        report = rank_contingencies(init(self.net), self.V0, self.thermal_limit_a, branch_ids, top_k=2,
+                                    rho_threshold=None)
+        assert np.all(np.sort(report["branch_ids"]) == branch_ids)
+        assert np.sum(report["selected"]) == 2
+        assert report["rho"].shape == (4, self.nb_branch)
+        # no outage is selected
+        report = rank_contingencies(init(self.net), self.V0, self.thermal_limit_a, branch_ids, rho_threshold=None)
+        assert not np.any(report["computed"])
+        assert np.all(np.isnan(report["rho"]))
+
+    def test_errors(self):
+        with self.assertRaises(RuntimeError):
+            rank_contingencies(init(self.net), self.V0, self.thermal_limit_a[1:])
+        with self.assertRaises(RuntimeError):
+            rank_contingencies(init(self.net), self.V0, self.thermal_limit_a, index_type="pi")
+        with self.assertRaises(RuntimeError):
+            rank_contingencies(init(self.net), self.V0, self.thermal_limit_a, np.array([self.nb_branch]))
+
+
+class TestContingencyRankingBackend(unittest.TestCase):
+    def setUp(self):
+        if not GRID2OP_INSTALLED:
+            self.skipTest("grid2op is not installed")
+
+    def test_backend(self):
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore")
+            env = grid2op.make("rte_case14_realistic", test=True, backend=LightSimBackend())
+        obs, *_ = env.step(env.action_space())
+        rho_base = 1.0 * obs.rho
+        converged, rho = env.backend.run_n1()
+        for index_type in ["dc", "ac"]:
+            report = env.backend.rank_contingencies(index_type=index_type, top_k=5, rho_threshold=None)
+            line_ids = report["branch_ids"]
+            assert np.all(np.sort(line_ids) == np.arange(env.n_line))
+            ok = report["converged"]
+            assert np.sum(report["computed"]) >= 5
+            assert np.all(ok == (converged[line_ids] & report["computed"]))
+            assert np.max(np.abs(report["rho"][ok] - rho[line_ids[ok]])) <= 1e-5
+        # the backend is not modified
+        assert np.max(np.abs(env.backend.get_relative_flow() - rho_base)) <= 1e-5
+        with self.assertRaises(BackendError):
+            env.backend.rank_contingencies(index_type="pi")
+        env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import numpy as np
+import pdb
+
+from lightsim2grid.initGridModel import init
+from compare_models import BaseGridTests
+
+
+class TestDCBatch(BaseGridTests, unittest.TestCase):
+    nb_scenario = 7
+
+    def setUp(self):
+        super().setUp()
+        prng = np.random.RandomState(0)
+        self.loads_p = self.net.load["p_mw"].values * (1. + 0.1 * prng.normal(size=(self.nb_scenario, 1)))
+        self.gen_p = np.concatenate((self.net.gen["p_mw"].values, [0.]))  # the last generator is the slack
+
+    def get_pbus(self, model):
+        """injections at each bus (one column per scenario)"""
+        Pbus = np.zeros((self.nb_bus, self.nb_scenario))
+        for load_id in range(self.loads_p.shape[1]):
+            Pbus[model.get_bus_load(load_id)] -= self.loads_p[:, load_id]
+        for gen_id in range(self.gen_p.shape[0]):
+            Pbus[model.get_bus_gen(gen_id)] += self.gen_p[gen_id]
+        for shunt_id in range(self.net.shunt.shape[0]):
+            Pbus[model.get_bus_shunt(shunt_id)] -= self.net.shunt["p_mw"].values[shunt_id]
+        return Pbus
+
+    def compute_ref(self, model):
+        """the same dc powerflows, one by one"""
+        res = np.zeros((self.nb_scenario, self.nb_branch))
+        for scenario_id in range(self.nb_scenario):
+            for load_id in range(self.loads_p.shape[1]):
+                model.change_p_load(load_id, self.loads_p[scenario_id, load_id])
+            V = model.dc_pf(self.V0, self.max_it, self.tol)
+            assert V.shape[0] > 0
+            res[scenario_id] = self.get_flows(model)[0]
+        return res
+
+    def test_same_results(self):
+        model = init(self.net)
+        res_ref = self.compute_ref(init(self.net))
+        for chunk_size in [1, 3, self.nb_scenario, 256]:
+            res = model.dc_pf_batch(self.get_pbus(model), chunk_size)
+            assert res.shape == res_ref.shape
+            assert np.max(np.abs(res - res_ref)) <= self.tol_test
+        # B is factorized only once
+        assert model.get_dc_nb_factorizations() == (1, 1, 4 * self.nb_scenario)
+
+    def test_shared_factorization(self):
+        # dc_pf and dc_pf_batch use the same factorization
+        model = init(self.net)
+        assert model.dc_pf(self.V0, self.max_it, self.tol).shape[0] > 0
+        res = model.dc_pf_batch(self.get_pbus(model))
+        assert np.max(np.abs(res - self.compute_ref(model))) <= self.tol_test
+        assert model.get_dc_nb_factorizations() == (1, 1, 2 * self.nb_scenario + 1)
+
+    def test_slack(self):
+        # the slack bus compensates the imbalance, its injection is not used
+        model = init(self.net)
+        Pbus = self.get_pbus(model)
+        res_ref = model.dc_pf_batch(Pbus)
+        Pbus[model.get_bus_gen(self.gen_p.shape[0] - 1)] += 100.
+        res = model.dc_pf_batch(Pbus)
+        assert np.max(np.abs(res - res_ref)) <= self.tol_test
+
+    def test_topology(self):
+        model_ref = init(self.net)
+        model_ref.deactivate_powerline(3)
+        model_ref.deactivate_trafo(1)
+        res_ref = self.compute_ref(model_ref)
+        model = init(self.net)
+        res_init = model.dc_pf_batch(self.get_pbus(model))
+        model.deactivate_powerline(3)
+        model.deactivate_trafo(1)
+        res = model.dc_pf_batch(self.get_pbus(model), 2)
+        assert np.max(np.abs(res - res_ref)) <= self.tol_test
+        assert np.all(res[:, 3] == 0.)
+        assert np.all(res[:, self.nb_line + 1] == 0.)
+        assert np.max(np.abs(res - res_init)) > 1.
+        assert model.get_dc_nb_factorizations()[:2] == (2, 2)
+
+    def test_not_connected(self):
+        model = init(self.net)
+        # bus 111 (id 110) is only connected to the grid with the powerline 72
+        model.deactivate_powerline(72)
+        res = model.dc_pf_batch(self.get_pbus(model))
+        assert res.shape[0] == 0
+
+    def test_wrong_shape(self):
+        model = init(self.net)
+        self.check_errors(model.dc_pf_batch, (self.get_pbus(model)[1:], ), (self.get_pbus(model), 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import numpy as np
+import pdb
+
+from lightsim2grid.initGridModel import init
+from compare_models import BaseGridTests
+
+
+class TestDCN2Screening(BaseGridTests, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        # limits: some margin above the dc flows of the base case
+        model = init(self.net)
+        model.dc_pf(self.V0, self.max_it, self.tol)
+        flows = np.abs(self.get_flows(model)[0])
+        margin = 1.5 + np.random.RandomState(0).uniform(size=self.nb_branch)
+        self.flow_limits = np.maximum(flows, np.median(flows)) * margin
+        self.disconnected = []
+
+    def make_model(self):
+        model = init(self.net)
+        for branch_id in self.disconnected:
+            self.set_branch(model, branch_id, False)
+        return model
+
+    def compute_ref(self, branch_ids, rho_max=1.):
+        """critical single outages, and critical pairs: dc_n1_screening after the outage of the first branch"""
+        split_grid, p_or = self.make_model().dc_n1_screening(self.V0, branch_ids)
+        rho = np.abs(p_or) / self.flow_limits
+        n1_critical = split_grid | ~(np.max(rho, axis=1) < rho_max)
+        candidates = branch_ids[~n1_critical]
+        pairs = {}
+        for pos, branch_1 in enumerate(candidates[:-1]):
+            model = self.make_model()
+            self.set_branch(model, branch_1, False)
+            others = candidates[pos + 1:]
+            split_grid, p_or = model.dc_n1_screening(self.V0, others)
+            rho = np.abs(p_or) / self.flow_limits
+            for branch_2, split, rho_pair in zip(others, split_grid, rho):
+                if split:
+                    pairs[(branch_1, branch_2)] = None
+                elif np.max(rho_pair) >= rho_max:
+                    pairs[(branch_1, branch_2)] = rho_pair
+        return branch_ids[n1_critical], pairs
+
+    def check_same(self, res, res_ref, rho_max=1.):
+        pairs, rho, n1_critical = res
+        n1_critical_ref, pairs_ref = res_ref
+        assert np.all(np.sort(n1_critical) == np.sort(n1_critical_ref))
+        assert pairs.shape == (len(pairs_ref), 3)
+        assert rho.shape == (len(pairs_ref), )
+        assert sorted(pairs_ref.keys()) == [(el[0], el[1]) for el in pairs]
+        for (branch_1, branch_2, overloaded), rho_pair in zip(pairs, rho):
+            rho_ref = pairs_ref[(branch_1, branch_2)]
+            if rho_ref is None:
+                assert overloaded == -1
+                assert np.isinf(rho_pair)
+            else:
+                # the first overloaded branch found
+                assert rho_pair >= rho_max
+                assert abs(rho_pair - rho_ref[overloaded]) <= self.tol_test
+
+    def test_same_results(self):
+        branch_ids = np.arange(self.nb_branch)
+        res_ref = self.compute_ref(branch_ids)
+        model = init(self.net)
+        res = model.dc_n2_screening(self.V0, branch_ids, self.flow_limits, 1.0, 1)
+        self.check_same(res, res_ref)
+        nb_candidate = self.nb_branch - res[2].shape[0]
+        nb_pair, nb_pruned, nb_critical = model.get_n2_stats()
+        assert nb_pair == nb_candidate * (nb_candidate - 1) // 2
+        assert nb_critical == res[0].shape[0]
+        # most of the pairs are pruned without computing their flows
+        assert nb_pruned >= 0.5 * nb_pair
+        assert nb_pruned + nb_critical <= nb_pair
+        # the grid keeps the results of the dc powerflow of the base case
+        self.check_base_case(model, dc=True)
+
+    def test_threads(self):
+        branch_ids = np.arange(self.nb_branch)
+        res_ref = init(self.net).dc_n2_screening(self.V0, branch_ids, self.flow_limits, 1.0, 1)
+        for n_threads in [2, 4, 0]:
+            res = init(self.net).dc_n2_screening(self.V0, branch_ids, self.flow_limits, 1.0, n_threads)
+            for el, el_ref in zip(res, res_ref):
+                assert np.all(el == el_ref)
+
+    def test_subset(self):
+        # some branches only, with a disconnected one and a lower threshold
+        branch_ids = np.array([100, 0, 5, 3, self.nb_line, self.nb_branch - 1, 20, 30, 40, 50])
+        self.disconnected = [3]
+        res_ref = self.compute_ref(branch_ids, 0.9)
+        res = self.make_model().dc_n2_screening(self.V0, branch_ids, self.flow_limits, 0.9)
+        self.check_same(res, res_ref, 0.9)
+        assert res[0].shape[0] >= 1
+        # the disconnected branch is not paired
+        assert not np.any(res[0][:, :2] == 3)
+        assert 3 not in res[2]
+
+    def test_no_limit(self):
+        model = init(self.net)
+        pairs, rho, n1_critical = model.dc_n2_screening(self.V0, np.arange(self.nb_branch),
+                                                        np.full(self.nb_branch, fill_value=np.inf))
+        # only the outages that split the grid are critical
+        split_grid, _ = init(self.net).dc_n1_screening(self.V0, np.arange(self.nb_branch))
+        assert np.all(n1_critical == np.where(split_grid)[0])
+        assert np.all(pairs[:, 2] == -1)
+        assert np.all(np.isinf(rho))
+        nb_pair, nb_pruned, nb_critical = model.get_n2_stats()
+        assert nb_pruned + nb_critical == nb_pair
+
+    def test_errors(self):
+        model = init(self.net)
+        flow_limits_zero = 1. * self.flow_limits
+        flow_limits_zero[0] = 0.
+        self.check_errors(model.dc_n2_screening,
+                          (self.V0, np.array([self.nb_branch]), self.flow_limits),
+                          (self.V0, np.array([0]), self.flow_limits[1:]),
+                          (self.V0, np.array([0]), flow_limits_zero))
+
+
+if __name__ == "__main__":
+    unittest.main()
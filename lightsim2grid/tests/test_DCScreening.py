@@ -0,0 +1,74 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import numpy as np
+import pandapower.networks as pn
+import pdb
+
+from lightsim2grid.initGridModel import init
+from compare_models import BaseGridTests
+
+
+class TestDCScreening(BaseGridTests, unittest.TestCase):
+    def test_same_results(self):
+        # bus 111 (id 110) is only connected to the grid with the powerline 72
+        branch_ids = np.array([0, 5, 72, 100, self.nb_line, self.nb_branch - 1])
+        model = init(self.net)
+        split_grid, res = model.dc_n1_screening(self.V0, branch_ids)
+        assert np.all(split_grid == (branch_ids == 72))
+        self.check_same_outages(self.compute_ref_outages(branch_ids, dc=True), ~split_grid, res)
+        # B is factorized only once, nothing is solved for the powerline 72 (the only one connected to its bus)
+        assert model.get_dc_nb_factorizations() == (1, 1, branch_ids.shape[0])
+        # the grid keeps the results of the base case
+        self.check_base_case(model, dc=True)
+
+    def test_all_branches(self):
+        model = init(self.net)
+        branch_ids = np.arange(self.nb_branch)
+        # the grid is split when a bus is only connected with one branch
+        res_ref = self.compute_ref_outages(branch_ids, dc=True)
+        for chunk_size in [1, 7, 1000]:
+            split_grid, res = model.dc_n1_screening(self.V0, branch_ids, chunk_size)
+            self.check_same_outages(res_ref, ~split_grid, res)
+            # the outaged branches do not have any flow
+            assert np.all(res[~split_grid, branch_ids[~split_grid]] == 0.)
+
+    def test_negative_reactance(self):
+        # the powerline 58 of this grid has a negative reactance
+        self.set_net(pn.case300())
+        assert self.net.line["x_ohm_per_km"].values[58] < 0.
+        branch_ids = np.array([1, 3, 58])
+        split_grid, res = init(self.net).dc_n1_screening(self.V0, branch_ids)
+        assert not np.any(split_grid)
+        self.check_same_outages(self.compute_ref_outages(branch_ids, dc=True), ~split_grid, res)
+
+    def test_disconnected(self):
+        model = init(self.net)
+        model.deactivate_powerline(3)
+        split_grid, res = model.dc_n1_screening(self.V0, np.array([3, 50]))
+        assert not np.any(split_grid)
+        assert model.dc_pf(self.V0, self.max_it, self.tol).shape[0] > 0
+        # the outage of a branch already disconnected does not change anything
+        model_ref = init(self.net)
+        model_ref.deactivate_powerline(3)
+        self.check_same_outages(self.compute_ref_outages([3, 50], dc=True, model=model_ref), ~split_grid, res)
+        assert np.max(np.abs(res[0] - self.get_flows(model)[0])) <= self.tol_test
+        assert np.all(res[:, 3] == 0.)
+
+    def test_errors(self):
+        model = init(self.net)
+        self.check_errors(model.dc_n1_screening,
+                          (self.V0, np.array([self.nb_branch])),
+                          (self.V0, np.array([0]), 0))
+        model.deactivate_powerline(72)
+        self.check_errors(model.dc_n1_screening, (self.V0, np.array([0])))
+
+
+if __name__ == "__main__":
+    unittest.main()
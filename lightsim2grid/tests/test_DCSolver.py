@@ -0,0 +1,215 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import copy
+import unittest
+import warnings
+import numpy as np
+import pandapower as pp
+import pandapower.networks as pn
+import pdb
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import LinearSolverType
+
+
+class TestDCSolver(unittest.TestCase):
+    def setUp(self):
+        self.net = pn.case118()
+        self.nb_bus = self.net.bus.shape[0]
+        self.V0 = np.full(self.nb_bus, fill_value=1.0, dtype=np.complex_)
+        self.V0[self.net.ext_grid["bus"].values] = np.exp(1j * np.deg2rad(self.net.ext_grid["va_degree"].values))
+        self.max_it = 10
+        self.tol = 1e-8  # not used in dc
+        self.tol_test = 1e-6
+
+    def run_ref_pf(self, net):
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore")
+            pp.rundcpp(net, init="flat")
+
+    def check_res(self, model, Vfinal, net):
+        assert Vfinal.shape[0] > 0, "dc powerflow failed"
+        tmp_bus_ind = np.argsort(net.bus.index)
+        va_ref = np.deg2rad(net.res_bus["va_degree"].values[tmp_bus_ind])
+        assert np.max(np.abs(np.angle(Vfinal) - va_ref)) <= self.tol_test
+
+        # powerlines (the results of disconnected powerlines are 0.)
+        por, qor, vor, aor = model.get_lineor_res()
+        pex, qex, vex, aex = model.get_lineex_res()
+        assert np.max(np.abs(por - net.res_line["p_from_mw"].fillna(0.).values)) <= self.tol_test
+        assert np.max(np.abs(pex - net.res_line["p_to_mw"].fillna(0.).values)) <= self.tol_test
+        assert np.max(np.abs(aor - net.res_line["i_from_ka"].fillna(0.).values)) <= self.tol_test
+        assert np.all(qor == 0.)
+        assert np.all(qex == 0.)
+
+        # trafos
+        tpor, tqor, tvor, taor = model.get_trafohv_res()
+        tpex, tqex, tvex, taex = model.get_trafolv_res()
+        assert np.max(np.abs(tpor - net.res_trafo["p_hv_mw"].fillna(0.).values)) <= self.tol_test
+        assert np.max(np.abs(tpex - net.res_trafo["p_lv_mw"].fillna(0.).values)) <= self.tol_test
+        assert np.all(tqor == 0.)
+
+        # loads and generators (the last generator is the slack bus, see initGridModel)
+        load_p, load_q, load_v = model.get_loads_res()
+        assert np.max(np.abs(load_p - net.res_load["p_mw"].values)) <= self.tol_test
+        assert np.all(load_q == 0.)
+        gen_p, gen_q, gen_v = model.get_gen_res()
+        assert np.max(np.abs(gen_p[:-1] - net.res_gen["p_mw"].values)) <= self.tol_test
+        assert np.abs(gen_p[-1] - net.res_ext_grid["p_mw"].values[0]) <= self.tol_test
+        assert np.all(gen_q == 0.)
+
+    def test_dc_pf(self):
+        model = init(self.net)
+        Vfinal = model.dc_pf(self.V0, self.max_it, self.tol)
+        self.run_ref_pf(self.net)
+        self.check_res(model, Vfinal, self.net)
+        assert model.get_dc_nb_factorizations() == (1, 1, 1)
+
+    def test_injections_only(self):
+        # B is factorized only once
+        model = init(self.net)
+        Vfinal = model.dc_pf(self.V0, self.max_it, self.tol)
+        assert Vfinal.shape[0] > 0
+        for it_num in range(3):
+            new_p = (1. + 0.1 * it_num) * self.net.load["p_mw"].values[0]
+            self.net.load["p_mw"].values[0] = new_p
+            model.change_p_load(0, new_p)
+            new_p_gen = (1. - 0.05 * it_num) * self.net.gen["p_mw"].values[2]
+            self.net.gen["p_mw"].values[2] = new_p_gen
+            model.change_p_gen(2, new_p_gen)
+            Vfinal = model.dc_pf(self.V0, self.max_it, self.tol)
+            self.run_ref_pf(self.net)
+            self.check_res(model, Vfinal, self.net)
+        assert model.get_dc_nb_factorizations() == (1, 1, 4)
+
+    def test_topology_change(self):
+        model = init(self.net)
+        Vfinal = model.dc_pf(self.V0, self.max_it, self.tol)
+        assert Vfinal.shape[0] > 0
+        net = copy.deepcopy(self.net)
+        net.line["in_service"].values[3] = False
+        net.trafo["in_service"].values[1] = False
+        model.deactivate_powerline(3)
+        model.deactivate_trafo(1)
+        Vfinal = model.dc_pf(self.V0, self.max_it, self.tol)
+        self.run_ref_pf(net)
+        self.check_res(model, Vfinal, net)
+        assert model.get_dc_nb_factorizations() == (2, 2, 2)
+
+        # back to the original topology
+        model.reactivate_powerline(3)
+        model.reactivate_trafo(1)
+        Vfinal = model.dc_pf(self.V0, self.max_it, self.tol)
+        self.run_ref_pf(self.net)
+        self.check_res(model, Vfinal, self.net)
+
+    def test_shunt(self):
+        # the active power of the shunts is an injection in dc (as in pandapower)
+        model = init(self.net)
+        self.net.shunt["p_mw"].values[0] = 10.
+        model.change_p_shunt(0, 10.)
+        Vfinal = model.dc_pf(self.V0, self.max_it, self.tol)
+        self.run_ref_pf(self.net)
+        self.check_res(model, Vfinal, self.net)
+        shunt_p, shunt_q, shunt_v = model.get_shunts_res()
+        assert np.max(np.abs(shunt_p - self.net.res_shunt["p_mw"].values)) <= self.tol_test
+        assert np.all(shunt_q == 0.)
+
+    def test_linear_solver(self):
+        model = init(self.net)
+        Vref = model.dc_pf(self.V0, self.max_it, self.tol)
+        assert Vref.shape[0] > 0
+        for linear_solver in [LinearSolverType.KLU, LinearSolverType.LDLT, LinearSolverType.DenseLU]:
+            # changing the linear solver factorizes B again
+            nb_analyze, nb_factor, nb_solve = model.get_dc_nb_factorizations()
+            model.set_dc_linear_solver(linear_solver)
+            Vfinal = model.dc_pf(self.V0, self.max_it, self.tol)
+            assert np.max(np.abs(Vfinal - Vref)) <= self.tol_test
+            assert model.get_dc_nb_factorizations() == (nb_analyze + 1, nb_factor + 1, nb_solve + 1)
+
+    def test_not_connected(self):
+        model = init(self.net)
+        # bus 111 (id 110) is only connected to the grid with the powerline 72
+        model.deactivate_powerline(72)
+        Vfinal = model.dc_pf(self.V0, self.max_it, self.tol)
+        assert Vfinal.shape[0] == 0
+        model.reactivate_powerline(72)
+        Vfinal = model.dc_pf(self.V0, self.max_it, self.tol)
+        self.run_ref_pf(self.net)
+        self.check_res(model, Vfinal, self.net)
+
+    def test_ac_after_dc(self):
+        # the dc and the ac powerflows do not share their state
+        model = init(self.net)
+        model_ref = init(self.net)
+        V_ref = model_ref.ac_pf(self.V0, self.max_it, 1e-8)
+        for _ in range(2):
+            Vdc = model.dc_pf(self.V0, self.max_it, self.tol)
+            assert Vdc.shape[0] > 0
+            V = model.ac_pf(Vdc, self.max_it, 1e-8)
+            assert V.shape[0] > 0
+            assert np.max(np.abs(V - V_ref)) <= self.tol_test
+            assert np.max(np.abs(model.get_lineor_res()[0] - model_ref.get_lineor_res()[0])) <= self.tol_test
+        assert model.get_dc_nb_factorizations() == (1, 1, 2)
+
+
+class TestDCBackend(unittest.TestCase):
+    def setUp(self):
+        from grid2op import make
+        from grid2op.Backend import PandaPowerBackend
+        from grid2op.Parameters import Parameters
+        from lightsim2grid.LightSimBackend import LightSimBackend
+        param = Parameters()
+        param.init_from_dict({"NO_OVERFLOW_DISCONNECTION": True, "ENV_DC": True})
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore")
+            self.env_ref = make("rte_case14_realistic", param=param, backend=PandaPowerBackend(), test=True)
+            self.env = make("rte_case14_realistic", param=param, backend=LightSimBackend(), test=True)
+        self.tol = 1e-4
+
+    def tearDown(self):
+        self.env_ref.close()
+        self.env.close()
+
+    def test_same_results(self):
+        for _ in range(5):
+            obs_ref, reward, done, info = self.env_ref.step(self.env_ref.action_space())
+            assert not done
+            obs, reward, done, info = self.env.step(self.env.action_space())
+            assert not done
+            assert np.max(np.abs(obs.p_or - obs_ref.p_or)) <= self.tol
+            assert np.max(np.abs(obs.p_ex - obs_ref.p_ex)) <= self.tol
+            assert np.max(np.abs(obs.a_or - obs_ref.a_or)) <= self.tol
+            assert np.max(np.abs(obs.load_p - obs_ref.load_p)) <= self.tol
+            assert np.all(obs.q_or == 0.)
+            assert np.all(obs.load_q == 0.)
+            # no losses in dc: the slack bus produces exactly the missing power
+            assert np.abs(np.sum(obs.prod_p) - np.sum(obs.load_p)) <= self.tol
+
+    def test_runpf_dc(self):
+        backend = self.env.backend
+        assert backend.runpf(is_dc=True)
+        p_or_dc = 1. * backend.p_or
+        assert np.all(backend.q_or == 0.)
+        assert backend.runpf(is_dc=False)
+        assert np.any(backend.q_or != 0.)
+        assert np.max(np.abs(backend.p_or - p_or_dc)) > self.tol
+        assert backend.runpf(is_dc=True)
+        assert np.max(np.abs(backend.p_or - p_or_dc)) <= self.tol
+
+    def test_divergence(self):
+        # powerline 18 is the only one connecting the generator of bus 7 to the grid, as in ac the episode is over
+        act = self.env.action_space({"set_line_status": [(18, -1)]})
+        obs, reward, done, info = self.env.step(act)
+        assert done
+        assert len(info["exception"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import warnings
+import numpy as np
+import scipy.sparse
+import pandapower.networks as pn
+import pdb
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import KLUSolver, PFAlgorithm, LinearSolverType
+from compare_models import BaseGridTests
+
+try:
+    import grid2op
+    from lightsim2grid.LightSimBackend import LightSimBackend
+    GRID2OP_INSTALLED = True
+except ImportError as exc_:
+    GRID2OP_INSTALLED = False
+
+
+class TestDenseLU(BaseGridTests, unittest.TestCase):
+    def make_net(self):
+        return pn.case30()
+
+    def setUp(self):
+        super().setUp()
+        self.model_ref = init(self.net)
+        self.model_ref.set_dense_threshold(-1)
+        self.model_ref.set_dc_dense_threshold(-1)
+        self.V_ref = self.model_ref.ac_pf(self.V0, self.max_it, self.tol)
+        assert self.V_ref.shape[0] > 0
+        self.Vdc_ref = self.model_ref.dc_pf(self.V0, self.max_it, self.tol)
+        assert self.Vdc_ref.shape[0] > 0
+
+    def test_default(self):
+        model = init(self.net)
+        assert model.get_dense_threshold() < 0
+        assert model.get_dc_dense_threshold() < 0
+        model.set_dense_threshold(self.nb_bus)
+        model.set_dc_dense_threshold(3)
+        model2 = model.copy()
+        assert model2.get_dense_threshold() == self.nb_bus
+        assert model2.get_dc_dense_threshold() == 3
+
+    def test_ac_pf(self):
+        for pf_algorithm in [PFAlgorithm.NR, PFAlgorithm.FDPF_XB]:
+            model = init(self.net)
+            model.set_dense_threshold(self.nb_bus)
+            model.set_pf_algorithm(pf_algorithm)
+            V = model.ac_pf(self.V0, 30, self.tol)
+            assert V.shape[0] > 0, "powerflow diverged with {}".format(pf_algorithm)
+            assert np.max(np.abs(V - self.V_ref)) <= self.tol_test
+
+            # the factorization is kept after a modification of the injections
+            model.change_p_load(0, 1.1 * self.net.load["p_mw"].values[0])
+            V = model.ac_pf(V, 30, self.tol)
+            assert V.shape[0] > 0
+            self.model_ref.change_p_load(0, 1.1 * self.net.load["p_mw"].values[0])
+            V_ref = self.model_ref.ac_pf(self.V_ref, self.max_it, self.tol)
+            self.model_ref.change_p_load(0, self.net.load["p_mw"].values[0])
+            assert np.max(np.abs(V - V_ref)) <= self.tol_test
+
+    def test_threshold(self):
+        # the grid is too big for the threshold: same as the sparse solver
+        model = init(self.net)
+        model.set_dense_threshold(self.nb_bus - 1)
+        V = model.ac_pf(self.V0, self.max_it, self.tol)
+        assert np.max(np.abs(V - self.V_ref)) <= self.tol_test
+        assert model.get_nb_factorizations() == self.model_ref.get_nb_factorizations()
+
+        # switching to the dense LU between two powerflows
+        model.set_dense_threshold(self.nb_bus)
+        V = model.ac_pf(self.V0, self.max_it, self.tol)
+        assert np.max(np.abs(V - self.V_ref)) <= self.tol_test
+        model.set_dense_threshold(-1)
+        V = model.ac_pf(self.V0, self.max_it, self.tol)
+        assert np.max(np.abs(V - self.V_ref)) <= self.tol_test
+
+    def test_forced(self):
+        # DenseLU can be chosen whatever the size of the grid
+        model = init(self.net)
+        model.set_linear_solver(LinearSolverType.DenseLU)
+        V = model.ac_pf(self.V0, self.max_it, self.tol)
+        assert np.max(np.abs(V - self.V_ref)) <= self.tol_test
+        model.set_dc_dense_threshold(-1)
+        model.set_dc_linear_solver(LinearSolverType.DenseLU)
+        Vdc = model.dc_pf(self.V0, self.max_it, self.tol)
+        assert np.max(np.abs(Vdc - self.Vdc_ref)) <= self.tol_test
+
+    def test_dc_pf(self):
+        model = init(self.net)
+        model.set_dc_dense_threshold(self.nb_bus)
+        Vdc = model.dc_pf(self.V0, self.max_it, self.tol)
+        assert Vdc.shape[0] > 0
+        assert np.max(np.abs(Vdc - self.Vdc_ref)) <= self.tol_test
+
+    def test_topology_change(self):
+        for fixed_pattern in [False, True]:
+            model = init(self.net)
+            model.set_fixed_pattern(fixed_pattern)
+            model.set_topo_cache_capacity(2)
+            if fixed_pattern:
+                model.set_n_sub(self.nb_bus)
+            model.set_dense_threshold(2 * self.nb_bus)
+            V = model.ac_pf(self.V0, self.max_it, self.tol)
+            assert V.shape[0] > 0
+            for _ in range(2):
+                model.deactivate_powerline(2)
+                V = model.ac_pf(V, self.max_it, self.tol)
+                assert V.shape[0] > 0
+                model.reactivate_powerline(2)
+                V = model.ac_pf(V, self.max_it, self.tol)
+                assert V.shape[0] > 0
+                assert np.max(np.abs(V - self.V_ref)) <= self.tol_test
+
+    def test_solve_multi(self):
+        model = init(self.net)
+        model.set_linear_solver(LinearSolverType.DenseLU)
+        V = model.ac_pf(self.V0, self.max_it, self.tol)
+        assert V.shape[0] > 0
+        J = model.get_J()
+        rhs = np.asfortranarray(np.random.RandomState(0).normal(size=(J.shape[0], 3)))
+        rhs_init = 1. * rhs
+        model.solve_jacobian(rhs)
+        assert np.max(np.abs(J.dot(rhs) - rhs_init)) <= 1e-8
+        rhs[:] = rhs_init
+        model.solve_jacobian(rhs, True)
+        assert np.max(np.abs(J.T.dot(rhs) - rhs_init)) <= 1e-8
+
+    def test_singular(self):
+        solver = KLUSolver()
+        solver.set_linear_solver(LinearSolverType.DenseLU)
+        with self.assertRaises(RuntimeError):
+            solver.factorize(scipy.sparse.csc_matrix(np.array([[1., 2., 0.], [2., 4., 0.], [0., 0., 1.]])))
+
+
+class TestDenseLUBackend(unittest.TestCase):
+    def setUp(self):
+        if not GRID2OP_INSTALLED:
+            self.skipTest("grid2op is not installed")
+
+    def test_backend(self):
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore")
+            env_ref = grid2op.make("rte_case14_realistic", test=True, backend=LightSimBackend())
+            env = grid2op.make("rte_case14_realistic", test=True,
+                               backend=LightSimBackend(dense_threshold=100, dc_dense_threshold=-1))
+        assert env.backend._grid.get_dense_threshold() == 100
+        assert env.backend._grid.get_dc_dense_threshold() == -1
+        for _ in range(5):
+            obs_ref, *_ = env_ref.step(env_ref.action_space())
+            obs, *_ = env.step(env.action_space())
+            assert np.max(np.abs(obs.p_or - obs_ref.p_or)) <= 1e-4
+        env.close()
+        env_ref.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import warnings
+import numpy as np
+import pdb
+
+from lightsim2grid_cpp import PFAlgorithm
+from compare_models import BaseCompareModels
+
+
+class TestFDPF(BaseCompareModels, unittest.TestCase):
+    """compare the fast decoupled powerflow with the newton raphson one"""
+    max_it_variant = 50
+    variant_name = "the fast decoupled powerflow"
+
+    def set_variant(self, model):
+        model.set_pf_algorithm(PFAlgorithm.FDPF_XB)
+
+    def test_algorithm_flag(self):
+        assert self.model_ref.get_pf_algorithm() == PFAlgorithm.NR
+        assert self.model.get_pf_algorithm() == PFAlgorithm.FDPF_XB
+        self.model.set_pf_algorithm(PFAlgorithm.FDPF_BX)
+        assert self.model.copy().get_pf_algorithm() == PFAlgorithm.FDPF_BX
+
+    def test_xb_bx(self):
+        for pf_algorithm in [PFAlgorithm.FDPF_XB, PFAlgorithm.FDPF_BX]:
+            self.model = self.make_model(True)
+            self.model.set_pf_algorithm(pf_algorithm)
+            self.check_same()
+            assert self.model.get_nb_iter() > 1
+            nb_analyze, nb_factor, nb_refactor = self.model.get_nb_factorizations()
+            assert nb_analyze == 2  # B' and B''
+            assert nb_factor == 2
+            assert nb_refactor == 0
+
+    def test_injections_change(self):
+        self.check_same()
+        self._both("change_p_load", 0, 1.1 * self.net.load["p_mw"].values[0])
+        self._both("change_q_load", 1, 1.1 * self.net.load["q_mvar"].values[1])
+        self.check_same()
+        # B' and B'' are not factorized again
+        nb_analyze, nb_factor, _ = self.model.get_nb_factorizations()
+        assert nb_analyze == 2
+        assert nb_factor == 2
+
+    def test_topo_changes(self):
+        self.model.set_pf_algorithm(PFAlgorithm.FDPF_BX)
+        self.check_same()
+        self._both("deactivate_powerline", 0)
+        self.check_same()
+        nb_analyze, *_ = self.model.get_nb_factorizations()
+        assert nb_analyze == 4  # the topology changed
+        self._both("change_q_shunt", 0, 1.1 * self.net.shunt["q_mvar"].values[0])
+        self.check_same()
+        self._both("reactivate_powerline", 0)
+        self._both("deactivate_trafo", 0)
+        self.check_same()
+
+    def test_switch_algorithm(self):
+        self.check_same()
+        # the topology changes while the newton raphson is used
+        self.model.set_pf_algorithm(PFAlgorithm.NR)
+        self._both("deactivate_powerline", 0)
+        self.check_same()
+        self.model.set_pf_algorithm(PFAlgorithm.FDPF_XB)
+        self.check_same()
+
+    def test_divergence(self):
+        V = self.model.ac_pf(self.V0, 1, self.tol)  # not enough iterations
+        assert V.shape[0] == 0
+        self.check_same()
+
+
+class TestFDPFBackend(unittest.TestCase):
+    def setUp(self):
+        from grid2op import make
+        from grid2op.Parameters import Parameters
+        from lightsim2grid.LightSimBackend import LightSimBackend
+        param = Parameters()
+        param.init_from_dict({"NO_OVERFLOW_DISCONNECTION": True})
+        # NB the fast decoupled method does not converge on grids with a high r / x ratio (eg "case5_example")
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore")
+            self.env_ref = make("rte_case14_realistic", param=param, backend=LightSimBackend(), test=True)
+            self.env = make("rte_case14_realistic", param=param, backend=LightSimBackend(pf_algorithm="FDPF_XB"),
+                            test=True)
+        self.tol = 1e-4
+
+    def tearDown(self):
+        self.env_ref.close()
+        self.env.close()
+
+    def test_same_results(self):
+        assert self.env.backend._grid.get_pf_algorithm() == PFAlgorithm.FDPF_XB
+        for _ in range(5):
+            obs_ref, *_ = self.env_ref.step(self.env_ref.action_space())
+            obs, *_ = self.env.step(self.env.action_space())
+            assert np.max(np.abs(obs.p_or - obs_ref.p_or)) <= self.tol
+            assert np.max(np.abs(obs.a_or - obs_ref.a_or)) <= self.tol
+            assert np.max(np.abs(obs.prod_q - obs_ref.prod_q)) <= self.tol
+
+    def test_runpf_algorithm(self):
+        backend = self.env_ref.backend
+        assert backend.runpf()
+        p_or_ref = 1. * backend.p_or
+        assert backend.runpf(pf_algorithm="FDPF_BX")
+        assert backend._grid.get_pf_algorithm() == PFAlgorithm.FDPF_BX
+        assert np.max(np.abs(backend.p_or - p_or_ref)) <= self.tol
+        assert backend.runpf(pf_algorithm=PFAlgorithm.NR)
+        with self.assertRaises(Exception):
+            backend.runpf(pf_algorithm="unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
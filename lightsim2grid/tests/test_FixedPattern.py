@@ -0,0 +1,103 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import numpy as np
+import pandapower.networks as pn
+import pandapower as pp
+import pdb
+
+from lightsim2grid.initGridModel import init
+from compare_models import BaseCompareModels
+
+
+class TestFixedPattern(BaseCompareModels, unittest.TestCase):
+    """compare the "fixed pattern" mode with the default one, on a grid where each substation has 2 buses"""
+    variant_name = "the \"fixed pattern\" mode"
+
+    def make_net(self):
+        net = pn.case118()
+        self.n_sub = net.bus.shape[0]
+        for bus_id in range(self.n_sub):
+            # second busbar of each substation (same order as in the grid2op backend)
+            pp.create_bus(net, vn_kv=net.bus["vn_kv"].values[bus_id])
+        return net
+
+    def make_model(self, variant):
+        model = init(self.net)
+        for bus_id in range(self.n_sub, 2 * self.n_sub):
+            model.deactivate_bus(bus_id)
+        model.set_n_sub(self.n_sub)
+        model.set_fixed_pattern(variant)
+        return model
+
+    def test_fixed_pattern_flag(self):
+        assert not self.model_ref.get_fixed_pattern()
+        assert self.model.get_fixed_pattern()
+        model_cpy = self.model.copy()
+        assert model_cpy.get_fixed_pattern()
+
+    def test_same_results(self):
+        self.check_same()
+        nb_analyze, nb_factor, nb_refactor = self.model.get_nb_factorizations()
+        assert nb_analyze == 1
+        assert nb_factor >= 1
+
+    def test_topo_changes(self):
+        self.check_same()
+        # disconnect / reconnect powerlines
+        self._both("deactivate_powerline", 0)
+        self.check_same()
+        self._both("deactivate_powerline", 5)
+        self.check_same()
+        self._both("reactivate_powerline", 0)
+        self._both("reactivate_powerline", 5)
+        self.check_same()
+
+        # split a substation in two buses
+        bus_or = self.net.line["from_bus"].values
+        sub_id = np.argmax(np.bincount(bus_or))
+        line_ids = np.where(bus_or == sub_id)[0][:2]
+        self._both("reactivate_bus", sub_id + self.n_sub)
+        for line_id in line_ids:
+            self._both("change_bus_powerline_or", int(line_id), int(sub_id + self.n_sub))
+        V = self.check_same()
+        assert np.abs(V[sub_id + self.n_sub]) > 0.
+        assert np.abs(V[sub_id] - V[sub_id + self.n_sub]) > 1e-6
+
+        # and merge it again
+        for line_id in line_ids:
+            self._both("change_bus_powerline_or", int(line_id), int(sub_id))
+        self._both("deactivate_bus", sub_id + self.n_sub)
+        self.check_same()
+
+        # the symbolic analysis has been performed only once
+        nb_analyze, nb_factor, nb_refactor = self.model.get_nb_factorizations()
+        assert nb_analyze == 1
+        nb_analyze_ref, *_ = self.model_ref.get_nb_factorizations()
+        assert nb_analyze_ref > 1
+
+    def test_injections_change(self):
+        self.check_same()
+        self._both("change_p_load", 0, 1.1 * self.net.load["p_mw"].values[0])
+        self.check_same()
+        nb_analyze, nb_factor, nb_refactor = self.model.get_nb_factorizations()
+        assert nb_analyze == 1
+        assert nb_refactor >= 1
+
+    def test_element_outside_substation(self):
+        # an element connected to a bus of another substation is not part of the pattern
+        self.check_same()
+        self.model.change_bus_powerline_or(0, self.n_sub + 2)
+        self.model.reactivate_bus(self.n_sub + 2)
+        with self.assertRaises(RuntimeError):
+            self.model.ac_pf(self.V0, self.max_it, self.tol)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import warnings
+import numpy as np
+import networkx as nx
+import pandapower as pp
+import pandapower.networks as pn
+import pdb
+
+from lightsim2grid.initGridModel import init
+from compare_models import BaseGridTests
+
+try:
+    import grid2op
+    from lightsim2grid.LightSimBackend import LightSimBackend
+    GRID2OP_INSTALLED = True
+except ImportError as exc_:
+    GRID2OP_INSTALLED = False
+
+
+class TestGraphAnalytics(BaseGridTests, unittest.TestCase):
+    def get_edges(self, model):
+        """buses at both ends of the connected branches"""
+        edges = []
+        for branch_id in range(self.nb_branch):
+            if branch_id < self.nb_line:
+                if not model.get_lines_status()[branch_id]:
+                    continue
+                edges.append((model.get_bus_powerline_or(branch_id), model.get_bus_powerline_ex(branch_id)))
+            else:
+                trafo_id = branch_id - self.nb_line
+                if not model.get_trafo_status()[trafo_id]:
+                    continue
+                edges.append((model.get_bus_trafo_hv(trafo_id), model.get_bus_trafo_lv(trafo_id)))
+        return edges
+
+    def check_buses(self, model, buses):
+        graph = nx.Graph()
+        graph.add_nodes_from(buses)
+        graph.add_edges_from([el for el in self.get_edges(model) if el[0] != el[1]])
+        articulation = model.get_articulation_buses()
+        assert articulation.shape == (self.nb_bus, )
+        assert sorted(np.where(articulation)[0]) == sorted(nx.articulation_points(graph))
+        assert model.get_nb_islands() == nx.number_connected_components(graph)
+
+    def test_bridges(self):
+        for case in [pn.case118, pn.case300]:
+            self.set_net(case())
+            model = init(self.net)
+            bridges = model.get_bridges()
+            assert bridges.shape == (self.nb_branch, )
+            # the same outages as the ones detected by the dc screening
+            split_grid, _ = init(self.net).dc_n1_screening(self.V0, np.arange(self.nb_branch))
+            assert np.any(split_grid)
+            assert np.all(bridges == split_grid)
+            assert model.get_nb_islands() == 1
+
+    def test_articulation_buses(self):
+        model = init(self.net)
+        self.check_buses(model, range(self.nb_bus))
+        assert np.any(model.get_articulation_buses())
+
+    def test_topology_change(self):
+        model = init(self.net)
+        bridges_init = model.get_bridges()
+        # the outage of a powerline that is not a bridge can create new bridges
+        for line_id in range(self.nb_line):
+            if bridges_init[line_id]:
+                continue
+            model_ref = init(self.net)
+            model_ref.deactivate_powerline(line_id)
+            split_grid, _ = model_ref.dc_n1_screening(self.V0, np.arange(self.nb_branch))
+            if np.sum(split_grid) > np.sum(bridges_init):
+                break
+        model.deactivate_powerline(line_id)
+        bridges = model.get_bridges()
+        assert not bridges[line_id]
+        assert np.all(bridges == split_grid)
+        self.check_buses(model, range(self.nb_bus))
+        # the outage of a bridge creates an island
+        bridge_id = np.where(bridges)[0][0]
+        self.set_branch(model, bridge_id, False)
+        assert model.get_nb_islands() == 2
+        self.check_buses(model, range(self.nb_bus))
+        # back to the initial topology
+        model.reactivate_powerline(line_id)
+        self.set_branch(model, bridge_id, True)
+        assert np.all(model.get_bridges() == bridges_init)
+        assert model.get_nb_islands() == 1
+
+    def test_substations(self):
+        # second busbar of each substation (see test_FixedPattern)
+        for bus_id in range(self.nb_bus):
+            pp.create_bus(self.net, vn_kv=self.net.bus["vn_kv"].values[bus_id])
+        model = init(self.net)
+        for bus_id in range(self.nb_bus, 2 * self.nb_bus):
+            model.deactivate_bus(bus_id)
+        with self.assertRaises(RuntimeError):
+            model.get_articulation_substations()
+        model.set_n_sub(self.nb_bus)
+        # one bus per substation: the substations are the buses
+        assert np.all(model.get_articulation_substations() == model.get_articulation_buses()[:self.nb_bus])
+
+        # the powerlines of a substation on both busbars
+        sub_id = 4
+        lines_or = np.where(self.net.line["from_bus"].values == sub_id)[0]
+        assert lines_or.shape[0] >= 2
+        model.reactivate_bus(sub_id + self.nb_bus)
+        model.change_bus_powerline_or(int(lines_or[0]), sub_id + self.nb_bus)
+        self.check_buses(model, list(range(self.nb_bus)) + [sub_id + self.nb_bus])
+        graph = nx.Graph()
+        graph.add_nodes_from(range(self.nb_bus))
+        graph.add_edges_from([(el[0] % self.nb_bus, el[1] % self.nb_bus) for el in self.get_edges(model)
+                              if el[0] % self.nb_bus != el[1] % self.nb_bus])
+        articulation = model.get_articulation_substations()
+        assert articulation.shape == (self.nb_bus, )
+        assert sorted(np.where(articulation)[0]) == sorted(nx.articulation_points(graph))
+
+    def test_copy(self):
+        model = init(self.net)
+        model.deactivate_powerline(3)
+        bridges = model.get_bridges()
+        model_copy = model.copy()
+        assert np.all(model_copy.get_bridges() == bridges)
+        model_copy.reactivate_powerline(3)
+        assert np.all(model.get_bridges() == bridges)
+        assert np.all(model_copy.get_bridges() == init(self.net).get_bridges())
+
+
+class TestGraphAnalyticsBackend(unittest.TestCase):
+    def setUp(self):
+        if not GRID2OP_INSTALLED:
+            self.skipTest("grid2op is not installed")
+
+    def test_backend(self):
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore")
+            env = grid2op.make("rte_case14_realistic", test=True, backend=LightSimBackend())
+        islanding = env.backend.get_islanding_lines()
+        assert islanding.shape == (env.n_line, )
+        assert np.any(islanding)
+        for line_id in range(env.n_line):
+            backend = env.backend.copy()
+            backend._disconnect_line(line_id)
+            try:
+                converged = backend.runpf(is_dc=False)
+            except Exception as exc_:
+                converged = False
+            assert converged == (not islanding[line_id])
+        assert env.backend.get_articulation_substations().shape == (env.n_sub, )
+        env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
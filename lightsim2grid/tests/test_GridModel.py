@@ -94,6 +94,10 @@ class BaseTests:
         # self.skipTest("dev")
         pass
 
+    def get_nb_factorizations(self):
+        """number of symbolic analyses and of factorizations from scratch of the solver used by run_me_pf"""
+        raise NotImplementedError()
+
     def _run_both_pf(self, net):
         V0 = self.make_v0(net)
         self.run_ref_pf(net)
@@ -332,6 +336,39 @@ class BaseTests:
         Vfinal = self._run_both_pf(self.net_ref)
         self.check_res(Vfinal, self.net_ref)
 
+    def test_pf_change_injections_after_pf(self):
+        # the second powerflow only sees injections modifications, Ybus, pv, pq and the factorization
+        # of the solver are reused (no "full" reset)
+        self.do_i_skip("test_pf_change_injections_after_pf")
+        self.run_ref_pf(self.net_ref)
+        V0 = self.make_v0(self.net_ref)
+        Vfinal = self.run_me_pf(V0)
+        self.check_res(Vfinal, self.net_ref)
+        nb_factor_before = self.get_nb_factorizations()
+        Ybus_before = self.model.get_Ybus()
+
+        self.net_ref.load["p_mw"][0] = 50
+        self.net_ref.load["q_mvar"][1] = 10
+        self.net_ref.gen["p_mw"][0] = 50
+        self.net_ref.gen["vm_pu"][1] = 1.02
+        self.model.change_p_load(0, 50)
+        self.model.change_q_load(1, 10)
+        self.model.change_p_gen(0, 50)
+        self.model.change_v_gen(1, 1.02)
+        Vfinal = self._run_both_pf(self.net_ref)
+        self.check_res(Vfinal, self.net_ref)
+        # no new symbolic analysis nor factorization from scratch, and Ybus is the same
+        assert self.get_nb_factorizations() == nb_factor_before
+        Ybus = self.model.get_Ybus()
+        assert np.all(Ybus.indptr == Ybus_before.indptr)
+        assert np.all(Ybus.indices == Ybus_before.indices)
+        assert np.all(Ybus.data == Ybus_before.data)
+
+        # whereas a change of topology requires a new symbolic analysis
+        self.model.deactivate_powerline(0)
+        assert self.run_me_pf(V0).shape[0] > 0
+        assert self.get_nb_factorizations()[0] == nb_factor_before[0] + 1
+
     def test_pf_changeshuntp(self):
         self.skipTest("not usefull but not working at the moment")
         self.do_i_skip("test_pf_changeshuntp")
@@ -352,6 +389,9 @@ class MakeDCTests(BaseTests, unittest.TestCase):
     def run_me_pf(self, V0):
         return self.model.dc_pf(V0, self.max_it, self.tol)
 
+    def get_nb_factorizations(self):
+        return self.model.get_dc_nb_factorizations()[:2]
+
     def run_ref_pf(self, net):
         pp.rundcpp(net, init="flat")
 
@@ -377,6 +417,9 @@ class MakeACTests(BaseTests, unittest.TestCase):
     def run_me_pf(self, V0):
         return self.model.ac_pf(V0, self.max_it, self.tol)
 
+    def get_nb_factorizations(self):
+        return self.model.get_nb_factorizations()[:2]
+
     def run_ref_pf(self, net):
         pp.runpp(net, init="flat")
 
@@ -387,6 +430,40 @@ class MakeACTests(BaseTests, unittest.TestCase):
         # else:
         #    self.skipTest("dev")
 
+    def test_ybus_updated_not_recomputed(self):
+        # Ybus is only updated (and not computed from scratch) when elements change of status / bus
+        V0 = self.make_v0(self.net_ref)
+        Vfinal = self.run_me_pf(V0)
+        assert Vfinal.shape[0] > 0, "powerflow diverged !"
+        self.model.deactivate_powerline(0)
+        self.model.deactivate_trafo(1)
+        self.model.change_bus_powerline_or(2, 2)
+        self.model.change_q_shunt(0, 10.)
+        Vfinal = self.run_me_pf(V0)
+        assert Vfinal.shape[0] > 0, "powerflow diverged !"
+        Ybus_updated = self.model.get_Ybus()
+
+        model_ref = init(self.net_datamodel)
+        model_ref.deactivate_powerline(0)
+        model_ref.deactivate_trafo(1)
+        model_ref.change_bus_powerline_or(2, 2)
+        model_ref.change_q_shunt(0, 10.)
+        Vref = model_ref.ac_pf(V0, self.max_it, self.tol)
+        Ybus_ref = model_ref.get_Ybus()
+        assert np.max(np.abs((Ybus_updated - Ybus_ref).toarray())) <= 1e-8
+        # a Ybus computed from scratch has no coefficient for the disconnected branches, the updated one keeps them
+        # (as explicit 0.)
+        assert Ybus_updated.nnz > Ybus_ref.nnz
+        self.assert_equal(Vfinal, Vref)
+
+        # and it's back to the initial state
+        self.model.reactivate_powerline(0)
+        self.model.reactivate_trafo(1)
+        self.model.change_bus_powerline_or(2, self.net_datamodel.line["from_bus"].values[2])
+        self.model.change_q_shunt(0, self.net_datamodel.shunt["q_mvar"].values[0])
+        Vfinal = self._run_both_pf(self.net_ref)
+        self.check_res(Vfinal, self.net_ref)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,164 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import os
+import unittest
+import numpy as np
+import pandapower.networks as pn
+import pdb
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import KLUSolver, PFAlgorithm, LinearSolverType
+from compare_models import BaseCompareEnvs, GRID2OP_INSTALLED
+
+if GRID2OP_INSTALLED:
+    from lightsim2grid.LightSimBackend import LightSimBackend
+
+
+class TestLinearSolver(unittest.TestCase):
+    def setUp(self):
+        self.net = pn.case118()
+        self.V0 = np.full(self.net.bus.shape[0], fill_value=1.0, dtype=np.complex_)
+        self.V0[self.net.ext_grid["bus"].values] = self.net.ext_grid["vm_pu"].values
+        self.max_it = 10
+        self.tol = 1e-8  # tolerance for the solver
+        self.tol_test = 1e-6
+
+        self.model_ref = init(self.net)
+        self.V_ref = self.model_ref.ac_pf(self.V0, self.max_it, self.tol)
+        assert self.V_ref.shape[0] > 0
+        self.Vdc_ref = self.model_ref.dc_pf(self.V0, self.max_it, self.tol)
+        assert self.Vdc_ref.shape[0] > 0
+
+    def test_default(self):
+        model = init(self.net)
+        assert model.get_linear_solver() == LinearSolverType.KLU
+        assert model.get_dc_linear_solver() == LinearSolverType.KLU
+        assert KLUSolver().get_linear_solver() == LinearSolverType.KLU
+
+    def test_ac_pf(self):
+        for pf_algorithm in [PFAlgorithm.NR, PFAlgorithm.FDPF_XB]:
+            model = init(self.net)
+            model.set_linear_solver(LinearSolverType.SparseLU)
+            assert model.get_linear_solver() == LinearSolverType.SparseLU
+            model.set_pf_algorithm(pf_algorithm)
+            V = model.ac_pf(self.V0, 30, self.tol)
+            assert V.shape[0] > 0, "powerflow diverged with {}".format(pf_algorithm)
+            assert np.max(np.abs(V - self.V_ref)) <= self.tol_test
+
+            # solver is kept after a modification of the grid
+            model.change_p_load(0, 1.1 * self.net.load["p_mw"].values[0])
+            V = model.ac_pf(V, 30, self.tol)
+            assert V.shape[0] > 0
+            self.model_ref.change_p_load(0, 1.1 * self.net.load["p_mw"].values[0])
+            V_ref = self.model_ref.ac_pf(self.V_ref, self.max_it, self.tol)
+            assert np.max(np.abs(V - V_ref)) <= self.tol_test
+            self.model_ref.change_p_load(0, self.net.load["p_mw"].values[0])
+
+    def test_ldlt_ac(self):
+        model = init(self.net)
+        with self.assertRaises(RuntimeError):
+            model.set_linear_solver(LinearSolverType.LDLT)
+        with self.assertRaises(RuntimeError):
+            KLUSolver().set_linear_solver(LinearSolverType.LDLT)
+        assert model.get_linear_solver() == LinearSolverType.KLU
+
+    def test_dc_pf(self):
+        for linear_solver in [LinearSolverType.KLU, LinearSolverType.SparseLU, LinearSolverType.LDLT]:
+            model = init(self.net)
+            model.set_dc_linear_solver(linear_solver)
+            assert model.get_dc_linear_solver() == linear_solver
+            Vdc = model.dc_pf(self.V0, self.max_it, self.tol)
+            assert Vdc.shape[0] > 0, "dc powerflow failed with {}".format(linear_solver)
+            assert np.max(np.abs(Vdc - self.Vdc_ref)) <= self.tol_test
+
+    def test_topology_change(self):
+        for fixed_pattern in [False, True]:
+            model = init(self.net)
+            model.set_linear_solver(LinearSolverType.SparseLU)
+            model.set_fixed_pattern(fixed_pattern)
+            if fixed_pattern:
+                model.set_n_sub(self.net.bus.shape[0])
+            V = model.ac_pf(self.V0, self.max_it, self.tol)
+            assert V.shape[0] > 0
+            model.deactivate_powerline(2)
+            V = model.ac_pf(V, self.max_it, self.tol)
+            assert V.shape[0] > 0
+
+            self.model_ref.deactivate_powerline(2)
+            V_ref = self.model_ref.ac_pf(self.V_ref, self.max_it, self.tol)
+            self.model_ref.reactivate_powerline(2)
+            assert np.max(np.abs(V - V_ref)) <= self.tol_test
+
+    def test_copy(self):
+        model = init(self.net)
+        model.set_linear_solver(LinearSolverType.SparseLU)
+        model.set_dc_linear_solver(LinearSolverType.LDLT)
+        model2 = model.copy()
+        assert model2.get_linear_solver() == LinearSolverType.SparseLU
+        assert model2.get_dc_linear_solver() == LinearSolverType.LDLT
+
+    def test_solve_jacobian(self):
+        model = init(self.net)
+        model.set_linear_solver(LinearSolverType.SparseLU)
+        V = model.ac_pf(self.V0, self.max_it, self.tol)
+        assert V.shape[0] > 0
+        J = model.get_J()
+        rhs = np.asfortranarray(np.random.RandomState(0).normal(size=(J.shape[0], 3)))
+        rhs_init = 1. * rhs
+        model.solve_jacobian(rhs)
+        assert np.max(np.abs(J.dot(rhs) - rhs_init)) <= 1e-8
+
+    def test_tune(self):
+        model = init(self.net)
+        ac_timers, dc_timers = model.tune_linear_solver(self.V0, self.max_it, self.tol, 2)
+        assert len(ac_timers) == 2
+        assert len(dc_timers) == 3
+        assert np.all(np.isfinite(ac_timers))
+        assert np.all(np.isfinite(dc_timers))
+        ac_types = [LinearSolverType.KLU, LinearSolverType.SparseLU]
+        dc_types = [LinearSolverType.KLU, LinearSolverType.SparseLU, LinearSolverType.LDLT]
+        assert model.get_linear_solver() == ac_types[int(np.argmin(ac_timers))]
+        assert model.get_dc_linear_solver() == dc_types[int(np.argmin(dc_timers))]
+        # the grid itself is not modified
+        V = model.ac_pf(self.V0, self.max_it, self.tol)
+        assert np.max(np.abs(V - self.V_ref)) <= self.tol_test
+
+
+class TestLinearSolverBackend(BaseCompareEnvs, unittest.TestCase):
+    def setUp(self):
+        if not GRID2OP_INSTALLED:
+            self.skipTest("grid2op is not installed")
+
+    def test_backend(self):
+        env_ref = self.make_env()
+        env = self.make_env(linear_solver="SparseLU", dc_linear_solver="LDLT")
+        assert env.backend._grid.get_linear_solver() == LinearSolverType.SparseLU
+        assert env.backend._grid.get_dc_linear_solver() == LinearSolverType.LDLT
+        for _ in range(5):
+            self.step_both(env_ref, env)
+        env.close()
+        env_ref.close()
+
+    def test_backend_tune(self):
+        env = self.make_env(auto_tune_linear_solver=True)
+        assert env.backend._grid.get_linear_solver() in [LinearSolverType.KLU, LinearSolverType.SparseLU]
+        obs, reward, done, info = env.step(env.action_space())
+        assert not done
+        env.close()
+
+    def test_backend_wrong_name(self):
+        from grid2op.Exceptions import BackendError
+        with self.assertRaises(BackendError):
+            LightSimBackend(linear_solver="LDLT")
+        with self.assertRaises(BackendError):
+            LightSimBackend(dc_linear_solver="not_a_solver")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import numpy as np
+import scipy.sparse
+import pandapower.networks as pn
+import pdb
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import KLUSolver, PFAlgorithm
+
+
+class TestMultiRHS(unittest.TestCase):
+    def setUp(self):
+        self.net = pn.case118()
+        self.model = init(self.net)
+        self.V0 = np.full(self.net.bus.shape[0], fill_value=1.0, dtype=np.complex_)
+        self.V0[self.net.ext_grid["bus"].values] = self.net.ext_grid["vm_pu"].values
+        self.max_it = 10
+        self.tol = 1e-8  # tolerance for the solver
+        self.tol_test = 1e-8
+        self.prng = np.random.RandomState(0)
+
+    def _get_reduced_ybus(self):
+        """imaginary part of Ybus without the slack bus (as in a dc powerflow)"""
+        self.model.ac_pf(self.V0, self.max_it, self.tol)
+        Ybus = self.model.get_Ybus()
+        pvpq = np.concatenate((self.model.get_pv(), self.model.get_pq()))
+        # NB the indices of the sub matrix are not sorted (even if scipy says they are), "tocoo().tocsc()" sorts them
+        return Ybus[pvpq, :][:, pvpq].imag.tocoo().tocsc()
+
+    def test_factorize(self):
+        B = self._get_reduced_ybus()
+        solver = KLUSolver()
+        solver.factorize(B)
+        rhs = np.asfortranarray(self.prng.normal(size=(B.shape[0], 7)))
+        rhs_init = 1. * rhs
+        solver.solve_multi(rhs)  # solved in place
+        assert np.max(np.abs(rhs - np.linalg.solve(B.toarray(), rhs_init))) <= self.tol_test
+        assert np.max(np.abs(B.dot(rhs) - rhs_init)) <= self.tol_test
+
+        # transposed system
+        rhs[:] = rhs_init
+        solver.solve_multi(rhs, transpose=True)
+        assert np.max(np.abs(B.T.dot(rhs) - rhs_init)) <= self.tol_test
+
+        # some columns only
+        rhs[:] = rhs_init
+        solver.solve_multi(rhs[:, 2:5])
+        assert np.max(np.abs(B.dot(rhs[:, 2:5]) - rhs_init[:, 2:5])) <= self.tol_test
+        assert np.all(rhs[:, :2] == rhs_init[:, :2])
+        assert np.all(rhs[:, 5:] == rhs_init[:, 5:])
+
+    def test_no_copy(self):
+        B = self._get_reduced_ybus()
+        solver = KLUSolver()
+        solver.factorize(B)
+        # c ordered arrays (or arrays of another type) are not silently copied
+        with self.assertRaises(TypeError):
+            solver.solve_multi(np.ones((B.shape[0], 2)))
+        with self.assertRaises(TypeError):
+            solver.solve_multi(np.ones((B.shape[0], 2), dtype=np.float32, order="F"))
+        # a single right hand side can be a 1d array
+        rhs = np.ones(B.shape[0])
+        solver.solve_multi(rhs)
+        assert np.max(np.abs(B.dot(rhs) - 1.)) <= self.tol_test
+
+    def test_errors(self):
+        solver = KLUSolver()
+        with self.assertRaises(RuntimeError):
+            solver.solve_multi(np.ones((3, 2), order="F"))
+        with self.assertRaises(RuntimeError):
+            solver.factorize(scipy.sparse.csc_matrix(np.ones((3, 2))))
+        with self.assertRaises(RuntimeError):
+            # singular matrix
+            solver.factorize(scipy.sparse.csc_matrix(np.array([[1., 2., 0.], [2., 4., 0.], [0., 0., 1.]])))
+        B = self._get_reduced_ybus()
+        solver.factorize(B)
+        with self.assertRaises(RuntimeError):
+            solver.solve_multi(np.ones((B.shape[0] + 1, 2), order="F"))
+
+    def test_jacobian(self):
+        V = self.model.ac_pf(self.V0, self.max_it, self.tol)
+        assert V.shape[0] > 0
+        J = self.model.get_J()
+        rhs = np.asfortranarray(self.prng.normal(size=(J.shape[0], 5)))
+        rhs_init = 1. * rhs
+        self.model.solve_jacobian(rhs)
+        # the jacobian has been factorized at the last but one iterate, J is the same matrix
+        assert np.max(np.abs(J.dot(rhs) - rhs_init)) <= self.tol_test
+        rhs[:] = rhs_init
+        self.model.solve_jacobian(rhs, True)
+        assert np.max(np.abs(J.T.dot(rhs) - rhs_init)) <= self.tol_test
+
+        # the powerflow still works afterwards
+        self.model.change_p_load(0, 1.1 * self.net.load["p_mw"].values[0])
+        V = self.model.ac_pf(V, self.max_it, self.tol)
+        assert V.shape[0] > 0
+
+        self.model.set_pf_algorithm(PFAlgorithm.FDPF_XB)
+        with self.assertRaises(RuntimeError):
+            self.model.solve_jacobian(rhs)
+
+    def test_newton_after_factorize(self):
+        # the solver can be used for a newton raphson after a call to "factorize"
+        model = init(self.net)
+        model.ac_pf(self.V0, self.max_it, self.tol)
+        Ybus = model.get_Ybus()
+        Sbus = model.get_Sbus()
+        pv = model.get_pv()
+        pq = model.get_pq()
+        solver = KLUSolver()
+        solver.factorize(self._get_reduced_ybus())
+        V = np.ones(Ybus.shape[0], dtype=np.complex_)
+        V[self.net.ext_grid["bus"].values] = self.net.ext_grid["vm_pu"].values
+        assert solver.do_newton(Ybus, V, Sbus, pv, pq, self.max_it, self.tol)
+        assert solver.get_error() == 0
+
+
+if __name__ == "__main__":
+    unittest.main()
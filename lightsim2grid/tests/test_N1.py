@@ -0,0 +1,138 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import warnings
+import numpy as np
+import pdb
+
+from lightsim2grid.initGridModel import init
+from lightsim2grid_cpp import ElementType
+from compare_models import BaseGridTests
+
+try:
+    import grid2op
+    from lightsim2grid.LightSimBackend import LightSimBackend
+    GRID2OP_INSTALLED = True
+except ImportError as exc_:
+    GRID2OP_INSTALLED = False
+
+
+class TestN1(BaseGridTests, unittest.TestCase):
+    contingency_list = [[(ElementType.LINE, 0)],
+                        [(ElementType.LINE, 12)],
+                        [(ElementType.TRAFO, 2)],
+                        [(ElementType.GEN, 5)],
+                        [(ElementType.LINE, 3), (ElementType.LINE, 40)],
+                        [(ElementType.LINE, 20), (ElementType.GEN, 10)],
+                        [],
+                        ]
+
+    def test_same_results(self):
+        res_ref = self.compute_ref_outages(self.contingency_list)
+        for n_threads in [1, 3, 0]:
+            model = init(self.net)
+            res = model.run_n1(self.contingency_list, self.V0, self.max_it, self.tol, n_threads)
+            self.check_same_outages(res_ref, *res)
+        converged, p_or, a_or = res
+        # the disconnected branches do not have any flow
+        assert p_or[0, 0] == 0.
+        assert p_or[2, self.nb_line + 2] == 0.
+        assert p_or[4, 3] == 0. and p_or[4, 40] == 0.
+
+    def test_all_lines(self):
+        contingency_list = [[(ElementType.LINE, line_id)] for line_id in range(self.nb_line)]
+        res_ref = self.compute_ref_outages(contingency_list)
+        model = init(self.net)
+        res_1 = model.run_n1(contingency_list, self.V0, self.max_it, self.tol, 1)
+        res_2 = model.run_n1(contingency_list, self.V0, self.max_it, self.tol, 2)
+        self.check_same_outages(res_ref, *res_1)
+        self.check_same_outages(res_ref, *res_2)
+        # bus 111 (id 110) is only connected to the grid with the powerline 72
+        assert not res_1[0][72]
+
+    def test_slack_outage(self):
+        # the last generator is the slack bus (see initGridModel)
+        contingency_list = [[(ElementType.GEN, self.net.gen.shape[0])], [(ElementType.LINE, 0)]]
+        model = init(self.net)
+        converged, p_or, a_or = model.run_n1(contingency_list, self.V0, self.max_it, self.tol, 1)
+        assert not converged[0]
+        assert np.all(~np.isfinite(p_or[0]))
+        assert converged[1]
+        assert np.all(np.isfinite(p_or[1]))
+
+    def test_base_case_kept(self):
+        model_ref = init(self.net)
+        assert model_ref.ac_pf(self.V0, self.max_it, self.tol).shape[0] > 0
+        model = init(self.net)
+        model.run_n1(self.contingency_list, self.V0, self.max_it, self.tol, 2)
+        assert np.max(np.abs(model.get_Vm() - model_ref.get_Vm())) <= self.tol_test
+        assert np.max(np.abs(model.get_Va() - model_ref.get_Va())) <= self.tol_test
+        assert np.max(np.abs(model.get_lineor_res()[0] - model_ref.get_lineor_res()[0])) <= self.tol_test
+        assert np.all(model.get_lines_status())
+        assert np.all(model.get_gen_status())
+        assert np.all(model.get_trafo_status())
+
+    def test_already_disconnected(self):
+        model = init(self.net)
+        model.deactivate_powerline(12)
+        res = model.run_n1([[(ElementType.LINE, 12)], []], self.V0, self.max_it, self.tol, 1)
+        assert np.max(np.abs(res[1][0] - res[1][1])) <= self.tol_test
+        assert not model.get_lines_status()[12]
+
+    def test_errors(self):
+        model = init(self.net)
+        self.check_errors(model.run_n1,
+                          ([[(ElementType.LINE, self.nb_line)]], self.V0, self.max_it, self.tol, 1),
+                          ([[(ElementType.GEN, -1)]], self.V0, self.max_it, self.tol, 1))
+        # the powerflow of the base case diverges
+        for load_id in range(self.net.load.shape[0]):
+            model.change_p_load(load_id, 10. * self.net.load["p_mw"].values[load_id])
+        with self.assertRaises(RuntimeError):
+            model.run_n1(self.contingency_list, self.V0, self.max_it, self.tol, 1)
+
+
+class TestN1Backend(unittest.TestCase):
+    def setUp(self):
+        if not GRID2OP_INSTALLED:
+            self.skipTest("grid2op is not installed")
+
+    def test_backend(self):
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore")
+            env = grid2op.make("rte_case14_realistic", test=True, backend=LightSimBackend())
+        obs, *_ = env.step(env.action_space())
+        rho_base = 1.0 * obs.rho
+        converged, rho = env.backend.run_n1(n_threads=2)
+        assert rho.shape == (env.n_line, env.n_line)
+        for line_id in range(env.n_line):
+            # the python way: a copy of the backend for each contingency
+            backend = env.backend.copy()
+            backend._disconnect_line(line_id)
+            try:
+                conv_ref = backend.runpf(is_dc=False)
+            except Exception as exc_:
+                conv_ref = False
+            assert converged[line_id] == conv_ref
+            if conv_ref:
+                assert np.max(np.abs(rho[line_id] - backend.get_relative_flow())) <= 1e-5
+        # no powerflow computed yet: the same initial point as runpf
+        backend = env.backend.copy()
+        backend.V = None
+        converged_init, rho_init = backend.run_n1(n_threads=1)
+        assert np.all(converged_init == converged)
+        assert np.max(np.abs(rho_init[converged] - rho[converged])) <= 1e-5
+        # the lines given in the list only, and the backend is not modified
+        converged, rho_sub = env.backend.run_n1(line_ids=[2, env.n_line - 1])
+        assert np.max(np.abs(rho_sub - rho[[2, env.n_line - 1]])) <= 1e-5
+        assert np.max(np.abs(env.backend.get_relative_flow() - rho_base)) <= 1e-5
+        env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
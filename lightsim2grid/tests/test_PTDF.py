@@ -0,0 +1,114 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import numpy as np
+import pandapower as pp
+import pdb
+
+from lightsim2grid.initGridModel import init
+from compare_models import BaseGridTests
+
+
+class TestPTDF(BaseGridTests, unittest.TestCase):
+    tol_test = 1e-8
+
+    def setUp(self):
+        super().setUp()
+        self.slack_bus = self.net.ext_grid["bus"].values[0]
+
+    def test_ptdf(self):
+        model = init(self.net)
+        ptdf = model.get_ptdf()
+        assert ptdf.shape == (self.nb_branch, self.nb_bus)
+        # flows for 1MW injected at each bus (the slack bus compensates)
+        ptdf_ref = model.dc_pf_batch(np.eye(self.nb_bus)).T
+        assert np.max(np.abs(ptdf - ptdf_ref)) <= self.tol_test
+        assert np.all(ptdf[:, self.slack_bus] == 0.)
+        # B is factorized only once
+        assert model.get_dc_nb_factorizations()[:2] == (1, 1)
+
+        # flows of the base case
+        assert model.dc_pf(self.V0, self.max_it, self.tol).shape[0] > 0
+        Pbus = np.zeros(self.nb_bus)
+        for load_id in range(self.net.load.shape[0]):
+            Pbus[model.get_bus_load(load_id)] -= self.net.load["p_mw"].values[load_id]
+        for gen_id in range(self.net.gen.shape[0]):
+            Pbus[model.get_bus_gen(gen_id)] += self.net.gen["p_mw"].values[gen_id]
+        for shunt_id in range(self.net.shunt.shape[0]):
+            Pbus[model.get_bus_shunt(shunt_id)] -= self.net.shunt["p_mw"].values[shunt_id]
+        assert np.max(np.abs(ptdf.dot(Pbus) - self.get_flows(model)[0])) <= 1e-6
+
+    def test_ptdf_monitored(self):
+        model = init(self.net)
+        ptdf = model.get_ptdf()
+        monitored = np.array([5, 0, self.nb_line + 3, 5])
+        ptdf_mon = model.get_ptdf(monitored)
+        assert ptdf_mon.shape == (monitored.shape[0], self.nb_bus)
+        assert np.max(np.abs(ptdf_mon - ptdf[monitored])) <= self.tol_test
+
+    def test_lodf(self):
+        model = init(self.net)
+        lodf = model.get_lodf()
+        assert lodf.shape == (self.nb_branch, self.nb_branch)
+        split_grid, res = model.dc_n1_screening(self.V0, np.arange(self.nb_branch))
+        assert np.all(np.isnan(lodf[:, split_grid]))
+        assert np.all(np.isfinite(lodf[:, ~split_grid]))
+        assert np.all(np.diag(lodf)[~split_grid] == -1.)
+        # flows after each outage
+        flows = self.get_flows(model)[0]
+        flows_after = flows.reshape(1, -1) + (lodf * flows.reshape(1, -1)).T
+        assert np.max(np.abs(flows_after[~split_grid] - res[~split_grid])) <= 1e-6
+
+    def test_lodf_monitored(self):
+        model = init(self.net)
+        lodf = model.get_lodf()
+        monitored = np.array([5, 0, self.nb_line + 3])
+        outaged = np.array([72, 0, 10, self.nb_branch - 1])
+        assert np.array_equal(model.get_lodf(monitored), lodf[monitored], equal_nan=True)
+        assert np.array_equal(model.get_lodf(outaged_branches=outaged), lodf[:, outaged], equal_nan=True)
+        lodf_mon = model.get_lodf(monitored, outaged)
+        assert lodf_mon.shape == (monitored.shape[0], outaged.shape[0])
+        assert np.array_equal(lodf_mon, lodf[monitored][:, outaged], equal_nan=True)
+        assert lodf_mon[1, 1] == -1.
+
+    def test_topology(self):
+        model = init(self.net)
+        ptdf_init = model.get_ptdf()
+        model.deactivate_powerline(3)
+        ptdf = model.get_ptdf()
+        assert np.all(ptdf[3] == 0.)
+        assert np.max(np.abs(ptdf - model.dc_pf_batch(np.eye(self.nb_bus)).T)) <= self.tol_test
+        assert np.max(np.abs(ptdf - ptdf_init)) > 1e-3
+        # the outage of a disconnected branch does not change anything
+        lodf = model.get_lodf()
+        assert np.all(lodf[:, 3] == 0.)
+        # and the disconnected branch has no flow (the columns of the outages that split the grid are NaN)
+        assert np.all(lodf[3, np.isfinite(lodf[3])] == 0.)
+
+    def test_disconnected_bus(self):
+        # second busbar of each substation (see test_FixedPattern), all disconnected
+        ptdf_ref = init(self.net).get_ptdf()
+        for bus_id in range(self.nb_bus):
+            pp.create_bus(self.net, vn_kv=self.net.bus["vn_kv"].values[bus_id])
+        model = init(self.net)
+        for bus_id in range(self.nb_bus, 2 * self.nb_bus):
+            model.deactivate_bus(bus_id)
+        ptdf = model.get_ptdf()
+        assert ptdf.shape == (self.nb_branch, 2 * self.nb_bus)
+        assert np.max(np.abs(ptdf[:, :self.nb_bus] - ptdf_ref)) <= self.tol_test
+        assert np.all(ptdf[:, self.nb_bus:] == 0.)
+
+    def test_errors(self):
+        model = init(self.net)
+        self.check_errors(model.get_ptdf, (np.array([self.nb_branch]), ))
+        self.check_errors(model.get_lodf, (np.array([0]), np.array([-1])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import numpy as np
+import pdb
+
+from lightsim2grid.initGridModel import init
+from compare_models import BaseCompareSeries
+
+
+class TestTimeSeries(BaseCompareSeries, unittest.TestCase):
+    warm_start = True  # compute_time_series starts each time step from the result of the previous one
+
+    def test_same_results(self):
+        res_ref = self.compute_ref(init(self.net))
+        model = init(self.net)
+        res = model.compute_time_series(self.loads_p, self.loads_q, self.gens_p, self.gens_v,
+                                        self.V0, self.max_it, self.tol)
+        self.check_same(res, res_ref)
+        # ybus and the symbolic factorization are computed only once
+        nb_analyze, nb_factor, nb_refactor = model.get_nb_factorizations()
+        assert nb_analyze == 1
+        assert nb_factor == 1
+
+        # the grid keeps the injections of the last time step
+        model.ac_pf(self.V0, self.max_it, self.tol)
+        assert np.max(np.abs(model.get_lineor_res()[0] - res[2][-1, :self.net.line.shape[0]])) <= self.tol_test
+
+    def test_divergence(self):
+        self.loads_p[3] *= 10.
+        self.loads_q[3] *= 10.
+        res_ref = self.compute_ref(init(self.net))
+        assert res_ref[3] is None
+        model = init(self.net)
+        res = model.compute_time_series(self.loads_p, self.loads_q, self.gens_p, self.gens_v,
+                                        self.V0, self.max_it, self.tol)
+        self.check_same(res, res_ref)
+        assert np.sum(~res[0]) == 1
+
+    def test_topology(self):
+        # the current topology is used for all the time steps
+        model_ref = init(self.net)
+        model_ref.deactivate_powerline(3)
+        res_ref = self.compute_ref(model_ref)
+        model = init(self.net)
+        model.deactivate_powerline(3)
+        res = model.compute_time_series(self.loads_p, self.loads_q, self.gens_p, self.gens_v,
+                                        self.V0, self.max_it, self.tol)
+        self.check_same(res, res_ref)
+        assert np.all(res[2][:, 3] == 0.)
+
+    def test_wrong_shape(self):
+        model = init(self.net)
+        with self.assertRaises(RuntimeError):
+            model.compute_time_series(self.loads_p[:, 1:], self.loads_q, self.gens_p, self.gens_v,
+                                      self.V0, self.max_it, self.tol)
+        with self.assertRaises(RuntimeError):
+            model.compute_time_series(self.loads_p, self.loads_q, self.gens_p[1:], self.gens_v,
+                                      self.V0, self.max_it, self.tol)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import pdb
+
+from compare_models import BaseCompareModels
+
+
+class TestTopoCache(BaseCompareModels, unittest.TestCase):
+    tol_test = 1e-8
+    variant_name = "the topology cache"
+
+    def set_variant(self, model):
+        model.set_topo_cache_capacity(4)
+
+    def test_fingerprint(self):
+        fp_init = self.model.get_topo_fingerprint()
+        self.model.deactivate_powerline(0)
+        fp_disc = self.model.get_topo_fingerprint()
+        assert fp_disc != fp_init
+        self.model.reactivate_powerline(0)
+        assert self.model.get_topo_fingerprint() == fp_init
+
+        # injections are not part of the topology, but shunts are (they are in Ybus)
+        self.model.change_p_load(0, 1.1 * self.net.load["p_mw"].values[0])
+        assert self.model.get_topo_fingerprint() == fp_init
+        self.model.change_q_shunt(0, 1.1 * self.net.shunt["q_mvar"].values[0])
+        assert self.model.get_topo_fingerprint() != fp_init
+
+        # and the fingerprint only depends on the topology
+        assert self.model_ref.get_topo_fingerprint() == fp_init
+        self.model_ref.deactivate_powerline(0)
+        assert self.model_ref.get_topo_fingerprint() == fp_disc
+
+    def test_hit_miss(self):
+        assert self.model.get_topo_cache_capacity() == 4
+        self.check_same()
+        assert self.model.get_topo_cache_stats() == (0, 1, 0)
+        self._both("deactivate_powerline", 0)
+        self.check_same()
+        assert self.model.get_topo_cache_stats() == (0, 2, 1)
+        nb_analyze, *_ = self.model.get_nb_factorizations()
+
+        # back to the initial topology, everything is taken from the cache
+        self._both("reactivate_powerline", 0)
+        self._both("change_p_load", 0, 1.1 * self.net.load["p_mw"].values[0])
+        self.check_same()
+        assert self.model.get_topo_cache_stats() == (1, 2, 1)
+        self._both("deactivate_powerline", 0)
+        self.check_same()
+        assert self.model.get_topo_cache_stats() == (2, 2, 1)
+        nb_analyze_after, *_ = self.model.get_nb_factorizations()
+        assert nb_analyze_after == nb_analyze
+
+        # the topology did not change
+        self._both("deactivate_powerline", 5)
+        self._both("reactivate_powerline", 5)
+        self.check_same()
+        assert self.model.get_topo_cache_stats() == (3, 2, 1)
+
+        self.model.clear_topo_cache()
+        assert self.model.get_topo_cache_stats() == (0, 0, 0)
+        self._both("reactivate_powerline", 0)
+        self.check_same()
+
+    def test_eviction(self):
+        self.model.set_topo_cache_capacity(1)
+        for _ in range(2):
+            for line_id in range(3):
+                self._both("deactivate_powerline", line_id)
+                self.check_same()
+                self._both("reactivate_powerline", line_id)
+        hits, misses, size = self.model.get_topo_cache_stats()
+        assert size == 1
+        assert hits == 0
+        assert misses == 6
+
+    def test_divergence(self):
+        self.check_same()
+        V = self.model.ac_pf(self.V0, 1, self.tol)  # not enough iterations
+        assert V.shape[0] == 0
+        self._both("deactivate_powerline", 0)
+        self.check_same()
+        self._both("reactivate_powerline", 0)
+        self.check_same()
+
+    def test_copy(self):
+        self.check_same()
+        model_cpy = self.model.copy()
+        assert model_cpy.get_topo_cache_capacity() == 4
+        assert model_cpy.get_topo_cache_stats() == (0, 0, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
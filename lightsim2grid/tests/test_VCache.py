@@ -0,0 +1,87 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import numpy as np
+import pdb
+
+from compare_models import BaseCompareEnvs
+
+
+class TestVCache(BaseCompareEnvs, unittest.TestCase):
+    def setUp(self):
+        self.env_ref = self.make_env()
+        self.env = self.make_env(v_cache_capacity=2)
+        # forget the powerflows computed when the environment was created
+        self.env.backend.clear_v_cache()
+
+    def tearDown(self):
+        self.env_ref.close()
+        self.env.close()
+
+    def _step_both(self, act_dict):
+        self.step_both(self.env_ref, self.env, act_dict)
+
+    def test_same_results(self):
+        self._step_both({})
+        self._step_both({"set_line_status": [(3, -1)]})
+        self._step_both({"set_line_status": [(3, +1)]})
+        self._step_both({})
+        stats_ref = self.env_ref.backend.get_pf_stats()
+        stats = self.env.backend.get_pf_stats()
+        assert stats_ref["v_cache_hit"] == 0
+        assert stats_ref["nb_dc_init"] == 4
+        # the first step and the disconnection of the powerline are the only topologies never seen before
+        assert stats["v_cache_miss"] == 2
+        assert stats["v_cache_hit"] == 2
+        assert stats["nb_dc_init"] == 2
+        assert stats["nb_ac_pf"] == 4
+        assert stats["nb_ac_diverged"] == 0
+
+    def test_iterations(self):
+        backend = self.env.backend
+        assert backend.runpf()
+        p_or_ref = 1. * backend.p_or
+        stats = backend.get_pf_stats()
+        assert stats["v_cache_miss"] == 1
+        # nothing changed: the powerflow starts from its solution
+        assert backend.runpf()
+        stats = backend.get_pf_stats()
+        assert stats["v_cache_hit"] == 1
+        assert stats["nb_iter_v_cache_hit"] < stats["nb_ac_iter"] - stats["nb_iter_v_cache_hit"]
+        assert np.max(np.abs(backend.p_or - p_or_ref)) <= self.tol
+
+    def test_capacity(self):
+        backend = self.env.backend
+        assert backend.runpf()
+        for line_id in [3, 4]:
+            backend._disconnect_line(line_id)
+            assert backend.runpf()
+            backend._grid.reactivate_powerline(line_id)
+        # 3 topologies were seen, the initial one has been removed
+        assert len(backend._v_cache) == 2
+        assert backend.runpf()
+        stats = backend.get_pf_stats()
+        assert stats["v_cache_miss"] == 4
+        assert stats["v_cache_hit"] == 0
+
+        backend.clear_v_cache()
+        assert len(backend._v_cache) == 0
+
+    def test_dc(self):
+        # the dc powerflow does not use (nor fill) the cache
+        backend = self.env.backend
+        assert backend.runpf(is_dc=True)
+        assert len(backend._v_cache) == 0
+        stats = backend.get_pf_stats()
+        assert stats["nb_ac_pf"] == 0
+        assert stats["nb_dc_init"] == 0
+
+
+if __name__ == "__main__":
+    unittest.main()
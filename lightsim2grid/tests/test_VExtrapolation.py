@@ -0,0 +1,87 @@
+# Copyright (c) 2020, RTE (https://www.rte-france.com)
+# See AUTHORS.txt
+# This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+# If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+# you can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+# This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+import unittest
+import numpy as np
+import pdb
+
+from grid2op.Exceptions import BackendError
+from lightsim2grid.LightSimBackend import LightSimBackend
+from compare_models import BaseCompareEnvs
+
+
+class TestVExtrapolation(BaseCompareEnvs, unittest.TestCase):
+    def setUp(self):
+        self.env_ref = self.make_env(v_extrapolation_order=0)
+
+    def tearDown(self):
+        self.env_ref.close()
+
+    def test_same_results(self):
+        for order in [1, 2]:
+            # both environments start from the first time step
+            self.env_ref.close()
+            self.env_ref = self.make_env(v_extrapolation_order=0)
+            env = self.make_env(v_extrapolation_order=order)
+            for _ in range(6):
+                self.step_both(self.env_ref, env)
+            stats_ref = self.env_ref.backend.get_pf_stats()
+            stats = env.backend.get_pf_stats()
+            # the topology never changed, no dc powerflow is needed once 2 states are known (the creation of the
+            # environment computed at least one)
+            assert stats["nb_extrapolated"] >= 5
+            assert stats["nb_extrapolated"] + stats["nb_dc_init"] == 6
+            assert stats_ref["nb_dc_init"] == 6
+            assert stats["nb_ac_iter"] < stats_ref["nb_ac_iter"]
+            assert len(env.backend._v_history) == order + 1
+            env.close()
+
+    def test_topology_change(self):
+        env = self.make_env(v_extrapolation_order=1)
+        self.step_both(self.env_ref, env)
+        stats_init = env.backend.get_pf_stats()
+        self.step_both(self.env_ref, env, {"set_line_status": [(3, -1)]})
+        stats = env.backend.get_pf_stats()
+        assert stats["nb_extrapolated"] == stats_init["nb_extrapolated"]
+        assert stats["nb_dc_init"] == stats_init["nb_dc_init"] + 1
+        assert len(env.backend._v_history) == 1
+        # a single state of the new topology: the usual dc initialization
+        self.step_both(self.env_ref, env)
+        stats = env.backend.get_pf_stats()
+        assert stats["nb_extrapolated"] == stats_init["nb_extrapolated"]
+        assert stats["nb_dc_init"] == stats_init["nb_dc_init"] + 2
+        self.step_both(self.env_ref, env)
+        assert env.backend.get_pf_stats()["nb_extrapolated"] == stats_init["nb_extrapolated"] + 1
+        env.close()
+
+    def test_extrapolation(self):
+        env = self.make_env(v_extrapolation_order=2)
+        backend = env.backend
+        topo_key = backend._grid.get_topo_fingerprint()
+        backend._v_history = []
+        for k in range(3):
+            backend._add_v_history(topo_key, np.array([1.0 + 0.01 * k, (1.0 + 0.01 * k ** 2) * np.exp(0.1j * k),
+                                                       np.exp(1j * (3.0 + 0.1 * k))]))
+            if k == 0:
+                # not enough states to extrapolate
+                assert backend._extrapolate_v(topo_key) is None
+        assert len(backend._v_history) == 3
+        V = backend._extrapolate_v(topo_key)
+        assert np.max(np.abs(np.abs(V) - [1.03, 1.09, 1.])) <= 1e-8
+        # the angle of the last bus goes past pi
+        assert np.max(np.abs(V - np.abs(V) * np.exp(1j * np.array([0., 0.3, 3.3])))) <= 1e-8
+        assert backend._extrapolate_v(topo_key + 1) is None
+        env.close()
+
+    def test_wrong_order(self):
+        with self.assertRaises(BackendError):
+            LightSimBackend(v_extrapolation_order=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -152,7 +152,7 @@ extra_compile_args = extra_compile_args_tmp
 ext_modules = [
     Extension(
         'lightsim2grid_cpp',
-        ['src/main.cpp', "src/KLUSolver.cpp", "src/GridModel.cpp", "src/DataConverter.cpp",
+        ['src/main.cpp', "src/LinearSolver.cpp", "src/KLUSolver.cpp", "src/FDPFSolver.cpp", "src/DCSolver.cpp", "src/GridModel.cpp", "src/DataConverter.cpp",
          "src/DataLine.cpp", "src/DataGeneric.cpp", "src/DataShunt.cpp", "src/DataTrafo.cpp",
          "src/DataLoad.cpp", "src/DataGen.cpp"],
         include_dirs=include_dirs,
@@ -0,0 +1,142 @@
+// Copyright (c) 2020, RTE (https://www.rte-france.com)
+// See AUTHORS.txt
+// This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+// If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+// you can obtain one at http://mozilla.org/MPL/2.0/.
+// SPDX-License-Identifier: MPL-2.0
+// This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+#include "DCSolver.h"
+
+const cdouble DCSolver::my_i = {0., 1.};
+
+bool DCSolver::do_dc(const Eigen::SparseMatrix<cdouble> & dcYbus,
+                     Eigen::VectorXcd & V,
+                     const Eigen::VectorXcd & Sbus,
+                     int slack_bus_id_solver
+                     )
+{
+    /**
+    This method computes the voltage angles of the dc approximation (python implementation: "dcpf" in pypower).
+    If dcYbus changed, "reset" should be called before.
+    **/
+    reset_timer();
+    auto timer = CustTimer();
+    int nb_bus_solver = V.size();
+    if(need_factorize_){
+        initialize(dcYbus, slack_bus_id_solver);
+    }
+    if(err_ > 0){
+        // B cannot be factorized (the grid is not connected), "reset" is needed to try again
+        timer_total_ += timer.duration();
+        return false;
+    }
+
+    // remove the slack bus from Sbus
+    auto timer_Fx = CustTimer();
+    theta_.resize(nb_bus_solver - 1);
+    for (int k=0; k < nb_bus_solver; ++k){
+        if(k == slack_bus_id_solver) continue;  // I don't add anything to the slack bus
+        int col_res = k > slack_bus_id_solver ? k - 1 : k;
+        theta_(col_res) = std::real(Sbus(k));
+    }
+    timer_Fx_ += timer_Fx.duration();
+
+    // solve for theta: Sbus = dcY . theta
+    auto timer_solve = CustTimer();
+    bool ok = solver_->solve(theta_);
+    ++nb_solve_;
+    timer_solve_ += timer_solve.duration();
+    if(!ok){
+        // solving failed, this should not happen in dc ...
+        err_ = 3;
+        timer_total_ += timer.duration();
+        return false;
+    }
+
+    // retrieve back the results in the proper shape
+    Vm_ = V.array().abs();
+    Va_ = Eigen::VectorXd::Constant(nb_bus_solver, std::arg(V(slack_bus_id_solver)));
+    for (int k=0; k < nb_bus_solver; ++k){
+        if(k == slack_bus_id_solver) continue;  // slack bus is the reference
+        int col_res = k > slack_bus_id_solver ? k - 1 : k;
+        Va_(k) += theta_(col_res);
+    }
+    V_ = Vm_.array() * (Va_.array().cos().cast<cdouble>() + my_i * Va_.array().sin().cast<cdouble>());
+    V = V_;
+    err_ = 0;
+    timer_total_ += timer.duration();
+    return true;
+}
+
+bool DCSolver::solve_multi(const Eigen::SparseMatrix<cdouble> & dcYbus,
+                           Eigen::Ref<Eigen::MatrixXd> theta,
+                           int slack_bus_id_solver)
+{
+    reset_timer();
+    auto timer = CustTimer();
+    if(need_factorize_){
+        initialize(dcYbus, slack_bus_id_solver);
+    }
+    if(err_ > 0){
+        timer_total_ += timer.duration();
+        return false;
+    }
+    if(theta.rows() != dcYbus.cols() - 1){
+        throw std::runtime_error("DCSolver::solve_multi: theta should have one row per bus (except the slack bus)");
+    }
+
+    auto timer_solve = CustTimer();
+    bool ok = solver_->solve(theta);
+    nb_solve_ += theta.cols();
+    timer_solve_ += timer_solve.duration();
+    timer_total_ += timer.duration();
+    return ok;
+}
+
+void DCSolver::initialize(const Eigen::SparseMatrix<cdouble> & dcYbus, int slack_bus_id_solver){
+    auto timer = CustTimer();
+    // remove the slack bus from Ybus
+    int nb_bus_solver = dcYbus.cols();
+    Eigen::SparseMatrix<double> B = Eigen::SparseMatrix<double>(nb_bus_solver - 1, nb_bus_solver - 1);
+    std::vector<Eigen::Triplet<double> > tripletList;
+    tripletList.reserve(dcYbus.nonZeros());
+    for (int k=0; k < nb_bus_solver; ++k){
+        if(k == slack_bus_id_solver) continue;  // I don't add anything to the slack bus
+        for (Eigen::SparseMatrix<cdouble>::InnerIterator it(dcYbus, k); it; ++it)
+        {
+            int row_res = it.row();
+            if(row_res == slack_bus_id_solver) continue;
+            row_res = row_res > slack_bus_id_solver ? row_res - 1 : row_res;
+            int col_res = k > slack_bus_id_solver ? k - 1 : k;
+            tripletList.push_back(Eigen::Triplet<double> (row_res, col_res, std::real(it.value())));
+        }
+    }
+    B.setFromTriplets(tripletList.begin(), tripletList.end());
+    B.makeCompressed();
+
+    // very small grids: dense LU
+    LinearSolverType linear_solver_type = nb_bus_solver <= dense_threshold_ ? LinearSolverType::DenseLU : linear_solver_type_;
+    solver_ = LinearSolver::create(linear_solver_type);
+    bool ok = solver_->analyze(B);
+    ++nb_analyze_;
+    if(ok){
+        ok = solver_->factor(B);
+        ++nb_factor_;
+    }
+    // matrix is not connected
+    err_ = ok ? 0 : 1;
+    need_factorize_ = false;
+    timer_initialize_ += timer.duration();
+}
+
+void DCSolver::reset(){
+    solver_ = nullptr;
+    Vm_ = Eigen::VectorXd();
+    Va_ = Eigen::VectorXd();
+    V_ = Eigen::VectorXcd();
+    theta_ = Eigen::VectorXd();
+    need_factorize_ = true;
+    err_ = -1;
+    reset_timer();
+}
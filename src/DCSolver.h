@@ -0,0 +1,165 @@
+// Copyright (c) 2020, RTE (https://www.rte-france.com)
+// See AUTHORS.txt
+// This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+// If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+// you can obtain one at http://mozilla.org/MPL/2.0/.
+// SPDX-License-Identifier: MPL-2.0
+// This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+#ifndef DCSOLVER_H
+#define DCSOLVER_H
+
+#include <iostream>
+#include <vector>
+#include <stdio.h>
+#include <cstdint> // for int32
+#include <chrono>
+#include <complex>      // std::complex, std::conj
+#include <cmath>  // for PI
+
+// eigen is necessary to easily pass data from numpy to c++ without any copy.
+// and to optimize the matrix operations
+#include "Eigen/Core"
+#include "Eigen/Dense"
+#include "Eigen/SparseCore"
+
+#include "CustTimer.h"
+#include "Utils.h"
+#include "LinearSolver.h"
+
+/**
+class to handle the dc powerflow: B.theta = P where B is the (real) dc admittance matrix of the system
+without the slack bus.
+
+B is factorized (with KLU by default, see set_linear_solver) the first time "do_dc" is called after a
+"reset", the following calls only require a triangular solve. As long as the dc admittance matrix of the
+system (its topology) does not change, the same solver can be reused without calling "reset", even if the
+injections changed.
+**/
+class DCSolver
+{
+    public:
+        DCSolver():linear_solver_type_(LinearSolverType::KLU),
+                   dense_threshold_(LinearSolver::default_dc_dense_threshold),
+                   need_factorize_(true),err_(-1),
+                   nb_analyze_(0),nb_factor_(0),nb_solve_(0){
+            reset();
+        }
+
+        Eigen::Ref<Eigen::VectorXd> get_Va(){
+            return Va_;
+        }
+        Eigen::Ref<Eigen::VectorXd> get_Vm(){
+            return Vm_;
+        }
+        Eigen::Ref<Eigen::VectorXcd> get_V(){
+            return V_;
+        }
+        int get_error(){
+            return err_;
+        }
+        bool converged(){
+            return err_ == 0;
+        }
+        // same timers as KLUSolver::get_timers (only timer_Fx_ (building the right hand side), timer_solve_,
+        // timer_initialize_ (factorization) and the total time are used here)
+        std::tuple<double, double, double, double, double, double, double> get_timers()
+        {
+            auto res = std::tuple<double, double, double, double, double, double, double>(
+              timer_Fx_, timer_solve_, timer_initialize_, 0., 0., 0., timer_total_);
+            return res;
+        }
+        // number of calls to analyze and factor (of B) and number of right hand sides solved
+        std::tuple<int, int, int> get_nb_factorizations() const
+        {
+            return std::tuple<int, int, int>(nb_analyze_, nb_factor_, nb_solve_);
+        }
+
+        /**
+        dcYbus and Sbus should use the same bus ids (solver ids, see GridModel::init_Ybus), only the real part
+        of dcYbus is used, and only if the solver has not been factorized yet.
+
+        V is used for the magnitude of the voltages (not modified) and for the angle of the slack bus (the other
+        angles are computed with respect to this one). It returns false if B cannot be factorized
+        (non connected grid).
+        **/
+        bool do_dc(const Eigen::SparseMatrix<cdouble> & dcYbus,
+                   Eigen::VectorXcd & V,
+                   const Eigen::VectorXcd & Sbus,
+                   int slack_bus_id_solver
+                   );
+
+        /**
+        Solve B.theta = P for all the columns of "theta" at once: they contain the injections of the buses (without
+        the slack bus, same order as in do_dc) and are replaced in place by the voltage angles relative to the
+        slack bus. B is factorized first if needed (as in do_dc). It returns false if B cannot be factorized.
+        **/
+        bool solve_multi(const Eigen::SparseMatrix<cdouble> & dcYbus,
+                         Eigen::Ref<Eigen::MatrixXd> theta,
+                         int slack_bus_id_solver);
+
+        void reset();
+
+        /**
+        sparse linear solver used for B (it is symmetric, so LDLT can be used). Changing it resets the solver.
+        **/
+        void set_linear_solver(LinearSolverType linear_solver_type){
+            linear_solver_type_ = linear_solver_type;
+            reset();
+        }
+        LinearSolverType get_linear_solver() const {return linear_solver_type_;}
+        // B is factorized with DenseLU for grids with at most "dense_threshold" buses
+        void set_dense_threshold(int dense_threshold){
+            dense_threshold_ = dense_threshold;
+            reset();
+        }
+        int get_dense_threshold() const {return dense_threshold_;}
+
+    protected:
+        void reset_timer(){
+            timer_Fx_ = 0.;
+            timer_solve_ = 0.;
+            timer_initialize_ = 0.;
+            timer_total_ = 0.;
+        }
+
+        /**
+        extract the real part of dcYbus without the row and the column of the slack bus, and factorize it
+        **/
+        void initialize(const Eigen::SparseMatrix<cdouble> & dcYbus, int slack_bus_id_solver);
+
+    private:
+        LinearSolverType linear_solver_type_;
+        int dense_threshold_;
+        std::unique_ptr<LinearSolver> solver_;  // factorization of B
+
+        // solution of the problem
+        Eigen::VectorXd Vm_;  // voltage magnitude
+        Eigen::VectorXd Va_;  // voltage angle
+        Eigen::VectorXcd V_;  // complex voltage
+        Eigen::VectorXd theta_;  // right hand side, and then voltage angles, without the slack bus
+        bool need_factorize_;
+        int err_; //error message, same as KLUSolver:
+        // -1 : the solver has not been initialized (call initialize in this case)
+        // 0 everything ok
+        // 1: i can't factorize the matrix (klu_factor)
+        // 3: i can't solve the system (klu_solve)
+
+        // statistics about the factorizations
+        int nb_analyze_;
+        int nb_factor_;
+        int nb_solve_;
+
+        // timers
+        double timer_Fx_;
+        double timer_solve_;
+        double timer_initialize_;
+        double timer_total_;
+
+        // no copy allowed
+        DCSolver( const DCSolver & ) ;
+        DCSolver & operator=( const DCSolver & ) ;
+        static const cdouble my_i;
+};
+
+#endif // DCSOLVER_H
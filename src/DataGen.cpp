@@ -75,12 +75,14 @@ void DataGen::compute_results(const Eigen::Ref<Eigen::VectorXd> & Va,
                                const Eigen::Ref<Eigen::VectorXd> & Vm,
                                const Eigen::Ref<Eigen::VectorXcd> & V,
                                const std::vector<int> & id_grid_to_solver,
-                               const Eigen::VectorXd & bus_vn_kv)
+                               const Eigen::VectorXd & bus_vn_kv,
+                               bool ac)
 {
     int nb_gen = nb();
     v_kv_from_vpu(Va, Vm, status_, nb_gen, bus_id_, id_grid_to_solver, bus_vn_kv, res_v_);
     res_p_ = p_mw_;
     // res_q_ = q_mvar_;
+    if(!ac) res_q_ = Eigen::VectorXd::Constant(nb_gen, 0.);  // no reactive power in dc (in ac, see set_q)
 }
 
 void DataGen::reset_results(){
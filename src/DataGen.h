@@ -31,7 +31,7 @@ class DataGen: public DataGeneric
               const Eigen::VectorXi & generators_bus_id
               );
 
-    int nb() { return p_mw_.size(); }
+    int nb() const { return p_mw_.size(); }
 
     void deactivate(int gen_id, bool & need_reset) {_deactivate(gen_id, status_, need_reset);}
     void reactivate(int gen_id, bool & need_reset) {_reactivate(gen_id, status_, need_reset);}
@@ -51,7 +51,8 @@ class DataGen: public DataGeneric
                          const Eigen::Ref<Eigen::VectorXd> & Vm,
                          const Eigen::Ref<Eigen::VectorXcd> & V,
                          const std::vector<int> & id_grid_to_solver,
-                         const Eigen::VectorXd & bus_vn_kv);
+                         const Eigen::VectorXd & bus_vn_kv,
+                         bool ac);
     void reset_results();
     void set_q(const std::vector<double> & q_by_bus);
     int get_slack_bus_id(int gen_id);
@@ -66,6 +67,7 @@ class DataGen: public DataGeneric
 
     tuple3d get_res() const {return tuple3d(res_p_, res_q_, res_v_);}
     const std::vector<bool>& get_status() const {return status_;}
+    virtual void fill_topo_key(std::vector<int> & res) const {_fill_topo_key(res, status_, bus_id_);}
 
     void cout_v(){
         for(const auto & el : vm_pu_){
@@ -49,6 +49,62 @@ void DataGeneric::_change_bus(int el_id, int new_bus_me_id, Eigen::VectorXi & el
     bus_me_id = new_bus_me_id;
 }
 
+void DataGeneric::_record_change(int el_id, std::vector<bool> & has_changed, std::vector<int> & changed_ids){
+    if(has_changed[el_id]) return;  // already recorded
+    has_changed[el_id] = true;
+    changed_ids.push_back(el_id);
+}
+
+void DataGeneric::_fill_topo_key(std::vector<int> & res, const std::vector<bool> & status, const Eigen::VectorXi & bus_id) const
+{
+    int nb_el = bus_id.size();
+    for(int el_id = 0; el_id < nb_el; ++el_id) res.push_back(status[el_id] ? bus_id(el_id) : _deactivated_bus_id);
+}
+
+void DataGeneric::_fillYbus_pattern_branch(std::vector<Eigen::Triplet<cdouble> > & res,
+                                           int bus_1_id, int bus_2_id, int n_sub, int nb_bus)
+{
+    for(int bus_1 = bus_1_id % n_sub; bus_1 < nb_bus; bus_1 += n_sub){
+        for(int bus_2 = bus_2_id % n_sub; bus_2 < nb_bus; bus_2 += n_sub){
+            res.push_back(Eigen::Triplet<cdouble> (bus_1, bus_2, 0.));
+            res.push_back(Eigen::Triplet<cdouble> (bus_2, bus_1, 0.));
+        }
+    }
+}
+
+void DataGeneric::_fillBp_Bpp_branch(std::vector<Eigen::Triplet<double> > & Bp,
+                                     std::vector<Eigen::Triplet<double> > & Bpp,
+                                     int bus_or_solver_id,
+                                     int bus_ex_solver_id,
+                                     double r,
+                                     double x,
+                                     cdouble h,
+                                     double ratio,
+                                     FDPFMethod xb_or_bx) const
+{
+    // B' (angles): no shunt admittance, ratio of 1., no resistance for the XB method
+    cdouble y_bp = 0.;
+    cdouble z_bp = my_i * x;
+    if(xb_or_bx == FDPFMethod::BX) z_bp += r;
+    if(z_bp != 0.) y_bp = 1.0 / z_bp;
+    Bp.push_back(Eigen::Triplet<double> (bus_or_solver_id, bus_ex_solver_id, std::imag(y_bp)));
+    Bp.push_back(Eigen::Triplet<double> (bus_ex_solver_id, bus_or_solver_id, std::imag(y_bp)));
+    Bp.push_back(Eigen::Triplet<double> (bus_or_solver_id, bus_or_solver_id, -std::imag(y_bp)));
+    Bp.push_back(Eigen::Triplet<double> (bus_ex_solver_id, bus_ex_solver_id, -std::imag(y_bp)));
+
+    // B'' (magnitudes): same as Ybus, but no resistance for the BX method
+    cdouble y_bpp = 0.;
+    cdouble z_bpp = my_i * x;
+    if(xb_or_bx == FDPFMethod::XB) z_bpp += r;
+    if(z_bpp != 0.) y_bpp = 1.0 / z_bpp;
+    cdouble tmp = y_bpp / ratio;
+    Bpp.push_back(Eigen::Triplet<double> (bus_or_solver_id, bus_ex_solver_id, std::imag(tmp)));
+    Bpp.push_back(Eigen::Triplet<double> (bus_ex_solver_id, bus_or_solver_id, std::imag(tmp)));
+    tmp += h;
+    Bpp.push_back(Eigen::Triplet<double> (bus_or_solver_id, bus_or_solver_id, -std::imag(tmp / ratio)));
+    Bpp.push_back(Eigen::Triplet<double> (bus_ex_solver_id, bus_ex_solver_id, -std::imag(tmp * ratio)));
+}
+
 int DataGeneric::_get_bus(int el_id, const std::vector<bool> & status_, const Eigen::VectorXi & bus_id_)
 {
     int res;
@@ -33,6 +33,13 @@ class DataGeneric
         virtual double get_p_slack(int slack_bus_id) {return 0.;}
         virtual void set_p_slack(int gen_slackbus, double p_slack) {};
         virtual void get_q(std::vector<double>& q_by_bus) {};
+        // add to "res" everything that, for this type of element, has an impact on Ybus, pv and pq (status, buses etc.)
+        virtual void fill_topo_key(std::vector<int> & res) const {};
+        // add the contribution of this element to the B' and B'' matrices of the fast decoupled powerflow
+        virtual void fillBp_Bpp(std::vector<Eigen::Triplet<double> > & Bp,
+                                std::vector<Eigen::Triplet<double> > & Bpp,
+                                const std::vector<int> & id_grid_to_solver,
+                                FDPFMethod xb_or_bx) const {};
 
     protected:
         static const int _deactivated_bus_id;
@@ -46,6 +53,38 @@ class DataGeneric
         void _change_bus(int el_id, int new_bus_me_id, Eigen::VectorXi & el_bus_ids, bool & need_reset, int nb_bus);
         int _get_bus(int el_id, const std::vector<bool> & status_, const Eigen::VectorXi & bus_id_);
 
+        /**
+        keep track of the elements that have been modified since the last time the Ybus matrix
+        was computed (to update it instead of computing it from scratch)
+        **/
+        void _record_change(int el_id, std::vector<bool> & has_changed, std::vector<int> & changed_ids);
+
+        /**
+        add to "res" the bus of each element (or _deactivated_bus_id if the element is disconnected)
+        **/
+        void _fill_topo_key(std::vector<int> & res, const std::vector<bool> & status, const Eigen::VectorXi & bus_id) const;
+
+        /**
+        add (with a value of 0.) all the coefficients of Ybus a branch between "bus_1_id" and "bus_2_id" could fill
+        if each of its ends could be connected to any bus of its substation (bus_id % n_sub, bus_id % n_sub + n_sub, etc.)
+        **/
+        void _fillYbus_pattern_branch(std::vector<Eigen::Triplet<cdouble> > & res, int bus_1_id, int bus_2_id, int n_sub, int nb_bus);
+
+        /**
+        add the contribution of a branch (between the solver buses "bus_or_solver_id" and "bus_ex_solver_id") to B'
+        and B'' (same as "-imag(Ybus)" but B' ignores the shunt admittance "h" and the ratio, and the resistance
+        is ignored in B' for the XB method and in B'' for the BX method)
+        **/
+        void _fillBp_Bpp_branch(std::vector<Eigen::Triplet<double> > & Bp,
+                                std::vector<Eigen::Triplet<double> > & Bpp,
+                                int bus_or_solver_id,
+                                int bus_ex_solver_id,
+                                double r,
+                                double x,
+                                cdouble h,
+                                double ratio,
+                                FDPFMethod xb_or_bx) const;
+
         /**
         compute the amps from the p, the q and the v (v should NOT be pair unit)
         **/
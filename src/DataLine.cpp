@@ -33,6 +33,143 @@ void DataLine::init(const Eigen::VectorXd & branch_r,
     powerlines_r_ = branch_r;
     powerlines_x_ = branch_x;
     status_ = std::vector<bool>(branch_r.size(), true); // by default everything is connected
+    has_changed_ = std::vector<bool>(branch_r.size(), false);
+    changed_ids_ = std::vector<int>();
+}
+
+void DataLine::_get_ybus_coeffs(int line_id, bool ac, cdouble & y_off, cdouble & y_or, cdouble & y_ex)
+{
+    // convert subsceptance to half subsceptance, applied on each ends
+    cdouble h = 0.;
+    if(ac){
+        h = powerlines_h_(line_id); // yes it's the correct one
+        h = my_i * 0.5 * h;
+    }
+
+    // compute the admittance y
+    cdouble y = 0.;
+    cdouble z = powerlines_x_(line_id);
+    if(ac){
+        z *= my_i;
+        z += powerlines_r_(line_id);
+    }
+    if (z !=0. ) y = 1.0 / z;
+    y_off = -y;
+    y_or = y + h;
+    y_ex = y + h;
+}
+
+void DataLine::init_ybus_state()
+{
+    ybus_status_ = status_;
+    ybus_bus_or_id_ = bus_or_id_;
+    ybus_bus_ex_id_ = bus_ex_id_;
+    for(auto line_id : changed_ids_) has_changed_[line_id] = false;
+    changed_ids_.clear();
+}
+
+void DataLine::updateYbus(Eigen::SparseMatrix<cdouble> & res, bool ac, const std::vector<int> & id_grid_to_solver)
+{
+    cdouble y_off, y_or, y_ex;
+    for(auto line_id : changed_ids_){
+        has_changed_[line_id] = false;
+        bool old_status = ybus_status_[line_id];
+        bool new_status = status_[line_id];
+        int old_bus_or_id_me = ybus_bus_or_id_(line_id);
+        int old_bus_ex_id_me = ybus_bus_ex_id_(line_id);
+        int new_bus_or_id_me = bus_or_id_(line_id);
+        int new_bus_ex_id_me = bus_ex_id_(line_id);
+        if(!old_status && !new_status) continue;  // nothing changed in Ybus
+        if(old_status && new_status &&
+           (old_bus_or_id_me == new_bus_or_id_me) &&
+           (old_bus_ex_id_me == new_bus_ex_id_me)) continue; // nothing changed in Ybus (eg. disconnected then reconnected)
+
+        _get_ybus_coeffs(line_id, ac, y_off, y_or, y_ex);
+        if(old_status){
+            // remove the former contribution of this powerline (buses were connected at that time)
+            int bus_or_solver_id = id_grid_to_solver[old_bus_or_id_me];
+            int bus_ex_solver_id = id_grid_to_solver[old_bus_ex_id_me];
+            res.coeffRef(bus_or_solver_id, bus_ex_solver_id) -= y_off;
+            res.coeffRef(bus_ex_solver_id, bus_or_solver_id) -= y_off;
+            res.coeffRef(bus_or_solver_id, bus_or_solver_id) -= y_or;
+            res.coeffRef(bus_ex_solver_id, bus_ex_solver_id) -= y_ex;
+        }
+        if(new_status){
+            // add its new contribution
+            int bus_or_solver_id = id_grid_to_solver[new_bus_or_id_me];
+            if(bus_or_solver_id == _deactivated_bus_id){
+                throw std::runtime_error("DataLine::updateYbus: A line is connected (or) to a disconnected bus.");
+            }
+            int bus_ex_solver_id = id_grid_to_solver[new_bus_ex_id_me];
+            if(bus_ex_solver_id == _deactivated_bus_id){
+                throw std::runtime_error("DataLine::updateYbus: A line is connected (ex) to a disconnected bus.");
+            }
+            res.coeffRef(bus_or_solver_id, bus_ex_solver_id) += y_off;
+            res.coeffRef(bus_ex_solver_id, bus_or_solver_id) += y_off;
+            res.coeffRef(bus_or_solver_id, bus_or_solver_id) += y_or;
+            res.coeffRef(bus_ex_solver_id, bus_ex_solver_id) += y_ex;
+        }
+        ybus_status_[line_id] = new_status;
+        ybus_bus_or_id_(line_id) = new_bus_or_id_me;
+        ybus_bus_ex_id_(line_id) = new_bus_ex_id_me;
+    }
+    changed_ids_.clear();
+}
+
+void DataLine::fillYbus_pattern(std::vector<Eigen::Triplet<cdouble> > & res, int n_sub, int nb_bus)
+{
+    int nb_line = powerlines_r_.size();
+    for(int line_id = 0; line_id < nb_line; ++line_id){
+        _fillYbus_pattern_branch(res, bus_or_id_(line_id), bus_ex_id_(line_id), n_sub, nb_bus);
+    }
+}
+
+void DataLine::fillBp_Bpp(std::vector<Eigen::Triplet<double> > & Bp,
+                          std::vector<Eigen::Triplet<double> > & Bpp,
+                          const std::vector<int> & id_grid_to_solver,
+                          FDPFMethod xb_or_bx) const
+{
+    int nb_line = nb();
+    for(int line_id = 0; line_id < nb_line; ++line_id){
+        // i only add this if the powerline is connected
+        if(!status_[line_id]) continue;
+
+        int bus_or_solver_id = id_grid_to_solver[bus_or_id_(line_id)];
+        if(bus_or_solver_id == _deactivated_bus_id){
+            throw std::runtime_error("DataLine::fillBp_Bpp: A line is connected (or) to a disconnected bus.");
+        }
+        int bus_ex_solver_id = id_grid_to_solver[bus_ex_id_(line_id)];
+        if(bus_ex_solver_id == _deactivated_bus_id){
+            throw std::runtime_error("DataLine::fillBp_Bpp: A line is connected (ex) to a disconnected bus.");
+        }
+        cdouble h = my_i * 0.5 * powerlines_h_(line_id);
+        _fillBp_Bpp_branch(Bp, Bpp, bus_or_solver_id, bus_ex_solver_id,
+                           powerlines_r_(line_id), powerlines_x_(line_id), h, 1.0, xb_or_bx);
+    }
+}
+
+void DataLine::fillBf(std::vector<Eigen::Triplet<double> > & Bf,
+                      const std::vector<int> & id_grid_to_solver,
+                      int row_offset) const
+{
+    int nb_line = nb();
+    for(int line_id = 0; line_id < nb_line; ++line_id){
+        // i only add this if the powerline is connected
+        if(!status_[line_id]) continue;
+
+        int bus_or_solver_id = id_grid_to_solver[bus_or_id_(line_id)];
+        if(bus_or_solver_id == _deactivated_bus_id){
+            throw std::runtime_error("DataLine::fillBf: A line is connected (or) to a disconnected bus.");
+        }
+        int bus_ex_solver_id = id_grid_to_solver[bus_ex_id_(line_id)];
+        if(bus_ex_solver_id == _deactivated_bus_id){
+            throw std::runtime_error("DataLine::fillBf: A line is connected (ex) to a disconnected bus.");
+        }
+        double x = powerlines_x_(line_id);
+        double y_dc = x != 0. ? 1.0 / x : 0.;
+        Bf.push_back(Eigen::Triplet<double>(row_offset + line_id, bus_or_solver_id, y_dc));
+        Bf.push_back(Eigen::Triplet<double>(row_offset + line_id, bus_ex_solver_id, -y_dc));
+    }
 }
 
 void DataLine::fillYbus(std::vector<Eigen::Triplet<cdouble> > & res, bool ac, const std::vector<int> & id_grid_to_solver)
@@ -152,7 +289,8 @@ void DataLine::compute_results(const Eigen::Ref<Eigen::VectorXd> & Va,
                                const Eigen::Ref<Eigen::VectorXd> & Vm,
                                const Eigen::Ref<Eigen::VectorXcd> & V,
                                const std::vector<int> & id_grid_to_solver,
-                               const Eigen::VectorXd & bus_vn_kv)
+                               const Eigen::VectorXd & bus_vn_kv,
+                               bool ac)
 {
     // it needs to be initialized at 0.
     int nb_element = nb();
@@ -186,23 +324,31 @@ void DataLine::compute_results(const Eigen::Ref<Eigen::VectorXd> & Va,
             throw std::runtime_error("DataModel::res_powerlines: A powerline or a trafo is connected (ex) to a disconnected bus.");
         }
 
-        // results of the powerflow
-        cdouble Eor = V(bus_or_solver_id);
-        cdouble Eex = V(bus_ex_solver_id);
+        if(ac){
+            // results of the powerflow
+            cdouble Eor = V(bus_or_solver_id);
+            cdouble Eex = V(bus_ex_solver_id);
 
-        // powerline equations
-        cdouble I_orex = (y + h) * Eor - y * Eex;
-        cdouble I_exor = (y + h) * Eex - y * Eor;
+            // powerline equations
+            cdouble I_orex = (y + h) * Eor - y * Eex;
+            cdouble I_exor = (y + h) * Eex - y * Eor;
 
-        I_orex = std::conj(I_orex);
-        I_exor = std::conj(I_exor);
-        cdouble s_orex = Eor * I_orex;
-        cdouble s_exor = Eex * I_exor;
+            I_orex = std::conj(I_orex);
+            I_exor = std::conj(I_exor);
+            cdouble s_orex = Eor * I_orex;
+            cdouble s_exor = Eex * I_exor;
 
-        res_powerline_por_(line_id) = std::real(s_orex);
-        res_powerline_qor_(line_id) = std::imag(s_orex);
-        res_powerline_pex_(line_id) = std::real(s_exor);
-        res_powerline_qex_(line_id) = std::imag(s_exor);
+            res_powerline_por_(line_id) = std::real(s_orex);
+            res_powerline_qor_(line_id) = std::imag(s_orex);
+            res_powerline_pex_(line_id) = std::real(s_exor);
+            res_powerline_qex_(line_id) = std::imag(s_exor);
+        }else{
+            // dc approximation (same admittance as in fillYbus): no losses and no reactive power
+            double y_dc = x != 0. ? 1.0 / x : 0.;
+            double p_orex = y_dc * (Va(bus_or_solver_id) - Va(bus_ex_solver_id));
+            res_powerline_por_(line_id) = p_orex;
+            res_powerline_pex_(line_id) = -p_orex;
+        }
 
         // retrieve voltages magnitude in kv instead of pu
         double v_or = Vm(bus_or_solver_id);
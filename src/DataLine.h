@@ -29,22 +29,72 @@ class DataLine : public DataGeneric
               const Eigen::VectorXi & branch_to_id
               );
 
-    int nb() { return powerlines_r_.size(); }
+    int nb() const { return powerlines_r_.size(); }
 
-    void deactivate(int powerline_id, bool & need_reset) {_deactivate(powerline_id, status_, need_reset);}
-    void reactivate(int powerline_id, bool & need_reset) {_reactivate(powerline_id, status_, need_reset);}
-    void change_bus_or(int powerline_id, int new_bus_id, bool & need_reset, int nb_bus) {_change_bus(powerline_id, new_bus_id, bus_or_id_, need_reset, nb_bus);}
-    void change_bus_ex(int powerline_id, int new_bus_id, bool & need_reset, int nb_bus) {_change_bus(powerline_id, new_bus_id, bus_ex_id_, need_reset, nb_bus);}
+    void deactivate(int powerline_id, bool & need_reset) {
+        _deactivate(powerline_id, status_, need_reset);
+        _record_change(powerline_id, has_changed_, changed_ids_);
+    }
+    void reactivate(int powerline_id, bool & need_reset) {
+        _reactivate(powerline_id, status_, need_reset);
+        _record_change(powerline_id, has_changed_, changed_ids_);
+    }
+    void change_bus_or(int powerline_id, int new_bus_id, bool & need_reset, int nb_bus) {
+        _change_bus(powerline_id, new_bus_id, bus_or_id_, need_reset, nb_bus);
+        _record_change(powerline_id, has_changed_, changed_ids_);
+    }
+    void change_bus_ex(int powerline_id, int new_bus_id, bool & need_reset, int nb_bus) {
+        _change_bus(powerline_id, new_bus_id, bus_ex_id_, need_reset, nb_bus);
+        _record_change(powerline_id, has_changed_, changed_ids_);
+    }
     int get_bus_or(int powerline_id) {return _get_bus(powerline_id, status_, bus_or_id_);}
     int get_bus_ex(int powerline_id) {return _get_bus(powerline_id, status_, bus_ex_id_);}
+    // coefficients of a powerline in the ac Ybus (off diagonal coefficient, and diagonal coefficients at both its ends)
+    void get_ybus_coeffs(int powerline_id, cdouble & y_off, cdouble & y_or, cdouble & y_ex) {
+        _get_ybus_coeffs(powerline_id, true, y_off, y_or, y_ex);
+    }
     virtual void fillYbus(std::vector<Eigen::Triplet<cdouble> > & res, bool ac, const std::vector<int> & id_grid_to_solver);
     virtual void fillYbus_spmat(Eigen::SparseMatrix<cdouble> & res, bool ac, const std::vector<int> & id_grid_to_solver);
 
+    /**
+    Incremental update of the Ybus matrix: only the powerlines that have been modified (status or buses) since
+    the last call to "init_ybus_state" have their former contribution removed and their new contribution added.
+
+    It supposes that the buses are the same as when Ybus was computed, and that "init_ybus_state" has been
+    called right after the last "full" computation of Ybus.
+    **/
+    void init_ybus_state();
+    void updateYbus(Eigen::SparseMatrix<cdouble> & res, bool ac, const std::vector<int> & id_grid_to_solver);
+
+    /**
+    Add the coefficients (set to 0.) of Ybus that could be used by any powerline (connected or not) whatever
+    the bus of its substation it is connected to (used for the "fixed pattern" mode of GridModel).
+    Buses ids are the "me" ids.
+    **/
+    void fillYbus_pattern(std::vector<Eigen::Triplet<cdouble> > & res, int n_sub, int nb_bus);
+
+    /**
+    Contribution of the powerlines to the B' and B'' matrices of the fast decoupled powerflow
+    **/
+    virtual void fillBp_Bpp(std::vector<Eigen::Triplet<double> > & Bp,
+                            std::vector<Eigen::Triplet<double> > & Bpp,
+                            const std::vector<int> & id_grid_to_solver,
+                            FDPFMethod xb_or_bx) const;
+
+    /**
+    Contribution of the powerlines to the matrix of the dc flows (p_or = Bf.Va, same admittance as in fillYbus):
+    one row per powerline (starting at "row_offset"), the rows of the disconnected ones are empty.
+    **/
+    void fillBf(std::vector<Eigen::Triplet<double> > & Bf,
+                const std::vector<int> & id_grid_to_solver,
+                int row_offset) const;
+
     void compute_results(const Eigen::Ref<Eigen::VectorXd> & Va,
                          const Eigen::Ref<Eigen::VectorXd> & Vm,
                          const Eigen::Ref<Eigen::VectorXcd> & V,
                          const std::vector<int> & id_grid_to_solver,
-                         const Eigen::VectorXd & bus_vn_kv);
+                         const Eigen::VectorXd & bus_vn_kv,
+                         bool ac);
     void reset_results();
     virtual double get_p_slack(int slack_bus_id);
     virtual void get_q(std::vector<double>& q_by_bus);
@@ -52,6 +102,14 @@ class DataLine : public DataGeneric
     tuple4d get_lineor_res() const {return tuple4d(res_powerline_por_, res_powerline_qor_, res_powerline_vor_, res_powerline_aor_);}
     tuple4d get_lineex_res() const {return tuple4d(res_powerline_pex_, res_powerline_qex_, res_powerline_vex_, res_powerline_aex_);}
     const std::vector<bool>& get_status() const {return status_;}
+    virtual void fill_topo_key(std::vector<int> & res) const {
+        _fill_topo_key(res, status_, bus_or_id_);
+        _fill_topo_key(res, status_, bus_ex_id_);
+    }
+
+    protected:
+        // admittance of a powerline (off diagonal coefficient, and diagonal coefficients at both its ends)
+        void _get_ybus_coeffs(int line_id, bool ac, cdouble & y_off, cdouble & y_or, cdouble & y_ex);
 
     protected:
         // physical properties
@@ -64,6 +122,14 @@ class DataLine : public DataGeneric
         Eigen::VectorXi bus_ex_id_;
         std::vector<bool> status_;
 
+        // state of the powerlines when the Ybus matrix was last computed (or updated)
+        std::vector<bool> ybus_status_;
+        Eigen::VectorXi ybus_bus_or_id_;
+        Eigen::VectorXi ybus_bus_ex_id_;
+        // powerlines modified since then
+        std::vector<int> changed_ids_;
+        std::vector<bool> has_changed_;
+
         //output data
         Eigen::VectorXd res_powerline_por_;  // in MW
         Eigen::VectorXd res_powerline_qor_;  // in MVar
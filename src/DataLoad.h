@@ -27,7 +27,7 @@ class DataLoad : public DataGeneric
               const Eigen::VectorXi & loads_bus_id
               );
 
-    int nb() { return p_mw_.size(); }
+    int nb() const { return p_mw_.size(); }
 
     void deactivate(int load_id, bool & need_reset) {_deactivate(load_id, status_, need_reset);}
     void reactivate(int load_id, bool & need_reset) {_reactivate(load_id, status_, need_reset);}
@@ -42,13 +42,15 @@ class DataLoad : public DataGeneric
                          const Eigen::Ref<Eigen::VectorXd> & Vm,
                          const Eigen::Ref<Eigen::VectorXcd> & V,
                          const std::vector<int> & id_grid_to_solver,
-                         const Eigen::VectorXd & bus_vn_kv);
+                         const Eigen::VectorXd & bus_vn_kv,
+                         bool ac);
     void reset_results();
     virtual double get_p_slack(int slack_bus_id);
     virtual void get_q(std::vector<double>& q_by_bus);
 
     tuple3d get_res() const {return tuple3d(res_p_, res_q_, res_v_);}
     const std::vector<bool>& get_status() const {return status_;}
+    virtual void fill_topo_key(std::vector<int> & res) const {_fill_topo_key(res, status_, bus_id_);}
 
     protected:
         // physical properties
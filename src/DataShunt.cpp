@@ -7,6 +7,7 @@
 // This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
 
 #include "DataShunt.h"
+#include <cstring>  // for memcpy
 
 void DataShunt::init(const Eigen::VectorXd & shunt_p_mw,
                      const Eigen::VectorXd & shunt_q_mvar,
@@ -16,9 +17,54 @@ void DataShunt::init(const Eigen::VectorXd & shunt_p_mw,
     q_mvar_ = shunt_q_mvar;
     bus_id_ = shunt_bus_id;
     status_ = std::vector<bool>(p_mw_.size(), true); // by default everything is connected
+    has_changed_ = std::vector<bool>(p_mw_.size(), false);
+    changed_ids_ = std::vector<int>();
+}
+
+void DataShunt::init_ybus_state()
+{
+    ybus_status_ = status_;
+    ybus_bus_id_ = bus_id_;
+    ybus_p_mw_ = p_mw_;
+    ybus_q_mvar_ = q_mvar_;
+    for(auto shunt_id : changed_ids_) has_changed_[shunt_id] = false;
+    changed_ids_.clear();
+}
+
+void DataShunt::updateYbus(Eigen::SparseMatrix<cdouble> & res, bool ac, const std::vector<int> & id_grid_to_solver)
+{
+    for(auto shunt_id : changed_ids_){
+        has_changed_[shunt_id] = false;
+        if(!ybus_status_[shunt_id] && !status_[shunt_id]) continue;  // nothing changed in Ybus
+        if(ybus_status_[shunt_id] && status_[shunt_id] &&
+           (ybus_bus_id_(shunt_id) == bus_id_(shunt_id)) &&
+           (ybus_p_mw_(shunt_id) == p_mw_(shunt_id)) &&
+           (ybus_q_mvar_(shunt_id) == q_mvar_(shunt_id))) continue;  // nothing changed in Ybus
+        if(ybus_status_[shunt_id]){
+            // remove the former contribution of this shunt
+            cdouble tmp = ybus_p_mw_(shunt_id) + my_i * ybus_q_mvar_(shunt_id);
+            int bus_id_solver = id_grid_to_solver[ybus_bus_id_(shunt_id)];
+            res.coeffRef(bus_id_solver, bus_id_solver) += tmp;
+        }
+        if(status_[shunt_id]){
+            // add its new contribution
+            cdouble tmp = p_mw_(shunt_id) + my_i * q_mvar_(shunt_id);
+            int bus_id_solver = id_grid_to_solver[bus_id_(shunt_id)];
+            if(bus_id_solver == _deactivated_bus_id){
+                throw std::runtime_error("DataShunt::updateYbus: A shunt is connected to a disconnected bus.");
+            }
+            res.coeffRef(bus_id_solver, bus_id_solver) -= tmp;
+        }
+        ybus_status_[shunt_id] = status_[shunt_id];
+        ybus_bus_id_(shunt_id) = bus_id_(shunt_id);
+        ybus_p_mw_(shunt_id) = p_mw_(shunt_id);
+        ybus_q_mvar_(shunt_id) = q_mvar_(shunt_id);
+    }
+    changed_ids_.clear();
 }
 
 void DataShunt::fillYbus(std::vector<Eigen::Triplet<cdouble> > & res, bool ac, const std::vector<int> & id_grid_to_solver){
+    if(!ac) return;  // in dc, the shunts are injections (see fillSbus)
     int nb_shunt = q_mvar_.size();
     cdouble tmp;
     int bus_id_me, bus_id_solver;
@@ -59,7 +105,8 @@ void DataShunt::compute_results(const Eigen::Ref<Eigen::VectorXd> & Va,
                                const Eigen::Ref<Eigen::VectorXd> & Vm,
                                const Eigen::Ref<Eigen::VectorXcd> & V,
                                const std::vector<int> & id_grid_to_solver,
-                               const Eigen::VectorXd & bus_vn_kv)
+                               const Eigen::VectorXd & bus_vn_kv,
+                               bool ac)
 {
     int nb_shunt = p_mw_.size();
     v_kv_from_vpu(Va, Vm, status_, nb_shunt, bus_id_, id_grid_to_solver, bus_vn_kv, res_v_);
@@ -72,6 +119,11 @@ void DataShunt::compute_results(const Eigen::Ref<Eigen::VectorXd> & Va,
         if(bus_solver_id == _deactivated_bus_id){
             throw std::runtime_error("DataShunt::compute_results: A shunt is connected to a disconnected bus.");
         }
+        if(!ac){
+            // dc approximation: no reactive power, voltages at 1. pu (see fillSbus)
+            res_p_(shunt_id) = p_mw_(shunt_id);
+            continue;
+        }
         cdouble E = V(bus_solver_id);
         cdouble y = -1.0 * (p_mw_(shunt_id) + my_i * q_mvar_(shunt_id));
         cdouble I = y * E;
@@ -82,6 +134,24 @@ void DataShunt::compute_results(const Eigen::Ref<Eigen::VectorXd> & Va,
     }
 }
 
+void DataShunt::fillSbus(Eigen::VectorXcd & Sbus, bool ac, const std::vector<int> & id_grid_to_solver){
+    if(ac) return;  // in ac, the shunts are part of Ybus (see fillYbus)
+    // in dc (as in pypower), the active power of the shunts is taken into account as a load (voltages are 1. pu)
+    int nb_shunt = nb();
+    int bus_id_me, bus_id_solver;
+    for(int shunt_id = 0; shunt_id < nb_shunt; ++shunt_id){
+        // i don't do anything if the shunt is disconnected
+        if(!status_[shunt_id]) continue;
+
+        bus_id_me = bus_id_(shunt_id);
+        bus_id_solver = id_grid_to_solver[bus_id_me];
+        if(bus_id_solver == _deactivated_bus_id){
+            throw std::runtime_error("DataShunt::fillSbus: A shunt is connected to a disconnected bus.");
+        }
+        Sbus.coeffRef(bus_id_solver) -= p_mw_(shunt_id);
+    }
+}
+
 void DataShunt::reset_results(){
     res_p_ = Eigen::VectorXd();  // in MW
     res_q_ = Eigen::VectorXd();  // in MVar
@@ -92,7 +162,10 @@ void DataShunt::change_p(int shunt_id, double new_p, bool & need_reset)
 {
     bool my_status = status_.at(shunt_id); // and this check that load_id is not out of bound
     if(!my_status) throw std::runtime_error("Impossible to change the active value of a disconnected shunt");
-    if(p_mw_(shunt_id) != new_p) need_reset = true;
+    if(p_mw_(shunt_id) != new_p){
+        need_reset = true;
+        _record_change(shunt_id, has_changed_, changed_ids_);
+    }
     p_mw_(shunt_id) = new_p;
 
 }
@@ -101,10 +174,45 @@ void DataShunt::change_q(int shunt_id, double new_q, bool & need_reset)
 {
     bool my_status = status_.at(shunt_id); // and this check that load_id is not out of bound
     if(!my_status) throw std::runtime_error("Impossible to change the reactive value of a disconnected shunt");
-    if(q_mvar_(shunt_id) != new_q) need_reset = true;
+    if(q_mvar_(shunt_id) != new_q){
+        need_reset = true;
+        _record_change(shunt_id, has_changed_, changed_ids_);
+    }
     q_mvar_(shunt_id) = new_q;
 }
 
+void DataShunt::fillBp_Bpp(std::vector<Eigen::Triplet<double> > & Bp,
+                           std::vector<Eigen::Triplet<double> > & Bpp,
+                           const std::vector<int> & id_grid_to_solver,
+                           FDPFMethod xb_or_bx) const
+{
+    // shunts are only in B'' (same coefficient as -imag(Ybus))
+    int nb_shunt = nb();
+    for(int shunt_id = 0; shunt_id < nb_shunt; ++shunt_id){
+        // i don't do anything if the shunt is disconnected
+        if(!status_[shunt_id]) continue;
+        int bus_id_solver = id_grid_to_solver[bus_id_(shunt_id)];
+        if(bus_id_solver == _deactivated_bus_id){
+            throw std::runtime_error("DataShunt::fillBp_Bpp: A shunt is connected to a disconnected bus.");
+        }
+        Bpp.push_back(Eigen::Triplet<double> (bus_id_solver, bus_id_solver, q_mvar_(shunt_id)));
+    }
+}
+
+void DataShunt::fill_topo_key(std::vector<int> & res) const
+{
+    _fill_topo_key(res, status_, bus_id_);
+    int nb_shunt = p_mw_.size();
+    std::int32_t tmp[4];
+    for(int shunt_id = 0; shunt_id < nb_shunt; ++shunt_id){
+        if(!status_[shunt_id]) continue;
+        // exact representation of the values, 2 ints per double
+        std::memcpy(tmp, &p_mw_(shunt_id), sizeof(double));
+        std::memcpy(tmp + 2, &q_mvar_(shunt_id), sizeof(double));
+        res.insert(res.end(), tmp, tmp + 4);
+    }
+}
+
 double DataShunt::get_p_slack(int slack_bus_id)
 {
     int nb_element = nb();
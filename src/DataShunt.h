@@ -27,29 +27,52 @@ class DataShunt : public DataGeneric
                      const Eigen::VectorXi & shunt_bus_id
               );
 
-    int nb() { return p_mw_.size(); }
+    int nb() const { return p_mw_.size(); }
 
-    void deactivate(int shunt_id, bool & need_reset) {_deactivate(shunt_id, status_, need_reset);}
-    void reactivate(int shunt_id, bool & need_reset) {_reactivate(shunt_id, status_, need_reset);}
-    void change_bus(int shunt_id, int new_bus_id, bool & need_reset, int nb_bus) {_change_bus(shunt_id, new_bus_id, bus_id_, need_reset, nb_bus);}
+    void deactivate(int shunt_id, bool & need_reset) {
+        _deactivate(shunt_id, status_, need_reset);
+        _record_change(shunt_id, has_changed_, changed_ids_);
+    }
+    void reactivate(int shunt_id, bool & need_reset) {
+        _reactivate(shunt_id, status_, need_reset);
+        _record_change(shunt_id, has_changed_, changed_ids_);
+    }
+    void change_bus(int shunt_id, int new_bus_id, bool & need_reset, int nb_bus) {
+        _change_bus(shunt_id, new_bus_id, bus_id_, need_reset, nb_bus);
+        _record_change(shunt_id, has_changed_, changed_ids_);
+    }
     void change_p(int shunt_id, double new_p, bool & need_reset);
     void change_q(int shunt_id, double new_q, bool & need_reset);
     int get_bus(int shunt_id) {return _get_bus(shunt_id, status_, bus_id_);}
 
     virtual void fillYbus(std::vector<Eigen::Triplet<cdouble> > & res, bool ac, const std::vector<int> & id_grid_to_solver);
     virtual void fillYbus_spmat(Eigen::SparseMatrix<cdouble> & res, bool ac, const std::vector<int> & id_grid_to_solver);
+    virtual void fillSbus(Eigen::VectorXcd & Sbus, bool ac, const std::vector<int> & id_grid_to_solver);
+    virtual void fillBp_Bpp(std::vector<Eigen::Triplet<double> > & Bp,
+                            std::vector<Eigen::Triplet<double> > & Bpp,
+                            const std::vector<int> & id_grid_to_solver,
+                            FDPFMethod xb_or_bx) const;
+
+    /**
+    Incremental update of the Ybus matrix, see DataLine::updateYbus
+    **/
+    void init_ybus_state();
+    void updateYbus(Eigen::SparseMatrix<cdouble> & res, bool ac, const std::vector<int> & id_grid_to_solver);
 
     void compute_results(const Eigen::Ref<Eigen::VectorXd> & Va,
                          const Eigen::Ref<Eigen::VectorXd> & Vm,
                          const Eigen::Ref<Eigen::VectorXcd> & V,
                          const std::vector<int> & id_grid_to_solver,
-                         const Eigen::VectorXd & bus_vn_kv);
+                         const Eigen::VectorXd & bus_vn_kv,
+                         bool ac);
     void reset_results();
     virtual double get_p_slack(int slack_bus_id);
     virtual void get_q(std::vector<double>& q_by_bus);
 
     tuple3d get_res() const {return tuple3d(res_p_, res_q_, res_v_);}
     const std::vector<bool>& get_status() const {return status_;}
+    // shunts p / q are part of Ybus, they are added to the key
+    virtual void fill_topo_key(std::vector<int> & res) const;
 
     protected:
         // physical properties
@@ -60,6 +83,15 @@ class DataShunt : public DataGeneric
         Eigen::VectorXi bus_id_;
         std::vector<bool> status_;
 
+        // state of the shunts when the Ybus matrix was last computed (or updated)
+        std::vector<bool> ybus_status_;
+        Eigen::VectorXi ybus_bus_id_;
+        Eigen::VectorXd ybus_p_mw_;
+        Eigen::VectorXd ybus_q_mvar_;
+        // shunts modified since then
+        std::vector<int> changed_ids_;
+        std::vector<bool> has_changed_;
+
         //output data
         Eigen::VectorXd res_p_;  // in MW
         Eigen::VectorXd res_q_;  // in MVar
@@ -33,6 +33,96 @@ void DataTrafo::init(const Eigen::VectorXd & trafo_r,
     bus_hv_id_ = trafo_hv_id;
     bus_lv_id_ = trafo_lv_id;
     status_ = std::vector<bool>(trafo_r.size(), true);
+    has_changed_ = std::vector<bool>(trafo_r.size(), false);
+    changed_ids_ = std::vector<int>();
+}
+
+void DataTrafo::_get_ybus_coeffs(int trafo_id, bool ac, cdouble & y_off, cdouble & y_hv, cdouble & y_lv)
+{
+    // get the transformers ratio
+    double r = ratio_(trafo_id);
+
+    // subsecptance
+    cdouble h = 0.;
+    if(ac){
+        h = h_(trafo_id);
+        h = my_i * 0.5 * h;
+    }
+
+    // admittance
+    cdouble y = 0.;
+    cdouble z = x_(trafo_id);
+    if(ac){
+        z *= my_i;
+        z += r_(trafo_id);
+    }
+    if(z != 0.) y = 1.0 / z;
+
+    cdouble tmp = y / r;
+    y_off = -tmp;
+    if(!ac){
+        r = 1.0; // in dc, r = 1.0 here (same voltage both side)
+    }
+    tmp += h;
+    y_hv = tmp / r;
+    y_lv = tmp * r;
+}
+
+void DataTrafo::init_ybus_state()
+{
+    ybus_status_ = status_;
+    ybus_bus_hv_id_ = bus_hv_id_;
+    ybus_bus_lv_id_ = bus_lv_id_;
+    for(auto trafo_id : changed_ids_) has_changed_[trafo_id] = false;
+    changed_ids_.clear();
+}
+
+void DataTrafo::updateYbus(Eigen::SparseMatrix<cdouble> & res, bool ac, const std::vector<int> & id_grid_to_solver)
+{
+    cdouble y_off, y_hv, y_lv;
+    for(auto trafo_id : changed_ids_){
+        has_changed_[trafo_id] = false;
+        bool old_status = ybus_status_[trafo_id];
+        bool new_status = status_[trafo_id];
+        int old_bus_hv_id_me = ybus_bus_hv_id_(trafo_id);
+        int old_bus_lv_id_me = ybus_bus_lv_id_(trafo_id);
+        int new_bus_hv_id_me = bus_hv_id_(trafo_id);
+        int new_bus_lv_id_me = bus_lv_id_(trafo_id);
+        if(!old_status && !new_status) continue;  // nothing changed in Ybus
+        if(old_status && new_status &&
+           (old_bus_hv_id_me == new_bus_hv_id_me) &&
+           (old_bus_lv_id_me == new_bus_lv_id_me)) continue; // nothing changed in Ybus
+
+        _get_ybus_coeffs(trafo_id, ac, y_off, y_hv, y_lv);
+        if(old_status){
+            // remove the former contribution of this trafo
+            int bus_hv_solver_id = id_grid_to_solver[old_bus_hv_id_me];
+            int bus_lv_solver_id = id_grid_to_solver[old_bus_lv_id_me];
+            res.coeffRef(bus_hv_solver_id, bus_lv_solver_id) -= y_off;
+            res.coeffRef(bus_lv_solver_id, bus_hv_solver_id) -= y_off;
+            res.coeffRef(bus_hv_solver_id, bus_hv_solver_id) -= y_hv;
+            res.coeffRef(bus_lv_solver_id, bus_lv_solver_id) -= y_lv;
+        }
+        if(new_status){
+            // add its new contribution
+            int bus_hv_solver_id = id_grid_to_solver[new_bus_hv_id_me];
+            if(bus_hv_solver_id == _deactivated_bus_id){
+                throw std::runtime_error("DataTrafo::updateYbus: A trafo is connected (hv) to a disconnected bus.");
+            }
+            int bus_lv_solver_id = id_grid_to_solver[new_bus_lv_id_me];
+            if(bus_lv_solver_id == _deactivated_bus_id){
+                throw std::runtime_error("DataTrafo::updateYbus: A trafo is connected (lv) to a disconnected bus.");
+            }
+            res.coeffRef(bus_hv_solver_id, bus_lv_solver_id) += y_off;
+            res.coeffRef(bus_lv_solver_id, bus_hv_solver_id) += y_off;
+            res.coeffRef(bus_hv_solver_id, bus_hv_solver_id) += y_hv;
+            res.coeffRef(bus_lv_solver_id, bus_lv_solver_id) += y_lv;
+        }
+        ybus_status_[trafo_id] = new_status;
+        ybus_bus_hv_id_(trafo_id) = new_bus_hv_id_me;
+        ybus_bus_lv_id_(trafo_id) = new_bus_lv_id_me;
+    }
+    changed_ids_.clear();
 }
 
 void DataTrafo::fillYbus_spmat(Eigen::SparseMatrix<cdouble> & res, bool ac, const std::vector<int> & id_grid_to_solver)
@@ -90,6 +180,62 @@ void DataTrafo::fillYbus_spmat(Eigen::SparseMatrix<cdouble> & res, bool ac, cons
     }
 }
 
+void DataTrafo::fillYbus_pattern(std::vector<Eigen::Triplet<cdouble> > & res, int n_sub, int nb_bus)
+{
+    int nb_trafo = nb();
+    for(int trafo_id = 0; trafo_id < nb_trafo; ++trafo_id){
+        _fillYbus_pattern_branch(res, bus_hv_id_(trafo_id), bus_lv_id_(trafo_id), n_sub, nb_bus);
+    }
+}
+
+void DataTrafo::fillBp_Bpp(std::vector<Eigen::Triplet<double> > & Bp,
+                           std::vector<Eigen::Triplet<double> > & Bpp,
+                           const std::vector<int> & id_grid_to_solver,
+                           FDPFMethod xb_or_bx) const
+{
+    int nb_trafo = nb();
+    for(int trafo_id = 0; trafo_id < nb_trafo; ++trafo_id){
+        // i don't do anything if the trafo is disconnected
+        if(!status_[trafo_id]) continue;
+
+        int bus_hv_solver_id = id_grid_to_solver[bus_hv_id_(trafo_id)];
+        if(bus_hv_solver_id == _deactivated_bus_id){
+            throw std::runtime_error("DataTrafo::fillBp_Bpp: A trafo is connected (hv) to a disconnected bus.");
+        }
+        int bus_lv_solver_id = id_grid_to_solver[bus_lv_id_(trafo_id)];
+        if(bus_lv_solver_id == _deactivated_bus_id){
+            throw std::runtime_error("DataTrafo::fillBp_Bpp: A trafo is connected (lv) to a disconnected bus.");
+        }
+        cdouble h = my_i * 0.5 * h_(trafo_id);
+        _fillBp_Bpp_branch(Bp, Bpp, bus_hv_solver_id, bus_lv_solver_id,
+                           r_(trafo_id), x_(trafo_id), h, ratio_(trafo_id), xb_or_bx);
+    }
+}
+
+void DataTrafo::fillBf(std::vector<Eigen::Triplet<double> > & Bf,
+                       const std::vector<int> & id_grid_to_solver,
+                       int row_offset) const
+{
+    int nb_trafo = nb();
+    for(int trafo_id = 0; trafo_id < nb_trafo; ++trafo_id){
+        // i don't do anything if the trafo is disconnected
+        if(!status_[trafo_id]) continue;
+
+        int bus_hv_solver_id = id_grid_to_solver[bus_hv_id_(trafo_id)];
+        if(bus_hv_solver_id == _deactivated_bus_id){
+            throw std::runtime_error("DataTrafo::fillBf: A trafo is connected (hv) to a disconnected bus.");
+        }
+        int bus_lv_solver_id = id_grid_to_solver[bus_lv_id_(trafo_id)];
+        if(bus_lv_solver_id == _deactivated_bus_id){
+            throw std::runtime_error("DataTrafo::fillBf: A trafo is connected (lv) to a disconnected bus.");
+        }
+        double x = x_(trafo_id);
+        double y_dc = x != 0. ? 1.0 / (x * ratio_(trafo_id)) : 0.;
+        Bf.push_back(Eigen::Triplet<double>(row_offset + trafo_id, bus_hv_solver_id, y_dc));
+        Bf.push_back(Eigen::Triplet<double>(row_offset + trafo_id, bus_lv_solver_id, -y_dc));
+    }
+}
+
 void DataTrafo::fillYbus(std::vector<Eigen::Triplet<cdouble> > & res, bool ac, const std::vector<int> & id_grid_to_solver)
 {
     //TODO merge that with fillYbusBranch!
@@ -149,7 +295,8 @@ void DataTrafo::compute_results(const Eigen::Ref<Eigen::VectorXd> & Va,
                          const Eigen::Ref<Eigen::VectorXd> & Vm,
                          const Eigen::Ref<Eigen::VectorXcd> & V,
                          const std::vector<int> & id_grid_to_solver,
-                         const Eigen::VectorXd & bus_vn_kv
+                         const Eigen::VectorXd & bus_vn_kv,
+                         bool ac
                               )
 {
     // it needs to be initialized at 0.
@@ -186,23 +333,31 @@ void DataTrafo::compute_results(const Eigen::Ref<Eigen::VectorXd> & Va,
             throw std::runtime_error("DataTrafo::compute_results: A trafo is connected (lv) to a disconnected bus.");
         }
 
-        // results of the powerflow
-        cdouble Eor = V(bus_or_solver_id);
-        cdouble Eex = V(bus_ex_solver_id);
+        if(ac){
+            // results of the powerflow
+            cdouble Eor = V(bus_or_solver_id);
+            cdouble Eex = V(bus_ex_solver_id);
 
-        // powerline equations
-        cdouble I_orex = (y + h) / ratio_me * Eor - y * Eex;
-        cdouble I_exor = (y + h) * ratio_me * Eex - y * Eor;
+            // powerline equations
+            cdouble I_orex = (y + h) / ratio_me * Eor - y * Eex;
+            cdouble I_exor = (y + h) * ratio_me * Eex - y * Eor;
 
-        I_orex = std::conj(I_orex);
-        I_exor = std::conj(I_exor);
-        cdouble s_orex = Eor * I_orex;
-        cdouble s_exor = Eex * I_exor;
+            I_orex = std::conj(I_orex);
+            I_exor = std::conj(I_exor);
+            cdouble s_orex = Eor * I_orex;
+            cdouble s_exor = Eex * I_exor;
 
-        res_p_hv_(line_id) = std::real(s_orex);
-        res_q_hv_(line_id) = std::imag(s_orex);
-        res_p_lv_(line_id) = std::real(s_exor);
-        res_q_lv_(line_id) = std::imag(s_exor);
+            res_p_hv_(line_id) = std::real(s_orex);
+            res_q_hv_(line_id) = std::imag(s_orex);
+            res_p_lv_(line_id) = std::real(s_exor);
+            res_q_lv_(line_id) = std::imag(s_exor);
+        }else{
+            // dc approximation (same admittance as in fillYbus): no losses and no reactive power
+            double y_dc = x != 0. ? 1.0 / (x * ratio_me) : 0.;
+            double p_orex = y_dc * (Va(bus_or_solver_id) - Va(bus_ex_solver_id));
+            res_p_hv_(line_id) = p_orex;
+            res_p_lv_(line_id) = -p_orex;
+        }
 
         // retrieve voltages magnitude in kv instead of pu
         double v_or = Vm(bus_or_solver_id);
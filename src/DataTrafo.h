@@ -33,23 +33,66 @@ class DataTrafo : public DataGeneric
                            const Eigen::VectorXi & trafo_lv_id
               );
 
-    int nb() { return r_.size(); }
+    int nb() const { return r_.size(); }
 
-    void deactivate(int trafo_id, bool & need_reset) {_deactivate(trafo_id, status_, need_reset);}
-    void reactivate(int trafo_id, bool & need_reset) {_reactivate(trafo_id, status_, need_reset);}
-    void change_bus_hv(int trafo_id, int new_bus_id, bool & need_reset, int nb_bus) {_change_bus(trafo_id, new_bus_id, bus_hv_id_, need_reset, nb_bus);}
-    void change_bus_lv(int trafo_id, int new_bus_id, bool & need_reset, int nb_bus) {_change_bus(trafo_id, new_bus_id, bus_lv_id_, need_reset, nb_bus);}
+    void deactivate(int trafo_id, bool & need_reset) {
+        _deactivate(trafo_id, status_, need_reset);
+        _record_change(trafo_id, has_changed_, changed_ids_);
+    }
+    void reactivate(int trafo_id, bool & need_reset) {
+        _reactivate(trafo_id, status_, need_reset);
+        _record_change(trafo_id, has_changed_, changed_ids_);
+    }
+    void change_bus_hv(int trafo_id, int new_bus_id, bool & need_reset, int nb_bus) {
+        _change_bus(trafo_id, new_bus_id, bus_hv_id_, need_reset, nb_bus);
+        _record_change(trafo_id, has_changed_, changed_ids_);
+    }
+    void change_bus_lv(int trafo_id, int new_bus_id, bool & need_reset, int nb_bus) {
+        _change_bus(trafo_id, new_bus_id, bus_lv_id_, need_reset, nb_bus);
+        _record_change(trafo_id, has_changed_, changed_ids_);
+    }
     int get_bus_hv(int trafo_id) {return _get_bus(trafo_id, status_, bus_hv_id_);}
     int get_bus_lv(int trafo_id) {return _get_bus(trafo_id, status_, bus_lv_id_);}
+    // coefficients of a trafo in the ac Ybus (off diagonal coefficient, and diagonal coefficients at both its ends)
+    void get_ybus_coeffs(int trafo_id, cdouble & y_off, cdouble & y_hv, cdouble & y_lv) {
+        _get_ybus_coeffs(trafo_id, true, y_off, y_hv, y_lv);
+    }
 
     virtual void fillYbus_spmat(Eigen::SparseMatrix<cdouble> & res, bool ac, const std::vector<int> & id_grid_to_solver);
     virtual void fillYbus(std::vector<Eigen::Triplet<cdouble> > & res, bool ac, const std::vector<int> & id_grid_to_solver);
 
+    /**
+    Incremental update of the Ybus matrix, see DataLine::updateYbus
+    **/
+    void init_ybus_state();
+    void updateYbus(Eigen::SparseMatrix<cdouble> & res, bool ac, const std::vector<int> & id_grid_to_solver);
+
+    /**
+    Sparsity pattern of Ybus for the "fixed pattern" mode, see DataLine::fillYbus_pattern
+    **/
+    void fillYbus_pattern(std::vector<Eigen::Triplet<cdouble> > & res, int n_sub, int nb_bus);
+
+    /**
+    Contribution of the trafos to B' and B'', see DataLine::fillBp_Bpp
+    **/
+    virtual void fillBp_Bpp(std::vector<Eigen::Triplet<double> > & Bp,
+                            std::vector<Eigen::Triplet<double> > & Bpp,
+                            const std::vector<int> & id_grid_to_solver,
+                            FDPFMethod xb_or_bx) const;
+
+    /**
+    Contribution of the trafos to the matrix of the dc flows, see DataLine::fillBf
+    **/
+    void fillBf(std::vector<Eigen::Triplet<double> > & Bf,
+                const std::vector<int> & id_grid_to_solver,
+                int row_offset) const;
+
     void compute_results(const Eigen::Ref<Eigen::VectorXd> & Va,
                          const Eigen::Ref<Eigen::VectorXd> & Vm,
                          const Eigen::Ref<Eigen::VectorXcd> & V,
                          const std::vector<int> & id_grid_to_solver,
-                         const Eigen::VectorXd & bus_vn_kv);
+                         const Eigen::VectorXd & bus_vn_kv,
+                         bool ac);
     void reset_results();
     virtual double get_p_slack(int slack_bus_id);
     virtual void get_q(std::vector<double>& q_by_bus);
@@ -57,6 +100,14 @@ class DataTrafo : public DataGeneric
     tuple4d get_res_hv() const {return tuple4d(res_p_hv_, res_q_hv_, res_v_hv_, res_a_hv_);}
     tuple4d get_res_lv() const {return tuple4d(res_p_lv_, res_q_lv_, res_v_lv_, res_a_lv_);}
     const std::vector<bool>& get_status() const {return status_;}
+    virtual void fill_topo_key(std::vector<int> & res) const {
+        _fill_topo_key(res, status_, bus_hv_id_);
+        _fill_topo_key(res, status_, bus_lv_id_);
+    }
+
+    protected:
+        // admittance of a trafo (off diagonal coefficient, and diagonal coefficients at both its ends)
+        void _get_ybus_coeffs(int trafo_id, bool ac, cdouble & y_off, cdouble & y_hv, cdouble & y_lv);
 
     protected:
         // physical properties
@@ -70,6 +121,14 @@ class DataTrafo : public DataGeneric
         std::vector<bool> status_;
         Eigen::VectorXd ratio_;
 
+        // state of the trafos when the Ybus matrix was last computed (or updated)
+        std::vector<bool> ybus_status_;
+        Eigen::VectorXi ybus_bus_hv_id_;
+        Eigen::VectorXi ybus_bus_lv_id_;
+        // trafos modified since then
+        std::vector<int> changed_ids_;
+        std::vector<bool> has_changed_;
+
         //output data
         Eigen::VectorXd res_p_hv_;  // in MW
         Eigen::VectorXd res_q_hv_;  // in MVar
@@ -0,0 +1,188 @@
+// Copyright (c) 2020, RTE (https://www.rte-france.com)
+// See AUTHORS.txt
+// This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+// If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+// you can obtain one at http://mozilla.org/MPL/2.0/.
+// SPDX-License-Identifier: MPL-2.0
+// This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+#include "FDPFSolver.h"
+
+const cdouble FDPFSolver::my_i = {0., 1.};
+
+bool FDPFSolver::do_fdpf(const Eigen::SparseMatrix<double> & Bp,
+                         const Eigen::SparseMatrix<double> & Bpp,
+                         const Eigen::SparseMatrix<cdouble> & Ybus,
+                         Eigen::VectorXcd & V,
+                         const Eigen::VectorXcd & Sbus,
+                         const Eigen::VectorXi & pv,
+                         const Eigen::VectorXi & pq,
+                         int max_iter,
+                         double tol
+                         )
+{
+    /**
+    This method uses the fast decoupled algorithm (python implementation: "fdpf" in pypower) to compute
+    voltage angles and magnitudes at each bus of the system.
+    If Ybus, pv or pq changed, "reset" should be called before.
+    **/
+    reset_timer();
+    if(err_ > 0) return false; // i don't do anything if there were a problem at the initialization
+    auto timer = CustTimer();
+    int n_pv = pv.size();
+    int n_pq = pq.size();
+    Eigen::VectorXi pvpq(n_pv + n_pq);
+    pvpq << pv, pq;
+    int n_pvpq = pvpq.size();
+
+    V_ = V;
+    Vm_ = V_.array().abs();
+    Va_ = V_.array().arg();
+
+    // first check, if the problem is already solved, i stop there
+    Eigen::VectorXd P, Q;
+    _evaluate_mismatch(Ybus, Sbus, pvpq, pq, P, Q);
+    bool converged = _check_for_convergence(P, Q, tol);
+    nr_iter_ = 0;
+    bool res = true;
+    if(!converged && need_factorize_){
+        // B' and B'' are factorized once and for all (until the next call to "reset")
+        std::vector<int> pvpq_inv(V.size(), -1);
+        for(int inv_id=0; inv_id < n_pvpq; ++inv_id) pvpq_inv[pvpq(inv_id)] = inv_id;
+        std::vector<int> pq_inv(V.size(), -1);
+        for(int inv_id=0; inv_id < n_pq; ++inv_id) pq_inv[pq(inv_id)] = inv_id;
+        err_ = 0;
+        // very small grids: dense LU instead of the sparse solver
+        LinearSolverType linear_solver_type = Ybus.cols() <= dense_threshold_ ? LinearSolverType::DenseLU : linear_solver_type_;
+        if(Bp_solver_->get_type() != linear_solver_type){
+            Bp_solver_ = LinearSolver::create(linear_solver_type);
+            Bpp_solver_ = LinearSolver::create(linear_solver_type);
+        }
+        if(n_pvpq > 0) initialize(*Bp_solver_, Bp, pvpq, pvpq_inv);
+        if((err_ == 0) && (n_pq > 0)) initialize(*Bpp_solver_, Bpp, pq, pq_inv);
+        need_factorize_ = false;
+        if(err_ != 0) res = false;
+    }
+    while (res && (!converged) && (nr_iter_ < max_iter)){
+        nr_iter_++;
+
+        // "P" half iteration: update of the voltage angles
+        if(n_pvpq > 0){
+            solve(*Bp_solver_, P);
+            if(err_ != 0){
+                res = false;
+                break;
+            }
+            for(int i = 0; i < n_pvpq; ++i) Va_(pvpq(i)) -= P(i);
+            V_ = Vm_.array() * (Va_.array().cos().cast<cdouble>() + my_i * Va_.array().sin().cast<cdouble>() );
+            _evaluate_mismatch(Ybus, Sbus, pvpq, pq, P, Q);
+            if(!P.allFinite() || !Q.allFinite()) break; // divergence due to Nans
+            converged = _check_for_convergence(P, Q, tol);
+            if(converged) break;
+        }
+
+        // "Q" half iteration: update of the voltage magnitudes
+        if(n_pq > 0){
+            solve(*Bpp_solver_, Q);
+            if(err_ != 0){
+                res = false;
+                break;
+            }
+            for(int i = 0; i < n_pq; ++i) Vm_(pq(i)) -= Q(i);
+            V_ = Vm_.array() * (Va_.array().cos().cast<cdouble>() + my_i * Va_.array().sin().cast<cdouble>() );
+            _evaluate_mismatch(Ybus, Sbus, pvpq, pq, P, Q);
+            if(!P.allFinite() || !Q.allFinite()) break; // divergence due to Nans
+            converged = _check_for_convergence(P, Q, tol);
+        }
+    }
+    if(!converged){
+        if(err_ <= 0) err_ = 4;
+        res = false;
+    }else{
+        err_ = 0;
+    }
+    timer_total_nr_ += timer.duration();
+    return res;
+}
+
+void FDPFSolver::reset(){
+    Bp_solver_ = LinearSolver::create(linear_solver_type_);
+    Bpp_solver_ = LinearSolver::create(linear_solver_type_);
+
+    Vm_ = Eigen::VectorXd();
+    Va_ = Eigen::VectorXd();
+    V_ = Eigen::VectorXcd();
+    need_factorize_ = true;
+    nr_iter_ = 0;
+    err_ = -1;
+    reset_timer();
+}
+
+void FDPFSolver::set_linear_solver(LinearSolverType linear_solver_type){
+    if(linear_solver_type == LinearSolverType::LDLT){
+        throw std::runtime_error("FDPFSolver::set_linear_solver: B' and B'' are not symmetric, LDLT cannot be used");
+    }
+    linear_solver_type_ = linear_solver_type;
+    reset();
+}
+
+void FDPFSolver::initialize(LinearSolver & solver,
+                            const Eigen::SparseMatrix<double> & mat,
+                            const Eigen::VectorXi & ids,
+                            const std::vector<int> & ids_inv){
+    auto timer = CustTimer();
+    int n = ids.size();
+    std::vector<Eigen::Triplet<double> > tripletList;
+    tripletList.reserve(mat.nonZeros());
+    for(int col_id = 0; col_id < n; ++col_id){
+        for(Eigen::SparseMatrix<double>::InnerIterator it(mat, ids(col_id)); it; ++it){
+            int row_id = ids_inv[it.row()];
+            if(row_id < 0) continue;  // this bus is not part of the system
+            tripletList.push_back(Eigen::Triplet<double> (row_id, col_id, it.value()));
+        }
+    }
+    Eigen::SparseMatrix<double> B(n, n);
+    B.setFromTriplets(tripletList.begin(), tripletList.end());
+    B.makeCompressed();
+    bool ok = solver.analyze(B);
+    if(ok) ok = solver.factor(B);
+    ++nb_analyze_;
+    ++nb_factor_;
+    if (!ok) {
+        err_ = 1;
+    }
+    timer_initialize_ += timer.duration();
+}
+
+void FDPFSolver::solve(const LinearSolver & solver, Eigen::VectorXd & b){
+    // solves (for x) the linear system B.x = b, b is overwritten by x
+    auto timer = CustTimer();
+    bool ok = solver.solve(b);
+    if (!ok) {
+        err_ = 3;
+    }
+    timer_solve_ += timer.duration();
+}
+
+void FDPFSolver::_evaluate_mismatch(const Eigen::SparseMatrix<cdouble> & Ybus,
+                                    const Eigen::VectorXcd & Sbus,
+                                    const Eigen::VectorXi & pvpq,
+                                    const Eigen::VectorXi & pq,
+                                    Eigen::VectorXd & P,
+                                    Eigen::VectorXd & Q)
+{
+    // python implementation:
+    // mis = (V * conj(Ybus * V) - Sbus) / Vm
+    // P = mis[pvpq].real
+    // Q = mis[pq].imag
+    auto timer = CustTimer();
+    Eigen::VectorXcd tmp = Ybus * V_;
+    tmp = V_.array() * tmp.array().conjugate() - Sbus.array();
+    int n_pvpq = pvpq.size();
+    int n_pq = pq.size();
+    P.resize(n_pvpq);
+    Q.resize(n_pq);
+    for(int i = 0; i < n_pvpq; ++i) P(i) = std::real(tmp(pvpq(i))) / Vm_(pvpq(i));
+    for(int i = 0; i < n_pq; ++i) Q(i) = std::imag(tmp(pq(i))) / Vm_(pq(i));
+    timer_Fx_ += timer.duration();
+}
@@ -0,0 +1,190 @@
+// Copyright (c) 2020, RTE (https://www.rte-france.com)
+// See AUTHORS.txt
+// This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+// If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+// you can obtain one at http://mozilla.org/MPL/2.0/.
+// SPDX-License-Identifier: MPL-2.0
+// This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+#ifndef FDPFSOLVER_H
+#define FDPFSOLVER_H
+
+#include <iostream>
+#include <vector>
+#include <stdio.h>
+#include <cstdint> // for int32
+#include <chrono>
+#include <complex>      // std::complex, std::conj
+#include <cmath>  // for PI
+
+// eigen is necessary to easily pass data from numpy to c++ without any copy.
+// and to optimize the matrix operations
+#include "Eigen/Core"
+#include "Eigen/Dense"
+#include "Eigen/SparseCore"
+
+#include "CustTimer.h"
+#include "Utils.h"
+#include "LinearSolver.h"
+
+/**
+class to handle the solver using the fast decoupled method (XB or BX variant, see the "fdpf" function of pypower).
+
+Instead of the jacobian matrix, it uses two constant matrices B' (for the active power / voltage angles) and
+B'' (for the reactive power / voltage magnitudes). These are factorized (with KLU by default, see set_linear_solver)
+the first time "do_fdpf" is called after a "reset" and each iteration then only requires two triangular solves (one
+for each half iteration).
+
+As long as the admittance matrix (and pv / pq) of the system does not change, the same solver (and its
+factorizations) can be reused without calling "reset".
+**/
+class FDPFSolver
+{
+    public:
+        FDPFSolver():linear_solver_type_(LinearSolverType::KLU),dense_threshold_(LinearSolver::default_dense_threshold),
+                     need_factorize_(true),nr_iter_(0),err_(-1),
+                     nb_analyze_(0),nb_factor_(0){
+            reset();
+        }
+
+        Eigen::Ref<Eigen::VectorXd> get_Va(){
+            return Va_;
+        }
+        Eigen::Ref<Eigen::VectorXd> get_Vm(){
+            return Vm_;
+        }
+        Eigen::Ref<Eigen::VectorXcd> get_V(){
+            return V_;
+        }
+        int get_error(){
+            return err_;
+        }
+        int get_nb_iter(){
+            return nr_iter_;
+        }
+        bool converged(){
+            return err_ == 0;
+        }
+        // same timers as KLUSolver::get_timers (timer_dSbus_ and timer_fillJ_ are always 0. here)
+        std::tuple<double, double, double, double, double, double, double> get_timers()
+        {
+            auto res = std::tuple<double, double, double, double, double, double, double>(
+              timer_Fx_, timer_solve_, timer_initialize_, timer_check_, 0., 0., timer_total_nr_);
+            return res;
+        }
+        // number of calls to klu_analyze, klu_factor (for B' and B'') and klu_refactor (always 0.)
+        std::tuple<int, int, int> get_nb_factorizations() const
+        {
+            return std::tuple<int, int, int>(nb_analyze_, nb_factor_, 0);
+        }
+
+        /**
+        B' and B'' should be given with the same bus ids as Ybus (see GridModel::fillBp_Bpp), only their
+        [pvpq, pvpq] and [pq, pq] parts are used. They are not read if the solver has already been factorized.
+
+        An iteration is made of a "P" half iteration (update of the voltage angles of pv and pq buses) followed
+        by a "Q" half iteration (update of the voltage magnitudes of the pq buses). Convergence is checked
+        after each half iteration.
+        **/
+        bool do_fdpf(const Eigen::SparseMatrix<double> & Bp,
+                     const Eigen::SparseMatrix<double> & Bpp,
+                     const Eigen::SparseMatrix<cdouble> & Ybus,
+                     Eigen::VectorXcd & V,
+                     const Eigen::VectorXcd & Sbus,
+                     const Eigen::VectorXi & pv,
+                     const Eigen::VectorXi & pq,
+                     int max_iter,
+                     double tol
+                     );
+
+        void reset();
+
+        /**
+        sparse linear solver used for B' and B'' (they are not symmetric in general, LDLT cannot be used).
+        Changing it resets the solver.
+        **/
+        void set_linear_solver(LinearSolverType linear_solver_type);
+        LinearSolverType get_linear_solver() const {return linear_solver_type_;}
+        // B' and B'' are factorized with DenseLU for grids with at most "dense_threshold" buses (see KLUSolver)
+        void set_dense_threshold(int dense_threshold){dense_threshold_ = dense_threshold;}
+        int get_dense_threshold() const {return dense_threshold_;}
+
+    protected:
+        void reset_timer(){
+            timer_Fx_ = 0.;
+            timer_solve_ = 0.;
+            timer_initialize_ = 0.;
+            timer_check_ = 0.;
+            timer_total_nr_ = 0.;
+        }
+
+        /**
+        extract mat[ids, ids] (ids_inv[bus_id] is the position of bus_id in ids, or -1) and factorize it
+        **/
+        void initialize(LinearSolver & solver,
+                        const Eigen::SparseMatrix<double> & mat,
+                        const Eigen::VectorXi & ids,
+                        const std::vector<int> & ids_inv);
+
+        void solve(const LinearSolver & solver, Eigen::VectorXd & b);
+
+        /**
+        mismatch (divided by Vm, as in pypower) for the active power at the pvpq buses ("P")
+        and for the reactive power at the pq buses ("Q")
+        **/
+        void _evaluate_mismatch(const Eigen::SparseMatrix<cdouble> & Ybus,
+                                const Eigen::VectorXcd & Sbus,
+                                const Eigen::VectorXi & pvpq,
+                                const Eigen::VectorXi & pq,
+                                Eigen::VectorXd & P,
+                                Eigen::VectorXd & Q);
+
+        bool _check_for_convergence(const Eigen::VectorXd & P,
+                                    const Eigen::VectorXd & Q,
+                                    double tol)
+        {
+            auto timer = CustTimer();
+            bool res = true;
+            if(P.size() > 0) res = P.lpNorm<Eigen::Infinity>() < tol;
+            if(res && Q.size() > 0) res = Q.lpNorm<Eigen::Infinity>() < tol;
+            timer_check_ += timer.duration();
+            return res;
+        }
+
+    private:
+        LinearSolverType linear_solver_type_;
+        int dense_threshold_;
+        std::unique_ptr<LinearSolver> Bp_solver_;  // factorization of B'[pvpq, pvpq]
+        std::unique_ptr<LinearSolver> Bpp_solver_;  // factorization of B''[pq, pq]
+
+        // solution of the problem
+        Eigen::VectorXd Vm_;  // voltage magnitude
+        Eigen::VectorXd Va_;  // voltage angle
+        Eigen::VectorXcd V_;  // complex voltage
+        bool need_factorize_;
+        int nr_iter_;  // number of (full) iterations performed
+        int err_; //error message, same as KLUSolver:
+        // -1 : the solver has not been initialized (call initialize in this case)
+        // 0 everything ok
+        // 1: i can't factorize the matrix (klu_factor)
+        // 3: i can't solve the system (klu_solve)
+        // 4: end of possible iterations (divergence because nr_iter_ >= max_iter
+
+        // statistics about the factorizations
+        int nb_analyze_;
+        int nb_factor_;
+
+        // timers
+        double timer_Fx_;
+        double timer_solve_;
+        double timer_initialize_;
+        double timer_check_;
+        double timer_total_nr_;
+
+        // no copy allowed
+        FDPFSolver( const FDPFSolver & ) ;
+        FDPFSolver & operator=( const FDPFSolver & ) ;
+        static const cdouble my_i;
+};
+
+#endif // FDPFSOLVER_H
@@ -8,6 +8,9 @@
 
 #include "GridModel.h"
 
+const double GridModel::split_grid_tol_ = 1e-8;
+const int GridModel::sensitivity_chunk_size_ = 64;
+
 GridModel::GridModel(const GridModel & other)
 {
     /** done in reset
@@ -50,6 +53,27 @@ GridModel::GridModel(const GridModel & other)
     gen_slackbus_ = other.gen_slackbus_;
     slack_bus_id_ = other.slack_bus_id_;
 
+    // solver options
+    fixed_pattern_ = other.fixed_pattern_;
+    pf_algorithm_ = other.pf_algorithm_;
+    set_linear_solver(other.get_linear_solver());
+    set_dc_linear_solver(other.get_dc_linear_solver());
+    set_dense_threshold(other.dense_threshold_);
+    set_dc_dense_threshold(other.get_dc_dense_threshold());
+    dc_slack_bus_id_solver_ = -1;  // dcYbus_ is not copied (dc_topo_key_ is empty)
+    _solver.set_chord(other._solver.get_chord());
+    double chord_max_ratio;
+    int chord_max_reuse;
+    std::tie(chord_max_ratio, chord_max_reuse) = other._solver.get_chord_policy();
+    _solver.set_chord_policy(chord_max_ratio, chord_max_reuse);
+    topo_cache_capacity_ = other.topo_cache_capacity_;  // the content of the cache is not copied
+    topo_cache_hits_ = 0;
+    topo_cache_misses_ = 0;
+    uf_nb_build_ = 0;  // the union find of the buses is built again at the first check
+    uf_nb_update_ = 0;
+    connectivity_changed_ = true;
+    connectivity_status_ = ConnectivityStatus::CONNECTED;
+
     // specific grid2op
     n_sub_ = other.n_sub_;
     load_pos_topo_vect_ = other.load_pos_topo_vect_;
@@ -77,6 +101,7 @@ void GridModel::init_bus(const Eigen::VectorXd & bus_vn_kv, int nb_line, int nb_
     bus_vn_kv_ = bus_vn_kv;  // base_kv
 
     bus_status_ = std::vector<bool>(nb_bus, true); // by default everything is connected
+    connectivity_changed_ = true;
 }
 
 void GridModel::reset()
@@ -89,7 +114,54 @@ void GridModel::reset()
     bus_pv_ = Eigen::VectorXi();
     bus_pq_ = Eigen::VectorXi();
     need_reset_ = true;
+    topo_changed_ = true;
+    topo_key_valid_ = false;
+}
 
+void GridModel::prepare_ac_pf()
+{
+    if(need_reset_ || topo_changed_){
+        // B' and B'' (fast decoupled powerflow) will be computed and factorized again if needed
+        Bp_ = Eigen::SparseMatrix<double>();
+        Bpp_ = Eigen::SparseMatrix<double>();
+        _fdpf_solver.reset();
+    }
+    if(fixed_pattern_ && (need_reset_ || topo_changed_)){
+        // Ybus_ is computed again, but its sparsity pattern is the same, so the solver is not reset
+        init_Ybus_fixed_pattern();
+    }else if((need_reset_ || topo_changed_) && use_topo_cache()){
+        // this topology has been used recently: Ybus, pv / pq and the KLU factorization are taken from the cache
+    }else if(need_reset_){
+        // the topology (or a shunt) changed since last call: Ybus, bus ordering, pv / pq
+        // and the symbolic factorization of the solver need to be computed from scratch
+        reset();
+        slack_bus_id_ = generators_.get_slack_bus_id(gen_slackbus_);
+        init_Ybus(Ybus_, Sbus_, id_me_to_solver_, id_solver_to_me_, slack_bus_id_solver_);
+        fillYbus(Ybus_, true, id_me_to_solver_);
+        init_ybus_state();
+        fillpv_pq(id_me_to_solver_);
+        generators_.init_q_vector(bus_vn_kv_.size());
+        _solver.reset();
+    }else if(topo_changed_){
+        // some elements changed of bus / status, but the buses are the same: only the contributions
+        // of these elements are updated in Ybus, pv / pq and the solver are recomputed
+        need_reset_ = true;  // in case something goes wrong here, everything will be recomputed next time
+        slack_bus_id_ = generators_.get_slack_bus_id(gen_slackbus_);
+        slack_bus_id_solver_ = id_me_to_solver_[slack_bus_id_];
+        if(slack_bus_id_solver_ == _deactivated_bus_id){
+            throw std::runtime_error("The slack bus is disconnected.");
+        }
+        update_Ybus();
+        Sbus_.setZero();
+        fillpv_pq(id_me_to_solver_);
+        generators_.init_q_vector(bus_vn_kv_.size());
+        _solver.reset();
+        need_reset_ = false;
+    }else{
+        // only the injections changed: Ybus, pv, pq and the KLU symbolic / numeric objects are
+        // kept, only Sbus is recomputed (the jacobian will be "klu_refactor"ed)
+        Sbus_.setZero();
+    }
 }
 
 Eigen::VectorXcd GridModel::ac_pf(const Eigen::VectorXcd & Vinit,
@@ -104,15 +176,12 @@ Eigen::VectorXcd GridModel::ac_pf(const Eigen::VectorXcd & Vinit,
     Eigen::VectorXcd res = Eigen::VectorXcd();
     Eigen::VectorXcd res_tmp = Eigen::VectorXcd();
 
-    // if(need_reset_){ // TODO optimization when it's not mandatory to start from scratch
-    reset();
-    slack_bus_id_ = generators_.get_slack_bus_id(gen_slackbus_);
-    init_Ybus(Ybus_, Sbus_, id_me_to_solver_, id_solver_to_me_, slack_bus_id_solver_);
-    fillYbus(Ybus_, true, id_me_to_solver_);
-    fillpv_pq(id_me_to_solver_);
-    generators_.init_q_vector(bus_vn_kv_.size());
-    _solver.reset();
-    // }
+    if((need_reset_ || topo_changed_) && (check_connectivity() != ConnectivityStatus::CONNECTED)){
+        // the grid cannot be solved, nothing is computed (and Ybus is kept for the previous topology)
+        reset_results();
+        return res;
+    }
+    prepare_ac_pf();
     fillSbus_me(Sbus_, true, id_me_to_solver_, slack_bus_id_solver_);
 
     int nb_bus_solver = id_solver_to_me_.size();
@@ -122,15 +191,23 @@ Eigen::VectorXcd GridModel::ac_pf(const Eigen::VectorXcd & Vinit,
         cdouble tmp = Vinit(bus_me_id);
         V(bus_solver_id) = tmp;
         // TODO save this V somewhere
+        // disconnected buses are kept in the "fixed pattern" mode, their voltage is not used
+        if(!bus_status_[bus_me_id]) V(bus_solver_id) = 1.0;
     }
 
     generators_.set_vm(V, id_me_to_solver_);
-    conv = _solver.do_newton(Ybus_, V, Sbus_, bus_pv_, bus_pq_, max_iter, tol);
+    if(use_fdpf()){
+        if(Bp_.cols() != nb_bus_solver) fillBp_Bpp();
+        conv = _fdpf_solver.do_fdpf(Bp_, Bpp_, Ybus_, V, Sbus_, bus_pv_, bus_pq_, max_iter, tol);
+    }
+    else if(fixed_pattern_) conv = _solver.do_newton_fixed_pattern(Ybus_, V, Sbus_, bus_pv_, bus_pq_, max_iter, tol);
+    else conv = _solver.do_newton(Ybus_, V, Sbus_, bus_pv_, bus_pq_, max_iter, tol);
     if (conv){
         // timer = CustTimer();
         compute_results();
         need_reset_ = false;
-        res_tmp = _solver.get_V();
+        topo_key_valid_ = (topo_cache_capacity_ > 0) && !fixed_pattern_;
+        res_tmp = get_V_solver();
         // convert back the results to "big" vector
         res = Eigen::VectorXcd::Constant(Vinit.size(), 0.);
         for (int bus_id_me=0; bus_id_me < nb_bus; ++bus_id_me){
@@ -146,10 +223,558 @@ Eigen::VectorXcd GridModel::ac_pf(const Eigen::VectorXcd & Vinit,
         //powerflow diverge
         reset_results();
         need_reset_ = true;  // in this case, the powerflow diverge, so i need to recompute Ybus next time
+        topo_key_valid_ = false;
     }
     return res;
 };
 
+TimeSeriesRes GridModel::compute_time_series(const Eigen::Ref<const RealMat> & loads_p,
+                                             const Eigen::Ref<const RealMat> & loads_q,
+                                             const Eigen::Ref<const RealMat> & gens_p,
+                                             const Eigen::Ref<const RealMat> & gens_v,
+                                             const Eigen::VectorXcd & Vinit,
+                                             int max_iter,
+                                             double tol)
+{
+    const int nb_ts = loads_p.rows();
+    check_injections_size(loads_p, loads_q, gens_p, gens_v, "compute_time_series");
+    const int nb_bus = bus_vn_kv_.size();
+    if(Vinit.size() != nb_bus){
+        throw std::runtime_error("GridModel::compute_time_series: Vinit should have one component per bus (both connected and disconnected)");
+    }
+
+    // all the results are allocated once
+    const int nb_line = powerlines_.nb();
+    const int nb_branch = nb_line + trafos_.nb();
+    const double nan = std::numeric_limits<double>::quiet_NaN();
+    Eigen::Array<bool, Eigen::Dynamic, 1> converged = Eigen::Array<bool, Eigen::Dynamic, 1>::Constant(nb_ts, false);
+    CplxMat V_res = CplxMat::Constant(nb_ts, nb_bus, cdouble(nan, nan));
+    std::vector<RealMat> flows_res(6, RealMat::Constant(nb_ts, nb_branch, nan));  // p_or, q_or, a_or, p_ex, q_ex, a_ex
+
+    Eigen::VectorXcd V = Vinit;
+    for(int ts = 0; ts < nb_ts; ++ts){
+        set_injections(loads_p, loads_q, gens_p, gens_v, ts);
+        Eigen::VectorXcd V_ts = ac_pf(V, max_iter, tol);
+        if(V_ts.size() == 0){
+            // the next time step starts from Vinit again
+            V = Vinit;
+            continue;
+        }
+        converged(ts) = true;
+        V = V_ts;
+        V_res.row(ts) = V_ts;
+        get_branch_flows(flows_res, ts);
+    }
+    return TimeSeriesRes(std::move(converged), std::move(V_res),
+                         std::move(flows_res[0]), std::move(flows_res[1]), std::move(flows_res[2]),
+                         std::move(flows_res[3]), std::move(flows_res[4]), std::move(flows_res[5]));
+}
+
+TimeSeriesRes GridModel::ac_pf_batch(const Eigen::Ref<const RealMat> & loads_p,
+                                     const Eigen::Ref<const RealMat> & loads_q,
+                                     const Eigen::Ref<const RealMat> & gens_p,
+                                     const Eigen::Ref<const RealMat> & gens_v,
+                                     const Eigen::VectorXcd & Vinit,
+                                     int max_iter,
+                                     double tol,
+                                     int batch_size)
+{
+    const int nb_scenario = loads_p.rows();
+    check_injections_size(loads_p, loads_q, gens_p, gens_v, "ac_pf_batch");
+    const int nb_bus = bus_vn_kv_.size();
+    if(Vinit.size() != nb_bus){
+        throw std::runtime_error("GridModel::ac_pf_batch: Vinit should have one component per bus (both connected and disconnected)");
+    }
+    if(batch_size <= 0){
+        throw std::runtime_error("GridModel::ac_pf_batch: batch_size should be > 0");
+    }
+
+    // all the results are allocated once
+    const int nb_branch = powerlines_.nb() + trafos_.nb();
+    const double nan = std::numeric_limits<double>::quiet_NaN();
+    Eigen::Array<bool, Eigen::Dynamic, 1> converged = Eigen::Array<bool, Eigen::Dynamic, 1>::Constant(nb_scenario, false);
+    CplxMat V_res = CplxMat::Constant(nb_scenario, nb_bus, cdouble(nan, nan));
+    std::vector<RealMat> flows_res(6, RealMat::Constant(nb_scenario, nb_branch, nan));  // p_or, q_or, a_or, p_ex, q_ex, a_ex
+    batch_nb_iter_ = Eigen::VectorXi::Constant(nb_scenario, -1);
+    if(nb_scenario == 0) return TimeSeriesRes(std::move(converged), std::move(V_res),
+                                              std::move(flows_res[0]), std::move(flows_res[1]), std::move(flows_res[2]),
+                                              std::move(flows_res[3]), std::move(flows_res[4]), std::move(flows_res[5]));
+    if((need_reset_ || topo_changed_) && (check_connectivity() != ConnectivityStatus::CONNECTED)){
+        // the grid cannot be solved (see ac_pf): no scenario is computed, and nothing is prepared
+        reset_results();
+        return TimeSeriesRes(std::move(converged), std::move(V_res),
+                             std::move(flows_res[0]), std::move(flows_res[1]), std::move(flows_res[2]),
+                             std::move(flows_res[3]), std::move(flows_res[4]), std::move(flows_res[5]));
+    }
+
+    // Ybus, pv / pq (and the symbolic factorization of the jacobian) are the same for all the scenarios
+    prepare_ac_pf();
+    const int nb_bus_solver = id_solver_to_me_.size();
+    Eigen::VectorXcd V0 = Eigen::VectorXcd::Constant(nb_bus_solver, 1.0);
+    for(int bus_solver_id = 0; bus_solver_id < nb_bus_solver; ++bus_solver_id){
+        int bus_me_id = id_solver_to_me_[bus_solver_id];
+        if(bus_status_[bus_me_id]) V0(bus_solver_id) = Vinit(bus_me_id);
+    }
+
+    Eigen::VectorXcd V_scenario;
+    Eigen::VectorXd Va, Vm;
+    Eigen::VectorXi nb_iter;
+    int nb_conv = 0;
+    for(int start = 0; start < nb_scenario; start += batch_size){
+        const int nb_batch = std::min(batch_size, nb_scenario - start);
+        // injections and initial voltages (the voltage setpoints of the generators differ) of each scenario
+        CplxMat V(nb_bus_solver, nb_batch);
+        CplxMat Sbus(nb_bus_solver, nb_batch);
+        for(int k = 0; k < nb_batch; ++k){
+            set_injections(loads_p, loads_q, gens_p, gens_v, start + k);
+            Sbus_.setZero();
+            fillSbus_me(Sbus_, true, id_me_to_solver_, slack_bus_id_solver_);
+            Sbus.col(k) = Sbus_;
+            V_scenario = V0;
+            generators_.set_vm(V_scenario, id_me_to_solver_);
+            V.col(k) = V_scenario;
+        }
+
+        nb_conv += _solver.do_newton_batch(Ybus_, V, Sbus, bus_pv_, bus_pq_, max_iter, tol, nb_iter);
+
+        for(int k = 0; k < nb_batch; ++k){
+            if(nb_iter(k) < 0) continue;
+            const int scenario_id = start + k;
+            converged(scenario_id) = true;
+            batch_nb_iter_(scenario_id) = nb_iter(k);
+            V_scenario = V.col(k);
+            Vm = V_scenario.array().abs();
+            Va = V_scenario.array().arg();
+            V_res.row(scenario_id).setZero();
+            for(int bus_id_me = 0; bus_id_me < nb_bus; ++bus_id_me){
+                if(!bus_status_[bus_id_me]) continue;
+                V_res(scenario_id, bus_id_me) = V_scenario(id_me_to_solver_[bus_id_me]);
+            }
+            // only the flows on the branches are computed
+            powerlines_.compute_results(Va, Vm, V_scenario, id_me_to_solver_, bus_vn_kv_, true);
+            trafos_.compute_results(Va, Vm, V_scenario, id_me_to_solver_, bus_vn_kv_, true);
+            get_branch_flows(flows_res, scenario_id);
+        }
+    }
+    const bool factorized = (nb_conv > 0) || _solver.has_factorization();
+    // the fixed pattern mode uses another jacobian matrix
+    if(fixed_pattern_) _solver.reset();
+    if(factorized){
+        need_reset_ = false;
+        topo_key_valid_ = (topo_cache_capacity_ > 0) && !fixed_pattern_;
+    }else{
+        // all the scenarios diverged (as in ac_pf): everything is recomputed next time
+        need_reset_ = true;
+        topo_key_valid_ = false;
+    }
+    // the results of the elements would mix different scenarios
+    reset_results();
+    return TimeSeriesRes(std::move(converged), std::move(V_res),
+                         std::move(flows_res[0]), std::move(flows_res[1]), std::move(flows_res[2]),
+                         std::move(flows_res[3]), std::move(flows_res[4]), std::move(flows_res[5]));
+}
+
+void GridModel::check_injections_size(const Eigen::Ref<const RealMat> & loads_p,
+                                      const Eigen::Ref<const RealMat> & loads_q,
+                                      const Eigen::Ref<const RealMat> & gens_p,
+                                      const Eigen::Ref<const RealMat> & gens_v,
+                                      const std::string & caller) const
+{
+    const int nb_row = loads_p.rows();
+    const int nb_load = loads_.nb();
+    const int nb_gen = generators_.nb();
+    if(loads_p.cols() != nb_load || loads_q.rows() != nb_row || loads_q.cols() != nb_load){
+        throw std::runtime_error("GridModel::" + caller + ": loads_p and loads_q should have one row per time step (or scenario) and one column per load");
+    }
+    if(gens_p.rows() != nb_row || gens_p.cols() != nb_gen || gens_v.rows() != nb_row || gens_v.cols() != nb_gen){
+        throw std::runtime_error("GridModel::" + caller + ": gens_p and gens_v should have one row per time step (or scenario) and one column per generator");
+    }
+}
+
+void GridModel::set_injections(const Eigen::Ref<const RealMat> & loads_p,
+                               const Eigen::Ref<const RealMat> & loads_q,
+                               const Eigen::Ref<const RealMat> & gens_p,
+                               const Eigen::Ref<const RealMat> & gens_v,
+                               int row)
+{
+    // the values of the disconnected elements are not used
+    const std::vector<bool> & load_status = loads_.get_status();
+    const std::vector<bool> & gen_status = generators_.get_status();
+    const int nb_load = loads_.nb();
+    const int nb_gen = generators_.nb();
+    for(int load_id = 0; load_id < nb_load; ++load_id){
+        if(!load_status[load_id]) continue;
+        change_p_load(load_id, loads_p(row, load_id));
+        change_q_load(load_id, loads_q(row, load_id));
+    }
+    for(int gen_id = 0; gen_id < nb_gen; ++gen_id){
+        if(!gen_status[gen_id]) continue;
+        change_p_gen(gen_id, gens_p(row, gen_id));
+        change_v_gen(gen_id, gens_v(row, gen_id));
+    }
+}
+
+void GridModel::get_branch_flows(std::vector<RealMat> & flows_res, int row)
+{
+    // results of the powerlines, then of the trafos
+    const tuple4d res_line_or = powerlines_.get_lineor_res();
+    const tuple4d res_line_ex = powerlines_.get_lineex_res();
+    const tuple4d res_trafo_hv = trafos_.get_res_hv();
+    const tuple4d res_trafo_lv = trafos_.get_res_lv();
+    flows_res[0].row(row) << std::get<0>(res_line_or).transpose(), std::get<0>(res_trafo_hv).transpose();
+    flows_res[1].row(row) << std::get<1>(res_line_or).transpose(), std::get<1>(res_trafo_hv).transpose();
+    flows_res[2].row(row) << std::get<3>(res_line_or).transpose(), std::get<3>(res_trafo_hv).transpose();
+    flows_res[3].row(row) << std::get<0>(res_line_ex).transpose(), std::get<0>(res_trafo_lv).transpose();
+    flows_res[4].row(row) << std::get<1>(res_line_ex).transpose(), std::get<1>(res_trafo_lv).transpose();
+    flows_res[5].row(row) << std::get<3>(res_line_ex).transpose(), std::get<3>(res_trafo_lv).transpose();
+}
+
+ContingencyRes GridModel::run_n1(const std::vector<Contingency> & contingency_list,
+                                 const Eigen::VectorXcd & Vinit,
+                                 int max_iter,
+                                 double tol,
+                                 int n_threads)
+{
+    check_contingencies(contingency_list);
+    const Eigen::VectorXcd V_base = ac_pf(Vinit, max_iter, tol);
+    if(V_base.size() == 0){
+        throw std::runtime_error("GridModel::run_n1: the powerflow of the base case diverged");
+    }
+
+    const int nb_cont = contingency_list.size();
+    const int nb_branch = powerlines_.nb() + trafos_.nb();
+    const double nan = std::numeric_limits<double>::quiet_NaN();
+    Eigen::Array<bool, Eigen::Dynamic, 1> converged = Eigen::Array<bool, Eigen::Dynamic, 1>::Constant(nb_cont, false);
+    RealMat p_or = RealMat::Constant(nb_cont, nb_branch, nan);
+    RealMat a_or = RealMat::Constant(nb_cont, nb_branch, nan);
+    if(n_threads <= 0) n_threads = std::max(1, static_cast<int>(std::thread::hardware_concurrency()));
+    n_threads = std::max(1, std::min(n_threads, nb_cont));
+
+    // each thread has its own copy of the grid, the contingencies are given to the threads one by one
+    std::vector<std::unique_ptr<GridModel> > models;
+    for(int thread_id = 0; thread_id < n_threads; ++thread_id) models.push_back(std::make_unique<GridModel>(*this));
+    std::atomic<int> next_cont(0);
+    auto worker = [&](GridModel & model){
+        std::vector<std::pair<ElementType, int> > disconnected;
+        for(int cont_id = next_cont++; cont_id < nb_cont; cont_id = next_cont++){
+            disconnected.clear();
+            for(const auto & el : contingency_list[cont_id]){
+                if(!model.get_element_status(el.first, el.second)) continue;
+                model.change_element_status(el.first, el.second, false);
+                disconnected.push_back(el);
+            }
+            try{
+                const Eigen::VectorXcd V = model.ac_pf(V_base, max_iter, tol);
+                if(V.size() > 0){
+                    // each thread writes different rows of the results
+                    converged(cont_id) = true;
+                    const tuple4d res_line_or = model.powerlines_.get_lineor_res();
+                    const tuple4d res_trafo_hv = model.trafos_.get_res_hv();
+                    p_or.row(cont_id) << std::get<0>(res_line_or).transpose(), std::get<0>(res_trafo_hv).transpose();
+                    a_or.row(cont_id) << std::get<3>(res_line_or).transpose(), std::get<3>(res_trafo_hv).transpose();
+                }
+            }catch(const std::exception &){
+                // eg the slack bus is disconnected: this powerflow diverged, Ybus will be computed from scratch next time
+                model.need_reset_ = true;
+            }
+            // back to the base case topology
+            for(const auto & el : disconnected) model.change_element_status(el.first, el.second, true);
+        }
+    };
+    if(n_threads == 1){
+        worker(*models[0]);
+    }else{
+        std::vector<std::thread> threads;
+        for(int thread_id = 0; thread_id < n_threads; ++thread_id) threads.emplace_back(worker, std::ref(*models[thread_id]));
+        for(auto & thread : threads) thread.join();
+    }
+    return ContingencyRes(std::move(converged), std::move(p_or), std::move(a_or));
+}
+
+void GridModel::check_contingencies(const std::vector<Contingency> & contingency_list) const
+{
+    for(const auto & contingency : contingency_list){
+        for(const auto & el : contingency){
+            int nb_el = 0;
+            switch(el.first){
+                case ElementType::LINE: nb_el = powerlines_.nb(); break;
+                case ElementType::TRAFO: nb_el = trafos_.nb(); break;
+                case ElementType::GEN: nb_el = generators_.nb(); break;
+            }
+            if((el.second < 0) || (el.second >= nb_el)){
+                throw std::runtime_error("GridModel::run_n1: a contingency contains an element id that does not exist (" + std::to_string(el.second) + ")");
+            }
+        }
+    }
+}
+
+bool GridModel::get_element_status(ElementType element_type, int element_id) const
+{
+    switch(element_type){
+        case ElementType::LINE: return powerlines_.get_status()[element_id];
+        case ElementType::TRAFO: return trafos_.get_status()[element_id];
+        case ElementType::GEN: return generators_.get_status()[element_id];
+    }
+    return false;
+}
+
+void GridModel::change_element_status(ElementType element_type, int element_id, bool status)
+{
+    switch(element_type){
+        case ElementType::LINE:
+            if(status) reactivate_powerline(element_id);
+            else deactivate_powerline(element_id);
+            break;
+        case ElementType::TRAFO:
+            if(status) reactivate_trafo(element_id);
+            else deactivate_trafo(element_id);
+            break;
+        case ElementType::GEN:
+            if(status) reactivate_gen(element_id);
+            else deactivate_gen(element_id);
+            break;
+    }
+}
+
+ACContingencyRes GridModel::ac_n1_screening(const Eigen::VectorXcd & Vinit,
+                                            const Eigen::VectorXi & branch_ids,
+                                            int max_iter,
+                                            double tol,
+                                            int nb_step)
+{
+    if(use_fdpf() || fixed_pattern_){
+        throw std::runtime_error("GridModel::ac_n1_screening: it requires the newton raphson algorithm, and is not available in the \"fixed pattern\" mode");
+    }
+    if(nb_step <= 0){
+        throw std::runtime_error("GridModel::ac_n1_screening: nb_step should be > 0");
+    }
+    check_branch_ids(branch_ids, "ac_n1_screening");
+    if(ac_pf(Vinit, max_iter, tol).size() == 0){
+        throw std::runtime_error("GridModel::ac_n1_screening: the powerflow of the base case diverged");
+    }
+    // the jacobian is factorized at the solution of the base case (do_newton factorized the one of its last iteration)
+    const Eigen::VectorXcd V_base = _solver.get_V();
+    if(!_solver.factorize_jacobian(Ybus_, V_base, bus_pv_, bus_pq_)){
+        _solver.reset();
+        throw std::runtime_error("GridModel::ac_n1_screening: the jacobian matrix of the base case cannot be factorized");
+    }
+
+    const int nb_bus_solver = id_solver_to_me_.size();
+    const int n_pv = bus_pv_.size();
+    const int n_pq = bus_pq_.size();
+    const int n_pvpq = n_pv + n_pq;
+    Eigen::VectorXi bus_pvpq(n_pvpq);
+    bus_pvpq << bus_pv_, bus_pq_;
+    // row of the jacobian of the angle (and of p) and of the magnitude (and of q) of each bus (-1: not a variable)
+    std::vector<int> va_row(nb_bus_solver, -1);
+    std::vector<int> vm_row(nb_bus_solver, -1);
+    for(int i = 0; i < n_pvpq; ++i) va_row[bus_pvpq(i)] = i;
+    for(int i = 0; i < n_pq; ++i) vm_row[bus_pq_(i)] = n_pvpq + i;
+
+    struct Outage
+    {
+        int cont_id;
+        int branch_id;
+        int nb_end;  // 1 if the branch is connected to the same bus at both ends
+        int bus[2];
+        cdouble y[2][2];  // currents injected by the branch: I(bus[a]) = sum_b y[a][b] * V(bus[b])
+        std::vector<int> rows;  // variables (rows and columns of the jacobian) at its ends
+        int first_col;  // column of its first variable in Z
+        Eigen::MatrixXd M;  // jacobian after the outage: J + E.M.E^T (E: columns "rows" of the identity)
+        Eigen::FullPivLU<Eigen::MatrixXd> C_lu;  // I + M.E^T.J^-1.E
+    };
+    // mismatch (same as KLUSolver::_evaluate_Fx) of each column of V, without the outaged branch of this column
+    Eigen::MatrixXcd Ibus;
+    Eigen::VectorXcd mis;
+    auto compute_mismatch = [&](const std::vector<Outage> & outages, const Eigen::MatrixXcd & V, Eigen::MatrixXd & F){
+        Ibus.noalias() = Ybus_ * V;
+        F.resize(n_pvpq + n_pq, V.cols());
+        for(int col = 0; col < V.cols(); ++col){
+            const Outage & outage = outages[col];
+            for(int a = 0; a < outage.nb_end; ++a){
+                for(int b = 0; b < outage.nb_end; ++b) Ibus(outage.bus[a], col) -= outage.y[a][b] * V(outage.bus[b], col);
+            }
+            mis = V.col(col).array() * Ibus.col(col).array().conjugate() - Sbus_.array();
+            F.col(col) << mis.real()(bus_pvpq), mis.imag()(bus_pq_);
+        }
+    };
+
+    // results of the base case, for the outages that do not change anything
+    const int nb_branch = powerlines_.nb() + trafos_.nb();
+    const int nb_cont = branch_ids.size();
+    Eigen::RowVectorXd p_or_base(nb_branch);
+    Eigen::RowVectorXd a_or_base(nb_branch);
+    p_or_base << std::get<0>(powerlines_.get_lineor_res()).transpose(), std::get<0>(trafos_.get_res_hv()).transpose();
+    a_or_base << std::get<3>(powerlines_.get_lineor_res()).transpose(), std::get<3>(trafos_.get_res_hv()).transpose();
+    const double error_base = [&](){
+        Outage no_outage{};  // nb_end is 0: no branch is removed
+        Eigen::MatrixXd F;
+        compute_mismatch(std::vector<Outage>(1, no_outage), V_base, F);
+        return F.lpNorm<Eigen::Infinity>();
+    }();
+
+    Eigen::VectorXd error(nb_cont);
+    RealMat p_or(nb_cont, nb_branch);
+    RealMat a_or(nb_cont, nb_branch);
+    const double nan = std::numeric_limits<double>::quiet_NaN();
+    const double inf = std::numeric_limits<double>::infinity();
+    std::vector<Outage> outages;
+    Eigen::MatrixXd Z, F, dx, Va, Vm;
+    Eigen::MatrixXcd V;
+    Eigen::VectorXd Va_col, Vm_col;
+    Eigen::VectorXcd V_col;
+    for(int first = 0; first < nb_cont; first += sensitivity_chunk_size_){
+        const int last = std::min(first + sensitivity_chunk_size_, nb_cont);
+        outages.clear();
+        int nb_var = 0;
+        for(int cont_id = first; cont_id < last; ++cont_id){
+            Outage outage;
+            outage.cont_id = cont_id;
+            outage.branch_id = branch_ids(cont_id);
+            cdouble y_off, y_or, y_ex;
+            if(!get_branch_ybus(outage.branch_id, outage.bus[0], outage.bus[1], y_off, y_or, y_ex)){
+                // the outage of a disconnected branch does not change anything
+                error(cont_id) = error_base;
+                p_or.row(cont_id) = p_or_base;
+                a_or.row(cont_id) = a_or_base;
+                continue;
+            }
+            if(outage.bus[0] == outage.bus[1]){
+                outage.nb_end = 1;
+                outage.y[0][0] = y_or + y_ex + 2. * y_off;
+            }else{
+                outage.nb_end = 2;
+                outage.y[0][0] = y_or;
+                outage.y[0][1] = y_off;
+                outage.y[1][0] = y_off;
+                outage.y[1][1] = y_ex;
+            }
+            for(int a = 0; a < outage.nb_end; ++a){
+                if(va_row[outage.bus[a]] >= 0) outage.rows.push_back(va_row[outage.bus[a]]);
+                if(vm_row[outage.bus[a]] >= 0) outage.rows.push_back(vm_row[outage.bus[a]]);
+            }
+            auto local_id = [&outage](int row){
+                if(row < 0) return -1;
+                return static_cast<int>(std::find(outage.rows.begin(), outage.rows.end(), row) - outage.rows.begin());
+            };
+            // M = - derivatives of the power injected by the branch at its ends (see KLUSolver::_dS_dV_entry)
+            const int nb_row = outage.rows.size();
+            outage.M = Eigen::MatrixXd::Zero(nb_row, nb_row);
+            for(int a = 0; a < outage.nb_end; ++a){
+                const cdouble V_a = V_base(outage.bus[a]);
+                cdouble I_a = 0.;
+                for(int b = 0; b < outage.nb_end; ++b) I_a += outage.y[a][b] * V_base(outage.bus[b]);
+                const int row_p = local_id(va_row[outage.bus[a]]);
+                const int row_q = local_id(vm_row[outage.bus[a]]);
+                for(int b = 0; b < outage.nb_end; ++b){
+                    const cdouble V_b = V_base(outage.bus[b]);
+                    cdouble dS_dVm = std::conj(outage.y[a][b] * V_b / std::abs(V_b)) * V_a;
+                    cdouble tmp = outage.y[a][b] * V_b;
+                    if(a == b){
+                        dS_dVm += std::conj(I_a) * V_a / std::abs(V_a);
+                        tmp -= I_a;
+                    }
+                    const cdouble dS_dVa = std::conj(-tmp) * (my_i * V_a);
+                    const int col_va = local_id(va_row[outage.bus[b]]);
+                    const int col_vm = local_id(vm_row[outage.bus[b]]);
+                    if(row_p >= 0 && col_va >= 0) outage.M(row_p, col_va) -= std::real(dS_dVa);
+                    if(row_p >= 0 && col_vm >= 0) outage.M(row_p, col_vm) -= std::real(dS_dVm);
+                    if(row_q >= 0 && col_va >= 0) outage.M(row_q, col_va) -= std::imag(dS_dVa);
+                    if(row_q >= 0 && col_vm >= 0) outage.M(row_q, col_vm) -= std::imag(dS_dVm);
+                }
+            }
+            outage.first_col = nb_var;
+            nb_var += nb_row;
+            outages.push_back(std::move(outage));
+        }
+        if(outages.empty()) continue;
+
+        // J^-1.E for all the outages of this chunk (one solve with many right hand sides)
+        Z = Eigen::MatrixXd::Zero(n_pvpq + n_pq, nb_var);
+        for(const auto & outage : outages){
+            for(int i = 0; i < static_cast<int>(outage.rows.size()); ++i) Z(outage.rows[i], outage.first_col + i) = 1.;
+        }
+        _solver.solve_multi(Z);
+        for(auto & outage : outages){
+            const int nb_row = outage.rows.size();
+            if(nb_row == 0) continue;
+            // C is singular if the jacobian after the outage is: the outage splits the grid
+            outage.C_lu.setThreshold(split_grid_tol_);
+            outage.C_lu.compute(Eigen::MatrixXd::Identity(nb_row, nb_row) +
+                                outage.M * Z(outage.rows, Eigen::seqN(outage.first_col, nb_row)));
+        }
+
+        // newton raphson steps, all the outages of this chunk at once
+        const int nb_col = outages.size();
+        V = V_base.replicate(1, nb_col);
+        Va = V_base.array().arg().matrix().replicate(1, nb_col);
+        Vm = V_base.array().abs().matrix().replicate(1, nb_col);
+        for(int step = 0; step < nb_step; ++step){
+            compute_mismatch(outages, V, F);
+            dx = -F;
+            _solver.solve_multi(dx);
+            // Woodbury formula: (J + E.M.E^T)^-1.b = J^-1.b - J^-1.E.C^-1.M.E^T.J^-1.b
+            for(int col = 0; col < nb_col; ++col){
+                const Outage & outage = outages[col];
+                const int nb_row = outage.rows.size();
+                if((nb_row == 0) || !outage.C_lu.isInvertible()) continue;
+                dx.col(col) -= Z.middleCols(outage.first_col, nb_row) * outage.C_lu.solve(outage.M * dx(outage.rows, col));
+            }
+            Va(bus_pvpq, Eigen::all) += dx.topRows(n_pvpq);
+            Vm(bus_pq_, Eigen::all) += dx.bottomRows(n_pq);
+            V = Vm.cast<cdouble>().array() * (Va.array().cos().cast<cdouble>() + my_i * Va.array().sin().cast<cdouble>());
+        }
+        compute_mismatch(outages, V, F);
+
+        // flows of the branches after each outage
+        for(int col = 0; col < nb_col; ++col){
+            const Outage & outage = outages[col];
+            const int cont_id = outage.cont_id;
+            const double err = F.col(col).lpNorm<Eigen::Infinity>();
+            if(((outage.rows.size() > 0) && !outage.C_lu.isInvertible()) || !std::isfinite(err)){
+                error(cont_id) = inf;
+                p_or.row(cont_id).setConstant(nan);
+                a_or.row(cont_id).setConstant(nan);
+                continue;
+            }
+            error(cont_id) = err;
+            Va_col = Va.col(col);
+            Vm_col = Vm.col(col);
+            V_col = V.col(col);
+            powerlines_.compute_results(Va_col, Vm_col, V_col, id_me_to_solver_, bus_vn_kv_, true);
+            trafos_.compute_results(Va_col, Vm_col, V_col, id_me_to_solver_, bus_vn_kv_, true);
+            p_or.row(cont_id) << std::get<0>(powerlines_.get_lineor_res()).transpose(), std::get<0>(trafos_.get_res_hv()).transpose();
+            a_or.row(cont_id) << std::get<3>(powerlines_.get_lineor_res()).transpose(), std::get<3>(trafos_.get_res_hv()).transpose();
+            p_or(cont_id, outage.branch_id) = 0.;
+            a_or(cont_id, outage.branch_id) = 0.;
+        }
+    }
+    // the elements keep the results of the base case
+    compute_results();
+    return ACContingencyRes(std::move(error), std::move(p_or), std::move(a_or));
+}
+
+bool GridModel::get_branch_ybus(int branch_id, int & bus_or_solver_id, int & bus_ex_solver_id,
+                                cdouble & y_off, cdouble & y_or, cdouble & y_ex)
+{
+    const int nb_line = powerlines_.nb();
+    int bus_or_id_me, bus_ex_id_me;
+    if(branch_id < nb_line){
+        bus_or_id_me = powerlines_.get_bus_or(branch_id);
+        bus_ex_id_me = powerlines_.get_bus_ex(branch_id);
+        if(bus_or_id_me == _deactivated_bus_id) return false;
+        powerlines_.get_ybus_coeffs(branch_id, y_off, y_or, y_ex);
+    }else{
+        bus_or_id_me = trafos_.get_bus_hv(branch_id - nb_line);
+        bus_ex_id_me = trafos_.get_bus_lv(branch_id - nb_line);
+        if(bus_or_id_me == _deactivated_bus_id) return false;
+        trafos_.get_ybus_coeffs(branch_id - nb_line, y_off, y_or, y_ex);
+    }
+    bus_or_solver_id = id_me_to_solver_[bus_or_id_me];
+    bus_ex_solver_id = id_me_to_solver_[bus_ex_id_me];
+    return true;
+}
+
 void GridModel::init_Ybus(Eigen::SparseMatrix<cdouble> & Ybus, Eigen::VectorXcd & Sbus,
                           std::vector<int>& id_me_to_solver, std::vector<int>& id_solver_to_me,
                           int & slack_bus_id_solver){
@@ -199,6 +824,293 @@ void GridModel::fillYbus(Eigen::SparseMatrix<cdouble> & res, bool ac, const std:
     res.makeCompressed();
 }
 
+void GridModel::init_ybus_state()
+{
+    // Ybus_ has just been computed from scratch, it is now up to date with all the elements
+    powerlines_.init_ybus_state();
+    shunts_.init_ybus_state();
+    trafos_.init_ybus_state();
+    topo_changed_ = false;
+}
+
+void GridModel::update_Ybus()
+{
+    /**
+    Supposes that Ybus_ has been computed with the same buses (id_me_to_solver_ is still valid)
+    and that only some elements changed. Only their contributions are updated.
+
+    The contributions are changed with "coeffRef": the coefficients of a disconnected branch stay in Ybus_ as
+    explicit 0. (so in the sparsity pattern of the jacobian too), which avoids an insertion in the compressed
+    matrix when it is reconnected. They are removed only when Ybus_ is computed from scratch ("need_reset_").
+    **/
+    powerlines_.updateYbus(Ybus_, true, id_me_to_solver_);
+    shunts_.updateYbus(Ybus_, true, id_me_to_solver_);
+    trafos_.updateYbus(Ybus_, true, id_me_to_solver_);
+    Ybus_.makeCompressed();
+    topo_changed_ = false;
+}
+
+void GridModel::init_Ybus_pattern()
+{
+    /**
+    Sparsity pattern of Ybus in the "fixed pattern" mode: all the diagonal coefficients, and all the
+    coefficients that any branch could use if its ends were connected to any bus of their substation.
+    **/
+    int nb_bus = bus_vn_kv_.size();
+    if(n_sub_ <= 0){
+        throw std::runtime_error("GridModel::init_Ybus_pattern: the number of substations should be set (with \"set_n_sub\") to use the \"fixed pattern\" mode.");
+    }
+    std::vector<Eigen::Triplet<cdouble> > tripletList;
+    int nb_bus_per_sub = (nb_bus + n_sub_ - 1) / n_sub_;
+    tripletList.reserve(nb_bus + 2 * nb_bus_per_sub * nb_bus_per_sub * (powerlines_.nb() + trafos_.nb()));
+    for(int bus_id = 0; bus_id < nb_bus; ++bus_id) tripletList.push_back(Eigen::Triplet<cdouble> (bus_id, bus_id, 0.));
+    powerlines_.fillYbus_pattern(tripletList, n_sub_, nb_bus);
+    trafos_.fillYbus_pattern(tripletList, n_sub_, nb_bus);
+    Ybus_pattern_ = Eigen::SparseMatrix<cdouble>(nb_bus, nb_bus);
+    Ybus_pattern_.setFromTriplets(tripletList.begin(), tripletList.end());  // explicit 0. are kept
+    Ybus_pattern_.makeCompressed();
+}
+
+void GridModel::init_Ybus_fixed_pattern()
+{
+    /**
+    In this mode, the solver ids are the "me" ids (disconnected buses are kept, but are neither pv nor pq)
+    and Ybus_ is computed by adding the contributions of the elements to Ybus_pattern_.
+    **/
+    need_reset_ = true;  // in case something goes wrong here, everything will be recomputed next time
+    int nb_bus = bus_vn_kv_.size();
+    if(Ybus_pattern_.cols() != nb_bus) init_Ybus_pattern();
+
+    id_me_to_solver_ = std::vector<int>(nb_bus, _deactivated_bus_id);
+    id_solver_to_me_ = std::vector<int>(nb_bus);
+    for(int bus_id = 0; bus_id < nb_bus; ++bus_id){
+        id_solver_to_me_[bus_id] = bus_id;
+        if(bus_status_[bus_id]) id_me_to_solver_[bus_id] = bus_id;
+    }
+    slack_bus_id_ = generators_.get_slack_bus_id(gen_slackbus_);
+    slack_bus_id_solver_ = id_me_to_solver_[slack_bus_id_];
+    if(slack_bus_id_solver_ == _deactivated_bus_id){
+        throw std::runtime_error("The slack bus is disconnected.");
+    }
+
+    std::vector<Eigen::Triplet<cdouble> > tripletList;
+    tripletList.reserve(bus_vn_kv_.size() + 4*powerlines_.nb() + 4*trafos_.nb() + shunts_.nb());
+    powerlines_.fillYbus(tripletList, true, id_me_to_solver_);
+    shunts_.fillYbus(tripletList, true, id_me_to_solver_);
+    trafos_.fillYbus(tripletList, true, id_me_to_solver_);
+    loads_.fillYbus(tripletList, true, id_me_to_solver_);
+    generators_.fillYbus(tripletList, true, id_me_to_solver_);
+    Ybus_ = Ybus_pattern_;
+    for(const auto & el : tripletList) Ybus_.coeffRef(el.row(), el.col()) += el.value();
+    if(Ybus_.nonZeros() != Ybus_pattern_.nonZeros()){
+        throw std::runtime_error("GridModel::init_Ybus_fixed_pattern: an element is connected to a bus that is not part of its substation.");
+    }
+    init_ybus_state();
+
+    Sbus_ = Eigen::VectorXcd::Constant(nb_bus, 0.);
+    fillpv_pq(id_me_to_solver_);
+    generators_.init_q_vector(nb_bus);
+    need_reset_ = false;
+}
+
+void GridModel::fillBp_Bpp()
+{
+    /**
+    Supposes that Ybus_ (and the bus ids conversion) is up to date.
+    See the "makeB" function of pypower for the details.
+    **/
+    FDPFMethod xb_or_bx = pf_algorithm_ == PFAlgorithm::FDPF_BX ? FDPFMethod::BX : FDPFMethod::XB;
+    int nb_bus_solver = id_solver_to_me_.size();
+    std::vector<Eigen::Triplet<double> > tripletBp;
+    std::vector<Eigen::Triplet<double> > tripletBpp;
+    tripletBp.reserve(4*powerlines_.nb() + 4*trafos_.nb());
+    tripletBpp.reserve(4*powerlines_.nb() + 4*trafos_.nb() + shunts_.nb());
+    powerlines_.fillBp_Bpp(tripletBp, tripletBpp, id_me_to_solver_, xb_or_bx);
+    shunts_.fillBp_Bpp(tripletBp, tripletBpp, id_me_to_solver_, xb_or_bx);
+    trafos_.fillBp_Bpp(tripletBp, tripletBpp, id_me_to_solver_, xb_or_bx);
+    loads_.fillBp_Bpp(tripletBp, tripletBpp, id_me_to_solver_, xb_or_bx);
+    generators_.fillBp_Bpp(tripletBp, tripletBpp, id_me_to_solver_, xb_or_bx);
+    Bp_ = Eigen::SparseMatrix<double>(nb_bus_solver, nb_bus_solver);
+    Bp_.setFromTriplets(tripletBp.begin(), tripletBp.end());
+    Bp_.makeCompressed();
+    Bpp_ = Eigen::SparseMatrix<double>(nb_bus_solver, nb_bus_solver);
+    Bpp_.setFromTriplets(tripletBpp.begin(), tripletBpp.end());
+    Bpp_.makeCompressed();
+}
+
+void GridModel::get_topo_key(std::vector<int> & res) const
+{
+    res.clear();
+    res.reserve(bus_status_.size() + 2 * (powerlines_.nb() + trafos_.nb()) + loads_.nb() + generators_.nb() + 5 * shunts_.nb() + 1);
+    for(auto bus_status : bus_status_) res.push_back(bus_status ? 1 : 0);
+    powerlines_.fill_topo_key(res);
+    trafos_.fill_topo_key(res);
+    loads_.fill_topo_key(res);
+    generators_.fill_topo_key(res);
+    shunts_.fill_topo_key(res);
+    res.push_back(gen_slackbus_);
+}
+
+std::uint64_t GridModel::get_topo_fingerprint() const
+{
+    // FNV-1a hash of the topology key
+    std::vector<int> key;
+    get_topo_key(key);
+    std::uint64_t res = 14695981039346656037ULL;
+    for(auto el : key){
+        res ^= static_cast<std::uint32_t>(el);
+        res *= 1099511628211ULL;
+    }
+    return res;
+}
+
+void GridModel::set_topo_cache_capacity(int capacity)
+{
+    if(capacity < 0) throw std::runtime_error("GridModel::set_topo_cache_capacity: the capacity cannot be negative.");
+    topo_cache_capacity_ = capacity;
+    while(static_cast<int>(topo_cache_.size()) > topo_cache_capacity_) topo_cache_.pop_back();
+    topo_key_valid_ = false;  // the current state will be put in the cache only after the next powerflow
+}
+
+void GridModel::set_linear_solver(LinearSolverType linear_solver_type)
+{
+    if(linear_solver_type == LinearSolverType::LDLT){
+        throw std::runtime_error("GridModel::set_linear_solver: the matrices of the ac powerflow are not symmetric, LDLT cannot be used (it can for the dc powerflow, see set_dc_linear_solver)");
+    }
+    if(linear_solver_type == _solver.get_linear_solver()) return;
+    _solver.set_linear_solver(linear_solver_type);
+    _fdpf_solver.set_linear_solver(linear_solver_type);
+    // the factorizations in the cache have been computed by the previous solver
+    clear_topo_cache();
+    need_reset_ = true;
+}
+
+std::tuple<std::vector<double>, std::vector<double> > GridModel::tune_linear_solver(const Eigen::VectorXcd & Vinit,
+                                                                                    int max_iter,
+                                                                                    double tol,
+                                                                                    int nb_pf)
+{
+    if(nb_pf <= 0) throw std::runtime_error("GridModel::tune_linear_solver: nb_pf should be > 0");
+    const double not_working = std::numeric_limits<double>::infinity();
+    const std::vector<LinearSolverType> ac_types = {LinearSolverType::KLU, LinearSolverType::SparseLU};
+    const std::vector<LinearSolverType> dc_types = {LinearSolverType::KLU, LinearSolverType::SparseLU, LinearSolverType::LDLT};
+
+    // ac powerflow (copies are used, the state of this grid is not modified)
+    std::vector<double> ac_timers;
+    for(auto linear_solver_type : ac_types){
+        GridModel tmp(*this);
+        tmp.set_dense_threshold(-1);
+        tmp.set_linear_solver(linear_solver_type);
+        double timer_pf = 0.;
+        bool ok = true;
+        for(int pf_id = 0; (pf_id < nb_pf) && ok; ++pf_id){
+            auto timer = CustTimer();
+            try{
+                ok = tmp.ac_pf(Vinit, max_iter, tol).size() > 0;
+            }catch(const std::exception &){
+                ok = false;
+            }
+            timer_pf += timer.duration();
+        }
+        ac_timers.push_back(ok ? timer_pf / nb_pf : not_working);
+    }
+
+    // dc powerflow
+    std::vector<double> dc_timers;
+    for(auto linear_solver_type : dc_types){
+        GridModel tmp(*this);
+        tmp.set_dc_dense_threshold(-1);
+        tmp.set_dc_linear_solver(linear_solver_type);
+        double timer_pf = 0.;
+        bool ok = true;
+        for(int pf_id = 0; (pf_id < nb_pf) && ok; ++pf_id){
+            auto timer = CustTimer();
+            try{
+                ok = tmp.dc_pf(Vinit, max_iter, tol).size() > 0;
+            }catch(const std::exception &){
+                ok = false;
+            }
+            timer_pf += timer.duration();
+        }
+        dc_timers.push_back(ok ? timer_pf / nb_pf : not_working);
+    }
+
+    // keep the fastest ones (the current ones if none of them work)
+    auto best_ac = std::min_element(ac_timers.begin(), ac_timers.end());
+    if(*best_ac < not_working) set_linear_solver(ac_types[best_ac - ac_timers.begin()]);
+    auto best_dc = std::min_element(dc_timers.begin(), dc_timers.end());
+    if(*best_dc < not_working) set_dc_linear_solver(dc_types[best_dc - dc_timers.begin()]);
+    return std::tuple<std::vector<double>, std::vector<double> >(ac_timers, dc_timers);
+}
+
+void GridModel::clear_topo_cache()
+{
+    topo_cache_.clear();
+    topo_cache_hits_ = 0;
+    topo_cache_misses_ = 0;
+    topo_key_valid_ = false;
+}
+
+bool GridModel::use_topo_cache()
+{
+    if(topo_cache_capacity_ <= 0) return false;
+    std::vector<int> new_key;
+    get_topo_key(new_key);
+    if(topo_key_valid_ && (new_key == topo_key_)){
+        // same topology as the one used for the last powerflow (eg a powerline has been disconnected and reconnected)
+        ++topo_cache_hits_;
+        init_ybus_state();
+        Sbus_.setZero();
+        need_reset_ = false;
+        return true;
+    }
+
+    if(topo_key_valid_){
+        // put the current state in the cache
+        PreparedTopo current;
+        current.key.swap(topo_key_);
+        current.Ybus = Ybus_;  // copy, Ybus_ might be updated instead of recomputed
+        current.id_me_to_solver = id_me_to_solver_;
+        current.id_solver_to_me = id_solver_to_me_;
+        current.slack_bus_id_solver = slack_bus_id_solver_;
+        current.bus_pv = bus_pv_;
+        current.bus_pq = bus_pq_;
+        current.factorization = std::make_shared<JacobianFactorization>();
+        _solver.move_factorization_to(*current.factorization);
+        topo_cache_.push_front(std::move(current));
+        if(static_cast<int>(topo_cache_.size()) > topo_cache_capacity_) topo_cache_.pop_back();
+    }
+    topo_key_valid_ = false;
+    topo_key_.swap(new_key);
+
+    auto it = topo_cache_.begin();
+    for(; it != topo_cache_.end(); ++it){
+        if(it->key == topo_key_) break;
+    }
+    if(it == topo_cache_.end()){
+        ++topo_cache_misses_;
+        return false;
+    }
+
+    // restore the state from the cache (it is removed from the cache, and put back when the topology changes)
+    ++topo_cache_hits_;
+    Ybus_.swap(it->Ybus);
+    id_me_to_solver_.swap(it->id_me_to_solver);
+    id_solver_to_me_.swap(it->id_solver_to_me);
+    slack_bus_id_solver_ = it->slack_bus_id_solver;
+    bus_pv_.swap(it->bus_pv);
+    bus_pq_.swap(it->bus_pq);
+    _solver.move_factorization_from(*it->factorization);
+    topo_cache_.erase(it);
+
+    slack_bus_id_ = generators_.get_slack_bus_id(gen_slackbus_);
+    init_ybus_state();
+    Sbus_ = Eigen::VectorXcd::Constant(id_solver_to_me_.size(), 0.);
+    generators_.init_q_vector(bus_vn_kv_.size());
+    need_reset_ = false;
+    return true;
+}
+
 void GridModel::fillSbus_me(Eigen::VectorXcd & res, bool ac, const std::vector<int>& id_me_to_solver, int slack_bus_id_solver)
 {
     // init the Sbus vector
@@ -233,27 +1145,29 @@ void GridModel::fillpv_pq(const std::vector<int>& id_me_to_solver)
     for(int bus_id = 0; bus_id< nb_bus; ++bus_id){
         if(bus_id == slack_bus_id_solver_) continue;  // slack bus is not PQ either
         if(has_bus_been_added[bus_id]) continue; // a pv bus cannot be PQ
+        if(!bus_status_[id_solver_to_me_[bus_id]]) continue;  // disconnected bus (only in the "fixed pattern" mode)
         bus_pq.push_back(bus_id);
         has_bus_been_added[bus_id] = true;  // don't add it a second time
     }
     bus_pv_ = Eigen::Map<Eigen::VectorXi, Eigen::Unaligned>(bus_pv.data(), bus_pv.size());
     bus_pq_ = Eigen::Map<Eigen::VectorXi, Eigen::Unaligned>(bus_pq.data(), bus_pq.size());
 }
-void GridModel::compute_results(){
+void GridModel::compute_results(bool ac){
     // retrieve results from powerflow
-    const auto & Va = _solver.get_Va();
-    const auto & Vm = _solver.get_Vm();
-    const auto & V = _solver.get_V();
+    const auto & Va = ac ? get_Va() : _dc_solver.get_Va();
+    const auto & Vm = ac ? get_Vm() : _dc_solver.get_Vm();
+    const auto & V = ac ? get_V_solver() : _dc_solver.get_V();
+    const std::vector<int> & id_me_to_solver = ac ? id_me_to_solver_ : dc_id_me_to_solver_;
     // for powerlines
-    powerlines_.compute_results(Va, Vm, V, id_me_to_solver_, bus_vn_kv_);
+    powerlines_.compute_results(Va, Vm, V, id_me_to_solver, bus_vn_kv_, ac);
     // for trafo
-    trafos_.compute_results(Va, Vm, V, id_me_to_solver_, bus_vn_kv_);
+    trafos_.compute_results(Va, Vm, V, id_me_to_solver, bus_vn_kv_, ac);
     // for loads
-    loads_.compute_results(Va, Vm, V, id_me_to_solver_, bus_vn_kv_);
+    loads_.compute_results(Va, Vm, V, id_me_to_solver, bus_vn_kv_, ac);
     // for shunts
-    shunts_.compute_results(Va, Vm, V, id_me_to_solver_, bus_vn_kv_);
+    shunts_.compute_results(Va, Vm, V, id_me_to_solver, bus_vn_kv_, ac);
     // for prods
-    generators_.compute_results(Va, Vm, V, id_me_to_solver_, bus_vn_kv_);
+    generators_.compute_results(Va, Vm, V, id_me_to_solver, bus_vn_kv_, ac);
 
     //handle_slack_bus
     double p_slack = powerlines_.get_p_slack(slack_bus_id_);
@@ -261,6 +1175,7 @@ void GridModel::compute_results(){
     p_slack += loads_.get_p_slack(slack_bus_id_);
     p_slack += shunts_.get_p_slack(slack_bus_id_);
     generators_.set_p_slack(gen_slackbus_, p_slack);
+    if(!ac) return;  // no reactive power in dc
 
     // handle gen_q now
     std::vector<double> q_by_bus = std::vector<double>(bus_vn_kv_.size(), 0.);
@@ -281,129 +1196,698 @@ void GridModel::reset_results(){
     generators_.reset_results();
 }
 
-Eigen::VectorXcd GridModel::dc_pf(const Eigen::VectorXcd & Vinit,
-                                  int max_iter,  // not used for DC
-                                  double tol  // not used for DC
-                                  )
+bool GridModel::update_dc_topology()
 {
-    // TODO refactor that with ac pf, this is mostly done, but only mostly...
-    int nb_bus = bus_vn_kv_.size();
-    if(Vinit.size() != nb_bus){
-        throw std::runtime_error("Size of the Vinit should be the same as the total number of buses (both conencted and disconnected). Components of Vinit corresponding to deactivated bys will be ignored anyway.");
-    }
-    Eigen::SparseMatrix<cdouble> dcYbus_tmp;
-    Eigen::VectorXcd Sbus_tmp;
-    std::vector<int> id_me_to_solver;
-    std::vector<int> id_solver_to_me;
-    int slack_bus_id_solver;
+    std::vector<int> topo_key;
+    get_topo_key(topo_key);
+    if(topo_key == dc_topo_key_) return false;
 
-    //if(need_reset_){
+    // the topology changed since last call: the dc admittance matrix is computed (and will be factorized) again
+    dc_topo_key_.clear();  // in case something goes wrong here, everything will be recomputed next time
     slack_bus_id_ = generators_.get_slack_bus_id(gen_slackbus_);
-    init_Ybus(dcYbus_tmp, Sbus_tmp, id_me_to_solver, id_solver_to_me, slack_bus_id_solver);
-    fillYbus(dcYbus_tmp, false, id_me_to_solver);
-    // fillpv_pq(id_me_to_solver);
-    //}
-    fillSbus_me(Sbus_tmp, false, id_me_to_solver, slack_bus_id_solver);
+    init_Ybus(dcYbus_, dcSbus_, dc_id_me_to_solver_, dc_id_solver_to_me_, dc_slack_bus_id_solver_);
+    fillYbus(dcYbus_, false, dc_id_me_to_solver_);
+    dcBf_ = Eigen::SparseMatrix<double>();  // computed again when needed (see dc_pf_batch)
+    _dc_solver.reset();
+    dc_topo_key_ = std::move(topo_key);
+    return true;
+}
+
+RealMat GridModel::dc_pf_batch(const Eigen::Ref<const RealMat> & Pbus, int chunk_size)
+{
+    const int nb_bus = bus_vn_kv_.size();
+    if(Pbus.rows() != nb_bus){
+        throw std::runtime_error("GridModel::dc_pf_batch: Pbus should have one row per bus (both connected and disconnected)");
+    }
+    if(chunk_size <= 0){
+        throw std::runtime_error("GridModel::dc_pf_batch: chunk_size should be > 0");
+    }
+    update_dc_topology();
+    update_dcBf();
+    const int nb_bus_solver = dc_id_solver_to_me_.size();
+    const int nb_branch = powerlines_.nb() + trafos_.nb();
+
+    const int nb_scenario = Pbus.cols();
+    RealMat res(nb_scenario, nb_branch);
+    // only one chunk of the scenarios is solved at a time, to bound the memory used
+    Eigen::MatrixXd theta;
+    Eigen::MatrixXd Va;
+    for(int first = 0; first < nb_scenario; first += chunk_size){
+        const int nb_col = std::min(chunk_size, nb_scenario - first);
+        // right hand sides (without the slack bus), the injections of the disconnected buses are not used
+        theta.resize(nb_bus_solver - 1, nb_col);
+        for(int bus_id_solver = 0; bus_id_solver < nb_bus_solver; ++bus_id_solver){
+            if(bus_id_solver == dc_slack_bus_id_solver_) continue;
+            int row_res = bus_id_solver > dc_slack_bus_id_solver_ ? bus_id_solver - 1 : bus_id_solver;
+            theta.row(row_res) = Pbus.block(dc_id_solver_to_me_[bus_id_solver], first, 1, nb_col);
+        }
+        if(!solve_dc_angles(theta, Va)){
+            // matrix is not connected
+            return RealMat();
+        }
+        res.middleRows(first, nb_col) = (dcBf_ * Va).transpose();
+    }
+    return res;
+}
 
+DCContingencyRes GridModel::dc_n1_screening(const Eigen::VectorXcd & Vinit,
+                                            const Eigen::VectorXi & branch_ids,
+                                            int chunk_size)
+{
+    const int nb_line = powerlines_.nb();
+    const int nb_branch = nb_line + trafos_.nb();
+    if(chunk_size <= 0){
+        throw std::runtime_error("GridModel::dc_n1_screening: chunk_size should be > 0");
+    }
+    check_branch_ids(branch_ids, "dc_n1_screening");
+
+    // base case: the flows that will be redistributed, and the factorization of B
+    if(dc_pf(Vinit, 1, 0.).size() == 0){
+        throw std::runtime_error("GridModel::dc_n1_screening: the dc powerflow of the base case failed (non connected grid)");
+    }
+    Eigen::VectorXd flows_base(nb_branch);
+    flows_base << std::get<0>(powerlines_.get_lineor_res()), std::get<0>(trafos_.get_res_hv());
+    update_dcBf();
+    // row major: each flow is computed from the angles at both ends of its branch
+    const Eigen::SparseMatrix<double, Eigen::RowMajor> Bf = dcBf_;
+    const int nb_bus_solver = dc_id_solver_to_me_.size();
+
+    const int nb_cont = branch_ids.size();
+    Eigen::Array<bool, Eigen::Dynamic, 1> split_grid = Eigen::Array<bool, Eigen::Dynamic, 1>::Constant(nb_cont, false);
+    RealMat res(nb_cont, nb_branch);
+    const double nan = std::numeric_limits<double>::quiet_NaN();
+    std::vector<int> chunk_cont;
+    std::vector<int> chunk_branch;
+    Eigen::MatrixXd theta;
+    Eigen::MatrixXd Va;
+    Eigen::VectorXd flows_transfer;
+    for(int first = 0; first < nb_cont; first += chunk_size){
+        const int last = std::min(first + chunk_size, nb_cont);
+        // right hand sides: a transfer of 1MW from one end of the branch to the other (without the slack bus),
+        // the branches that are disconnected (or connected to the same bus at both ends) do not change anything
+        chunk_cont.clear();
+        chunk_branch.clear();
+        theta = Eigen::MatrixXd::Zero(nb_bus_solver - 1, last - first);
+        for(int cont_id = first; cont_id < last; ++cont_id){
+            const int branch_id = branch_ids(cont_id);
+            const int transfer = fill_dc_transfer(branch_id, theta, chunk_cont.size());
+            if(transfer == 0){
+                res.row(cont_id) = flows_base.transpose();
+                continue;
+            }
+            if(transfer < 0){
+                // no need to solve anything: this branch is the only one connected to one of its buses
+                split_grid(cont_id) = true;
+                res.row(cont_id).setConstant(nan);
+                continue;
+            }
+            chunk_cont.push_back(cont_id);
+            chunk_branch.push_back(branch_id);
+        }
+        if(chunk_cont.empty()) continue;
+        theta.conservativeResize(Eigen::NoChange, chunk_cont.size());
+        if(!solve_dc_angles(theta, Va)){
+            throw std::runtime_error("GridModel::dc_n1_screening: the dc matrix cannot be factorized");
+        }
 
-    // extract only connected bus from Vinit
-    int nb_bus_solver = id_solver_to_me.size();
+        // the outage of a branch is the same as a transfer of its flow through it, amplified because the
+        // branch itself carries a part of this transfer (Sherman-Morrison formula)
+        for(int col = 0; col < static_cast<int>(chunk_cont.size()); ++col){
+            const int cont_id = chunk_cont[col];
+            const int branch_id = chunk_branch[col];
+            const double denom = 1.0 - Bf.row(branch_id).dot(Va.col(col));
+            if(std::abs(denom) < split_grid_tol_){
+                // all the transfer goes through the branch: it is a bridge of the grid
+                split_grid(cont_id) = true;
+                res.row(cont_id).setConstant(nan);
+                continue;
+            }
+            // flows of all the branches for this transfer
+            flows_transfer.noalias() = Bf * Va.col(col);
+            res.row(cont_id) = flows_base.transpose() + (flows_base(branch_id) / denom) * flows_transfer.transpose();
+            res(cont_id, branch_id) = 0.;
+        }
+    }
+    return DCContingencyRes(std::move(split_grid), std::move(res));
+}
 
-    // DC SOLVER STARTS HERE
-    // TODO all this should rather be one in a "dc solver" instead of here
-    // remove the slack bus
+RealMat GridModel::get_ptdf(const Eigen::VectorXi & monitored_branches)
+{
+    const int nb_branch = powerlines_.nb() + trafos_.nb();
+    check_branch_ids(monitored_branches, "get_ptdf");
+    const Eigen::VectorXi branch_ids = monitored_branches.size() > 0 ? monitored_branches : Eigen::VectorXi::LinSpaced(nb_branch, 0, nb_branch - 1);
+    update_dc_topology();
+    update_dcBf();
+    const Eigen::SparseMatrix<double, Eigen::RowMajor> Bf = dcBf_;
+    const int nb_bus_solver = dc_id_solver_to_me_.size();
 
-    // remove the slack bus from Ybus
-    // TODO see if "prune" might work here https://eigen.tuxfamily.org/dox/classEigen_1_1SparseMatrix.html#title29
-    dcYbus_tmp.makeCompressed();
-    Eigen::SparseMatrix<double> dcYbus = Eigen::SparseMatrix<double>(nb_bus_solver - 1, nb_bus_solver - 1);
+    // B is symmetric: the row of the PTDF of a branch is the solution of B.x = (row of this branch in Bf)
+    const int nb_row = branch_ids.size();
+    RealMat res = RealMat::Zero(nb_row, bus_vn_kv_.size());
+    Eigen::MatrixXd theta;
+    Eigen::MatrixXd Va;
+    for(int first = 0; first < nb_row; first += sensitivity_chunk_size_){
+        const int nb_col = std::min(sensitivity_chunk_size_, nb_row - first);
+        theta = Eigen::MatrixXd::Zero(nb_bus_solver - 1, nb_col);
+        for(int col = 0; col < nb_col; ++col){
+            for(Eigen::SparseMatrix<double, Eigen::RowMajor>::InnerIterator it(Bf, branch_ids(first + col)); it; ++it){
+                if(it.col() == dc_slack_bus_id_solver_) continue;
+                theta(it.col() > dc_slack_bus_id_solver_ ? it.col() - 1 : it.col(), col) += it.value();
+            }
+        }
+        if(!solve_dc_angles(theta, Va)){
+            throw std::runtime_error("GridModel::get_ptdf: the dc matrix cannot be factorized (non connected grid)");
+        }
+        // back to the bus ids of the grid (the columns of the disconnected buses and of the slack bus are 0.)
+        for(int bus_id_solver = 0; bus_id_solver < nb_bus_solver; ++bus_id_solver){
+            res.block(first, dc_id_solver_to_me_[bus_id_solver], nb_col, 1) = Va.row(bus_id_solver).transpose();
+        }
+    }
+    return res;
+}
+
+RealMat GridModel::get_lodf(const Eigen::VectorXi & monitored_branches, const Eigen::VectorXi & outaged_branches)
+{
+    const int nb_branch = powerlines_.nb() + trafos_.nb();
+    check_branch_ids(monitored_branches, "get_lodf");
+    check_branch_ids(outaged_branches, "get_lodf");
+    const Eigen::VectorXi all_branches = Eigen::VectorXi::LinSpaced(nb_branch, 0, nb_branch - 1);
+    const Eigen::VectorXi & monitored = monitored_branches.size() > 0 ? monitored_branches : all_branches;
+    const Eigen::VectorXi & outaged = outaged_branches.size() > 0 ? outaged_branches : all_branches;
+    update_dc_topology();
+    update_dcBf();
+    const Eigen::SparseMatrix<double, Eigen::RowMajor> Bf = dcBf_;
+    const int nb_bus_solver = dc_id_solver_to_me_.size();
+    // only the flows of the monitored branches are computed
+    const int nb_row = monitored.size();
     std::vector<Eigen::Triplet<double> > tripletList;
-    tripletList.reserve(dcYbus_tmp.nonZeros());
-    for (int k=0; k < nb_bus_solver; ++k){
-        if(k == slack_bus_id_solver) continue;  // I don't add anything to the slack bus
-        for (Eigen::SparseMatrix<cdouble>::InnerIterator it(dcYbus_tmp, k); it; ++it)
-        {
-            int row_res = it.row();
-            if(row_res == slack_bus_id_solver) continue;
-            row_res = row_res > slack_bus_id_solver ? row_res - 1 : row_res;
-            int col_res = it.col();
-            col_res = col_res > slack_bus_id_solver ? col_res - 1 : col_res;
-            tripletList.push_back(Eigen::Triplet<double> (row_res, col_res, std::real(it.value())));
-        }
-    }
-    dcYbus.setFromTriplets(tripletList.begin(), tripletList.end());
-    dcYbus.makeCompressed();
-
-    // initialize the solver
-    Eigen::SparseLU<Eigen::SparseMatrix<double>, Eigen::COLAMDOrdering<int> >   solver;
-    solver.analyzePattern(dcYbus);
-    solver.factorize(dcYbus);
-    if(solver.info() != Eigen::Success) {
-        // matrix is not connected
-        return Eigen::VectorXcd();
+    tripletList.reserve(2 * nb_row);
+    for(int row = 0; row < nb_row; ++row){
+        for(Eigen::SparseMatrix<double, Eigen::RowMajor>::InnerIterator it(Bf, monitored(row)); it; ++it){
+            tripletList.push_back(Eigen::Triplet<double>(row, it.col(), it.value()));
+        }
     }
+    Eigen::SparseMatrix<double, Eigen::RowMajor> Bf_monitored(nb_row, nb_bus_solver);
+    Bf_monitored.setFromTriplets(tripletList.begin(), tripletList.end());
 
-    // remove the slack bus from Sbus
-    Eigen::VectorXd Sbus = Eigen::VectorXd::Constant(nb_bus_solver - 1, 0.);
-    for (int k=0; k < nb_bus_solver; ++k){
-        if(k == slack_bus_id_solver) continue;  // I don't add anything to the slack bus
-        int col_res = k;
-        col_res = col_res > slack_bus_id_solver ? col_res - 1 : col_res;
-        Sbus(col_res) = std::real(Sbus_tmp(k));
+    // the column of an outaged branch comes from the flows of a transfer between its ends (see dc_n1_screening)
+    const int nb_outage = outaged.size();
+    RealMat res = RealMat::Zero(nb_row, nb_outage);
+    const double nan = std::numeric_limits<double>::quiet_NaN();
+    std::vector<int> chunk_outage;
+    Eigen::MatrixXd theta;
+    Eigen::MatrixXd Va;
+    for(int first = 0; first < nb_outage; first += sensitivity_chunk_size_){
+        const int last = std::min(first + sensitivity_chunk_size_, nb_outage);
+        chunk_outage.clear();
+        theta = Eigen::MatrixXd::Zero(nb_bus_solver - 1, last - first);
+        for(int outage_id = first; outage_id < last; ++outage_id){
+            // nothing changes after the outage of a disconnected branch: its column is 0.
+            const int transfer = fill_dc_transfer(outaged(outage_id), theta, chunk_outage.size());
+            if(transfer < 0) res.col(outage_id).setConstant(nan);
+            if(transfer <= 0) continue;
+            chunk_outage.push_back(outage_id);
+        }
+        if(chunk_outage.empty()) continue;
+        theta.conservativeResize(Eigen::NoChange, chunk_outage.size());
+        if(!solve_dc_angles(theta, Va)){
+            throw std::runtime_error("GridModel::get_lodf: the dc matrix cannot be factorized (non connected grid)");
+        }
+        for(int col = 0; col < static_cast<int>(chunk_outage.size()); ++col){
+            const int outage_id = chunk_outage[col];
+            const int branch_id = outaged(outage_id);
+            const double denom = 1.0 - Bf.row(branch_id).dot(Va.col(col));
+            if(std::abs(denom) < split_grid_tol_){
+                // this outage splits the grid
+                res.col(outage_id).setConstant(nan);
+                continue;
+            }
+            res.col(outage_id).noalias() = (Bf_monitored * Va.col(col)) / denom;
+            // the flow of the outaged branch itself disappears
+            for(int row = 0; row < nb_row; ++row){
+                if(monitored(row) == branch_id) res(row, outage_id) = -1.0;
+            }
+        }
     }
+    return res;
+}
 
-    // solve for theta: Sbus = dcY . theta
-    Eigen::VectorXd Va_dc = solver.solve(Sbus);
-    if(solver.info() != Eigen::Success) {
-        // solving failed, this should not happen in dc ...
-        return Eigen::VectorXcd();
+N2ContingencyRes GridModel::dc_n2_screening(const Eigen::VectorXcd & Vinit,
+                                            const Eigen::VectorXi & branch_ids,
+                                            const Eigen::VectorXd & flow_limits,
+                                            double rho_max,
+                                            int n_threads)
+{
+    const int nb_branch = powerlines_.nb() + trafos_.nb();
+    check_branch_ids(branch_ids, "dc_n2_screening");
+    if(flow_limits.size() != nb_branch){
+        throw std::runtime_error("GridModel::dc_n2_screening: there should be one flow limit per branch");
+    }
+    if(!(flow_limits.array() > 0.).all()){
+        throw std::runtime_error("GridModel::dc_n2_screening: the flow limits should be > 0.");
+    }
+    if(dc_pf(Vinit, 1, 0.).size() == 0){
+        throw std::runtime_error("GridModel::dc_n2_screening: the dc powerflow of the base case failed (non connected grid)");
+    }
+    Eigen::VectorXd flows_base(nb_branch);
+    flows_base << std::get<0>(powerlines_.get_lineor_res()), std::get<0>(trafos_.get_res_hv());
+    // one row per outage: the flows of all the branches of a pair are read contiguously
+    const RealMat lodf = get_lodf(Eigen::VectorXi(), branch_ids).transpose();
+    const Eigen::ArrayXd inv_limits = flow_limits.array().inverse();
+    const double inf = std::numeric_limits<double>::infinity();
+
+    // single outages: the critical ones and the ones that are paired (with their highest relative flow and their
+    // highest LODF relatively to the limits, used by the bound)
+    const int nb_outage = branch_ids.size();
+    std::vector<int> n1_critical;
+    std::vector<int> candidates;
+    Eigen::VectorXd n1_rho = Eigen::VectorXd::Zero(nb_outage);
+    Eigen::VectorXd max_lodf = Eigen::VectorXd::Zero(nb_outage);
+    Eigen::ArrayXd tmp;
+    for(int row = 0; row < nb_outage; ++row){
+        const int branch_id = branch_ids(row);
+        if(!lodf.row(row).allFinite()){
+            n1_critical.push_back(branch_id);
+            continue;
+        }
+        // nothing changes after the outage of a disconnected branch
+        if(lodf(row, branch_id) == 0.) continue;
+        tmp = (flows_base.array() + flows_base(branch_id) * lodf.row(row).transpose().array()).abs() * inv_limits;
+        n1_rho(row) = tmp.maxCoeff();
+        if(n1_rho(row) >= rho_max){
+            n1_critical.push_back(branch_id);
+            continue;
+        }
+        tmp = lodf.row(row).transpose().array().abs() * inv_limits;
+        tmp(branch_id) = 0.;
+        max_lodf(row) = tmp.maxCoeff();
+        candidates.push_back(row);
     }
 
-    // retrieve back the results in the proper shape
-    int nb_bus_me = bus_vn_kv_.size();
-    int bus_id_solver;
-    Eigen::VectorXd Va = Eigen::VectorXd::Constant(nb_bus_me, 0.);
-    // fill Va from dc approx
-    for (int bus_id_me=0; bus_id_me < nb_bus_me; ++bus_id_me){
-        if(bus_id_me == slack_bus_id_) continue;  // slack bus is handled elsewhere
-        if(!bus_status_[bus_id_me]) continue;  // nothing is done if the bus is not connected
+    // pairs: each thread takes all the pairs of one outage with the next ones, then goes to the next outage
+    struct CriticalPair{
+        int branch_1;
+        int branch_2;
+        int overloaded;
+        double rho;
+    };
+    const int nb_candidate = candidates.size();
+    if(n_threads <= 0) n_threads = std::max(1, static_cast<int>(std::thread::hardware_concurrency()));
+    n_threads = std::max(1, std::min(n_threads, nb_candidate));
+    std::vector<std::vector<CriticalPair> > res_threads(n_threads);
+    std::vector<int> nb_pruned(n_threads, 0);
+    std::atomic<int> next_candidate(0);
+    auto worker = [&](int thread_id){
+        std::vector<CriticalPair> & res = res_threads[thread_id];
+        for(int i = next_candidate++; i < nb_candidate; i = next_candidate++){
+            const int row_k = candidates[i];
+            const int k = branch_ids(row_k);
+            for(int j = i + 1; j < nb_candidate; ++j){
+                const int row_m = candidates[j];
+                const int m = branch_ids(row_m);
+                if(m == k) continue;
+                // flows transferred by both outages: the flows of k and m are 0. afterwards
+                const double lodf_km = lodf(row_m, k);
+                const double lodf_mk = lodf(row_k, m);
+                const double det = 1.0 - lodf_km * lodf_mk;
+                if(std::abs(det) < split_grid_tol_){
+                    res.push_back({k, m, -1, inf});
+                    continue;
+                }
+                const double x_k = (flows_base(k) + lodf_km * flows_base(m)) / det;
+                const double x_m = (flows_base(m) + lodf_mk * flows_base(k)) / det;
+                // the flows after both outages are the flows after the outage of k, plus x_m (LODF_lm + LODF_km LODF_lk)
+                // (or the same with k and m swapped)
+                const double bound_k = n1_rho(row_k) + std::abs(x_m) * (max_lodf(row_m) + std::abs(lodf_km) * max_lodf(row_k));
+                const double bound_m = n1_rho(row_m) + std::abs(x_k) * (max_lodf(row_k) + std::abs(lodf_mk) * max_lodf(row_m));
+                if(std::min(bound_k, bound_m) < rho_max){
+                    ++nb_pruned[thread_id];
+                    continue;
+                }
+                for(int l = 0; l < nb_branch; ++l){
+                    if((l == k) || (l == m)) continue;
+                    const double rho = std::abs(flows_base(l) + lodf(row_k, l) * x_k + lodf(row_m, l) * x_m) * inv_limits(l);
+                    if(rho >= rho_max){
+                        res.push_back({k, m, l, rho});
+                        break;
+                    }
+                }
+            }
+        }
+    };
+    if(n_threads == 1){
+        worker(0);
+    }else{
+        std::vector<std::thread> threads;
+        for(int thread_id = 0; thread_id < n_threads; ++thread_id) threads.emplace_back(worker, thread_id);
+        for(auto & thread : threads) thread.join();
+    }
 
-        bus_id_solver = id_me_to_solver[bus_id_me];
-        if(bus_id_solver == _deactivated_bus_id){
-            //TODO improve error message with the gen_id
-            throw std::runtime_error("One bus is both connected and disconnected");
+    std::vector<CriticalPair> critical_pairs;
+    for(const auto & res : res_threads) critical_pairs.insert(critical_pairs.end(), res.begin(), res.end());
+    std::sort(critical_pairs.begin(), critical_pairs.end(), [](const CriticalPair & a, const CriticalPair & b){
+        return std::make_pair(a.branch_1, a.branch_2) < std::make_pair(b.branch_1, b.branch_2);
+    });
+    const int nb_critical = critical_pairs.size();
+    IntMat pairs(nb_critical, 3);
+    Eigen::VectorXd rho(nb_critical);
+    for(int pair_id = 0; pair_id < nb_critical; ++pair_id){
+        const CriticalPair & pair = critical_pairs[pair_id];
+        pairs.row(pair_id) << pair.branch_1, pair.branch_2, pair.overloaded;
+        rho(pair_id) = pair.rho;
+    }
+    const int nb_pair = nb_candidate * (nb_candidate - 1) / 2;
+    n2_stats_ = std::tuple<int, int, int>(nb_pair, std::accumulate(nb_pruned.begin(), nb_pruned.end(), 0), nb_critical);
+    return N2ContingencyRes(std::move(pairs), std::move(rho),
+                            Eigen::Map<const Eigen::VectorXi>(n1_critical.data(), n1_critical.size()));
+}
+
+void GridModel::check_branch_ids(const Eigen::VectorXi & branch_ids, const std::string & caller) const
+{
+    const int nb_branch = powerlines_.nb() + trafos_.nb();
+    for(int i = 0; i < branch_ids.size(); ++i){
+        if((branch_ids(i) < 0) || (branch_ids(i) >= nb_branch)){
+            throw std::runtime_error("GridModel::" + caller + ": a branch id does not exist (" + std::to_string(branch_ids(i)) + ")");
         }
-        bus_id_solver = bus_id_solver > slack_bus_id_solver ? bus_id_solver - 1 : bus_id_solver;
-        Va(bus_id_me) = Va_dc(bus_id_solver);
     }
-    Va.array() +=  std::arg(Vinit(slack_bus_id_));
+}
+
+void GridModel::update_graph_analytics()
+{
+    std::vector<int> topo_key;
+    get_topo_key(topo_key);
+    topo_key.push_back(n_sub_);
+    if(topo_key == graph_topo_key_) return;
+
+    const int nb_bus = bus_vn_kv_.size();
+    const int nb_line = powerlines_.nb();
+    const int nb_branch = nb_line + trafos_.nb();
+    // one edge per branch (a disconnected branch, or a branch connected to the same bus at both ends, is not an
+    // edge of the graph: its ends are -1)
+    std::vector<std::pair<int, int> > edges(nb_branch, std::pair<int, int>(-1, -1));
+    for(int branch_id = 0; branch_id < nb_branch; ++branch_id){
+        const int bus_or_id = branch_id < nb_line ? powerlines_.get_bus_or(branch_id) : trafos_.get_bus_hv(branch_id - nb_line);
+        const int bus_ex_id = branch_id < nb_line ? powerlines_.get_bus_ex(branch_id) : trafos_.get_bus_lv(branch_id - nb_line);
+        if((bus_or_id == _deactivated_bus_id) || (bus_or_id == bus_ex_id)) continue;
+        edges[branch_id] = std::pair<int, int>(bus_or_id, bus_ex_id);
+    }
+    nb_islands_ = find_bridges(bus_status_, edges, bridges_, articulation_buses_);
 
-    // fill Vm either Vinit if pq or Vm if pv (TODO)
-    Eigen::VectorXd Vm;
-    if(false){
-        Vm = Vinit.array().abs();  // fill Vm = Vinit for all
-        // put Vm = 0. for disconnected bus
-        for (int bus_id_me=0; bus_id_me < nb_bus_me; ++bus_id_me){
-            if(bus_status_[bus_id_me]) continue;  // nothing is done if the bus is connected
-            Vm(bus_id_me) = 0.;
+    // same graph, with all the buses of a substation merged
+    if(n_sub_ > 0){
+        std::vector<bool> sub_active(n_sub_, false);
+        for(int bus_id = 0; bus_id < nb_bus; ++bus_id){
+            if(bus_status_[bus_id]) sub_active[bus_id % n_sub_] = true;
+        }
+        std::vector<std::pair<int, int> > sub_edges(nb_branch, std::pair<int, int>(-1, -1));
+        for(int branch_id = 0; branch_id < nb_branch; ++branch_id){
+            if(edges[branch_id].first == -1) continue;
+            const int sub_or_id = edges[branch_id].first % n_sub_;
+            const int sub_ex_id = edges[branch_id].second % n_sub_;
+            if(sub_or_id != sub_ex_id) sub_edges[branch_id] = std::pair<int, int>(sub_or_id, sub_ex_id);
         }
-        // put Vm = Vm of turned on gen
-        // generators_.get_vm_for_dc(Vm);
-        // assign vm of the slack bus
-        Vm(slack_bus_id_) =  std::abs(Vinit(slack_bus_id_));
+        Eigen::Array<bool, Eigen::Dynamic, 1> sub_bridges;
+        find_bridges(sub_active, sub_edges, sub_bridges, articulation_substations_);
+    }else{
+        articulation_substations_ = Eigen::Array<bool, Eigen::Dynamic, 1>();
     }
-    else{
-        Vm = Eigen::VectorXd::Constant(Vinit.size(), 1.0);
-        for (int bus_id_me=0; bus_id_me < nb_bus_me; ++bus_id_me){
-            if(bus_status_[bus_id_me]) continue;  // nothing is done if the bus is connected
-            Vm(bus_id_me) = 0.;
+    graph_topo_key_ = std::move(topo_key);
+}
+
+Eigen::Array<bool, Eigen::Dynamic, 1> GridModel::get_articulation_substations()
+{
+    if(n_sub_ <= 0){
+        throw std::runtime_error("GridModel::get_articulation_substations: the number of substations should be set (with \"set_n_sub\")");
+    }
+    update_graph_analytics();
+    return articulation_substations_;
+}
+
+int GridModel::find_bridges(const std::vector<bool> & node_active,
+                            const std::vector<std::pair<int, int> > & edges,
+                            Eigen::Array<bool, Eigen::Dynamic, 1> & bridges,
+                            Eigen::Array<bool, Eigen::Dynamic, 1> & articulation_points)
+{
+    const int nb_node = node_active.size();
+    const int nb_edge = edges.size();
+    bridges = Eigen::Array<bool, Eigen::Dynamic, 1>::Constant(nb_edge, false);
+    articulation_points = Eigen::Array<bool, Eigen::Dynamic, 1>::Constant(nb_node, false);
+
+    // adjacency lists (compressed): the neighbours of the node i are adjacency[adj_start[i]:adj_start[i + 1]]
+    std::vector<int> adj_start(nb_node + 1, 0);
+    for(const auto & edge : edges){
+        if(edge.first == -1) continue;
+        ++adj_start[edge.first + 1];
+        ++adj_start[edge.second + 1];
+    }
+    for(int node = 0; node < nb_node; ++node) adj_start[node + 1] += adj_start[node];
+    std::vector<std::pair<int, int> > adjacency(adj_start[nb_node]);  // (neighbour, edge)
+    std::vector<int> adj_pos(adj_start.begin(), adj_start.end() - 1);
+    for(int edge_id = 0; edge_id < nb_edge; ++edge_id){
+        const auto & edge = edges[edge_id];
+        if(edge.first == -1) continue;
+        adjacency[adj_pos[edge.first]++] = std::pair<int, int>(edge.second, edge_id);
+        adjacency[adj_pos[edge.second]++] = std::pair<int, int>(edge.first, edge_id);
+    }
+
+    // depth first search without recursion: discovery time and lowest discovery time reachable from the subtree
+    // of each node (with at most one edge that is not in the tree)
+    struct Frame{
+        int node;
+        int parent_edge;
+        int next;  // next position in adjacency
+    };
+    std::vector<int> disc(nb_node, -1);
+    std::vector<int> low(nb_node, -1);
+    std::vector<Frame> stack;
+    int time = 0;
+    int nb_component = 0;
+    for(int root = 0; root < nb_node; ++root){
+        if(!node_active[root] || disc[root] != -1) continue;
+        ++nb_component;
+        int nb_root_child = 0;
+        disc[root] = low[root] = time++;
+        stack.push_back({root, -1, adj_start[root]});
+        while(!stack.empty()){
+            Frame & frame = stack.back();
+            const int node = frame.node;
+            if(frame.next < adj_start[node + 1]){
+                const int neighbour = adjacency[frame.next].first;
+                const int edge_id = adjacency[frame.next].second;
+                ++frame.next;
+                // the edge to the parent is not used to go back, but a parallel edge is
+                if(edge_id == frame.parent_edge) continue;
+                if(disc[neighbour] == -1){
+                    if(node == root) ++nb_root_child;
+                    disc[neighbour] = low[neighbour] = time++;
+                    stack.push_back({neighbour, edge_id, adj_start[neighbour]});
+                }else{
+                    low[node] = std::min(low[node], disc[neighbour]);
+                }
+                continue;
+            }
+            // all the neighbours of this node are visited
+            const int parent_edge = frame.parent_edge;
+            stack.pop_back();
+            if(stack.empty()) continue;
+            const int parent = stack.back().node;
+            low[parent] = std::min(low[parent], low[node]);
+            if(low[node] > disc[parent]) bridges(parent_edge) = true;
+            if((parent != root) && (low[node] >= disc[parent])) articulation_points(parent) = true;
         }
-        generators_.get_vm_for_dc(Vm);
+        if(nb_root_child > 1) articulation_points(root) = true;
+    }
+    return nb_component;
+}
+
+void GridModel::update_connectivity()
+{
+    if(!connectivity_changed_) return;  // connectivity_status_ and the isolated elements are up to date
+    connectivity_changed_ = false;
+    const int nb_bus = bus_vn_kv_.size();
+    const int nb_line = powerlines_.nb();
+    const int nb_branch = nb_line + trafos_.nb();
+    // ends of the connected branches (both their buses being connected)
+    std::vector<std::pair<int, int> > edges(nb_branch, std::pair<int, int>(-1, -1));
+    for(int branch_id = 0; branch_id < nb_branch; ++branch_id){
+        const int bus_or_id = branch_id < nb_line ? powerlines_.get_bus_or(branch_id) : trafos_.get_bus_hv(branch_id - nb_line);
+        const int bus_ex_id = branch_id < nb_line ? powerlines_.get_bus_ex(branch_id) : trafos_.get_bus_lv(branch_id - nb_line);
+        if((bus_or_id == _deactivated_bus_id) || (bus_ex_id == _deactivated_bus_id)) continue;
+        if(!bus_status_[bus_or_id] || !bus_status_[bus_ex_id]) continue;
+        edges[branch_id] = std::pair<int, int>(bus_or_id, bus_ex_id);
+    }
+
+    // a union find cannot split a component: it is built again if a branch has been disconnected (or moved)
+    bool rebuild = (uf_bus_status_ != bus_status_) || (static_cast<int>(uf_edges_.size()) != nb_branch);
+    for(int branch_id = 0; !rebuild && branch_id < nb_branch; ++branch_id){
+        if((uf_edges_[branch_id].first != -1) && (uf_edges_[branch_id] != edges[branch_id])) rebuild = true;
+    }
+    if(rebuild){
+        uf_parent_.resize(nb_bus);
+        std::iota(uf_parent_.begin(), uf_parent_.end(), 0);
+        uf_size_.assign(nb_bus, 1);
+        uf_edges_.assign(nb_branch, std::pair<int, int>(-1, -1));
+        uf_bus_status_ = bus_status_;
+        ++uf_nb_build_;
+    }else{
+        ++uf_nb_update_;
+    }
+    for(int branch_id = 0; branch_id < nb_branch; ++branch_id){
+        if((edges[branch_id].first == -1) || (uf_edges_[branch_id].first != -1)) continue;
+        uf_edges_[branch_id] = edges[branch_id];
+        // union by size
+        int root_or = uf_find(edges[branch_id].first);
+        int root_ex = uf_find(edges[branch_id].second);
+        if(root_or == root_ex) continue;
+        if(uf_size_[root_or] < uf_size_[root_ex]) std::swap(root_or, root_ex);
+        uf_parent_[root_ex] = root_or;
+        uf_size_[root_or] += uf_size_[root_ex];
+    }
+
+    // elements that are not in the connected component of the slack bus
+    isolated_buses_.clear();
+    isolated_loads_.clear();
+    isolated_gens_.clear();
+    const int nb_gen = generators_.nb();
+    const int slack_bus_id = ((gen_slackbus_ >= 0) && (gen_slackbus_ < nb_gen)) ? generators_.get_bus(gen_slackbus_) : _deactivated_bus_id;
+    if((slack_bus_id == _deactivated_bus_id) || !bus_status_[slack_bus_id]){
+        connectivity_status_ = ConnectivityStatus::SLACK_DISCONNECTED;
+        return;
+    }
+    const int slack_root = uf_find(slack_bus_id);
+    const int nb_load = loads_.nb();
+    for(int load_id = 0; load_id < nb_load; ++load_id){
+        const int bus_id = loads_.get_bus(load_id);
+        if(bus_id == _deactivated_bus_id) continue;
+        if(!bus_status_[bus_id] || (uf_find(bus_id) != slack_root)) isolated_loads_.push_back(load_id);
+    }
+    for(int gen_id = 0; gen_id < nb_gen; ++gen_id){
+        const int bus_id = generators_.get_bus(gen_id);
+        if(bus_id == _deactivated_bus_id) continue;
+        if(!bus_status_[bus_id] || (uf_find(bus_id) != slack_root)) isolated_gens_.push_back(gen_id);
+    }
+    for(int bus_id = 0; bus_id < nb_bus; ++bus_id){
+        if(bus_status_[bus_id] && (uf_find(bus_id) != slack_root)) isolated_buses_.push_back(bus_id);
+    }
+    if(!isolated_loads_.empty()) connectivity_status_ = ConnectivityStatus::LOAD_ISOLATED;
+    else if(!isolated_gens_.empty()) connectivity_status_ = ConnectivityStatus::GEN_ISOLATED;
+    else if(!isolated_buses_.empty()) connectivity_status_ = ConnectivityStatus::BUS_ISOLATED;
+    else connectivity_status_ = ConnectivityStatus::CONNECTED;
+}
+
+int GridModel::uf_find(int bus_id)
+{
+    while(uf_parent_[bus_id] != bus_id){
+        uf_parent_[bus_id] = uf_parent_[uf_parent_[bus_id]];
+        bus_id = uf_parent_[bus_id];
+    }
+    return bus_id;
+}
+
+ConnectivityRes GridModel::get_connectivity_report()
+{
+    update_connectivity();
+    return ConnectivityRes(connectivity_status_,
+                           Eigen::Map<const Eigen::VectorXi>(isolated_buses_.data(), isolated_buses_.size()),
+                           Eigen::Map<const Eigen::VectorXi>(isolated_loads_.data(), isolated_loads_.size()),
+                           Eigen::Map<const Eigen::VectorXi>(isolated_gens_.data(), isolated_gens_.size()));
+}
+
+int GridModel::fill_dc_transfer(int branch_id, Eigen::MatrixXd & theta, int col)
+{
+    const int nb_line = powerlines_.nb();
+    int bus_or_id_me, bus_ex_id_me;
+    if(branch_id < nb_line){
+        bus_or_id_me = powerlines_.get_bus_or(branch_id);
+        bus_ex_id_me = powerlines_.get_bus_ex(branch_id);
+    }else{
+        bus_or_id_me = trafos_.get_bus_hv(branch_id - nb_line);
+        bus_ex_id_me = trafos_.get_bus_lv(branch_id - nb_line);
+    }
+    if((bus_or_id_me == _deactivated_bus_id) || (bus_or_id_me == bus_ex_id_me)) return 0;
+    const int bus_or_solver_id = dc_id_me_to_solver_[bus_or_id_me];
+    const int bus_ex_solver_id = dc_id_me_to_solver_[bus_ex_id_me];
+    if((dcBf_.col(bus_or_solver_id).nonZeros() == 1) || (dcBf_.col(bus_ex_solver_id).nonZeros() == 1)) return -1;
+    if(bus_or_solver_id != dc_slack_bus_id_solver_){
+        theta(bus_or_solver_id > dc_slack_bus_id_solver_ ? bus_or_solver_id - 1 : bus_or_solver_id, col) += 1.;
+    }
+    if(bus_ex_solver_id != dc_slack_bus_id_solver_){
+        theta(bus_ex_solver_id > dc_slack_bus_id_solver_ ? bus_ex_solver_id - 1 : bus_ex_solver_id, col) -= 1.;
     }
-    //END of the SOLVER PART
+    return 1;
+}
+
+void GridModel::update_dcBf()
+{
+    const int nb_line = powerlines_.nb();
+    const int nb_branch = nb_line + trafos_.nb();
+    if(dcBf_.rows() == nb_branch) return;
+    std::vector<Eigen::Triplet<double> > tripletList;
+    tripletList.reserve(2 * nb_branch);
+    powerlines_.fillBf(tripletList, dc_id_me_to_solver_, 0);
+    trafos_.fillBf(tripletList, dc_id_me_to_solver_, nb_line);
+    dcBf_ = Eigen::SparseMatrix<double>(nb_branch, dc_id_solver_to_me_.size());
+    dcBf_.setFromTriplets(tripletList.begin(), tripletList.end());
+    dcBf_.makeCompressed();
+}
 
-    //TODO handle Vm = Vm (gen) for connected generators
-    return Vm.array() * (Va.array().cos().cast<cdouble>() + my_i * Va.array().sin().cast<cdouble>());
+bool GridModel::solve_dc_angles(Eigen::MatrixXd & theta, Eigen::MatrixXd & Va)
+{
+    if(!_dc_solver.solve_multi(dcYbus_, theta, dc_slack_bus_id_solver_)) return false;
+    // the flows only depend on the angle differences: the angle of the slack bus is 0.
+    const int nb_bus_solver = dc_id_solver_to_me_.size();
+    const int nb_col = theta.cols();
+    Va.resize(nb_bus_solver, nb_col);
+    Va.topRows(dc_slack_bus_id_solver_) = theta.topRows(dc_slack_bus_id_solver_);
+    Va.row(dc_slack_bus_id_solver_).setZero();
+    Va.bottomRows(nb_bus_solver - dc_slack_bus_id_solver_ - 1) = theta.bottomRows(nb_bus_solver - dc_slack_bus_id_solver_ - 1);
+    return true;
+}
+
+Eigen::VectorXcd GridModel::dc_pf(const Eigen::VectorXcd & Vinit,
+                                  int max_iter,  // not used for DC
+                                  double tol  // not used for DC
+                                  )
+{
+    int nb_bus = bus_vn_kv_.size();
+    if(Vinit.size() != nb_bus){
+        throw std::runtime_error("Size of the Vinit should be the same as the total number of buses (both conencted and disconnected). Components of Vinit corresponding to deactivated bys will be ignored anyway.");
+    }
+
+    if(check_connectivity() != ConnectivityStatus::CONNECTED){
+        reset_results();
+        return Eigen::VectorXcd();
+    }
+    if(!update_dc_topology()){
+        // only the injections changed: the factorization of the solver is reused
+        dcSbus_.setZero();
+    }
+    fillSbus_me(dcSbus_, false, dc_id_me_to_solver_, dc_slack_bus_id_solver_);
+
+    // voltage magnitudes (1. pu, or the setpoint of the generators), the angle of the slack bus is the one of Vinit
+    Eigen::VectorXd Vm = Eigen::VectorXd::Constant(nb_bus, 1.0);
+    generators_.get_vm_for_dc(Vm);
+    int nb_bus_solver = dc_id_solver_to_me_.size();
+    Eigen::VectorXcd V = Eigen::VectorXcd(nb_bus_solver);
+    for(int bus_id_solver = 0; bus_id_solver < nb_bus_solver; ++bus_id_solver){
+        V(bus_id_solver) = Vm(dc_id_solver_to_me_[bus_id_solver]);
+    }
+    V(dc_slack_bus_id_solver_) = std::polar(Vm(slack_bus_id_), std::arg(Vinit(slack_bus_id_)));
+
+    bool conv = _dc_solver.do_dc(dcYbus_, V, dcSbus_, dc_slack_bus_id_solver_);
+    if(!conv){
+        // matrix is not connected
+        reset_results();
+        return Eigen::VectorXcd();
+    }
+    compute_results(false);
+
+    // convert back the results to "big" vector (disconnected buses have a voltage of 0.)
+    Eigen::VectorXcd res = Eigen::VectorXcd::Constant(nb_bus, 0.);
+    for(int bus_id_solver = 0; bus_id_solver < nb_bus_solver; ++bus_id_solver){
+        res(dc_id_solver_to_me_[bus_id_solver]) = V(bus_id_solver);
+    }
+    return res;
 }
 
 int GridModel::nb_bus() const
@@ -420,6 +1904,8 @@ void GridModel::add_gen_slackbus(int gen_id){
     if(gen_id < 0) throw std::runtime_error("Slack bus should be an id of a generator, thus positive");
     if(gen_id > generators_.nb()) throw std::runtime_error("Slack bus should be an id of a generator, your id is to high.");
     gen_slackbus_ = gen_id;
+    need_reset_ = true;  // the slack bus might have moved
+    connectivity_changed_ = true;
 }
 
 /** GRID2OP SPECIFIC REPRESENTATION **/
@@ -16,13 +16,20 @@
 #include <chrono>
 #include <complex>      // std::complex, std::conj
 #include <cmath>  // for PI
+#include <list>
+#include <limits>
+#include <algorithm>
+#include <memory>
+#include <string>
+#include <thread>
+#include <atomic>
+#include <numeric>
 
 // eigen is necessary to easily pass data from numpy to c++ without any copy.
 // and to optimize the matrix operations
 #include "Eigen/Core"
 #include "Eigen/Dense"
 #include "Eigen/SparseCore"
-#include "Eigen/SparseLU"
 
 // import data classes
 #include "Utils.h"
@@ -36,12 +43,16 @@
 
 // import klu solver
 #include "KLUSolver.h"
+#include "FDPFSolver.h"
+#include "DCSolver.h"
 
-//TODO implement a BFS check to make sure the Ymatrix is "connected" [one single component]
 class GridModel : public DataGeneric
 {
     public:
-        GridModel():need_reset_(true){};
+        GridModel():need_reset_(true), topo_changed_(true), fixed_pattern_(false), pf_algorithm_(PFAlgorithm::NR),
+                    topo_cache_capacity_(0), topo_cache_hits_(0), topo_cache_misses_(0), topo_key_valid_(false),
+                    dense_threshold_(LinearSolver::default_dense_threshold), dc_slack_bus_id_solver_(-1), nb_islands_(0), uf_nb_build_(0), uf_nb_update_(0),
+                    connectivity_changed_(true), connectivity_status_(ConnectivityStatus::CONNECTED), n_sub_(-1){};
         GridModel(const GridModel & other);
         GridModel copy(){
             GridModel res(*this);
@@ -92,63 +103,147 @@ class GridModel : public DataGeneric
         void add_gen_slackbus(int gen_id);
 
         //powerflows
-        // dc powerflow
+        // dc powerflow (see DCSolver): the dc matrix and its factorization are kept until the topology changes,
+        // the results of the elements are computed with the dc approximation
         Eigen::VectorXcd dc_pf(const Eigen::VectorXcd & Vinit,
                                int max_iter,  // not used for DC
                                double tol  // not used for DC
                                );
 
+        // dc powerflows of the current topology for many scenarios: Pbus (MW) has one row per bus and one column per
+        // scenario, solved "chunk_size" at a time. Returns the flows at the origin of the branches (one row per
+        // scenario), empty if the grid is not connected
+        RealMat dc_pf_batch(const Eigen::Ref<const RealMat> & Pbus, int chunk_size);
+
+        // dc screening of the outages of single branches (powerlines, then trafos) by a rank one correction of the
+        // flows of the base case. Returns whether each outage splits the grid and the flows (MW) after each of them
+        DCContingencyRes dc_n1_screening(const Eigen::VectorXcd & Vinit,
+                                         const Eigen::VectorXi & branch_ids,
+                                         int chunk_size);
+
+        // dc sensitivity matrices of the current topology (branches: powerlines then trafos, all the buses of the grid,
+        // all the branches if a list is empty): PTDF (MW for 1MW at each bus, withdrawn at the slack bus) and LODF
+        // (NaN if the outage splits the grid)
+        RealMat get_ptdf(const Eigen::VectorXi & monitored_branches);
+        RealMat get_lodf(const Eigen::VectorXi & monitored_branches, const Eigen::VectorXi & outaged_branches);
+
+        // dc screening of the outages of pairs of branches from the LODF, the pairs whose bound on the flows is below
+        // rho_max are pruned. Returns the critical pairs (with the first overloaded branch), its relative flow and the
+        // critical single outages, see get_n2_stats
+        N2ContingencyRes dc_n2_screening(const Eigen::VectorXcd & Vinit,
+                                         const Eigen::VectorXi & branch_ids,
+                                         const Eigen::VectorXd & flow_limits,
+                                         double rho_max,
+                                         int n_threads);
+        std::tuple<int, int, int> get_n2_stats() const {return n2_stats_;}
+
+        // graph analytics of the current topology (Tarjan's algorithm, computed again only if the topology changed):
+        // bridges (branches whose outage splits the grid), articulation buses / substations and number of islands
+        Eigen::Array<bool, Eigen::Dynamic, 1> get_bridges() {update_graph_analytics(); return bridges_;}
+        Eigen::Array<bool, Eigen::Dynamic, 1> get_articulation_buses() {update_graph_analytics(); return articulation_buses_;}
+        Eigen::Array<bool, Eigen::Dynamic, 1> get_articulation_substations();
+        int get_nb_islands() {update_graph_analytics(); return nb_islands_;}
+
+        // connectivity of the current topology, checked by ac_pf and dc_pf before any computation (incremental union
+        // find of the buses, kept until an element changes of status / of bus, see record_topo_change)
+        ConnectivityStatus check_connectivity() {update_connectivity(); return connectivity_status_;}
+        ConnectivityRes get_connectivity_report();
+        std::tuple<int, int> get_connectivity_stats() const {return std::tuple<int, int>(uf_nb_build_, uf_nb_update_);}
+
         // ac powerflow
         Eigen::VectorXcd ac_pf(const Eigen::VectorXcd & Vinit,
                                int max_iter,
                                double tol);
 
+        // one ac powerflow per time step (row) of the injections, each one starting from the previous result,
+        // Ybus and the symbolic factorization are computed once. Returns the convergence, V and the branch flows
+        TimeSeriesRes compute_time_series(const Eigen::Ref<const RealMat> & loads_p,
+                                          const Eigen::Ref<const RealMat> & loads_q,
+                                          const Eigen::Ref<const RealMat> & gens_p,
+                                          const Eigen::Ref<const RealMat> & gens_v,
+                                          const Eigen::VectorXcd & Vinit,
+                                          int max_iter,
+                                          double tol);
+
+        // one ac powerflow per independent scenario, solved "batch_size" at a time (newton raphson whatever the
+        // algorithm set with "set_pf_algorithm"), without the GIL. The results of the elements are reset afterwards
+        TimeSeriesRes ac_pf_batch(const Eigen::Ref<const RealMat> & loads_p,
+                                  const Eigen::Ref<const RealMat> & loads_q,
+                                  const Eigen::Ref<const RealMat> & gens_p,
+                                  const Eigen::Ref<const RealMat> & gens_v,
+                                  const Eigen::VectorXcd & Vinit,
+                                  int max_iter,
+                                  double tol,
+                                  int batch_size);
+        Eigen::VectorXi get_batch_nb_iter() const {return batch_nb_iter_;}
+
+        // ac powerflow of the base case, then one per contingency (starting from the base case) on "n_threads" copies
+        // of the grid without the GIL. Returns the convergence, p_or (MW) and a_or (kA) of the branches per contingency
+        ContingencyRes run_n1(const std::vector<Contingency> & contingency_list,
+                              const Eigen::VectorXcd & Vinit,
+                              int max_iter,
+                              double tol,
+                              int n_threads);
+
+        // ac screening of the outages of single branches: "nb_step" newton raphson steps per outage with a low rank
+        // correction of the factorization of the base case. Returns the remaining mismatch and p_or / a_or per outage
+        // (newton raphson only, not in the "fixed pattern" mode)
+        ACContingencyRes ac_n1_screening(const Eigen::VectorXcd & Vinit,
+                                         const Eigen::VectorXi & branch_ids,
+                                         int max_iter,
+                                         double tol,
+                                         int nb_step);
+
+
+        // NB: modifying the status of a bus requires to recompute everything ("need_reset_") but modifying
+        // the status / the bus of the other elements only requires an update of Ybus ("topo_changed_"), in both
+        // cases the connectivity of the grid is checked again (see record_topo_change)
 
         // deactivate a bus. Be careful, if a bus is deactivated, but an element is
         //still connected to it, it will throw an exception
-        void deactivate_bus(int bus_id) {_deactivate(bus_id, bus_status_, need_reset_); }
+        void deactivate_bus(int bus_id) {bool changed = false; _deactivate(bus_id, bus_status_, changed); record_topo_change(changed, need_reset_); }
         // if a bus is connected, but isolated, it will make the powerflow diverge
-        void reactivate_bus(int bus_id) {_reactivate(bus_id, bus_status_, need_reset_); }
+        void reactivate_bus(int bus_id) {bool changed = false; _reactivate(bus_id, bus_status_, changed); record_topo_change(changed, need_reset_); }
         int nb_bus() const;
 
         //deactivate a powerline (disconnect it)
-        void deactivate_powerline(int powerline_id) {powerlines_.deactivate(powerline_id, need_reset_); }
-        void reactivate_powerline(int powerline_id) {powerlines_.reactivate(powerline_id, need_reset_); }
-        void change_bus_powerline_or(int powerline_id, int new_bus_id) {powerlines_.change_bus_or(powerline_id, new_bus_id, need_reset_, bus_vn_kv_.size()); }
-        void change_bus_powerline_ex(int powerline_id, int new_bus_id) {powerlines_.change_bus_ex(powerline_id, new_bus_id, need_reset_, bus_vn_kv_.size()); }
+        void deactivate_powerline(int powerline_id) {bool changed = false; powerlines_.deactivate(powerline_id, changed); record_topo_change(changed, topo_changed_); }
+        void reactivate_powerline(int powerline_id) {bool changed = false; powerlines_.reactivate(powerline_id, changed); record_topo_change(changed, topo_changed_); }
+        void change_bus_powerline_or(int powerline_id, int new_bus_id) {bool changed = false; powerlines_.change_bus_or(powerline_id, new_bus_id, changed, bus_vn_kv_.size()); record_topo_change(changed, topo_changed_); }
+        void change_bus_powerline_ex(int powerline_id, int new_bus_id) {bool changed = false; powerlines_.change_bus_ex(powerline_id, new_bus_id, changed, bus_vn_kv_.size()); record_topo_change(changed, topo_changed_); }
         int get_bus_powerline_or(int powerline_id) {return powerlines_.get_bus_or(powerline_id);}
         int get_bus_powerline_ex(int powerline_id) {return powerlines_.get_bus_ex(powerline_id);}
 
         //deactivate trafo
-        void deactivate_trafo(int trafo_id) {trafos_.deactivate(trafo_id, need_reset_); }
-        void reactivate_trafo(int trafo_id) {trafos_.reactivate(trafo_id, need_reset_); }
-        void change_bus_trafo_hv(int trafo_id, int new_bus_id) {trafos_.change_bus_hv(trafo_id, new_bus_id, need_reset_, bus_vn_kv_.size()); }
-        void change_bus_trafo_lv(int trafo_id, int new_bus_id) {trafos_.change_bus_lv(trafo_id, new_bus_id, need_reset_, bus_vn_kv_.size()); }
+        void deactivate_trafo(int trafo_id) {bool changed = false; trafos_.deactivate(trafo_id, changed); record_topo_change(changed, topo_changed_); }
+        void reactivate_trafo(int trafo_id) {bool changed = false; trafos_.reactivate(trafo_id, changed); record_topo_change(changed, topo_changed_); }
+        void change_bus_trafo_hv(int trafo_id, int new_bus_id) {bool changed = false; trafos_.change_bus_hv(trafo_id, new_bus_id, changed, bus_vn_kv_.size()); record_topo_change(changed, topo_changed_); }
+        void change_bus_trafo_lv(int trafo_id, int new_bus_id) {bool changed = false; trafos_.change_bus_lv(trafo_id, new_bus_id, changed, bus_vn_kv_.size()); record_topo_change(changed, topo_changed_); }
         int get_bus_trafo_hv(int trafo_id) {return trafos_.get_bus_hv(trafo_id);}
         int get_bus_trafo_lv(int trafo_id) {return trafos_.get_bus_lv(trafo_id);}
 
         //load
-        void deactivate_load(int load_id) {loads_.deactivate(load_id, need_reset_); }
-        void reactivate_load(int load_id) {loads_.reactivate(load_id, need_reset_); }
-        void change_bus_load(int load_id, int new_bus_id) {loads_.change_bus(load_id, new_bus_id, need_reset_, bus_vn_kv_.size()); }
+        void deactivate_load(int load_id) {bool changed = false; loads_.deactivate(load_id, changed); record_topo_change(changed, topo_changed_); }
+        void reactivate_load(int load_id) {bool changed = false; loads_.reactivate(load_id, changed); record_topo_change(changed, topo_changed_); }
+        void change_bus_load(int load_id, int new_bus_id) {bool changed = false; loads_.change_bus(load_id, new_bus_id, changed, bus_vn_kv_.size()); record_topo_change(changed, topo_changed_); }
         void change_p_load(int load_id, double new_p) {loads_.change_p(load_id, new_p, need_reset_); }
         void change_q_load(int load_id, double new_q) {loads_.change_q(load_id, new_q, need_reset_); }
         int get_bus_load(int load_id) {return loads_.get_bus(load_id);}
 
         //generator
-        void deactivate_gen(int gen_id) {generators_.deactivate(gen_id, need_reset_); }
-        void reactivate_gen(int gen_id) {generators_.reactivate(gen_id, need_reset_); }
-        void change_bus_gen(int gen_id, int new_bus_id) {generators_.change_bus(gen_id, new_bus_id, need_reset_, bus_vn_kv_.size()); }
+        void deactivate_gen(int gen_id) {bool changed = false; generators_.deactivate(gen_id, changed); record_topo_change(changed, topo_changed_); }
+        void reactivate_gen(int gen_id) {bool changed = false; generators_.reactivate(gen_id, changed); record_topo_change(changed, topo_changed_); }
+        void change_bus_gen(int gen_id, int new_bus_id) {bool changed = false; generators_.change_bus(gen_id, new_bus_id, changed, bus_vn_kv_.size()); record_topo_change(changed, topo_changed_); }
         void change_p_gen(int gen_id, double new_p) {generators_.change_p(gen_id, new_p, need_reset_); }
         void change_v_gen(int gen_id, double new_v_pu) {generators_.change_v(gen_id, new_v_pu, need_reset_); }
         int get_bus_gen(int gen_id) {return generators_.get_bus(gen_id);}
 
         //shunt
-        void deactivate_shunt(int shunt_id) {shunts_.deactivate(shunt_id, need_reset_); }
-        void reactivate_shunt(int shunt_id) {shunts_.reactivate(shunt_id, need_reset_); }
-        void change_bus_shunt(int shunt_id, int new_bus_id) {shunts_.change_bus(shunt_id, new_bus_id, need_reset_, bus_vn_kv_.size());  }
-        void change_p_shunt(int shunt_id, double new_p) {shunts_.change_p(shunt_id, new_p, need_reset_); }
-        void change_q_shunt(int shunt_id, double new_q) {shunts_.change_q(shunt_id, new_q, need_reset_); }
+        void deactivate_shunt(int shunt_id) {shunts_.deactivate(shunt_id, topo_changed_); }
+        void reactivate_shunt(int shunt_id) {shunts_.reactivate(shunt_id, topo_changed_); }
+        void change_bus_shunt(int shunt_id, int new_bus_id) {shunts_.change_bus(shunt_id, new_bus_id, topo_changed_, bus_vn_kv_.size());  }
+        void change_p_shunt(int shunt_id, double new_p) {shunts_.change_p(shunt_id, new_p, topo_changed_); }
+        void change_q_shunt(int shunt_id, double new_q) {shunts_.change_q(shunt_id, new_q, topo_changed_); }
         int get_bus_shunt(int shunt_id) {return shunts_.get_bus(shunt_id);}
 
         // All results access
@@ -179,16 +274,138 @@ class GridModel : public DataGeneric
         Eigen::VectorXi get_pq(){
             return bus_pq_;
         }
+        Eigen::SparseMatrix<double> get_Bp(){
+            return Bp_;
+        }
+        Eigen::SparseMatrix<double> get_Bpp(){
+            return Bpp_;
+        }
         Eigen::Ref<Eigen::VectorXd> get_Va(){
+            if(use_fdpf()) return _fdpf_solver.get_Va();
             return _solver.get_Va();
         }
         Eigen::Ref<Eigen::VectorXd> get_Vm(){
+            if(use_fdpf()) return _fdpf_solver.get_Vm();
             return _solver.get_Vm();
         }
         Eigen::SparseMatrix<double> get_J(){
             return _solver.get_J();
         }
 
+        // "fixed pattern" mode: Ybus and the jacobian keep the same sparsity pattern whatever the topology, so the
+        // symbolic factorization is computed once (requires "set_n_sub")
+        void set_fixed_pattern(bool fixed_pattern){
+            if(fixed_pattern != fixed_pattern_){
+                fixed_pattern_ = fixed_pattern;
+                Ybus_pattern_ = Eigen::SparseMatrix<cdouble>();
+                need_reset_ = true;
+                clear_topo_cache();
+                _solver.reset();
+            }
+        }
+        bool get_fixed_pattern() const {return fixed_pattern_;}
+
+        /**
+        algorithm used by "ac_pf": newton raphson (default) or fast decoupled (XB or BX variant, see FDPFSolver).
+        The fast decoupled method needs more (but much cheaper) iterations: B' and B'' are factorized only once
+        per topology. Both solvers keep their state when switching from one algorithm to the other.
+        **/
+        void set_pf_algorithm(PFAlgorithm pf_algorithm){
+            if(pf_algorithm != pf_algorithm_){
+                pf_algorithm_ = pf_algorithm;
+                // B' and B'' depend on the variant (XB or BX)
+                Bp_ = Eigen::SparseMatrix<double>();
+                Bpp_ = Eigen::SparseMatrix<double>();
+                _fdpf_solver.reset();
+            }
+        }
+        PFAlgorithm get_pf_algorithm() const {return pf_algorithm_;}
+
+        /**
+        "chord" newton raphson: the factorization of the jacobian is reused across iterations (and across calls
+        to "ac_pf") as long as the mismatch decreases fast enough, see KLUSolver::set_chord. It is not used in
+        the "fixed pattern" mode nor by the fast decoupled powerflow.
+        **/
+        void set_chord_newton(bool chord){_solver.set_chord(chord);}
+        bool get_chord_newton() const {return _solver.get_chord();}
+        void set_chord_policy(double max_ratio, int max_reuse){_solver.set_chord_policy(max_ratio, max_reuse);}
+        std::tuple<double, int> get_chord_policy() const {return _solver.get_chord_policy();}
+        int get_nb_refactor_saved() const {return _solver.get_nb_refactor_saved();}
+
+        /**
+        linear solver (see LinearSolver) used by "ac_pf" (for the jacobian matrix, or B' and B'' for the
+        fast decoupled powerflow): KLU (default), SparseLU or DenseLU. These matrices are not symmetric, LDLT
+        cannot be used.
+        **/
+        void set_linear_solver(LinearSolverType linear_solver_type);
+        LinearSolverType get_linear_solver() const {return _solver.get_linear_solver();}
+
+        /**
+        linear solver used by "dc_pf": KLU (default, as for the ac powerflow), SparseLU, LDLT (the matrix of the
+        dc powerflow is symmetric) or DenseLU.
+        **/
+        void set_dc_linear_solver(LinearSolverType linear_solver_type){_dc_solver.set_linear_solver(linear_solver_type);}
+        LinearSolverType get_dc_linear_solver() const {return _dc_solver.get_linear_solver();}
+
+        // grids with at most this number of buses are solved with LinearSolverType::DenseLU, for the ac and for the dc
+        // powerflow. Opt-in: -1 (never) by default, see benchmarks/dense_lu.py
+        void set_dense_threshold(int dense_threshold){
+            dense_threshold_ = dense_threshold;
+            _solver.set_dense_threshold(dense_threshold);
+            _fdpf_solver.set_dense_threshold(dense_threshold);
+            _fdpf_solver.reset();  // B' and B'' will be factorized again with the right solver
+        }
+        int get_dense_threshold() const {return dense_threshold_;}
+        void set_dc_dense_threshold(int dense_threshold){_dc_solver.set_dense_threshold(dense_threshold);}
+        int get_dc_dense_threshold() const {return _dc_solver.get_dense_threshold();}
+
+        // time the ac and dc powerflows with every linear solver (on copies of the grid) and keep the fastest ones,
+        // returns the average time of each of them
+        std::tuple<std::vector<double>, std::vector<double> > tune_linear_solver(const Eigen::VectorXcd & Vinit,
+                                                                                 int max_iter,
+                                                                                 double tol,
+                                                                                 int nb_pf);
+
+        // solve J.x = b (or J^T.x = b) in place for all the columns of b, with the factorization of the jacobian of
+        // the last newton raphson powerflow (see KLUSolver::solve_multi)
+        void solve_jacobian(Eigen::Ref<Eigen::MatrixXd> b, bool transpose=false){
+            if(use_fdpf()) throw std::runtime_error("GridModel::solve_jacobian: the jacobian is not factorized by the fast decoupled powerflow");
+            _solver.solve_multi(b, transpose);
+        }
+
+        // timers of the solver (for the last powerflow), see KLUSolver::get_timers
+        std::tuple<double, double, double, double, double, double, double> get_timers() {
+            if(use_fdpf()) return _fdpf_solver.get_timers();
+            return _solver.get_timers();
+        }
+        int get_nb_iter() {
+            if(use_fdpf()) return _fdpf_solver.get_nb_iter();
+            return _solver.get_nb_iter();
+        }
+        // number of calls to klu_analyze, klu_factor and klu_refactor performed by the solver
+        std::tuple<int, int, int> get_nb_factorizations() const {
+            if(use_fdpf()) return _fdpf_solver.get_nb_factorizations();
+            return _solver.get_nb_factorizations();
+        }
+        // same as above for the dc powerflow (number of analyze, factor and solve, see DCSolver)
+        std::tuple<double, double, double, double, double, double, double> get_dc_timers() {
+            return _dc_solver.get_timers();
+        }
+        std::tuple<int, int, int> get_dc_nb_factorizations() const {
+            return _dc_solver.get_nb_factorizations();
+        }
+
+        // cache of the prepared topologies (Ybus, bus ids, pv / pq and factorization of the jacobian), least recently
+        // used first out, disabled by default (capacity of 0), see get_topo_fingerprint
+        void set_topo_cache_capacity(int capacity);
+        int get_topo_cache_capacity() const {return topo_cache_capacity_;}
+        void clear_topo_cache();
+        // number of hits, number of misses and number of topologies currently in the cache
+        std::tuple<int, int, int> get_topo_cache_stats() const {
+            return std::tuple<int, int, int>(topo_cache_hits_, topo_cache_misses_, static_cast<int>(topo_cache_.size()));
+        }
+        std::uint64_t get_topo_fingerprint() const;
+
         // part dedicated to grid2op backend, optimized for grid2op data representation (for speed)
         // this is not recommended to use it outside of its intended usage.
         void update_bus_status(int nb_bus_before, Eigen::Ref<Eigen::Array<bool, Eigen::Dynamic, 2, Eigen::RowMajor> > active_bus);
@@ -255,6 +472,8 @@ class GridModel : public DataGeneric
         void set_n_sub(int n_sub)
         {
             n_sub_ = n_sub;
+            Ybus_pattern_ = Eigen::SparseMatrix<cdouble>();  // the pattern depends on the substations
+            need_reset_ = true;
         }
 
     protected:
@@ -271,12 +490,112 @@ class GridModel : public DataGeneric
         void fillYbus(Eigen::SparseMatrix<cdouble> & res, bool ac, const std::vector<int>& id_me_to_solver);
         void fillSbus_me(Eigen::VectorXcd & res, bool ac, const std::vector<int>& id_me_to_solver, int slack_bus_id_solver);
         void fillpv_pq(const std::vector<int>& id_me_to_solver);
+        /**
+        update Ybus_ (instead of recomputing it) when only the status / buses of some elements changed
+        (but not the status of the buses)
+        **/
+        void update_Ybus();
+        void init_ybus_state();
+        /**
+        compute Ybus_, pv / pq (and the bus conversion vectors) in the "fixed pattern" mode
+        **/
+        void init_Ybus_fixed_pattern();
+        void init_Ybus_pattern();
+
+        /**
+        compute B' and B'' for the fast decoupled powerflow (same bus ids as Ybus_)
+        **/
+        void fillBp_Bpp();
+        bool use_fdpf() const {return pf_algorithm_ != PFAlgorithm::NR;}
+        /**
+        compute Ybus_, pv / pq and reset the solver if needed for the current topology (see ac_pf),
+        Sbus_ has the right size (but not its values) afterwards
+        **/
+        void prepare_ac_pf();
+
+        // injections (one row per time step / scenario, one column per load / generator) used by compute_time_series and ac_pf_batch
+        void check_injections_size(const Eigen::Ref<const RealMat> & loads_p,
+                                   const Eigen::Ref<const RealMat> & loads_q,
+                                   const Eigen::Ref<const RealMat> & gens_p,
+                                   const Eigen::Ref<const RealMat> & gens_v,
+                                   const std::string & caller) const;
+        void set_injections(const Eigen::Ref<const RealMat> & loads_p,
+                            const Eigen::Ref<const RealMat> & loads_q,
+                            const Eigen::Ref<const RealMat> & gens_p,
+                            const Eigen::Ref<const RealMat> & gens_v,
+                            int row);
+        // copy p_or, q_or, a_or, p_ex, q_ex, a_ex of the branches (the powerlines, then the trafos) in the row "row" of flows_res
+        void get_branch_flows(std::vector<RealMat> & flows_res, int row);
+
+        // used by run_n1: check that the contingencies only contain valid elements, connect / disconnect an element
+        void check_contingencies(const std::vector<Contingency> & contingency_list) const;
+        bool get_element_status(ElementType element_type, int element_id) const;
+        void change_element_status(ElementType element_type, int element_id, bool status);
+        Eigen::Ref<Eigen::VectorXcd> get_V_solver(){
+            if(use_fdpf()) return _fdpf_solver.get_V();
+            return _solver.get_V();
+        }
+
+        /**
+        topology cache: "use_topo_cache" stores the current state in the cache, and restores the one
+        of the current topology if it is found (returns true in this case)
+        **/
+        void get_topo_key(std::vector<int> & res) const;
+        bool use_topo_cache();
+        /**
+        compute the dc admittance matrix (and forget the factorization of the dc solver) if the topology changed
+        since the last dc powerflow, returns whether it did
+        **/
+        bool update_dc_topology();
+        // compute dcBf_ for the current dc topology if needed
+        void update_dcBf();
+        // right hand side (column "col" of theta) of a transfer of 1MW between both ends of a branch: returns 0 if it
+        // is disconnected, -1 if its outage splits the grid, 1 otherwise
+        int fill_dc_transfer(int branch_id, Eigen::MatrixXd & theta, int col);
+        /**
+        solver ids of the buses at both ends of a branch (the powerlines, then the trafos) and its coefficients in
+        Ybus_ (see DataLine::get_ybus_coeffs), returns false if the branch is disconnected
+        **/
+        bool get_branch_ybus(int branch_id, int & bus_or_solver_id, int & bus_ex_solver_id,
+                             cdouble & y_off, cdouble & y_or, cdouble & y_ex);
+        // compute the bridges, the articulation buses and substations and the number of islands if the topology changed
+        void update_graph_analytics();
+        /**
+        Tarjan's algorithm (iterative): bridges (one per edge, edges[i] being the nodes at both ends of the edge
+        i) and articulation points (one per node) of an undirected graph, only the nodes with node_active set are
+        in the graph. It returns the number of connected components.
+        **/
+        static int find_bridges(const std::vector<bool> & node_active,
+                                const std::vector<std::pair<int, int> > & edges,
+                                Eigen::Array<bool, Eigen::Dynamic, 1> & bridges,
+                                Eigen::Array<bool, Eigen::Dynamic, 1> & articulation_points);
+        /**
+        update the union find of the buses (only the connected branches that were not in it are merged, unless
+        it needs to be built again) and the connectivity status and isolated elements (see check_connectivity)
+        **/
+        void update_connectivity();
+        // an element (or a bus) changed of status / of bus if "changed": "flag" (need_reset_ or topo_changed_) is set
+        // and the connectivity will be checked again
+        void record_topo_change(bool changed, bool & flag) {
+            if(!changed) return;
+            flag = true;
+            connectivity_changed_ = true;
+        }
+        // representative of the connected component of a bus in the union find (with path halving)
+        int uf_find(int bus_id);
+        // raise an exception (from "caller") if an id of branch_ids is not the id of a branch
+        void check_branch_ids(const Eigen::VectorXi & branch_ids, const std::string & caller) const;
+        /**
+        solve B.theta = P for all the columns of theta (without the slack bus, see DCSolver::solve_multi) and
+        copy the results in Va (all the buses of the solver, the angle of the slack bus being 0.)
+        **/
+        bool solve_dc_angles(Eigen::MatrixXd & theta, Eigen::MatrixXd & Va);
 
         // results
         /**
-        Compute the results vector from the Va, Vm post powerflow
+        Compute the results vector from the Va, Vm post powerflow (of the ac or of the dc solver)
         **/
-        void compute_results();
+        void compute_results(bool ac=true);
         /**
         reset the results in case of divergence of the powerflow.
         **/
@@ -335,7 +654,10 @@ class GridModel : public DataGeneric
     protected:
         // member of the grid
         // static const int _deactivated_bus_id;
-        bool need_reset_;
+        bool need_reset_;  // everything needs to be recomputed
+        bool topo_changed_;  // some elements changed of status / bus, Ybus needs to be updated
+        bool fixed_pattern_;  // the sparsity pattern of Ybus does not depend on the topology
+        PFAlgorithm pf_algorithm_;  // algorithm used to compute the ac powerflow
 
         // powersystem representation
         // 1. bus
@@ -377,11 +699,76 @@ class GridModel : public DataGeneric
         Eigen::VectorXcd Sbus_;
         Eigen::VectorXi bus_pv_;  // id are the solver internal id and NOT the initial id
         Eigen::VectorXi bus_pq_;  // id are the solver internal id and NOT the initial id
+        Eigen::SparseMatrix<cdouble> Ybus_pattern_;  // all 0., used only in the "fixed pattern" mode
+        Eigen::SparseMatrix<double> Bp_;  // B' for the fast decoupled powerflow
+        Eigen::SparseMatrix<double> Bpp_;  // B'' for the fast decoupled powerflow
+
+        // cache of the prepared topologies
+        struct PreparedTopo
+        {
+            std::vector<int> key;
+            Eigen::SparseMatrix<cdouble> Ybus;
+            std::vector<int> id_me_to_solver;
+            std::vector<int> id_solver_to_me;
+            int slack_bus_id_solver;
+            Eigen::VectorXi bus_pv;
+            Eigen::VectorXi bus_pq;
+            std::shared_ptr<JacobianFactorization> factorization;
+        };
+        int topo_cache_capacity_;
+        int topo_cache_hits_;
+        int topo_cache_misses_;
+        std::list<PreparedTopo> topo_cache_;  // most recently used first
+        std::vector<int> topo_key_;  // key of the topology Ybus_, pv, pq etc. have been computed for
+        bool topo_key_valid_;  // whether the state above can be put in the cache (powerflow converged)
 
         // TODO have version of the stuff above for the public api, indexed with "me" and not "solver"
 
         // to solve the newton raphson
         KLUSolver _solver;
+        int dense_threshold_;
+        // to solve the fast decoupled powerflow
+        FDPFSolver _fdpf_solver;
+
+        // dc powerflow, the dc admittance matrix is computed again only if the topology changed
+        DCSolver _dc_solver;
+        Eigen::SparseMatrix<cdouble> dcYbus_;
+        Eigen::VectorXcd dcSbus_;
+        std::vector<int> dc_id_me_to_solver_;
+        std::vector<int> dc_id_solver_to_me_;
+        int dc_slack_bus_id_solver_;
+        std::vector<int> dc_topo_key_;  // key of the topology dcYbus_ has been computed for (empty: none)
+        Eigen::SparseMatrix<double> dcBf_;  // dc flows of the branches from the angles (see dc_pf_batch)
+        // below this value of 1 - (flow through a branch of a transfer between its ends), its outage splits the grid
+        static const double split_grid_tol_;
+        // number of right hand sides solved at once by get_ptdf, get_lodf and ac_n1_screening
+        static const int sensitivity_chunk_size_;
+
+        // number of iterations of each scenario of the last call to ac_pf_batch
+        Eigen::VectorXi batch_nb_iter_;
+        // number of pairs, pruned pairs and critical pairs of the last call to dc_n2_screening
+        std::tuple<int, int, int> n2_stats_;
+
+        // graph analytics (see get_bridges) and the topology (with the number of substations) they are computed for
+        std::vector<int> graph_topo_key_;
+        Eigen::Array<bool, Eigen::Dynamic, 1> bridges_;
+        Eigen::Array<bool, Eigen::Dynamic, 1> articulation_buses_;
+        Eigen::Array<bool, Eigen::Dynamic, 1> articulation_substations_;
+        int nb_islands_;
+
+        // union find of the buses (see check_connectivity): parent and size of the component of each bus, the ends
+        // of the branches merged in it ((-1, -1) if not merged) and the status of the buses it is built for
+        std::vector<int> uf_parent_;
+        std::vector<int> uf_size_;
+        std::vector<std::pair<int, int> > uf_edges_;
+        std::vector<bool> uf_bus_status_;
+        int uf_nb_build_;
+        int uf_nb_update_;
+        bool connectivity_changed_;  // the topology changed since the last check, connectivity_status_ is outdated
+        ConnectivityStatus connectivity_status_;
+        std::vector<int> isolated_buses_;
+        std::vector<int> isolated_loads_;
+        std::vector<int> isolated_gens_;
 
         // specific grid2op
         int n_sub_;
@@ -9,6 +9,7 @@
 #include "KLUSolver.h"
 
 const cdouble KLUSolver::my_i = {0., 1.};
+const double KLUSolver::pivot_rcond_ratio_ = 1e-3;
 
 bool KLUSolver::do_newton(const Eigen::SparseMatrix<cdouble> & Ybus,
                           Eigen::VectorXcd & V,
@@ -26,9 +27,11 @@ bool KLUSolver::do_newton(const Eigen::SparseMatrix<cdouble> & Ybus,
     **/
     // TODO check what can be checked: no voltage at 0, Ybus is square, Sbus same size than V and
     // TODO Ybus (nrow or ncol), pv and pq have value that are between 0 and nrow etc.
+    if(user_matrix_) reset();  // the factorization is not the one of a jacobian matrix
     reset_timer();
     if(err_ > 0) return false; // i don't do anything if there were a problem at the initialization
     auto timer = CustTimer();
+    update_linear_solver(Ybus.cols());
     // initialize once and for all the "inverse" of these vectors
     int n_pv = pv.size();
     int n_pq = pq.size();
@@ -46,25 +49,41 @@ bool KLUSolver::do_newton(const Eigen::SparseMatrix<cdouble> & Ybus,
 
     // first check, if the problem is already solved, i stop there
     Eigen::VectorXd F = _evaluate_Fx(Ybus, V, Sbus, pv, pq);
+    double norm_F = F.lpNorm<Eigen::Infinity>();
     bool converged = _check_for_convergence(F, tol);
     nr_iter_ = 0; //current step
     bool res = true;  // have i converged or not
     bool has_just_been_inialized = false;  // to avoid a call to klu_refactor follow a call to klu_factor in the same loop
+    // "chord" mode: the factorization of the last call is valid (same Ybus, pv and pq), it is reused
+    bool reuse_J = chord_ && (err_ == 0) && (!need_factorize_);
+    Eigen::VectorXd F_prev;
+    Eigen::VectorXcd V_prev;
     while ((!converged) & (nr_iter_ < max_iter)){
         nr_iter_++;
-        fill_jacobian_matrix(Ybus, V_, pq, pvpq, pq_inv, pvpq_inv);
-        if(need_factorize_){
-            initialize();
-            if(err_ != 0){
-                // I got an error during the initialization of the linear system, i need to stop here
-                res = false;
-                break;
+        // (the convergence of the chord method is only linear: the last half of the iterations are standard ones)
+        bool is_chord_step = reuse_J && (nb_chord_solve_ < chord_max_reuse_) && (2 * nr_iter_ <= max_iter);
+        if(is_chord_step){
+            // the jacobian is neither computed nor factorized, the step can be reverted if it is not good enough
+            F_prev = F;
+            V_prev = V_;
+            ++nb_chord_solve_;
+            solve(F, true);
+        }else{
+            fill_jacobian_matrix(Ybus, V_, pq, pvpq, pq_inv, pvpq_inv);
+            if(need_factorize_){
+                initialize();
+                if(err_ != 0){
+                    // I got an error during the initialization of the linear system, i need to stop here
+                    res = false;
+                    break;
+                }
+                has_just_been_inialized = true;
             }
-            has_just_been_inialized = true;
+            //TODO refactorize is called uselessly at the first iteration
+            solve(F, has_just_been_inialized);
+            has_just_been_inialized = false;
+            nb_chord_solve_ = 0;
         }
-        //TODO refactorize is called uselessly at the first iteration
-        solve(F, has_just_been_inialized);
-        has_just_been_inialized = false;
         if(err_ != 0){
             // I got an error during the solving of the linear system, i need to stop here
             res = false;
@@ -88,7 +107,23 @@ bool KLUSolver::do_newton(const Eigen::SparseMatrix<cdouble> & Ybus,
 
         F = _evaluate_Fx(Ybus, V_, Sbus, pv, pq);
         bool tmp = F.allFinite();
+        double norm_F_new = tmp ? F.lpNorm<Eigen::Infinity>() : 0.;
+        if(is_chord_step && (!tmp || norm_F_new >= norm_F)){
+            // the outdated jacobian did not reduce the mismatch: the step is discarded and
+            // the jacobian will be computed (and refactorized) at the next iteration
+            --nb_chord_solve_;
+            V_.swap(V_prev);
+            F.swap(F_prev);
+            Vm_ = V_.array().abs();
+            Va_ = V_.array().arg();
+            reuse_J = false;
+            continue;
+        }
         if(!tmp) break; // divergence due to Nans
+        if(is_chord_step) ++nb_refactor_saved_;
+        // the factorization is kept as long as the mismatch decreases fast enough
+        reuse_J = chord_ && (norm_F_new <= chord_max_ratio_ * norm_F);
+        norm_F = norm_F_new;
         converged = _check_for_convergence(F, tol);
     }
     if(!converged){
@@ -100,20 +135,17 @@ bool KLUSolver::do_newton(const Eigen::SparseMatrix<cdouble> & Ybus,
 }
 
 void KLUSolver::reset(){
-    klu_free_symbolic(&symbolic_, &common_);
-    klu_free_numeric(&numeric_, &common_);
-    n_ = -1;
-    common_ = klu_common();
-
-    symbolic_ = nullptr;
-    numeric_ = nullptr;
+    linear_solver_->reset();
 
     Vm_ = Eigen::VectorXd();  // voltage magnitude
     Va_= Eigen::VectorXd();  // voltage angle
     J_ = Eigen::SparseMatrix<double>();  // the jacobian matrix
     dS_dVm_ = Eigen::SparseMatrix<cdouble>();
     dS_dVa_ = Eigen::SparseMatrix<cdouble>();
+    value_map_ = std::vector<int>();
     need_factorize_ = true;
+    user_matrix_ = false;
+    nb_chord_solve_ = 0;
     nr_iter_ = 0;  // number of iteration performs by the Newton Raphson algorithm
     err_ = -1; //error message:
 
@@ -121,16 +153,46 @@ void KLUSolver::reset(){
     reset_timer();
 }
 
+void KLUSolver::move_factorization_to(JacobianFactorization & res){
+    res.free();
+    if(!has_factorization()){
+        // nothing to give
+        reset();
+        return;
+    }
+    res.solver_ = std::move(linear_solver_);  // not owned by this solver anymore
+    res.J_.swap(J_);
+    linear_solver_ = LinearSolver::create(linear_solver_type_);
+    reset();
+}
+
+void KLUSolver::move_factorization_from(JacobianFactorization & other){
+    reset();
+    // nothing to take (or factorization made by another kind of solver): it will be computed at the next call to do_newton
+    // (the DenseLU ones are kept: they have been made for a grid of the same size, see update_linear_solver)
+    if((other.solver_ == nullptr) || !other.solver_->is_factorized() ||
+       ((other.solver_->get_type() != linear_solver_type_) && (other.solver_->get_type() != LinearSolverType::DenseLU))){
+        other.free();
+        return;
+    }
+    linear_solver_ = std::move(other.solver_);  // not owned by "other" anymore
+    J_.swap(other.J_);
+    other.free();
+    // the jacobian will be "klu_refactor"ed with its new values (or reused as is in the "chord" mode)
+    need_factorize_ = false;
+    err_ = 0;
+}
+
 void KLUSolver::initialize(){
     // default Eigen representation: column major, which is good for klu !
     // J is const here, even if it's not said in klu_analyze
     auto timer = CustTimer();
-    n_ = J_.cols(); // should be equal to J_.nrows()
     err_ = 0; // reset error message
-    common_ = klu_common();
-    symbolic_ = klu_analyze(n_, J_.outerIndexPtr(), J_.innerIndexPtr(), &common_);
-    numeric_ = klu_factor(J_.outerIndexPtr(), J_.innerIndexPtr(), J_.valuePtr(), symbolic_, &common_);
-    if (common_.status != KLU_OK) {
+    bool ok = linear_solver_->analyze(J_);
+    if(ok) ok = linear_solver_->factor(J_);
+    ++nb_analyze_;
+    ++nb_factor_;
+    if (!ok) {
         err_ = 1;
     }
     need_factorize_ = false;
@@ -142,27 +204,107 @@ void KLUSolver::solve(Eigen::VectorXd & b, bool has_just_been_inialized){
     // supposes that the solver has been initialized (call klu_solver.analyze() before calling that)
     // J is const even if it does not compile if said const
     auto timer = CustTimer();
-    int ok;
     bool stop = false;
     if(!has_just_been_inialized){
         // if the call to "klu_factor" has been made this iteration, there is no need
         // to re factor again the matrix
         // i'm in the case where it has not
-        ok = klu_refactor(J_.outerIndexPtr(), J_.innerIndexPtr(), J_.valuePtr(), symbolic_, numeric_, &common_);
-        if (ok != 1) {
+        bool ok = linear_solver_->refactor(J_);
+        ++nb_refactor_;
+        if (!ok) {
             err_ = 2;
             stop = true;
         }
     }
     if(!stop){
-        ok = klu_solve(symbolic_, numeric_, n_, 1, &b(0), &common_);
-        if (ok != 1) {
+        bool ok = linear_solver_->solve(b);
+        if (!ok) {
             err_ = 3;
         }
     }
     timer_solve_ += timer.duration();
 }
 
+void KLUSolver::solve_multi(Eigen::Ref<Eigen::MatrixXd> b, bool transpose){
+    if((err_ != 0) || !linear_solver_->is_factorized()){
+        throw std::runtime_error("KLUSolver::solve_multi: there is no valid factorization (call \"factorize\" or run a powerflow first)");
+    }
+    if(b.rows() != linear_solver_->size()){
+        throw std::runtime_error("KLUSolver::solve_multi: b should have as many rows as the factorized matrix");
+    }
+    if(b.cols() == 0) return;
+    // the factorization is not modified (the klu solver uses a copy of its klu_common)
+    if(!linear_solver_->solve(b, transpose)){
+        throw std::runtime_error("KLUSolver::solve_multi: the linear solver failed");
+    }
+}
+
+bool KLUSolver::factorize_jacobian(const Eigen::SparseMatrix<cdouble> & Ybus,
+                                   const Eigen::VectorXcd & V,
+                                   const Eigen::VectorXi & pv,
+                                   const Eigen::VectorXi & pq)
+{
+    if(user_matrix_) reset();  // the factorization is not the one of a jacobian matrix
+    update_linear_solver(Ybus.cols());
+    int n_pv = pv.size();
+    int n_pq = pq.size();
+    Eigen::VectorXi pvpq(n_pv + n_pq);
+    pvpq << pv, pq;
+    int n_pvpq = pvpq.size();
+    std::vector<int> pvpq_inv(V.size(), -1);
+    for(int inv_id=0; inv_id < n_pvpq; ++inv_id) pvpq_inv[pvpq(inv_id)] = inv_id;
+    std::vector<int> pq_inv(V.size(), -1);
+    for(int inv_id=0; inv_id < n_pq; ++inv_id) pq_inv[pq(inv_id)] = inv_id;
+
+    fill_jacobian_matrix(Ybus, V, pq, pvpq, pq_inv, pvpq_inv);
+    if(need_factorize_){
+        initialize();
+    }else{
+        err_ = linear_solver_->refactor(J_) ? 0 : 2;
+        ++nb_refactor_;
+    }
+    nb_chord_solve_ = 0;
+    return err_ == 0;
+}
+
+void KLUSolver::factorize(const Eigen::SparseMatrix<double> & A){
+    if(A.rows() != A.cols()){
+        throw std::runtime_error("KLUSolver::factorize: the matrix should be square");
+    }
+    reset();
+    J_ = A;
+    J_.makeCompressed();
+    user_matrix_ = true;
+    bool ok = linear_solver_->analyze(J_);
+    if(ok) ok = linear_solver_->factor(J_);
+    ++nb_analyze_;
+    ++nb_factor_;
+    // klu_factor does not always detect numerically singular matrices
+    if(ok && linear_solver_->keeps_pivots()) ok = linear_solver_->rcond() > 0.;
+    if(!ok){
+        reset();
+        throw std::runtime_error("KLUSolver::factorize: the matrix cannot be factorized (it might be singular)");
+    }
+    need_factorize_ = false;
+    err_ = 0;
+}
+
+void KLUSolver::set_linear_solver(LinearSolverType linear_solver_type){
+    if(linear_solver_type == LinearSolverType::LDLT){
+        throw std::runtime_error("KLUSolver::set_linear_solver: the jacobian matrix is not symmetric, LDLT cannot be used");
+    }
+    linear_solver_type_ = linear_solver_type;
+    linear_solver_ = LinearSolver::create(linear_solver_type_);
+    reset();
+}
+
+void KLUSolver::update_linear_solver(int nb_bus){
+    LinearSolverType linear_solver_type = nb_bus <= dense_threshold_ ? LinearSolverType::DenseLU : linear_solver_type_;
+    if(linear_solver_->get_type() == linear_solver_type) return;
+    linear_solver_ = LinearSolver::create(linear_solver_type);
+    need_factorize_ = true;
+}
+
 void KLUSolver::_dSbus_dV(const Eigen::Ref<const Eigen::SparseMatrix<cdouble> > & Ybus,
                           const Eigen::Ref<const Eigen::VectorXcd > & V){
     auto timer = CustTimer();
@@ -204,40 +346,89 @@ void KLUSolver::_dSbus_dV(const Eigen::Ref<const Eigen::SparseMatrix<cdouble> >
     timer_dSbus_ += timer.duration();
 }
 
-void KLUSolver::_get_values_J(int & nb_obj_this_col,
-                              std::vector<int> & inner_index,
-                              std::vector<double> & values,
-                              const Eigen::SparseMatrix<double> & mat,  // ex. dS_dVa_r
-                              const std::vector<int> & index_row_inv, // ex. pvpq_inv
-                              const Eigen::VectorXi & index_col, // ex. pvpq
-                              int col_id,
-                              int row_lag  // 0 for J11 for example, n_pvpq for J12
-                             )
+void KLUSolver::_prepare_dS_dV(const Eigen::SparseMatrix<cdouble> & Ybus, const Eigen::VectorXcd & V)
+{
+    auto timer = CustTimer();
+    Ibus_.noalias() = Ybus * V;
+    Vnorm_ = V.array() / V.array().abs();
+    timer_dSbus_ += timer.duration();
+}
+
+void KLUSolver::_init_J_pattern(const Eigen::SparseMatrix<cdouble> & Ybus,
+                                const Eigen::VectorXi & pq,
+                                const Eigen::VectorXi & pvpq,
+                                const std::vector<int> & pq_inv,
+                                const std::vector<int> & pvpq_inv)
 {
     /**
-    This function will fill the "inner_index" and "values" with the non zero values
-    present in the matrix "mat" for the column of the J matrix with id "col_id"
-    which corresponds to the column "index_col(col_id)" of the matrix mat.
-
-    The rows need to be converted using another vector too. For example, row "j" of J
-    need to be filled with element k of matrix "mat" with k such that "index_row[j] = k"
-    Hence, we pass as the argument of this function the "inverse" of index_row, which is such
-    that : "j = index_row_inv[k]" is easily computable given k.
+    J_ has a non zero coefficient for each non zero coefficient of Ybus (explicit 0. included) that
+    is in the selected rows / columns of each of its blocks.
     **/
-    int col_id_mat = index_col(col_id);
+    const int n_pvpq = pvpq.size();
+    const int n_pq = pq.size();
+    const int size_j = n_pvpq + n_pq;
+    const int n = Ybus.cols();
+    std::vector<Eigen::Triplet<double> > tripletList;
+    tripletList.reserve(4 * Ybus.nonZeros());
+    for(int col_id = 0; col_id < n; ++col_id){
+        const int col_pvpq = pvpq_inv[col_id];
+        const int col_pq = pq_inv[col_id];
+        for (Eigen::SparseMatrix<cdouble>::InnerIterator it(Ybus, col_id); it; ++it){
+            const int row_pvpq = pvpq_inv[it.row()];
+            const int row_pq = pq_inv[it.row()];
+            if(col_pvpq >= 0){
+                if(row_pvpq >= 0) tripletList.push_back(Eigen::Triplet<double>(row_pvpq, col_pvpq, 0.));  // J11
+                if(row_pq >= 0) tripletList.push_back(Eigen::Triplet<double>(row_pq + n_pvpq, col_pvpq, 0.));  // J21
+            }
+            if(col_pq >= 0){
+                if(row_pvpq >= 0) tripletList.push_back(Eigen::Triplet<double>(row_pvpq, col_pq + n_pvpq, 0.));  // J12
+                if(row_pq >= 0) tripletList.push_back(Eigen::Triplet<double>(row_pq + n_pvpq, col_pq + n_pvpq, 0.));  // J22
+            }
+        }
+    }
+    J_ = Eigen::SparseMatrix<double>(size_j, size_j);
+    J_.setFromTriplets(tripletList.begin(), tripletList.end());
+    J_.makeCompressed();
+    _init_value_map(Ybus, n_pvpq, pq_inv, pvpq_inv);
+}
 
-    int start_id = mat.outerIndexPtr()[col_id_mat];
-    int end_id = mat.outerIndexPtr()[col_id_mat+1];
-    for(int obj_id = start_id; obj_id < end_id; ++obj_id)
-    {
-        int row_id_dS_dVa = mat.innerIndexPtr()[obj_id];
-        // I add the value only if the rows was selected in the indexes
-        int row_id = index_row_inv[row_id_dS_dVa];
-        if(row_id >= 0)
-        {
-            inner_index.push_back(row_id+row_lag);
-            values.push_back(mat.valuePtr()[obj_id]);
-            nb_obj_this_col++;
+void KLUSolver::_init_value_map(const Eigen::SparseMatrix<cdouble> & Ybus,
+                                int n_pvpq,
+                                const std::vector<int> & pq_inv,
+                                const std::vector<int> & pvpq_inv)
+{
+    /**
+    Supposes J_ has the pattern computed in "_init_J_pattern" (possibly in another call, eg. if J_ has been
+    restored with "move_factorization_from"). This search is done once per topology.
+    **/
+    const int n = Ybus.cols();
+    const int * Jp = J_.outerIndexPtr();
+    const int * Ji = J_.innerIndexPtr();
+    // index of coefficient (row_id, col_id) of J_ in J_.valuePtr()
+    auto get_index = [Jp, Ji](int row_id, int col_id){
+        const int * beg = Ji + Jp[col_id];
+        const int * end = Ji + Jp[col_id + 1];
+        const int * res = std::lower_bound(beg, end, row_id);
+        if((res == end) || (*res != row_id)) throw std::runtime_error("KLUSolver::_init_value_map: the jacobian matrix does not have the expected sparsity pattern.");
+        return static_cast<int>(res - Ji);
+    };
+
+    value_map_ = std::vector<int>(4 * Ybus.nonZeros(), -1);
+    int k = 0;
+    for(int col_id = 0; col_id < n; ++col_id){
+        const int col_pvpq = pvpq_inv[col_id];
+        const int col_pq = pq_inv[col_id];
+        for (Eigen::SparseMatrix<cdouble>::InnerIterator it(Ybus, col_id); it; ++it, ++k){
+            const int row_pvpq = pvpq_inv[it.row()];
+            const int row_pq = pq_inv[it.row()];
+            if(col_pvpq >= 0){
+                if(row_pvpq >= 0) value_map_[4 * k] = get_index(row_pvpq, col_pvpq);
+                if(row_pq >= 0) value_map_[4 * k + 1] = get_index(row_pq + n_pvpq, col_pvpq);
+            }
+            if(col_pq >= 0){
+                if(row_pvpq >= 0) value_map_[4 * k + 2] = get_index(row_pvpq, col_pq + n_pvpq);
+                if(row_pq >= 0) value_map_[4 * k + 3] = get_index(row_pq + n_pvpq, col_pq + n_pvpq);
+            }
         }
     }
 }
@@ -260,126 +451,42 @@ void KLUSolver::fill_jacobian_matrix(const Eigen::SparseMatrix<cdouble> & Ybus,
     J12 = dS_dVm[array([pvpq]).T, pq].real
     J21 = dS_dVa[array([pq]).T, pvpq].imag
     J22 = dS_dVm[array([pq]).T, pq].imag
+
+    The entries of dS_dVa and dS_dVm are computed one by one, and directly written in J_.valuePtr() (no
+    temporary sparse matrix, no search in J_)
     **/
 
     auto timer = CustTimer();
-    _dSbus_dV(Ybus, V);
-    Eigen::SparseMatrix<double> dS_dVa_r = dS_dVa_.real();
-    Eigen::SparseMatrix<double> dS_dVa_i = dS_dVa_.imag();
-    Eigen::SparseMatrix<double> dS_dVm_r = dS_dVm_.real();
-    Eigen::SparseMatrix<double> dS_dVm_i = dS_dVm_.imag();
-
-    const int n_pvpq = pvpq.size();
-    const int n_pq = pq.size();
-
-    const int size_j = n_pvpq + n_pq;
-
-    bool need_insert = false;  // i optimization: i don't need to insert the coefficient in the matrix
+    const int size_j = pvpq.size() + pq.size();
     if(J_.cols() != size_j)
     {
-        // optim : if the matrix was already computed, i don't initalize it, i instead reuse as much as i can
+        // first call for this topology: the sparsity pattern of J_ is computed
         // i can do that because the matrix will ALWAYS have the same non zero coefficients.
-        // in this if, i allocate it in a "large enough" place to avoid copy when first filling it
-        need_insert = true;
-        J_ = Eigen::SparseMatrix<double>(size_j,size_j);
-        // pre allocate a large enough matrix
-        J_.reserve(2*(dS_dVa_.nonZeros()+dS_dVm_.nonZeros()));
-        // from an experiment, outerIndexPtr is inialized, with the number of columns
-        // innerIndexPtr and valuePtr are not.
+        _init_J_pattern(Ybus, pq, pvpq, pq_inv, pvpq_inv);
+    }else if(value_map_.size() != 4 * static_cast<size_t>(Ybus.nonZeros())){
+        // J_ is already computed (eg. restored), but not the map
+        _init_value_map(Ybus, pvpq.size(), pq_inv, pvpq_inv);
     }
 
-    // i fill the buffer columns per columns
-    int nb_obj_this_col = 0;
-    std::vector<int> inner_index;
-    std::vector<double> values;
-
-    // TODO use the loop provided above (in dS) if J is already initialized
-    // fill n_pvpq leftmost columns
-    for(int col_id=0; col_id < n_pvpq; ++col_id){
-        // reset from the previous column
-        nb_obj_this_col = 0;
-        inner_index.clear();
-        values.clear();
-
-        // fill with the first column with the column of dS_dVa[:,pvpq[col_id]]
-        // and check the row order !
-        _get_values_J(nb_obj_this_col, inner_index, values,
-                      dS_dVa_r,
-                      pvpq_inv, pvpq,
-                      col_id, 0);
-        // fill the rest of the rows with the first column of dS_dVa_imag[:,pq[col_id]]
-        _get_values_J(nb_obj_this_col, inner_index, values,
-                      dS_dVa_i,
-                      pq_inv, pvpq,
-                      col_id, n_pvpq
-                      );
-
-        // "efficient" insert of the element in the matrix
-        for(int in_ind=0; in_ind < nb_obj_this_col; ++in_ind){
-            int row_id = inner_index[in_ind];
-            if(need_insert) J_.insert(row_id, col_id) = values[in_ind];
-            else J_.coeffRef(row_id, col_id) = values[in_ind];
+    _prepare_dS_dV(Ybus, V);
+    const int n = Ybus.cols();
+    const int * Yp = Ybus.outerIndexPtr();
+    const int * Yi = Ybus.innerIndexPtr();
+    const cdouble * Yx = Ybus.valuePtr();
+    double * Jx = J_.valuePtr();
+    const int * map = value_map_.data();
+    cdouble dS_dVa, dS_dVm;
+    for(int col_id = 0; col_id < n; ++col_id){
+        for(int k = Yp[col_id]; k < Yp[col_id + 1]; ++k){
+            const int * map_k = map + 4 * k;
+            if((map_k[0] < 0) && (map_k[1] < 0) && (map_k[2] < 0) && (map_k[3] < 0)) continue;
+            _dS_dV_entry(Yx[k], Yi[k], col_id, V, dS_dVa, dS_dVm);
+            if(map_k[0] >= 0) Jx[map_k[0]] = std::real(dS_dVa);
+            if(map_k[1] >= 0) Jx[map_k[1]] = std::imag(dS_dVa);
+            if(map_k[2] >= 0) Jx[map_k[2]] = std::real(dS_dVm);
+            if(map_k[3] >= 0) Jx[map_k[3]] = std::imag(dS_dVm);
         }
-//                if(need_insert){
-//                    for(int in_ind=0; in_ind < nb_obj_this_col; ++in_ind){
-//                        int row_id = inner_index[in_ind];
-//                        J_.insert(row_id, col_id) = values[in_ind];
-//                        // else J_.coeffRef(row_id, col_id) = values[in_ind];
-//                    }
-//                }else{
-//                    int in_ind=0;
-//                    for (Eigen::SparseMatrix<double>::InnerIterator it(J_,col_id); it; ++it, ++in_ind)
-//                    {
-////                        int row_id = inner_index[it.row()];
-//                        it.valueRef() = values[it.row()];
-//                    }
-//                }
-    }
-
-    //TODO make same for the second part (have a funciton for previous loop)
-    // fill the remaining n_pq columns
-    for(int col_id=0; col_id < n_pq; ++col_id){
-        // reset from the previous column
-        nb_obj_this_col = 0;
-        inner_index.clear();
-        values.clear();
-
-        // fill with the first column with the column of dS_dVa[:,pvpq[col_id]]
-        // and check the row order !
-        _get_values_J(nb_obj_this_col, inner_index, values,
-                      dS_dVm_r,
-                      pvpq_inv, pq,
-                      col_id, 0);
-
-        // fill the rest of the rows with the first column of dS_dVa_imag[:,pq[col_id]]
-        _get_values_J(nb_obj_this_col, inner_index, values,
-                      dS_dVm_i,
-                      pq_inv, pq,
-                      col_id, n_pvpq
-                      );
-
-        // "efficient" insert of the element in the matrix
-        for(int in_ind=0; in_ind < nb_obj_this_col; ++in_ind){
-            int row_id = inner_index[in_ind];
-            if(need_insert) J_.insert(row_id, col_id + n_pvpq) = values[in_ind];
-            else J_.coeffRef(row_id, col_id + n_pvpq) = values[in_ind];
-        }
-//                if(need_insert){
-//                    for(int in_ind=0; in_ind < nb_obj_this_col; ++in_ind){
-//                        int row_id = inner_index[in_ind];
-//                        J_.insert(row_id, col_id + n_pvpq) = values[in_ind];
-//                        // else J_.coeffRef(row_id, col_id) = values[in_ind];
-//                    }
-//                }else{
-//                    int in_ind=0;
-//                    for (Eigen::SparseMatrix<double>::InnerIterator it(J_, col_id + n_pvpq); it; ++it, ++in_ind)
-//                    {
-//                        int row_id = inner_index[it.row()];
-//                        it.valueRef() = values[row_id];
-//                    }
-//                }
     }
-    J_.makeCompressed();
     timer_fillJ_ += timer.duration();
 }
 
@@ -407,4 +514,471 @@ Eigen::VectorXd KLUSolver::_evaluate_Fx(const Eigen::SparseMatrix<cdouble> &  Yb
     res.segment(npv+npq, npq) = imag_(pq);
     timer_Fx_ += timer.duration();
     return res;
-}
\ No newline at end of file
+}
+int KLUSolver::do_newton_batch(const Eigen::SparseMatrix<cdouble> & Ybus,
+                               CplxMat & V,
+                               const CplxMat & Sbus,
+                               const Eigen::VectorXi & pv,
+                               const Eigen::VectorXi & pq,
+                               int max_iter,
+                               double tol,
+                               Eigen::VectorXi & nb_iter)
+{
+    const int n = Ybus.cols();
+    const int nb_scenario = V.cols();
+    if((V.rows() != n) || (Sbus.rows() != n) || (Sbus.cols() != nb_scenario)){
+        throw std::runtime_error("KLUSolver::do_newton_batch: V and Sbus should have one row per bus and one column per scenario");
+    }
+    if(user_matrix_) reset();  // the factorization is not the one of a jacobian matrix
+    reset_timer();
+    nb_iter = Eigen::VectorXi::Constant(nb_scenario, -1);
+    if(err_ > 0) return 0; // i don't do anything if there were a problem at the initialization
+    auto timer = CustTimer();
+    update_linear_solver(n);
+    const int n_pv = pv.size();
+    const int n_pq = pq.size();
+    Eigen::VectorXi pvpq(n_pv + n_pq);
+    pvpq << pv, pq;
+    const int n_pvpq = pvpq.size();
+    const int size_j = n_pvpq + n_pq;
+    std::vector<int> pvpq_inv(n, -1);
+    for(int inv_id=0; inv_id < n_pvpq; ++inv_id) pvpq_inv[pvpq(inv_id)] = inv_id;
+    std::vector<int> pq_inv(n, -1);
+    for(int inv_id=0; inv_id < n_pq; ++inv_id) pq_inv[pq(inv_id)] = inv_id;
+    if(J_.cols() != size_j){
+        // the jacobian of the last call (if any) is not the one of this problem
+        _init_J_pattern(Ybus, pq, pvpq, pq_inv, pvpq_inv);
+        need_factorize_ = true;
+    }else if(value_map_.size() != 4 * static_cast<size_t>(Ybus.nonZeros())){
+        _init_value_map(Ybus, n_pvpq, pq_inv, pvpq_inv);
+    }
+
+    // scenarios still in the batch: column k of the matrices bellow is the scenario active[k]
+    std::vector<int> active(nb_scenario);
+    for(int k = 0; k < nb_scenario; ++k) active[k] = k;
+    CplxMat V_it = V;
+    CplxMat S_it = Sbus;
+    CplxMat Ibus;
+    Eigen::MatrixXd F;  // column major: one mismatch (then one update) per column
+    RealMat Jx;  // row major: the coefficient of J_.valuePtr() for all the scenarios are contiguous
+    Eigen::MatrixXd Jx_cols;  // column major: the coefficients of the jacobian of each scenario are contiguous
+    const int transpose_block_size = 64;
+    RealMat Vm, Va;
+    std::vector<int> keep;
+    const double nan = std::numeric_limits<double>::quiet_NaN();
+    int nb_conv = 0;
+    nr_iter_ = 0;
+    while(true){
+        int nb_active = active.size();
+        auto timer_Fx = CustTimer();
+        Ibus.noalias() = Ybus * V_it;
+        timer_dSbus_ += timer_Fx.duration();
+        _evaluate_Fx_batch(V_it, Ibus, S_it, pv, pq, F);
+
+        // the scenarios that converged (or diverged) leave the batch
+        keep.clear();
+        for(int k = 0; k < nb_active; ++k){
+            if(!F.col(k).allFinite()) continue;  // divergence due to Nans
+            if(F.col(k).lpNorm<Eigen::Infinity>() < tol){
+                V.col(active[k]) = V_it.col(k);
+                nb_iter(active[k]) = nr_iter_;
+                ++nb_conv;
+                continue;
+            }
+            keep.push_back(k);
+        }
+        if(keep.empty() || (nr_iter_ >= max_iter)) break;
+        if(static_cast<int>(keep.size()) < nb_active){
+            nb_active = keep.size();
+            for(int k = 0; k < nb_active; ++k){
+                if(keep[k] == k) continue;
+                active[k] = active[keep[k]];
+                V_it.col(k) = V_it.col(keep[k]);
+                S_it.col(k) = S_it.col(keep[k]);
+                Ibus.col(k) = Ibus.col(keep[k]);
+                F.col(k) = F.col(keep[k]);
+            }
+            active.resize(nb_active);
+            V_it.conservativeResize(Eigen::NoChange, nb_active);
+            S_it.conservativeResize(Eigen::NoChange, nb_active);
+            Ibus.conservativeResize(Eigen::NoChange, nb_active);
+            F.conservativeResize(Eigen::NoChange, nb_active);
+        }
+        nr_iter_++;
+
+        // jacobian matrices of all the scenarios, then one klu_refactor per scenario (same symbolic analysis)
+        fill_jacobian_batch(Ybus, V_it, Ibus, Jx);
+        auto timer_solve = CustTimer();
+        // the values of each jacobian matrix are made contiguous (by blocks of rows, that stay in the cache)
+        Jx_cols.resize(Jx.rows(), nb_active);
+        for(int row_id = 0; row_id < Jx.rows(); row_id += transpose_block_size){
+            const int nb_row = std::min(transpose_block_size, static_cast<int>(Jx.rows()) - row_id);
+            Jx_cols.middleRows(row_id, nb_row) = Jx.middleRows(row_id, nb_row);
+        }
+        Eigen::Map<Eigen::VectorXd> J_values(J_.valuePtr(), J_.nonZeros());
+        for(int k = 0; k < nb_active; ++k){
+            J_values = Jx_cols.col(k);
+            bool ok;
+            if(need_factorize_){
+                initialize();
+                ok = err_ == 0;
+            }else{
+                ok = linear_solver_->refactor(J_);
+                ++nb_refactor_;
+                if(!ok){
+                    // the pivots of the previous scenario cannot be used for this one
+                    ok = linear_solver_->factor(J_);
+                    ++nb_factor_;
+                }
+            }
+            if(ok) ok = linear_solver_->solve(F.col(k));
+            // this scenario diverged, it will leave the batch at the next iteration
+            if(!ok) F.col(k).setConstant(nan);
+        }
+        timer_solve_ += timer_solve.duration();
+
+        // update voltage (this should be done consistently with "klu_solver._evaluate_Fx_batch")
+        Vm = V_it.cwiseAbs();
+        Va = V_it.array().arg();
+        for(int i = 0; i < n_pv; ++i) Va.row(pv(i)) -= F.row(i);
+        for(int i = 0; i < n_pq; ++i){
+            Va.row(pq(i)) -= F.row(n_pv + i);
+            Vm.row(pq(i)) -= F.row(n_pvpq + i);
+        }
+        V_it = Vm.array() * (Va.array().cos().cast<cdouble>() + my_i * Va.array().sin().cast<cdouble>());
+    }
+    if(linear_solver_->is_factorized() && !need_factorize_){
+        // the factorization (of the jacobian of the last scenario) can be "klu_refactor"ed by the next call
+        err_ = 0;
+    }else{
+        need_factorize_ = true;
+        err_ = -1;
+    }
+    timer_total_nr_ += timer.duration();
+    return nb_conv;
+}
+
+void KLUSolver::fill_jacobian_batch(const Eigen::SparseMatrix<cdouble> & Ybus,
+                                    const CplxMat & V,
+                                    const CplxMat & Ibus,
+                                    RealMat & Jx)
+{
+    /**
+    Same computation as "fill_jacobian_matrix" for all the scenarios (columns of V) at once: row "i" of Jx
+    contains the coefficient J_.valuePtr()[i] of all the scenarios. Every coefficient of J_ is written.
+
+    The real and imaginary parts are stored in different matrices (one row per bus, one column per scenario)
+    and the complex products are written explicitly, so that the loops over the scenarios only read and write
+    contiguous doubles (and can be vectorized by the compiler).
+    **/
+    auto timer = CustTimer();
+    const int nb_active = V.cols();
+    Jx.resize(J_.nonZeros(), nb_active);
+    const RealMat V_abs = V.cwiseAbs();
+    const RealMat Vr = V.real();
+    const RealMat Vi = V.imag();
+    const RealMat Vnr = Vr.cwiseQuotient(V_abs);
+    const RealMat Vni = Vi.cwiseQuotient(V_abs);
+    const RealMat Ir = Ibus.real();
+    const RealMat Ii = Ibus.imag();
+    // coefficients of dS_dVa and dS_dVm that are not in J_ are written there
+    Eigen::VectorXd not_in_J(nb_active);
+
+    const int n = Ybus.cols();
+    const int * Yp = Ybus.outerIndexPtr();
+    const int * Yi = Ybus.innerIndexPtr();
+    const cdouble * Yx = Ybus.valuePtr();
+    const int * map = value_map_.data();
+    for(int col_id = 0; col_id < n; ++col_id){
+        const double * vr_col = Vr.row(col_id).data();
+        const double * vi_col = Vi.row(col_id).data();
+        const double * vnr_col = Vnr.row(col_id).data();
+        const double * vni_col = Vni.row(col_id).data();
+        for(int k = Yp[col_id]; k < Yp[col_id + 1]; ++k){
+            const int * map_k = map + 4 * k;
+            if((map_k[0] < 0) && (map_k[1] < 0) && (map_k[2] < 0) && (map_k[3] < 0)) continue;
+            const int row_id = Yi[k];
+            const double yr = std::real(Yx[k]);
+            const double yi = std::imag(Yx[k]);
+            const double * vr_row = Vr.row(row_id).data();
+            const double * vi_row = Vi.row(row_id).data();
+            double * dva_r = map_k[0] >= 0 ? Jx.row(map_k[0]).data() : not_in_J.data();  // J11
+            double * dva_i = map_k[1] >= 0 ? Jx.row(map_k[1]).data() : not_in_J.data();  // J21
+            double * dvm_r = map_k[2] >= 0 ? Jx.row(map_k[2]).data() : not_in_J.data();  // J12
+            double * dvm_i = map_k[3] >= 0 ? Jx.row(map_k[3]).data() : not_in_J.data();  // J22
+            for(int s = 0; s < nb_active; ++s){
+                // dS_dVm = conj(y * Vnorm[col]) * V[row]
+                const double ar = yr * vnr_col[s] - yi * vni_col[s];
+                const double ai = yr * vni_col[s] + yi * vnr_col[s];
+                // dS_dVa = conj(-y * V[col]) * (1j * V[row])
+                const double tr = yr * vr_col[s] - yi * vi_col[s];
+                const double ti = yr * vi_col[s] + yi * vr_col[s];
+                dvm_r[s] = ar * vr_row[s] + ai * vi_row[s];
+                dvm_i[s] = ar * vi_row[s] - ai * vr_row[s];
+                dva_r[s] = tr * vi_row[s] - ti * vr_row[s];
+                dva_i[s] = -tr * vr_row[s] - ti * vi_row[s];
+            }
+            if(row_id != col_id) continue;
+            // diagonal element: dS_dVm += conj(Ibus) * Vnorm, dS_dVa += conj(Ibus) * (1j * V)
+            const double * ir = Ir.row(row_id).data();
+            const double * ii = Ii.row(row_id).data();
+            for(int s = 0; s < nb_active; ++s){
+                dvm_r[s] += ir[s] * vnr_col[s] + ii[s] * vni_col[s];
+                dvm_i[s] += ir[s] * vni_col[s] - ii[s] * vnr_col[s];
+                dva_r[s] -= ir[s] * vi_row[s] - ii[s] * vr_row[s];
+                dva_i[s] += ir[s] * vr_row[s] + ii[s] * vi_row[s];
+            }
+        }
+    }
+    timer_fillJ_ += timer.duration();
+}
+
+void KLUSolver::_evaluate_Fx_batch(const CplxMat & V,
+                                   const CplxMat & Ibus,
+                                   const CplxMat & Sbus,
+                                   const Eigen::VectorXi & pv,
+                                   const Eigen::VectorXi & pq,
+                                   Eigen::MatrixXd & F)
+{
+    auto timer = CustTimer();
+    const int npv = pv.size();
+    const int npq = pq.size();
+
+    // compute the mismatch of all the scenarios
+    const CplxMat mis = V.array() * Ibus.array().conjugate() - Sbus.array();
+
+    // build and fill the result
+    F.resize(npv + 2 * npq, V.cols());
+    for(int i = 0; i < npv; ++i) F.row(i) = mis.row(pv(i)).real();
+    for(int i = 0; i < npq; ++i){
+        F.row(npv + i) = mis.row(pq(i)).real();
+        F.row(npv + npq + i) = mis.row(pq(i)).imag();
+    }
+    timer_Fx_ += timer.duration();
+}
+
+bool KLUSolver::do_newton_fixed_pattern(const Eigen::SparseMatrix<cdouble> & Ybus,
+                                        Eigen::VectorXcd & V,
+                                        const Eigen::VectorXcd & Sbus,
+                                        const Eigen::VectorXi & pv,
+                                        const Eigen::VectorXi & pq,
+                                        int max_iter,
+                                        double tol
+                                        )
+{
+    /**
+    Newton Raphson with a jacobian that has always the same sparsity pattern (see the description in KLUSolver.h).
+    Buses that are neither pv nor pq (slack bus, or disconnected buses) are kept in the problem, but their
+    voltage is not modified.
+    **/
+    if(user_matrix_) reset();  // the factorization is not the one of a jacobian matrix
+    reset_timer();
+    err_ = 0;  // the factorization, if any, is valid (it is freed in case of error)
+    auto timer = CustTimer();
+    update_linear_solver(Ybus.cols());
+    const int n = V.size();
+    std::vector<bool> is_pvpq(n, false);
+    std::vector<bool> is_pq(n, false);
+    for(int i = 0; i < pv.size(); ++i) is_pvpq[pv(i)] = true;
+    for(int i = 0; i < pq.size(); ++i){
+        is_pvpq[pq(i)] = true;
+        is_pq[pq(i)] = true;
+    }
+
+    V_ = V;
+    Vm_ = V_.array().abs();
+    Va_ = V_.array().arg();
+
+    Eigen::VectorXd F = _evaluate_Fx_fixed_pattern(Ybus, V_, Sbus, is_pvpq, is_pq);
+    bool converged = _check_for_convergence(F, tol);
+    nr_iter_ = 0; //current step
+    bool res = true;  // have i converged or not
+    while ((!converged) & (nr_iter_ < max_iter)){
+        nr_iter_++;
+        fill_jacobian_fixed_pattern(Ybus, V_, is_pvpq, is_pq);
+        factorize_fixed_pattern();
+        if(err_ != 0){
+            res = false;
+            break;
+        }
+        auto timer_solve = CustTimer();
+        bool ok = linear_solver_->solve(F);
+        timer_solve_ += timer_solve.duration();
+        if (!ok) {
+            err_ = 3;
+            res = false;
+            break;
+        }
+
+        // update voltage, only for the variables that are not fixed
+        for(int bus_id = 0; bus_id < n; ++bus_id){
+            if(is_pvpq[bus_id]) Va_(bus_id) -= F(bus_id);
+            if(is_pq[bus_id]) Vm_(bus_id) -= F(n + bus_id);
+        }
+        V_ = Vm_.array() * (Va_.array().cos().cast<cdouble>() + my_i * Va_.array().sin().cast<cdouble>() );
+        // update Vm and Va again in case we wrapped around with a negative Vm
+        Vm_ = V_.array().abs();
+        Va_ = V_.array().arg();
+
+        F = _evaluate_Fx_fixed_pattern(Ybus, V_, Sbus, is_pvpq, is_pq);
+        bool tmp = F.allFinite();
+        if(!tmp) break; // divergence due to Nans
+        converged = _check_for_convergence(F, tol);
+    }
+    if(!converged){
+        if(err_ == 0) err_ = 4;
+        res = false;
+    }
+    if(!res){
+        // the pivoting might not be correct anymore, next call will use a new one
+        linear_solver_->invalidate_factorization();
+    }
+    timer_total_nr_ += timer.duration();
+    return res;
+}
+
+void KLUSolver::init_jacobian_fixed_pattern(const Eigen::SparseMatrix<cdouble> & Ybus)
+{
+    /**
+    Build the sparsity pattern of the jacobian matrix, from the one of Ybus. Each non zero coefficient
+    (i, j) of Ybus gives 4 non zero coefficients in J: (i, j), (n + i, j), (i, n + j) and (n + i, n + j).
+
+    Columns of Ybus are sorted (compressed matrix), so in the column j of J, the coefficients
+    for the rows "i" are followed by the ones for the rows "n + i". This is used in
+    "fill_jacobian_fixed_pattern" to find the position of each coefficient in J_.valuePtr()
+    **/
+    const int n = Ybus.cols();
+    std::vector<Eigen::Triplet<double> > tripletList;
+    tripletList.reserve(4 * Ybus.nonZeros());
+    for (int col_id = 0; col_id < n; ++col_id){
+        for (Eigen::SparseMatrix<cdouble>::InnerIterator it(Ybus, col_id); it; ++it)
+        {
+            int row_id = it.row();
+            tripletList.push_back(Eigen::Triplet<double>(row_id, col_id, 0.));
+            tripletList.push_back(Eigen::Triplet<double>(n + row_id, col_id, 0.));
+            tripletList.push_back(Eigen::Triplet<double>(row_id, n + col_id, 0.));
+            tripletList.push_back(Eigen::Triplet<double>(n + row_id, n + col_id, 0.));
+        }
+    }
+    J_ = Eigen::SparseMatrix<double>(2 * n, 2 * n);
+    J_.setFromTriplets(tripletList.begin(), tripletList.end());
+    J_.makeCompressed();
+
+    // new pattern: the symbolic analysis need to be performed again
+    linear_solver_->reset();
+}
+
+void KLUSolver::fill_jacobian_fixed_pattern(const Eigen::SparseMatrix<cdouble> & Ybus,
+                                            const Eigen::VectorXcd & V,
+                                            const std::vector<bool> & is_pvpq,
+                                            const std::vector<bool> & is_pq)
+{
+    /**
+    Rows of J that are not an equation of the problem (P for bus not in pvpq, Q for bus not in pq) and
+    columns that are not variables (Va for bus not in pvpq, Vm for bus not in pq) are replaced by
+    the identity (1. on the diagonal, 0. elsewhere).
+    **/
+    const int n = Ybus.cols();
+    const int nnz = Ybus.nonZeros();
+    if(J_.cols() != 2 * n || J_.nonZeros() != 4 * nnz){
+        // the pattern of Ybus is not the one used to build J, i need to build it again
+        init_jacobian_fixed_pattern(Ybus);
+    }
+
+    auto timer = CustTimer();
+    _prepare_dS_dV(Ybus, V);
+    const int * Yp = Ybus.outerIndexPtr();
+    const int * Yi = Ybus.innerIndexPtr();
+    const cdouble * Yx = Ybus.valuePtr();
+    double * Jx = J_.valuePtr();
+    cdouble dva, dvm;
+    for(int col_id = 0; col_id < n; ++col_id){
+        const int start_id = Yp[col_id];
+        const int nnz_col = Yp[col_id + 1] - start_id;
+        double * J_va = Jx + 2 * start_id;  // column "col_id" of J
+        double * J_vm = Jx + 2 * nnz + 2 * start_id;  // column "n + col_id" of J
+        const bool col_pvpq = is_pvpq[col_id];
+        const bool col_pq = is_pq[col_id];
+        for(int k = 0; k < nnz_col; ++k){
+            const int row_id = Yi[start_id + k];
+            const bool row_pvpq = is_pvpq[row_id];
+            const bool row_pq = is_pq[row_id];
+            _dS_dV_entry(Yx[start_id + k], row_id, col_id, V, dva, dvm);
+            const bool is_diag = row_id == col_id;
+
+            // dP / dVa
+            if(row_pvpq && col_pvpq) J_va[k] = std::real(dva);
+            else J_va[k] = is_diag ? 1. : 0.;
+            // dQ / dVa
+            J_va[nnz_col + k] = (row_pq && col_pvpq) ? std::imag(dva) : 0.;
+            // dP / dVm
+            J_vm[k] = (row_pvpq && col_pq) ? std::real(dvm) : 0.;
+            // dQ / dVm
+            if(row_pq && col_pq) J_vm[nnz_col + k] = std::imag(dvm);
+            else J_vm[nnz_col + k] = is_diag ? 1. : 0.;
+        }
+    }
+    timer_fillJ_ += timer.duration();
+}
+
+void KLUSolver::factorize_fixed_pattern()
+{
+    /**
+    klu_analyze is called only if the pattern of J changed.
+    Otherwise the previous pivots are reused (klu_refactor), except if the matrix is too badly conditioned
+    with them (in this case klu_factor is called again, which performs a new partial pivoting).
+    Linear solvers that do not keep the pivots (see LinearSolver::keeps_pivots) always perform a new factorization.
+    **/
+    auto timer = CustTimer();
+    if(!linear_solver_->is_analyzed()){
+        bool ok = linear_solver_->analyze(J_);
+        ++nb_analyze_;
+        if(!ok){
+            err_ = 1;
+            timer_initialize_ += timer.duration();
+            return;
+        }
+    }
+
+    bool need_factor = !linear_solver_->is_factorized() || !linear_solver_->keeps_pivots();
+    if(!need_factor){
+        bool ok = linear_solver_->refactor(J_);
+        ++nb_refactor_;
+        // numerical check: pivots chosen for a previous matrix (possibly another topology) might be bad
+        if(!ok || !(linear_solver_->rcond() >= pivot_rcond_ratio_ * rcond_factor_)) need_factor = true;
+    }
+    if(need_factor){
+        bool ok = linear_solver_->factor(J_);
+        ++nb_factor_;
+        if(!ok){
+            err_ = 1;
+        }else{
+            rcond_factor_ = linear_solver_->rcond();
+        }
+    }
+    timer_initialize_ += timer.duration();
+}
+
+Eigen::VectorXd KLUSolver::_evaluate_Fx_fixed_pattern(const Eigen::SparseMatrix<cdouble> &  Ybus,
+                                                      const Eigen::VectorXcd & V,
+                                                      const Eigen::VectorXcd & Sbus,
+                                                      const std::vector<bool> & is_pvpq,
+                                                      const std::vector<bool> & is_pq)
+{
+    auto timer = CustTimer();
+    const int n = V.size();
+
+    // compute the mismatch
+    Eigen::VectorXcd tmp = Ybus * V;  // this is a vector
+    tmp = tmp.array().conjugate();  // i take the conjugate
+    Eigen::VectorXcd mis = V.array() * tmp.array() - Sbus.array();
+
+    // build and fill the result (0. for the equations that are not part of the problem)
+    Eigen::VectorXd res = Eigen::VectorXd::Constant(2 * n, 0.);
+    for(int bus_id = 0; bus_id < n; ++bus_id){
+        if(is_pvpq[bus_id]) res(bus_id) = std::real(mis(bus_id));
+        if(is_pq[bus_id]) res(n + bus_id) = std::imag(mis(bus_id));
+    }
+    timer_Fx_ += timer.duration();
+    return res;
+}
@@ -16,6 +16,8 @@
 #include <chrono>
 #include <complex>      // std::complex, std::conj
 #include <cmath>  // for PI
+#include <algorithm>  // for lower_bound
+#include <limits>  // for quiet_NaN
 
 // eigen is necessary to easily pass data from numpy to c++ without any copy.
 // and to optimize the matrix operations
@@ -23,16 +25,38 @@
 #include "Eigen/Dense"
 #include "Eigen/SparseCore"
 
-// import klu package
-extern "C" {
-    #include "cs.h"
-    #include "klu.h"
-}
-
 #include "CustTimer.h"
 #include "Utils.h"
+#include "LinearSolver.h"  // (and the klu headers)
+
+/**
+Jacobian matrix and its (symbolic and numeric) factorization, once taken out of a KLUSolver
+(see KLUSolver::move_factorization_to).
+**/
+class JacobianFactorization
+{
+    public:
+        JacobianFactorization(){}
+        void free(){
+            solver_.reset();
+            J_ = Eigen::SparseMatrix<double>();
+        }
+
+        // no copy allowed
+        JacobianFactorization(const JacobianFactorization &) = delete;
+        JacobianFactorization & operator=(const JacobianFactorization &) = delete;
+
+    protected:
+        std::unique_ptr<LinearSolver> solver_;
+        Eigen::SparseMatrix<double> J_;
+
+    friend class KLUSolver;
+};
+
 /**
 class to handle the solver using newton-raphson method, using KLU algorithm and sparse matrices.
+The linear systems are solved with KLU by default, another sparse linear solver can be used instead
+(see set_linear_solver).
 
 As long as the admittance matrix of the sytem does not change, you can reuse the same solver.
 Reusing the same solver is possible, but "reset" method must be called.
@@ -43,9 +67,12 @@ Otherwise, unexpected behaviour might follow, including "segfault".
 class KLUSolver
 {
     public:
-        KLUSolver():symbolic_(),numeric_(),common_(),n_(-1),need_factorize_(true),err_(-1),
+        KLUSolver():linear_solver_type_(LinearSolverType::KLU),linear_solver_(LinearSolver::create(LinearSolverType::KLU)),
+                    dense_threshold_(LinearSolver::default_dense_threshold),
+                    need_factorize_(true),user_matrix_(false),err_(-1),
+                    nb_analyze_(0),nb_factor_(0),nb_refactor_(0),rcond_factor_(0.),
+                    chord_(false),chord_max_ratio_(0.1),chord_max_reuse_(20),nb_chord_solve_(0),nb_refactor_saved_(0),
                     timer_Fx_(0.){
-            klu_defaults(&common_);
             timer_Fx_ = 0.;
             timer_solve_ = 0.;
             timer_initialize_ = 0.;
@@ -55,12 +82,6 @@ class KLUSolver
             timer_total_nr_ = 0.;
         }
 
-        ~KLUSolver()
-         {
-             klu_free_symbolic(&symbolic_, &common_);
-             klu_free_numeric(&numeric_, &common_);
-         }
-
         Eigen::SparseMatrix<double> get_J(){
             return J_;
         }
@@ -95,6 +116,136 @@ class KLUSolver
                        double tol
                        );
 
+        /**
+        Same as "do_newton" but the jacobian matrix has always the same sparsity pattern (the one of Ybus, that
+        should not change between calls, explicit 0. are allowed). This allows to perform the symbolic analysis
+        (klu_analyze) only once.
+
+        All buses of Ybus are kept in the jacobian (even the ones that are not pv nor pq, for which the jacobian
+        is the identity). It has the shape 2n x 2n:
+        | dP / dVa | dP / dVm |
+        | dQ / dVa | dQ / dVm |
+
+        The previous factorization is reused (klu_refactor, that keeps the previous pivots) unless the
+        estimate of the reciprocal condition number degrades too much, in which case the jacobian is factorized
+        again (klu_factor) with a new pivoting.
+        **/
+        bool do_newton_fixed_pattern(const Eigen::SparseMatrix<cdouble> & Ybus,
+                                     Eigen::VectorXcd & V,
+                                     const Eigen::VectorXcd & Sbus,
+                                     const Eigen::VectorXi & pv,
+                                     const Eigen::VectorXi & pq,
+                                     int max_iter,
+                                     double tol
+                                     );
+
+        /**
+        Newton raphson for K scenarios that share Ybus, pv and pq (only the injections and the initial voltages
+        differ), the scenarios being the columns of V and Sbus (one row per bus). All the scenarios go through
+        the iterations together: the mismatches are computed with one product of Ybus by the matrix of the
+        voltages, and the coefficients of the K jacobian matrices are computed in the same loop on the non
+        zero coefficients of Ybus. The symbolic analysis (klu_analyze) of the jacobian is shared, each scenario
+        only needs a klu_refactor per iteration. A scenario leaves the batch as soon as it has converged (or diverged).
+
+        V is modified in place (the columns of the scenarios that did not converge should not be used).
+        nb_iter is the number of iterations of each scenario (-1 if it did not converge).
+        Returns the number of scenarios that converged.
+        **/
+        int do_newton_batch(const Eigen::SparseMatrix<cdouble> & Ybus,
+                            CplxMat & V,
+                            const CplxMat & Sbus,
+                            const Eigen::VectorXi & pv,
+                            const Eigen::VectorXi & pq,
+                            int max_iter,
+                            double tol,
+                            Eigen::VectorXi & nb_iter
+                            );
+
+        /**
+        Give the ownership of the current jacobian matrix (and its factorization) to "res" to reuse it later with
+        "move_factorization_from" (for the same Ybus, pv and pq). The solver is reset afterwards.
+        **/
+        bool has_factorization() const {
+            return (!need_factorize_) && (err_ == 0) && linear_solver_->is_factorized();
+        }
+        void move_factorization_to(JacobianFactorization & res);
+        void move_factorization_from(JacobianFactorization & other);
+
+        /**
+        linear solver used for the jacobian matrix (KLU by default, SparseLU, or DenseLU for any size of grid,
+        see set_dense_threshold). The jacobian matrix is not symmetric, LDLT cannot be used. Changing it resets
+        the solver.
+        **/
+        void set_linear_solver(LinearSolverType linear_solver_type);
+        LinearSolverType get_linear_solver() const {return linear_solver_type_;}
+
+        /**
+        systems with at most "dense_threshold" buses are solved with a dense LU decomposition (DenseLU) instead
+        of the linear solver above. A negative value (default) disables it, see GridModel::set_dense_threshold.
+        Only the decomposition is dense: the jacobian matrix is filled in J_ (sparse) in both cases.
+        **/
+        void set_dense_threshold(int dense_threshold){dense_threshold_ = dense_threshold;}
+        int get_dense_threshold() const {return dense_threshold_;}
+
+        // number of calls to klu_analyze, klu_factor and klu_refactor since the creation of this solver
+        std::tuple<int, int, int> get_nb_factorizations() const
+        {
+            return std::tuple<int, int, int>(nb_analyze_, nb_factor_, nb_refactor_);
+        }
+
+        /**
+        "chord" (or "dishonest") newton raphson, used by "do_newton" only: the jacobian matrix is neither computed
+        nor factorized again as long as the mismatch decreases fast enough (the infinite norm of the mismatch
+        is divided by at least 1. / max_ratio at each iteration), including across successive calls (as long as
+        the solver is not reset). If an iteration with an outdated jacobian does not decrease the mismatch, it is
+        discarded and the jacobian is computed and refactorized. The same factorization is used for at most
+        "max_reuse" consecutive iterations, and only during the first half of the "max_iter" iterations.
+        **/
+        void set_chord(bool chord){
+            chord_ = chord;
+            nb_chord_solve_ = 0;
+        }
+        bool get_chord() const {return chord_;}
+        void set_chord_policy(double max_ratio, int max_reuse){
+            if((max_ratio <= 0.) || (max_ratio >= 1.)) throw std::runtime_error("KLUSolver::set_chord_policy: max_ratio should be in ]0, 1[");
+            if(max_reuse < 0) throw std::runtime_error("KLUSolver::set_chord_policy: max_reuse cannot be negative");
+            chord_max_ratio_ = max_ratio;
+            chord_max_reuse_ = max_reuse;
+        }
+        std::tuple<double, int> get_chord_policy() const {
+            return std::tuple<double, int>(chord_max_ratio_, chord_max_reuse_);
+        }
+        // number of iterations that used an outdated jacobian (and thus saved a computation of J and a klu_refactor)
+        int get_nb_refactor_saved() const {return nb_refactor_saved_;}
+
+        /**
+        Solve A.x = b (or A^T.x = b if "transpose" is true) for all the columns of b at once (eg one call to klu_solve
+        with nrhs = b.cols()) with the current factorization of A, which is either the jacobian matrix of the last
+        call to "do_newton" / "do_newton_fixed_pattern" (the last one that has been factorized), or the
+        matrix given to "factorize". b is modified in place: it is the solution x once this function returns.
+
+        b should be column major (eg a numpy array in "fortran" order) to be used without any copy.
+        **/
+        void solve_multi(Eigen::Ref<Eigen::MatrixXd> b, bool transpose=false);
+
+        /**
+        Compute the jacobian matrix at V (for the Ybus, pv and pq of the last call to "do_newton") and factorize it
+        (klu_refactor if the last factorization was made for the same Ybus, pv and pq) to use it with "solve_multi".
+        After a powerflow, this gives the jacobian at its solution: the one factorized by "do_newton" is the one of
+        its last iteration. Returns false if it cannot be factorized.
+        **/
+        bool factorize_jacobian(const Eigen::SparseMatrix<cdouble> & Ybus,
+                                const Eigen::VectorXcd & V,
+                                const Eigen::VectorXi & pv,
+                                const Eigen::VectorXi & pq);
+
+        /**
+        Factorize (eg klu_analyze and klu_factor) the square matrix A to use it with "solve_multi", for example a reduced
+        Ybus. It resets the solver (the next call to "do_newton" will start from scratch).
+        The row indices of each column of A should be sorted (as in a scipy csc_matrix in canonical format).
+        **/
+        void factorize(const Eigen::SparseMatrix<double> & A);
+
 
         void reset();
 
@@ -103,6 +254,9 @@ class KLUSolver
         }
 
     protected:
+        // use DenseLU for systems with at most "dense_threshold_" buses, "linear_solver_type_" otherwise
+        void update_linear_solver(int nb_bus);
+
         void reset_timer(){
             timer_Fx_ = 0.;
             timer_solve_ = 0.;
@@ -119,15 +273,44 @@ class KLUSolver
         void _dSbus_dV(const Eigen::Ref<const Eigen::SparseMatrix<cdouble> > & Ybus,
                        const Eigen::Ref<const Eigen::VectorXcd > & V);
 
-        void _get_values_J(int & nb_obj_this_col,
-                           std::vector<int> & inner_index,
-                           std::vector<double> & values,
-                           const Eigen::SparseMatrix<double> & mat,  // ex. dS_dVa_r
-                           const std::vector<int> & index_row_inv, // ex. pvpq_inv
-                           const Eigen::VectorXi & index_col, // ex. pvpq
-                           int col_id,
-                           int row_lag  // 0 for J11 for example, n_pvpq for J12
-                           );
+        /**
+        compute Ibus_ = Ybus * V and Vnorm_ = V / |V| used to compute the entries of dS / dVa and dS / dVm
+        **/
+        void _prepare_dS_dV(const Eigen::SparseMatrix<cdouble> & Ybus, const Eigen::VectorXcd & V);
+
+        /**
+        entries (row_id, col_id) of dS / dVa and dS / dVm from the coefficient "y" (row_id, col_id) of Ybus
+        (_prepare_dS_dV should have been called before)
+        python implementation:
+        dS_dVm = diagV * conj(Ybus * diagVnorm) + conj(diagIbus) * diagVnorm
+        dS_dVa = 1j * diagV * conj(diagIbus - Ybus * diagV)
+        **/
+        inline void _dS_dV_entry(const cdouble & y, int row_id, int col_id, const Eigen::VectorXcd & V,
+                                 cdouble & dS_dVa, cdouble & dS_dVm) const
+        {
+            dS_dVm = std::conj(y * Vnorm_(col_id)) * V(row_id);
+            cdouble tmp = y * V(col_id);
+            if(row_id == col_id){
+                // diagonal element
+                dS_dVm += std::conj(Ibus_(row_id)) * Vnorm_(row_id);
+                tmp -= Ibus_(row_id);
+            }
+            dS_dVa = std::conj(-tmp) * (my_i * V(row_id));
+        }
+
+        /**
+        build the sparsity pattern of J_ (all coefficients set to 0.) and the map from the non zero coefficients
+        of Ybus to the coefficients of J_ (see value_map_)
+        **/
+        void _init_J_pattern(const Eigen::SparseMatrix<cdouble> & Ybus,
+                             const Eigen::VectorXi & pq,
+                             const Eigen::VectorXi & pvpq,
+                             const std::vector<int> & pq_inv,
+                             const std::vector<int> & pvpq_inv);
+        void _init_value_map(const Eigen::SparseMatrix<cdouble> & Ybus,
+                             int n_pvpq,
+                             const std::vector<int> & pq_inv,
+                             const std::vector<int> & pvpq_inv);
 
         void fill_jacobian_matrix(const Eigen::SparseMatrix<cdouble> & Ybus,
                                   const Eigen::VectorXcd & V,
@@ -143,6 +326,31 @@ class KLUSolver
                                      const Eigen::VectorXi & pv,
                                      const Eigen::VectorXi & pq);
 
+        // "batch" mode (see do_newton_batch): one column per scenario
+        void fill_jacobian_batch(const Eigen::SparseMatrix<cdouble> & Ybus,
+                                 const CplxMat & V,
+                                 const CplxMat & Ibus,
+                                 RealMat & Jx);
+        void _evaluate_Fx_batch(const CplxMat & V,
+                                const CplxMat & Ibus,
+                                const CplxMat & Sbus,
+                                const Eigen::VectorXi & pv,
+                                const Eigen::VectorXi & pq,
+                                Eigen::MatrixXd & F);
+
+        // "fixed pattern" mode
+        void init_jacobian_fixed_pattern(const Eigen::SparseMatrix<cdouble> & Ybus);
+        void fill_jacobian_fixed_pattern(const Eigen::SparseMatrix<cdouble> & Ybus,
+                                         const Eigen::VectorXcd & V,
+                                         const std::vector<bool> & is_pvpq,
+                                         const std::vector<bool> & is_pq);
+        void factorize_fixed_pattern();
+        Eigen::VectorXd _evaluate_Fx_fixed_pattern(const Eigen::SparseMatrix<cdouble> &  Ybus,
+                                                   const Eigen::VectorXcd & V,
+                                                   const Eigen::VectorXcd & Sbus,
+                                                   const std::vector<bool> & is_pvpq,
+                                                   const std::vector<bool> & is_pq);
+
         bool _check_for_convergence(const Eigen::VectorXd & F,
                                     double tol)
         {
@@ -153,11 +361,10 @@ class KLUSolver
         }
 
     private:
-        // solver initialization
-        klu_symbolic* symbolic_;
-        klu_numeric* numeric_;
-        klu_common common_;
-        int n_;
+        // solver of the linear systems (see LinearSolver)
+        LinearSolverType linear_solver_type_;
+        std::unique_ptr<LinearSolver> linear_solver_;
+        int dense_threshold_;
 
         // solution of the problem
         Eigen::VectorXd Vm_;  // voltage magnitude
@@ -167,6 +374,7 @@ class KLUSolver
         Eigen::SparseMatrix<cdouble> dS_dVm_;
         Eigen::SparseMatrix<cdouble> dS_dVa_;
         bool need_factorize_;
+        bool user_matrix_;  // J_ has been given with "factorize", it is not a jacobian matrix
         int nr_iter_;  // number of iteration performs by the Newton Raphson algorithm
         int err_; //error message:
         // -1 : the solver has not been initialized (call initialize in this case)
@@ -176,6 +384,29 @@ class KLUSolver
         // 3: i can't solve the system (klu_solve)
         // 4: end of possible iterations (divergence because nr_iter_ >= max_iter
 
+        // statistics about the factorizations
+        int nb_analyze_;
+        int nb_factor_;
+        int nb_refactor_;
+        double rcond_factor_;  // estimate of the reciprocal condition number of J, at the last klu_factor
+        static const double pivot_rcond_ratio_;  // factorize again (with pivoting) if rcond is bellow rcond_factor_ * pivot_rcond_ratio_
+
+        // "chord" newton raphson (see set_chord)
+        bool chord_;
+        double chord_max_ratio_;  // the factorization is kept if |F_new| <= chord_max_ratio_ * |F_old|
+        int chord_max_reuse_;  // maximum number of consecutive iterations with the same factorization
+        int nb_chord_solve_;  // number of consecutive iterations with the current factorization
+        int nb_refactor_saved_;  // total number of (accepted) iterations with an outdated jacobian
+
+        // to fill the jacobian without any allocation nor search: for the non zero coefficient "k" of Ybus (in the
+        // order of Ybus.valuePtr()), value_map_[4*k + i] is the index in J_.valuePtr() of:
+        // i=0: J11 (real part of dS/dVa), i=1: J21 (imag part of dS/dVa),
+        // i=2: J12 (real part of dS/dVm), i=3: J22 (imag part of dS/dVm)
+        // or -1 if this coefficient is not in J_ (row or column not in pvpq / pq)
+        std::vector<int> value_map_;
+        Eigen::VectorXcd Ibus_;  // Ybus * V
+        Eigen::VectorXcd Vnorm_;  // V / |V|
+
         // timers
          double timer_Fx_;
          double timer_solve_;
@@ -195,15 +426,19 @@ class KLUSolver
         void analyze_old(int n,
                       Eigen::Ref<Eigen::VectorXi> Ap,
                       Eigen::Ref<Eigen::VectorXi> Ai){
-            n_ = n;
-            symbolic_ = klu_analyze(n, &Ap(0), &Ai(0), &common_);
+            // only the pattern is used here
+            Eigen::VectorXd Ax = Eigen::VectorXd::Constant(Ai.size(), 1.);
+            Eigen::Map<const Eigen::SparseMatrix<double> > A(n, n, Ai.size(), &Ap(0), &Ai(0), &Ax(0));
+            linear_solver_->analyze(A);
         }
         void solve_old(Eigen::Ref<Eigen::VectorXi> Ap,
                     Eigen::Ref<Eigen::VectorXi> Ai,
                     Eigen::Ref<Eigen::VectorXd> Ax,
                     Eigen::Ref<Eigen::VectorXd> b){
-            numeric_ = klu_factor(&Ap(0), &Ai(0), &Ax(0), symbolic_, &common_);
-            klu_solve(symbolic_, numeric_, n_, 1, &b(0), &common_);
+            int n = Ap.size() - 1;
+            Eigen::Map<const Eigen::SparseMatrix<double> > A(n, n, Ai.size(), &Ap(0), &Ai(0), &Ax(0));
+            linear_solver_->factor(A);
+            linear_solver_->solve(b);
         }
 
         // TODO re add the references here for the last stuff
@@ -221,8 +456,8 @@ class KLUSolver
             auto npq = pq.size();
 
             // supposes that "klu_analyze" has been already called ! klu_solver.analyze(J) should have been called
-            numeric_ = klu_factor(J.outerIndexPtr(), J.innerIndexPtr(), J.valuePtr(), symbolic_, &common_);
-            klu_solve(symbolic_, numeric_, n_, 1, &F(0), &common_);
+            linear_solver_->factor(J);
+            linear_solver_->solve(F);
             auto dx = -1.0*F;
 
             // update voltage (this should be done consistently with "klu_solver._evaluate_Fx")
@@ -270,7 +505,7 @@ class KLUSolver
             klu_symbolic* symbolic = klu_analyze(n, J.outerIndexPtr(), J.innerIndexPtr(), &common);
 //            auto numeric = klu_factor(J.outerIndexPtr(), J.innerIndexPtr(), J.valuePtr(), symbolic, &common);
             klu_factor(J.outerIndexPtr(), J.innerIndexPtr(), J.valuePtr(), symbolic, &common);
-            if (common_.status != KLU_OK) {
+            if (common.status != KLU_OK) {
                 err_ = 1;
                 res = false;
             }
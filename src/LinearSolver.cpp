@@ -0,0 +1,209 @@
+// Copyright (c) 2020, RTE (https://www.rte-france.com)
+// See AUTHORS.txt
+// This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+// If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+// you can obtain one at http://mozilla.org/MPL/2.0/.
+// SPDX-License-Identifier: MPL-2.0
+// This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+#include "LinearSolver.h"
+
+// the jacobian is only refactorized (klu_refactor) from one powerflow to the next, which is cheaper than a dense LU
+// even for 5 buses. The matrix of the dc powerflow is factorized only when the topology changes (see DCSolver), and
+// the sparse triangular solves are then as fast as the dense ones, even for 14 buses.
+const int LinearSolver::default_dense_threshold = -1;
+const int LinearSolver::default_dc_dense_threshold = -1;
+
+std::unique_ptr<LinearSolver> LinearSolver::create(LinearSolverType type){
+    switch(type){
+        case LinearSolverType::SparseLU:
+            return std::unique_ptr<LinearSolver>(new SparseLULinearSolver());
+        case LinearSolverType::LDLT:
+            return std::unique_ptr<LinearSolver>(new LDLTLinearSolver());
+        case LinearSolverType::DenseLU:
+            return std::unique_ptr<LinearSolver>(new DenseLULinearSolver());
+        default:
+            return std::unique_ptr<LinearSolver>(new KLULinearSolver());
+    }
+}
+
+// KLU
+bool KLULinearSolver::analyze(const Eigen::SparseMatrix<double> & A){
+    reset();
+    // J is const here, even if it's not said in klu_analyze
+    int n = A.cols();
+    symbolic_ = klu_analyze(n, const_cast<int*>(A.outerIndexPtr()), const_cast<int*>(A.innerIndexPtr()), &common_);
+    if(symbolic_ == nullptr) return false;
+    n_ = n;
+    return true;
+}
+
+bool KLULinearSolver::factor(const Eigen::SparseMatrix<double> & A){
+    if(symbolic_ == nullptr) return false;
+    free_numeric();
+    numeric_ = klu_factor(const_cast<int*>(A.outerIndexPtr()), const_cast<int*>(A.innerIndexPtr()),
+                          const_cast<double*>(A.valuePtr()), symbolic_, &common_);
+    if((numeric_ == nullptr) || (common_.status != KLU_OK)){
+        free_numeric();
+        return false;
+    }
+    factorized_ = true;
+    return true;
+}
+
+bool KLULinearSolver::refactor(const Eigen::SparseMatrix<double> & A){
+    if(!factorized_ || (numeric_ == nullptr)) return factor(A);
+    int ok = klu_refactor(const_cast<int*>(A.outerIndexPtr()), const_cast<int*>(A.innerIndexPtr()),
+                          const_cast<double*>(A.valuePtr()), symbolic_, numeric_, &common_);
+    factorized_ = ok == 1;
+    return factorized_;
+}
+
+bool KLULinearSolver::solve(Eigen::Ref<Eigen::MatrixXd> b, bool transpose) const{
+    if(!factorized_) return false;
+    if(b.cols() == 0) return true;
+    // klu_common is modified by klu_solve (status): a copy is used, so that the factorization can be shared
+    klu_common common = common_;
+    int ok;
+    if(transpose) ok = klu_tsolve(symbolic_, numeric_, b.outerStride(), b.cols(), b.data(), &common);
+    else ok = klu_solve(symbolic_, numeric_, b.outerStride(), b.cols(), b.data(), &common);
+    return ok == 1;
+}
+
+double KLULinearSolver::rcond() const{
+    if(!factorized_) return 0.;
+    klu_common common = common_;
+    if(klu_rcond(symbolic_, numeric_, &common) != 1) return 0.;
+    return common.rcond;
+}
+
+void KLULinearSolver::free_numeric(){
+    klu_free_numeric(&numeric_, &common_);
+    numeric_ = nullptr;
+    factorized_ = false;
+}
+
+void KLULinearSolver::reset(){
+    free_numeric();
+    klu_free_symbolic(&symbolic_, &common_);
+    symbolic_ = nullptr;
+    klu_defaults(&common_);
+    n_ = -1;
+}
+
+// Eigen SparseLU
+bool SparseLULinearSolver::analyze(const Eigen::SparseMatrix<double> & A){
+    reset();
+    solver_.reset(new Eigen::SparseLU<Eigen::SparseMatrix<double>, Eigen::COLAMDOrdering<int> >());
+    solver_->analyzePattern(A);
+    n_ = A.cols();
+    return true;
+}
+
+bool SparseLULinearSolver::factor(const Eigen::SparseMatrix<double> & A){
+    if(n_ < 0) return false;
+    solver_->factorize(A);
+    factorized_ = solver_->info() == Eigen::Success;
+    return factorized_;
+}
+
+bool SparseLULinearSolver::solve(Eigen::Ref<Eigen::MatrixXd> b, bool transpose) const{
+    if(!factorized_) return false;
+    if(b.cols() == 0) return true;
+    Eigen::MatrixXd x;
+    if(transpose){
+#if EIGEN_VERSION_AT_LEAST(3, 4, 0)
+        x = solver_->transpose().solve(b);
+#else
+        return false;  // not available in this version of eigen
+#endif
+    }else{
+        x = solver_->solve(b);
+    }
+    if(solver_->info() != Eigen::Success) return false;
+    b = x;
+    return true;
+}
+
+void SparseLULinearSolver::reset(){
+    solver_.reset();
+    n_ = -1;
+    factorized_ = false;
+}
+
+// Eigen SimplicialLDLT
+bool LDLTLinearSolver::analyze(const Eigen::SparseMatrix<double> & A){
+    reset();
+    solver_.reset(new Eigen::SimplicialLDLT<Eigen::SparseMatrix<double> >());
+    solver_->analyzePattern(A);
+    n_ = A.cols();
+    return true;
+}
+
+bool LDLTLinearSolver::factor(const Eigen::SparseMatrix<double> & A){
+    if(n_ < 0) return false;
+    solver_->factorize(A);
+    factorized_ = solver_->info() == Eigen::Success;
+    return factorized_;
+}
+
+bool LDLTLinearSolver::solve(Eigen::Ref<Eigen::MatrixXd> b, bool transpose) const{
+    // the matrix is symmetric: "transpose" has no effect
+    if(!factorized_) return false;
+    if(b.cols() == 0) return true;
+    Eigen::MatrixXd x = solver_->solve(b);
+    if(solver_->info() != Eigen::Success) return false;
+    b = x;
+    return true;
+}
+
+void LDLTLinearSolver::reset(){
+    solver_.reset();
+    n_ = -1;
+    factorized_ = false;
+}
+
+// Eigen PartialPivLU (dense)
+bool DenseLULinearSolver::analyze(const Eigen::SparseMatrix<double> & A){
+    reset();
+    n_ = A.cols();
+    A_ = Eigen::MatrixXd::Zero(n_, n_);
+    lu_ = Eigen::PartialPivLU<Eigen::MatrixXd>(n_);
+    return true;
+}
+
+bool DenseLULinearSolver::factor(const Eigen::SparseMatrix<double> & A){
+    if((n_ < 0) || (A.cols() != n_)) return false;
+    // only the coefficients of the sparsity pattern are written (the pattern does not change after "analyze")
+    for (int col_id = 0; col_id < n_; ++col_id){
+        for (Eigen::SparseMatrix<double>::InnerIterator it(A, col_id); it; ++it){
+            A_(it.row(), col_id) = it.value();
+        }
+    }
+    lu_.compute(A_);
+    // PartialPivLU does not report singular matrices
+    factorized_ = (n_ == 0) || (lu_.matrixLU().diagonal().array().abs().minCoeff() > 0.);
+    return factorized_;
+}
+
+bool DenseLULinearSolver::solve(Eigen::Ref<Eigen::MatrixXd> b, bool transpose) const{
+    if(!factorized_) return false;
+    if(b.cols() == 0) return true;
+    if(b.cols() == 1){
+        // (much) faster than the general case for one right hand side
+        Eigen::Map<Eigen::VectorXd> x(b.data(), n_);
+        if(transpose) x = lu_.transpose().solve(x);
+        else x = lu_.solve(x);
+    }else{
+        if(transpose) b = lu_.transpose().solve(b);
+        else b = lu_.solve(b);
+    }
+    return b.allFinite();
+}
+
+void DenseLULinearSolver::reset(){
+    A_ = Eigen::MatrixXd();
+    lu_ = Eigen::PartialPivLU<Eigen::MatrixXd>();
+    n_ = -1;
+    factorized_ = false;
+}
@@ -0,0 +1,175 @@
+// Copyright (c) 2020, RTE (https://www.rte-france.com)
+// See AUTHORS.txt
+// This Source Code Form is subject to the terms of the Mozilla Public License, version 2.0.
+// If a copy of the Mozilla Public License, version 2.0 was not distributed with this file,
+// you can obtain one at http://mozilla.org/MPL/2.0/.
+// SPDX-License-Identifier: MPL-2.0
+// This file is part of LightSim2grid, LightSim2grid implements a c++ backend targeting the Grid2Op platform.
+
+#ifndef LINEARSOLVER_H
+#define LINEARSOLVER_H
+
+#include <memory>
+#include <complex>
+
+#include "Eigen/Core"
+#include "Eigen/Dense"
+#include "Eigen/SparseCore"
+#include "Eigen/SparseLU"
+#include "Eigen/SparseCholesky"
+
+// import klu package
+extern "C" {
+    #include "cs.h"
+    #include "klu.h"
+}
+
+#include "Utils.h"
+
+/**
+Interface of the linear solvers (for real square sparse matrices) used by KLUSolver, FDPFSolver and GridModel::dc_pf.
+
+The usage is:
+- "analyze" once for a given sparsity pattern (ordering, symbolic factorization)
+- "factor" (numeric factorization, with a new pivoting) for the values of a matrix having this sparsity pattern
+- "refactor" for new values of the matrix (with the same pattern). Solvers that can keep the pivoting of the last
+  call to "factor" (see "keeps_pivots") do so, the other ones perform a "factor" again.
+- "solve" as many times as needed, for one or many right hand sides at once
+
+The matrices should be compressed, with sorted indices. None of these functions throw: they return false in case of
+error (the solver then has no valid factorization).
+**/
+class LinearSolver
+{
+    public:
+        virtual ~LinearSolver(){}
+
+        // create a solver of the given type (see LinearSolverType)
+        static std::unique_ptr<LinearSolver> create(LinearSolverType type);
+
+        // grids with at most this number of buses are solved with DenseLU by default, for the ac and for the
+        // dc powerflow (negative: never), see benchmarks/dense_lu.py
+        static const int default_dense_threshold;
+        static const int default_dc_dense_threshold;
+
+        virtual LinearSolverType get_type() const = 0;
+        virtual bool analyze(const Eigen::SparseMatrix<double> & A) = 0;
+        virtual bool factor(const Eigen::SparseMatrix<double> & A) = 0;
+        virtual bool refactor(const Eigen::SparseMatrix<double> & A){
+            return factor(A);
+        }
+        // solve in place A.x = b (or A^T.x = b) for all the columns of b
+        virtual bool solve(Eigen::Ref<Eigen::MatrixXd> b, bool transpose=false) const = 0;
+        virtual void reset() = 0;
+
+        // size of the factorized matrix (-1 if "analyze" has not been called)
+        int size() const {return n_;}
+        bool is_analyzed() const {return n_ >= 0;}
+        bool is_factorized() const {return factorized_;}
+        // the next "refactor" will perform a full "factor" (eg if the last factorization gave a wrong solution)
+        void invalidate_factorization() {factorized_ = false;}
+
+        // whether "refactor" reuses the pivoting of the last "factor" (in which case "rcond" should be checked)
+        virtual bool keeps_pivots() const {return false;}
+        // cheap estimate of the reciprocal condition number of the factorized matrix (only for solvers that keep pivots)
+        virtual double rcond() const {return 1.;}
+
+    protected:
+        LinearSolver():n_(-1),factorized_(false){}
+
+        int n_;
+        bool factorized_;
+};
+
+/**
+SuiteSparse KLU, the default solver: it keeps the pivoting between successive factorizations (klu_refactor).
+**/
+class KLULinearSolver : public LinearSolver
+{
+    public:
+        KLULinearSolver():symbolic_(nullptr),numeric_(nullptr){
+            klu_defaults(&common_);
+        }
+        ~KLULinearSolver(){
+            reset();
+        }
+
+        LinearSolverType get_type() const {return LinearSolverType::KLU;}
+        bool analyze(const Eigen::SparseMatrix<double> & A);
+        bool factor(const Eigen::SparseMatrix<double> & A);
+        bool refactor(const Eigen::SparseMatrix<double> & A);
+        bool solve(Eigen::Ref<Eigen::MatrixXd> b, bool transpose=false) const;
+        void reset();
+
+        bool keeps_pivots() const {return true;}
+        double rcond() const;
+
+    private:
+        void free_numeric();
+
+        klu_symbolic* symbolic_;
+        klu_numeric* numeric_;
+        klu_common common_;
+
+        // no copy allowed
+        KLULinearSolver(const KLULinearSolver &) = delete;
+        KLULinearSolver & operator=(const KLULinearSolver &) = delete;
+};
+
+/**
+Eigen SparseLU (supernodal LU with partial pivoting), with a COLAMD ordering.
+**/
+class SparseLULinearSolver : public LinearSolver
+{
+    public:
+        LinearSolverType get_type() const {return LinearSolverType::SparseLU;}
+        bool analyze(const Eigen::SparseMatrix<double> & A);
+        bool factor(const Eigen::SparseMatrix<double> & A);
+        bool solve(Eigen::Ref<Eigen::MatrixXd> b, bool transpose=false) const;
+        void reset();
+
+    private:
+        // eigen solvers cannot be copied nor assigned, a new one is created by "reset"
+        std::unique_ptr<Eigen::SparseLU<Eigen::SparseMatrix<double>, Eigen::COLAMDOrdering<int> > > solver_;
+};
+
+/**
+Eigen SimplicialLDLT, for symmetric matrices only (eg the matrix of the dc powerflow), that are not checked.
+Only the lower triangular part of the matrix is read.
+**/
+class LDLTLinearSolver : public LinearSolver
+{
+    public:
+        LinearSolverType get_type() const {return LinearSolverType::LDLT;}
+        bool analyze(const Eigen::SparseMatrix<double> & A);
+        bool factor(const Eigen::SparseMatrix<double> & A);
+        bool solve(Eigen::Ref<Eigen::MatrixXd> b, bool transpose=false) const;
+        void reset();
+
+    private:
+        std::unique_ptr<Eigen::SimplicialLDLT<Eigen::SparseMatrix<double> > > solver_;
+};
+
+/**
+Eigen PartialPivLU on a dense copy of the matrix. The symbolic analysis, the ordering and the indirections of the
+sparse solvers cost more than the arithmetic for very small matrices (grids of a few tens of buses): the dense
+matrix (and its LU decomposition) is allocated by "analyze" and only filled (in place) by "factor".
+The matrix is still assembled as a sparse matrix by the caller (eg. the jacobian of KLUSolver, shared with
+get_J, the topology cache and the batch / fixed pattern modes), "factor" copies its non zero coefficients
+only. This copy is negligible compared to the dense LU decomposition itself.
+**/
+class DenseLULinearSolver : public LinearSolver
+{
+    public:
+        LinearSolverType get_type() const {return LinearSolverType::DenseLU;}
+        bool analyze(const Eigen::SparseMatrix<double> & A);
+        bool factor(const Eigen::SparseMatrix<double> & A);
+        bool solve(Eigen::Ref<Eigen::MatrixXd> b, bool transpose=false) const;
+        void reset();
+
+    private:
+        Eigen::MatrixXd A_;
+        Eigen::PartialPivLU<Eigen::MatrixXd> lu_;
+};
+
+#endif // LINEARSOLVER_H
@@ -15,5 +15,41 @@ Some typedef and other structures define here and used everywhere else
 typedef std::complex<double> cdouble;
 typedef std::tuple<Eigen::VectorXd, Eigen::VectorXd, Eigen::VectorXd> tuple3d;
 typedef std::tuple<Eigen::VectorXd, Eigen::VectorXd, Eigen::VectorXd, Eigen::VectorXd> tuple4d;
+// row major matrices: same memory layout as the (C ordered) numpy arrays, so they can be used without copy
+typedef Eigen::Matrix<double, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor> RealMat;
+typedef Eigen::Matrix<cdouble, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor> CplxMat;
+typedef Eigen::Matrix<int, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor> IntMat;
+// results of GridModel::compute_time_series: convergence flags, voltages, then p, q, a at the origin and at the
+// extremity of the branches
+typedef std::tuple<Eigen::Array<bool, Eigen::Dynamic, 1>, CplxMat,
+                   RealMat, RealMat, RealMat, RealMat, RealMat, RealMat> TimeSeriesRes;
+
+// algorithm used to solve the ac powerflow: newton raphson or fast decoupled (XB or BX variant)
+enum class PFAlgorithm {NR, FDPF_XB, FDPF_BX};
+// fast decoupled powerflow: the resistances are neglected in B' (XB) or in B'' (BX)
+enum class FDPFMethod {XB, BX};
+// linear solver (see LinearSolver), LDLT can only be used for symmetric matrices (dc powerflow)
+// DenseLU stores the matrix as a dense one: only for very small grids
+enum class LinearSolverType {KLU, SparseLU, LDLT, DenseLU};
+
+// elements that can be disconnected by a contingency (see GridModel::run_n1)
+enum class ElementType {LINE, TRAFO, GEN};
+// a contingency is the outage of one (or more) elements: their type and their id
+typedef std::vector<std::pair<ElementType, int> > Contingency;
+// results of GridModel::run_n1: convergence flags, p and a at the origin of the branches (one row per contingency)
+typedef std::tuple<Eigen::Array<bool, Eigen::Dynamic, 1>, RealMat, RealMat> ContingencyRes;
+// results of GridModel::dc_n1_screening: whether each outage splits the grid, p at the origin of the branches
+typedef std::tuple<Eigen::Array<bool, Eigen::Dynamic, 1>, RealMat> DCContingencyRes;
+// results of GridModel::ac_n1_screening: error indicator, p and a at the origin of the branches
+typedef std::tuple<Eigen::VectorXd, RealMat, RealMat> ACContingencyRes;
+// results of GridModel::dc_n2_screening: critical pairs of outages (both branches and the overloaded branch),
+// relative flow of the overloaded branch, and critical single outages
+typedef std::tuple<IntMat, Eigen::VectorXd, Eigen::VectorXi> N2ContingencyRes;
+
+// connectivity of the grid (see GridModel::check_connectivity): connected, or the first reason found for which
+// it cannot be solved (the slack bus is disconnected, a load / a generator / a bus is not connected to the slack bus)
+enum class ConnectivityStatus {CONNECTED, SLACK_DISCONNECTED, LOAD_ISOLATED, GEN_ISOLATED, BUS_ISOLATED};
+// results of GridModel::get_connectivity_report: the status, then the ids of the isolated buses, loads and generators
+typedef std::tuple<ConnectivityStatus, Eigen::VectorXi, Eigen::VectorXi, Eigen::VectorXi> ConnectivityRes;
 
 #endif // UTILS_H
\ No newline at end of file
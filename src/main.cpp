@@ -11,12 +11,21 @@
 #include <pybind11/stl.h>
 
 #include "KLUSolver.h"
+#include "FDPFSolver.h"
+#include "DCSolver.h"
 #include "DataConverter.h"
 #include "GridModel.h"
 
 namespace py = pybind11;
 
 PYBIND11_MODULE(lightsim2grid_cpp, m) {
+    py::enum_<LinearSolverType>(m, "LinearSolverType")
+        .value("KLU", LinearSolverType::KLU)  // SuiteSparse KLU (default)
+        .value("SparseLU", LinearSolverType::SparseLU)  // Eigen SparseLU
+        .value("LDLT", LinearSolverType::LDLT)  // Eigen SimplicialLDLT (symmetric matrices only: dc powerflow)
+        .value("DenseLU", LinearSolverType::DenseLU)  // Eigen PartialPivLU on a dense matrix (very small grids only)
+        .export_values();
+
     py::class_<KLUSolver>(m, "KLUSolver")
         .def(py::init<>())
         .def("get_J", &KLUSolver::get_J)  // (get the jacobian matrix, sparse csc matrix)
@@ -27,10 +36,75 @@ PYBIND11_MODULE(lightsim2grid_cpp, m) {
         .def("reset", &KLUSolver::reset)  // reset the solver to its original state
         .def("converged", &KLUSolver::converged)  // whether the solver has converged
         .def("do_newton", &KLUSolver::do_newton, py::call_guard<py::gil_scoped_release>())  // perform the newton raphson optimization
+        .def("do_newton_fixed_pattern", &KLUSolver::do_newton_fixed_pattern, py::call_guard<py::gil_scoped_release>())  // same, but the pattern of J does not change between calls
+        .def("get_nb_factorizations", &KLUSolver::get_nb_factorizations)  // number of klu_analyze, klu_factor and klu_refactor performed
+        .def("set_chord", &KLUSolver::set_chord)  // reuse the factorization of the jacobian while the mismatch decreases fast enough
+        .def("get_chord", &KLUSolver::get_chord)
+        .def("set_chord_policy", &KLUSolver::set_chord_policy)  // (max_ratio, max_reuse)
+        .def("get_chord_policy", &KLUSolver::get_chord_policy)
+        .def("get_nb_refactor_saved", &KLUSolver::get_nb_refactor_saved)  // number of iterations performed with an outdated jacobian
+        .def("set_linear_solver", &KLUSolver::set_linear_solver)  // KLU or SparseLU (see LinearSolverType)
+        .def("get_linear_solver", &KLUSolver::get_linear_solver)
+        .def("set_dense_threshold", &KLUSolver::set_dense_threshold)  // DenseLU is used up to this number of buses
+        .def("get_dense_threshold", &KLUSolver::get_dense_threshold)
+        .def("factorize", &KLUSolver::factorize, py::call_guard<py::gil_scoped_release>())  // factorize any (square) sparse matrix, to use it with "solve_multi"
+        .def("solve_multi", &KLUSolver::solve_multi, py::arg("b").noconvert(), py::arg("transpose") = false,
+             py::call_guard<py::gil_scoped_release>())  // solve in place for all the columns of b (fortran ordered) at once
         .def("get_timers", &KLUSolver::get_timers)  // returns the timers corresponding to times the solver spent in different part
         .def("solve", &KLUSolver::do_newton, py::call_guard<py::gil_scoped_release>() );  // perform the newton raphson optimization
 
 
+    py::enum_<ElementType>(m, "ElementType")
+        .value("LINE", ElementType::LINE)  // powerline
+        .value("TRAFO", ElementType::TRAFO)  // transformer
+        .value("GEN", ElementType::GEN)  // generator
+        .export_values();
+
+    py::enum_<ConnectivityStatus>(m, "ConnectivityStatus")
+        .value("CONNECTED", ConnectivityStatus::CONNECTED)  // the grid can be solved
+        .value("SLACK_DISCONNECTED", ConnectivityStatus::SLACK_DISCONNECTED)  // the slack generator or its bus is disconnected
+        .value("LOAD_ISOLATED", ConnectivityStatus::LOAD_ISOLATED)  // a load is not connected to the slack bus
+        .value("GEN_ISOLATED", ConnectivityStatus::GEN_ISOLATED)  // a generator is not connected to the slack bus
+        .value("BUS_ISOLATED", ConnectivityStatus::BUS_ISOLATED)  // a bus is not connected to the slack bus
+        .export_values();
+
+    py::enum_<PFAlgorithm>(m, "PFAlgorithm")
+        .value("NR", PFAlgorithm::NR)  // newton raphson (default)
+        .value("FDPF_XB", PFAlgorithm::FDPF_XB)  // fast decoupled, XB variant
+        .value("FDPF_BX", PFAlgorithm::FDPF_BX)  // fast decoupled, BX variant
+        .export_values();
+
+    py::class_<FDPFSolver>(m, "FDPFSolver")
+        .def(py::init<>())
+        .def("get_Va", &FDPFSolver::get_Va)  // get the voltage angle vector (vector of double)
+        .def("get_Vm", &FDPFSolver::get_Vm)  // get the voltage magnitude vector (vector of double)
+        .def("get_error", &FDPFSolver::get_error)  // get the error message, see the definition of "err_" for more information
+        .def("get_nb_iter", &FDPFSolver::get_nb_iter)  // return the number of iteration performed at the last optimization
+        .def("reset", &FDPFSolver::reset)  // reset the solver to its original state
+        .def("converged", &FDPFSolver::converged)  // whether the solver has converged
+        .def("do_fdpf", &FDPFSolver::do_fdpf, py::call_guard<py::gil_scoped_release>())  // perform the fast decoupled powerflow
+        .def("get_nb_factorizations", &FDPFSolver::get_nb_factorizations)  // number of klu_analyze, klu_factor and klu_refactor performed
+        .def("get_timers", &FDPFSolver::get_timers);  // returns the timers corresponding to times the solver spent in different part
+
+    py::class_<DCSolver>(m, "DCSolver")
+        .def(py::init<>())
+        .def("get_Va", &DCSolver::get_Va)  // get the voltage angle vector (vector of double)
+        .def("get_Vm", &DCSolver::get_Vm)  // get the voltage magnitude vector (vector of double)
+        .def("get_V", &DCSolver::get_V)  // get the complex voltage vector
+        .def("get_error", &DCSolver::get_error)  // get the error message, see the definition of "err_" for more information
+        .def("reset", &DCSolver::reset)  // reset the solver to its original state (B will be factorized again)
+        .def("converged", &DCSolver::converged)  // whether the dc powerflow succeeded
+        .def("do_dc", &DCSolver::do_dc, py::call_guard<py::gil_scoped_release>())  // perform the dc powerflow
+        .def("solve_multi", &DCSolver::solve_multi, py::arg("dcYbus"), py::arg("theta").noconvert(),
+             py::arg("slack_bus_id_solver"),
+             py::call_guard<py::gil_scoped_release>())  // solve in place for all the columns of theta (fortran ordered)
+        .def("set_linear_solver", &DCSolver::set_linear_solver)
+        .def("get_linear_solver", &DCSolver::get_linear_solver)
+        .def("set_dense_threshold", &DCSolver::set_dense_threshold)
+        .def("get_dense_threshold", &DCSolver::get_dense_threshold)
+        .def("get_nb_factorizations", &DCSolver::get_nb_factorizations)  // number of analyze, factor and solve performed
+        .def("get_timers", &DCSolver::get_timers);  // returns the timers corresponding to times the solver spent in different part
+
     // converters
     py::class_<PandaPowerConverter>(m, "PandaPowerConverter")
         .def(py::init<>())
@@ -96,6 +170,7 @@ PYBIND11_MODULE(lightsim2grid_cpp, m) {
         // get back the results
         .def("get_Va", &GridModel::get_Va)
         .def("get_Vm", &GridModel::get_Vm)
+        .def("get_J", &GridModel::get_J)  // jacobian matrix of the last newton raphson (see solve_jacobian)
 
         .def("get_loads_res", &GridModel::get_loads_res)
         .def("get_loads_status", &GridModel::get_loads_status)
@@ -116,9 +191,76 @@ PYBIND11_MODULE(lightsim2grid_cpp, m) {
         .def("get_Sbus", &GridModel::get_Sbus)
         .def("get_pv", &GridModel::get_pv)
         .def("get_pq", &GridModel::get_pq)
+        .def("get_Bp", &GridModel::get_Bp)  // B' of the fast decoupled powerflow (same bus ids as Ybus)
+        .def("get_Bpp", &GridModel::get_Bpp)  // B'' of the fast decoupled powerflow (same bus ids as Ybus)
         .def("dc_pf", &GridModel::dc_pf)
+        .def("dc_pf_batch", &GridModel::dc_pf_batch, py::arg("Pbus"), py::arg("chunk_size") = 64,
+             py::call_guard<py::gil_scoped_release>())  // dc flows for many injections (one column per scenario)
         .def("ac_pf", &GridModel::ac_pf)
+        .def("compute_time_series", &GridModel::compute_time_series,
+             py::call_guard<py::gil_scoped_release>())  // one ac powerflow per row of the injections (C ordered float64 arrays are not copied)
+        .def("ac_pf_batch", &GridModel::ac_pf_batch,
+             py::arg("loads_p"), py::arg("loads_q"), py::arg("gens_p"), py::arg("gens_v"),
+             py::arg("Vinit"), py::arg("max_iter"), py::arg("tol"), py::arg("batch_size") = 16,
+             py::call_guard<py::gil_scoped_release>())  // independent ac powerflows, solved together (see KLUSolver::do_newton_batch)
+        .def("get_batch_nb_iter", &GridModel::get_batch_nb_iter)  // number of iterations of each scenario of the last ac_pf_batch
+        .def("run_n1", &GridModel::run_n1,
+             py::arg("contingency_list"), py::arg("Vinit"), py::arg("max_iter"), py::arg("tol"), py::arg("n_threads") = 0,
+             py::call_guard<py::gil_scoped_release>())  // one ac powerflow per contingency (list of (ElementType, id)), computed by a pool of threads
+        .def("dc_n1_screening", &GridModel::dc_n1_screening,
+             py::arg("Vinit"), py::arg("branch_ids"), py::arg("chunk_size") = 64,
+             py::call_guard<py::gil_scoped_release>())  // dc flows after the outage of each branch, from one factorization of B
+        .def("ac_n1_screening", &GridModel::ac_n1_screening,
+             py::arg("Vinit"), py::arg("branch_ids"), py::arg("max_iter"), py::arg("tol"), py::arg("nb_step") = 2,
+             py::call_guard<py::gil_scoped_release>())  // approximate ac flows after the outage of each branch (compensation method)
+        .def("get_ptdf", &GridModel::get_ptdf, py::arg("monitored_branches") = Eigen::VectorXi(),
+             py::call_guard<py::gil_scoped_release>())  // power transfer distribution factors (dc), one row per branch
+        .def("get_lodf", &GridModel::get_lodf,
+             py::arg("monitored_branches") = Eigen::VectorXi(), py::arg("outaged_branches") = Eigen::VectorXi(),
+             py::call_guard<py::gil_scoped_release>())  // line outage distribution factors (dc), one column per outage
+        .def("dc_n2_screening", &GridModel::dc_n2_screening,
+             py::arg("Vinit"), py::arg("branch_ids"), py::arg("flow_limits"), py::arg("rho_max") = 1.0,
+             py::arg("n_threads") = 0,
+             py::call_guard<py::gil_scoped_release>())  // critical pairs of branch outages (dc, LODF with bounding and pruning)
+        .def("get_n2_stats", &GridModel::get_n2_stats)  // number of pairs, pruned pairs and critical pairs of the last dc_n2_screening
+        .def("get_bridges", &GridModel::get_bridges)  // whether the outage of each branch splits the grid (Tarjan's algorithm)
+        .def("get_articulation_buses", &GridModel::get_articulation_buses)  // whether the outage of each bus splits the grid
+        .def("get_articulation_substations", &GridModel::get_articulation_substations)  // same for the substations (see set_n_sub)
+        .def("get_nb_islands", &GridModel::get_nb_islands)  // number of connected components of the grid
+        .def("check_connectivity", &GridModel::check_connectivity)  // whether the grid can be solved (union find, checked by ac_pf and dc_pf)
+        .def("get_connectivity_report", &GridModel::get_connectivity_report)  // status, isolated buses, loads and generators
+        .def("get_connectivity_stats", &GridModel::get_connectivity_stats)  // number of builds and of incremental updates of the union find
         .def("compute_newton", &GridModel::ac_pf)
+        .def("set_fixed_pattern", &GridModel::set_fixed_pattern)
+        .def("get_fixed_pattern", &GridModel::get_fixed_pattern)
+        .def("get_nb_factorizations", &GridModel::get_nb_factorizations)
+        .def("set_pf_algorithm", &GridModel::set_pf_algorithm)  // newton raphson or fast decoupled (see PFAlgorithm)
+        .def("get_pf_algorithm", &GridModel::get_pf_algorithm)
+        .def("set_chord_newton", &GridModel::set_chord_newton)  // reuse the factorization of the jacobian (see KLUSolver::set_chord)
+        .def("get_chord_newton", &GridModel::get_chord_newton)
+        .def("set_chord_policy", &GridModel::set_chord_policy)
+        .def("get_chord_policy", &GridModel::get_chord_policy)
+        .def("get_nb_refactor_saved", &GridModel::get_nb_refactor_saved)
+        .def("set_linear_solver", &GridModel::set_linear_solver)  // linear solver of the ac powerflow (see LinearSolverType)
+        .def("get_linear_solver", &GridModel::get_linear_solver)
+        .def("set_dc_linear_solver", &GridModel::set_dc_linear_solver)  // linear solver of the dc powerflow
+        .def("get_dc_linear_solver", &GridModel::get_dc_linear_solver)
+        .def("set_dense_threshold", &GridModel::set_dense_threshold)  // DenseLU is used up to this number of buses (-1 by default: never)
+        .def("get_dense_threshold", &GridModel::get_dense_threshold)
+        .def("set_dc_dense_threshold", &GridModel::set_dc_dense_threshold)
+        .def("get_dc_dense_threshold", &GridModel::get_dc_dense_threshold)
+        .def("get_dc_nb_factorizations", &GridModel::get_dc_nb_factorizations)  // analyze, factor and solve of the dc powerflow
+        .def("get_dc_timers", &GridModel::get_dc_timers)  // timers of the last dc powerflow
+        .def("tune_linear_solver", &GridModel::tune_linear_solver)  // time every linear solver and keep the fastest
+        .def("solve_jacobian", &GridModel::solve_jacobian, py::arg("b").noconvert(), py::arg("transpose") = false,
+             py::call_guard<py::gil_scoped_release>())  // solve in place J.x = b for all the columns of b (fortran ordered)
+        .def("get_timers", &GridModel::get_timers)  // timers of the solver for the last powerflow
+        .def("get_nb_iter", &GridModel::get_nb_iter)  // number of newton raphson iterations of the last powerflow
+        .def("set_topo_cache_capacity", &GridModel::set_topo_cache_capacity)
+        .def("get_topo_cache_capacity", &GridModel::get_topo_cache_capacity)
+        .def("get_topo_cache_stats", &GridModel::get_topo_cache_stats)  // hits, misses, number of topologies in the cache
+        .def("clear_topo_cache", &GridModel::clear_topo_cache)
+        .def("get_topo_fingerprint", &GridModel::get_topo_fingerprint)
 
          // apply action faster (optimized for grid2op representation)
          // it is not recommended to use it outside of grid2Op.